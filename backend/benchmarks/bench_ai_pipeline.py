@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+Benchmark: AI pipelines end to end
+
+Runs the goal classification and employee recommendation pipelines of
+task_routes against the fake OpenAI server (benchmarks/fake_openai_server.py)
+and an in-memory Supabase stand-in, and reports per pipeline:
+- wall time (median / max over --repeat runs)
+- LLM calls received by the fake server (and how many were streamed)
+- database round trips (one per `.execute()`), split by table
+
+Pipelines:
+- classify:<template> - classify_goal_to_tasks_only for 'auto' and every predefined process
+- recommend:predefined / recommend:ai_task - corrected_process_employee_recommendations_for_task
+  for a predefined-process task (role matching) and an AI-generated task (full RAG)
+- recommend:ai_task:cached - regenerating an unchanged AI-generated task (recommendation cache hit)
+- full_rag_jd_analysis - JD analysis over the employee directory
+
+All other pipelines run with an empty recommendation cache.
+
+Usage (from the backend directory):
+    python benchmarks/bench_ai_pipeline.py
+    python benchmarks/bench_ai_pipeline.py --employees 200 --latency-ms 400 --token-delay-ms 5 --repeat 3
+    python benchmarks/bench_ai_pipeline.py --failure-rate 0.2 --json results.json
+"""
+import io
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import tempfile
+import statistics
+import contextlib
+from collections import Counter
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_openai_server import FakeOpenAIServer, parse_model_latency
+
+
+# ========== IN-MEMORY SUPABASE ==========
+
+def resolve(row, column):
+    """Value of `column` in `row`, following `a->b->>c` JSON paths"""
+    parts = [part for part in column.replace('->>', '->').split('->')]
+    value = row
+    for part in parts:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part.strip())
+    return value
+
+
+def split_clauses(filters):
+    """Top-level comma-separated clauses of a PostgREST logic filter"""
+    clauses, depth, quoted, current = [], 0, False, ''
+    for char in filters:
+        if char == '"':
+            quoted = not quoted
+        elif char == ',' and depth == 0 and not quoted:
+            clauses.append(current)
+            current = ''
+            continue
+        elif not quoted:
+            depth += char in '({'
+            depth -= char in ')}'
+        current += char
+    clauses.append(current)
+    return clauses
+
+
+def clause_matches(row, clause):
+    if clause.startswith('and(') and clause.endswith(')'):
+        return all(clause_matches(row, part) for part in split_clauses(clause[4:-1]))
+    column, operator, value = clause.split('.', 2)
+    actual = resolve(row, column)
+    value = value.strip('"')
+    if operator == 'eq':
+        return str(actual) == value
+    if operator in ('gt', 'lt'):
+        return actual is not None and (str(actual) > value if operator == 'gt' else str(actual) < value)
+    values = {item.strip() for item in value.strip('(){}').split(',') if item.strip()}
+    if operator == 'in':
+        return str(actual) in values
+    actual = {str(item) for item in actual or []}
+    return values <= actual if operator == 'cs' else bool(values & actual)
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db = db
+        self.table_name = table
+        self.operation = 'select'
+        self.payload = None
+        self.filters = []
+        self.orderings = []
+        self.max_rows = None
+        self.count = None
+
+    def select(self, *args, count=None, **kwargs):
+        self.operation, self.count = 'select', count
+        return self
+
+    def insert(self, payload):
+        self.operation, self.payload = 'insert', payload
+        return self
+
+    def update(self, payload):
+        self.operation, self.payload = 'update', payload
+        return self
+
+    def delete(self):
+        self.operation = 'delete'
+        return self
+
+    def upsert(self, payload, on_conflict='id', **kwargs):
+        self.operation, self.payload, self.conflict_column = 'upsert', payload, on_conflict or 'id'
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: str(resolve(row, column)) == str(value))
+        return self
+
+    def neq(self, column, value):
+        self.filters.append(lambda row: str(resolve(row, column)) != str(value))
+        return self
+
+    def in_(self, column, values):
+        values = {str(value) for value in values}
+        self.filters.append(lambda row: str(resolve(row, column)) in values)
+        return self
+
+    def or_(self, filters):
+        """PostgREST `or` filter: `column.op.value` clauses (eq, gt, lt, in, cs, ov) and nested and(...)"""
+        clauses = split_clauses(filters)
+        self.filters.append(lambda row: any(clause_matches(row, clause) for clause in clauses))
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: resolve(row, column) is not None and str(resolve(row, column)) >= str(value))
+        return self
+
+    def lte(self, column, value):
+        self.filters.append(lambda row: resolve(row, column) is not None and str(resolve(row, column)) <= str(value))
+        return self
+
+    def order(self, column, desc=False):
+        self.orderings.append((column, desc))
+        return self
+
+    def limit(self, count):
+        self.max_rows = count
+        return self
+
+    def execute(self):
+        self.db.round_trips[self.table_name] += 1
+        rows = self.db.tables.setdefault(self.table_name, [])
+
+        if self.operation == 'insert':
+            records = self.payload if isinstance(self.payload, list) else [self.payload]
+            inserted = []
+            for record in records:
+                row = dict(record)
+                row.setdefault('id', str(uuid.uuid4()))
+                row.setdefault('created_at', datetime.utcnow().isoformat())
+                rows.append(row)
+                inserted.append(dict(row))
+            return SimpleNamespace(data=inserted)
+
+        if self.operation == 'upsert':
+            records = self.payload if isinstance(self.payload, list) else [self.payload]
+            by_key = {str(row.get(self.conflict_column)): row for row in rows}
+            written = []
+            for record in records:
+                row = by_key.get(str(record.get(self.conflict_column)))
+                if row is None:
+                    row = dict(record)
+                    rows.append(row)
+                else:
+                    row.update(record)
+                written.append(dict(row))
+            return SimpleNamespace(data=written)
+
+        matched = [row for row in rows if all(test(row) for test in self.filters)]
+        if self.operation == 'update':
+            for row in matched:
+                row.update(self.payload)
+            return SimpleNamespace(data=[dict(row) for row in matched])
+        if self.operation == 'delete':
+            self.db.tables[self.table_name] = [row for row in rows if row not in matched]
+            return SimpleNamespace(data=matched)
+
+        for column, desc in reversed(self.orderings):
+            matched.sort(key=lambda row: str(resolve(row, column) or ''), reverse=desc)
+        total = len(matched) if self.count else None
+        if self.max_rows is not None:
+            matched = matched[:self.max_rows]
+        return SimpleNamespace(data=[dict(row) for row in matched], count=total)
+
+
+class FakeRpc:
+    def __init__(self, db, name, params):
+        self.db, self.name, self.params = db, name, params
+
+    def execute(self):
+        self.db.round_trips[f"rpc:{self.name}"] += 1
+        if self.name not in self.db.functions:
+            raise Exception(f"function {self.name} does not exist")
+        return SimpleNamespace(data=self.db.functions[self.name](self.db, self.params or {}))
+
+
+class FakeSupabase:
+    """Enough of the supabase-py query builder for the AI pipelines; counts round trips"""
+
+    def __init__(self):
+        self.tables = {}
+        self.round_trips = Counter()
+        # name -> function(db, params) for rpc(); benchmarks register what they need
+        self.functions = {}
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params=None):
+        return FakeRpc(self, name, params)
+
+
+def merge_strategic_metadata(db, params):
+    """Python version of the SQL function in migrations/action_plans_strategic_metadata.sql"""
+    updates = {row['id']: row['strategic_metadata'] for row in params['p_rows']}
+    updated = 0
+    for task in db.tables.get('action_plans', []):
+        if task['id'] in updates:
+            current = task.get('strategic_metadata')
+            if isinstance(current, str):
+                current = json.loads(current or '{}')
+            task['strategic_metadata'] = dict(current if isinstance(current, dict) else {}, **updates[task['id']])
+            updated += 1
+    return updated
+
+
+# ========== FIXTURES ==========
+
+def process_roles(registry):
+    roles = []
+    for process in registry.values():
+        for step in process.values():
+            role = (step.get('responsible') or '').strip()
+            if role and role not in roles:
+                roles.append(role)
+    return roles
+
+
+def seed_employees(db, count, roles, seed=11):
+    rng = random.Random(seed)
+    departments = ["SUPPLY CHAIN DEPARTMENT", "SALES DEPARTMENT", "PRODUCT DEVELOPMENT DEPARTMENT",
+                   "FINANCE & ADMIN DEPARTMENT"]
+    skills = ["logistics", "customs", "negotiation", "Excel", "budgeting", "supplier relations",
+              "invoice processing", "quality control", "documentation", "data analysis"]
+    employees = []
+    for index in range(count):
+        employee = {
+            'id': str(uuid.UUID(int=rng.getrandbits(128))),
+            'name': f"Employee {index}",
+            'role': roles[index % len(roles)] if index < len(roles) * 2 else rng.choice(roles + ["Analyst"]),
+            'title': rng.choice(["Officer", "Senior Officer", "Manager"]),
+            'department': rng.choice(departments),
+            'skills': rng.sample(skills, rng.randint(2, 6)),
+            'experience_years': rng.randint(0, 12),
+            'strengths': rng.sample(skills, 2),
+            'google_drive_jd': " ".join(rng.choice(skills) for _ in range(200)),
+            'job_description_url': f"https://docs.example.com/jd/{index}" if rng.random() < 0.6 else None,
+            'is_active': True,
+            'updated_at': "2025-01-01T00:00:00"
+        }
+        employees.append(employee)
+    db.tables['employees'] = [dict(employee) for employee in employees]
+    return employees
+
+
+def new_goal(db, template):
+    ai_meta = db.table("ai_meta").insert({
+        "source": "benchmark", "model": "gpt-3.5-turbo",
+        "input_json": {"template": template}, "output_json": {"status": "starting"}
+    }).execute().data[0]
+    goal = db.table("objectives").insert({
+        "title": f"Order to Delivery - ACME {template}",
+        "description": "Deliver the Q4 order of industrial chemicals to the customer warehouse",
+        "output": "Order delivered and settled",
+        "deadline": "2025-12-31",
+        "department": "SUPPLY CHAIN DEPARTMENT",
+        "priority": "high",
+        "pre_number": "OBJ-001",
+        "ai_meta_id": ai_meta['id']
+    }).execute().data[0]
+    goal_data = {key: goal[key] for key in ('title', 'description', 'output', 'deadline', 'department', 'priority')}
+    goal_data['auto_classify'] = True
+    return goal, goal_data, ai_meta['id']
+
+
+def new_task(db, template, strategic_metadata, description):
+    goal, _, _ = new_goal(db, template)
+    ai_meta = db.table("ai_meta").insert({"input_json": {}, "output_json": {"status": "processing"}}).execute().data[0]
+    task = db.table("action_plans").insert({
+        "task_description": description,
+        "objective_id": goal['id'],
+        "priority": "high",
+        "estimated_hours": 8,
+        "strategic_metadata": strategic_metadata
+    }).execute().data[0]
+    return task, ai_meta['id']
+
+
+def new_objective_tasks(db, task_routes, template):
+    """An objective with its generated tasks -> (objective id, task ids)"""
+    goal, goal_data, ai_meta_id = new_goal(db, template)
+    with contextlib.redirect_stdout(io.StringIO()):
+        task_routes.classify_goal_to_tasks_only(goal, goal_data, ai_meta_id, template)
+    tasks = db.table("action_plans").select("id").eq("objective_id", goal['id']).execute().data
+    return goal['id'], [task['id'] for task in tasks]
+
+
+def recommend_tasks_one_by_one(db, task_routes, objective_id, task_ids):
+    """What clicking "Recommend Employee" on every task does: one job per task"""
+    for task_id in task_ids:
+        ai_meta = db.table("ai_meta").insert({"input_json": {"task_id": task_id}, "output_json": {}}).execute().data[0]
+        task_routes.run_rag_recommendations_job({'task_id': task_id}, ai_meta['id'])
+    return f"{len(task_ids)} tasks"
+
+
+def warm_recommendation_cache(db, task_routes, employees, description):
+    """An AI-generated task whose recommendations were computed once already"""
+    task, ai_meta_id = new_task(db, 'auto', {"required_skills": ["Market analysis"]}, description)
+    with contextlib.redirect_stdout(io.StringIO()):
+        task_routes.corrected_process_employee_recommendations_for_task(task, employees, ai_meta_id)
+    return (task,)
+
+
+def regenerate_cached(task_routes, task, employees):
+    """The cache lookup /generate-rag-recommendations does before creating a job"""
+    entry = task_routes.apply_cached_recommendations(
+        task, task_routes.parse_strategic_metadata(task), None, "full_rag_ai_classified", False, employees)
+    assert entry, "expected a recommendation cache hit"
+    return entry['recommendations']
+
+
+def recommend_objective(db, task_routes, objective_id, task_ids):
+    ai_meta = db.table("ai_meta").insert({"input_json": {"objective_id": objective_id}, "output_json": {}}).execute().data[0]
+    task_routes.run_objective_recommendations_job({'objective_id': objective_id, 'only_missing': False}, ai_meta['id'])
+    output = db.table("ai_meta").select("*").eq("id", ai_meta['id']).execute().data[0]['output_json']
+    return f"{output.get('tasks_saved')} tasks, {output.get('distinct_analyses')} analyses"
+
+
+# ========== RUNS ==========
+
+def measure(name, setup, run, server, db, repeat, verbose, reset=None):
+    timings, llm_calls, streamed, round_trips, tables, results = [], [], [], [], Counter(), []
+    for _ in range(repeat):
+        if reset:
+            reset()
+        args = setup()
+        server.reset_counters()
+        db.round_trips.clear()
+        output = io.StringIO()
+        redirect = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(output)
+        start = time.perf_counter()
+        with redirect:
+            result = run(*args)
+        timings.append(time.perf_counter() - start)
+        llm_calls.append(server.calls)
+        streamed.append(server.streamed)
+        round_trips.append(sum(db.round_trips.values()))
+        tables.update(db.round_trips)
+        results.append(result)
+
+    report = {
+        'pipeline': name,
+        'wall_ms_median': round(statistics.median(timings) * 1000, 1),
+        'wall_ms_max': round(max(timings) * 1000, 1),
+        'llm_calls': statistics.median(llm_calls),
+        'llm_streamed': statistics.median(streamed),
+        'db_round_trips': statistics.median(round_trips),
+        'db_by_table': {table: count / repeat for table, count in sorted(tables.items())},
+        'result': summarize(results[-1])
+    }
+    print(f"{name:<34} {report['wall_ms_median']:>9.1f}ms {report['wall_ms_max']:>9.1f}ms "
+          f"{report['llm_calls']:>5} ({report['llm_streamed']:>2} streamed) {report['db_round_trips']:>6}   "
+          f"{report['result']}")
+    return report
+
+
+def summarize(result):
+    if isinstance(result, tuple) and result:
+        return f"{len(result[0])} tasks" if isinstance(result[0], list) else str(result[1])[:40]
+    if isinstance(result, list):
+        return f"{len(result)} recommendations"
+    return str(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--employees', type=int, default=40, help='Employees in the directory')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per pipeline')
+    parser.add_argument('--latency-ms', type=float, default=200, help='Fake OpenAI time to first byte')
+    parser.add_argument('--token-delay-ms', type=float, default=2, help='Fake OpenAI delay per streamed token')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of OpenAI requests that fail')
+    parser.add_argument('--failure-status', type=int, default=429, help='HTTP status of injected failures')
+    parser.add_argument('--invalid-task-rate', type=float, default=0.0,
+                        help='Fraction of generated tasks the fake OpenAI returns without a description')
+    parser.add_argument('--model-latency', action='append', default=[], metavar='MODEL=MS',
+                        help='Fake OpenAI latency for one model (repeatable)')
+    parser.add_argument('--json', help='Write the report to this file')
+    parser.add_argument('--verbose', action='store_true', help='Show pipeline logs')
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(latency_ms=args.latency_ms, token_delay_ms=args.token_delay_ms,
+                              failure_rate=args.failure_rate, failure_status=args.failure_status,
+                              invalid_task_rate=args.invalid_task_rate,
+                              model_latency_ms=parse_model_latency(args.model_latency)).start()
+
+    # task_routes reads its configuration at import
+    os.environ['OPENAI_API_KEY'] = 'sk-fake-benchmark-key'
+    os.environ['OPENAI_BASE_URL'] = server.base_url
+    os.environ.setdefault('JOB_STORE', 'memory')
+    os.environ['JOB_QUEUE_AUTOSTART'] = 'false'
+    os.environ.setdefault('LLM_RETRY_BASE_SECONDS', '0.05')
+    os.environ['RECOMMENDATION_CACHE_DIR'] = tempfile.mkdtemp(prefix='bench_recommendation_cache_')
+    with contextlib.redirect_stdout(io.StringIO()):
+        import task_routes
+        import employee_workload
+        from predefined_processes import get_predefined_processes_registry
+
+    db = FakeSupabase()
+    db.functions['merge_strategic_metadata'] = merge_strategic_metadata
+    task_routes.get_supabase_client = lambda: db
+    employee_workload.get_supabase_client = lambda: db
+    registry = get_predefined_processes_registry()
+    employees = seed_employees(db, args.employees, process_roles(registry))
+    cold = task_routes.get_recommendation_cache().clear
+
+    print(f"🤖 Fake OpenAI at {server.base_url}: {args.latency_ms:.0f}ms latency, "
+          f"{args.token_delay_ms:.0f}ms/token, {args.failure_rate:.0%} failures")
+    print(f"👥 {len(employees)} employees, {args.repeat} runs per pipeline")
+    print(f"{'pipeline':<34} {'median':>11} {'max':>11} {'LLM calls':>17} {'DB trips':>7}   result")
+    print("-" * 110)
+
+    reports = []
+    for template in ['auto'] + list(registry.keys()):
+        reports.append(measure(
+            f"classify:{template}",
+            lambda template=template: new_goal(db, template),
+            lambda goal, goal_data, ai_meta_id, template=template:
+                task_routes.classify_goal_to_tasks_only(goal, goal_data, ai_meta_id, template),
+            server, db, args.repeat, args.verbose))
+
+    first_process = next(iter(registry.values()))
+    first_step_key, first_step = next(iter(first_process.items()))
+    reports.append(measure(
+        "recommend:predefined",
+        lambda: new_task(db, next(iter(registry.keys())),
+                         {"recommended_role": first_step['responsible'], "predefined_process": True},
+                         f"{first_step_key}: {first_step['activities']}"),
+        lambda task, ai_meta_id: task_routes.corrected_process_employee_recommendations_for_task(
+            task, employees, ai_meta_id),
+        server, db, args.repeat, args.verbose, reset=cold))
+
+    ai_task_description = "Research market demand for specialty coatings and prepare a partnership proposal"
+    reports.append(measure(
+        "recommend:ai_task",
+        lambda: new_task(db, 'auto', {"required_skills": ["Market analysis"]}, ai_task_description),
+        lambda task, ai_meta_id: task_routes.corrected_process_employee_recommendations_for_task(
+            task, employees, ai_meta_id),
+        server, db, args.repeat, args.verbose, reset=cold))
+
+    reports.append(measure(
+        "recommend:ai_task:cached",
+        lambda: warm_recommendation_cache(db, task_routes, employees, ai_task_description),
+        lambda task: regenerate_cached(task_routes, task, employees),
+        server, db, args.repeat, args.verbose, reset=cold))
+
+    # Any employee change moves the directory version: the same task misses
+    (task,) = warm_recommendation_cache(db, task_routes, employees, ai_task_description)
+    edited = [dict(employee) for employee in employees]
+    edited[0]['updated_at'] = datetime.utcnow().isoformat()
+    assert task_routes.apply_cached_recommendations(
+        task, task_routes.parse_strategic_metadata(task), None, "full_rag_ai_classified", False, edited) is None
+    print(f"{'  employee edit -> cache miss':<34} ✅")
+
+    for template in ('auto', 'order_to_delivery' if 'order_to_delivery' in registry else next(iter(registry))):
+        reports.append(measure(
+            f"objective:{template}:per_task",
+            lambda template=template: new_objective_tasks(db, task_routes, template),
+            lambda objective_id, task_ids: recommend_tasks_one_by_one(db, task_routes, objective_id, task_ids),
+            server, db, args.repeat, args.verbose, reset=cold))
+        reports.append(measure(
+            f"objective:{template}:batch",
+            lambda template=template: new_objective_tasks(db, task_routes, template),
+            lambda objective_id, task_ids: recommend_objective(db, task_routes, objective_id, task_ids),
+            server, db, args.repeat, args.verbose, reset=cold))
+
+    reports.append(measure(
+        "full_rag_jd_analysis",
+        lambda: (ai_task_description, employees, 3, None, "Market research"),
+        task_routes.full_rag_jd_analysis,
+        server, db, args.repeat, args.verbose))
+
+    print("-" * 110)
+    print(f"LLM gateway: {task_routes.llm.stats()}")
+    server.stop()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as handle:
+            json.dump({
+                'config': vars(args),
+                'llm_gateway': task_routes.llm.stats(),
+                'pipelines': reports
+            }, handle, indent=2)
+        print(f"📄 Report written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark: objective-level assignment optimizer
+
+Plans an objective's tasks over the employee directory three ways and
+compares speed, total fit and how the work is spread:
+- per-task best match (what task-by-task recommendations amount to)
+- Hungarian assignment over capacity slots (scipy linear_sum_assignment)
+- the greedy solver used when SciPy is missing
+
+Optimized plans are checked against the capacity limits.
+
+Usage (from the backend directory):
+    python benchmarks/bench_assignment_optimizer.py
+    python benchmarks/bench_assignment_optimizer.py --tasks 50 --employees 200 --repeat 10
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import assignment_optimizer
+from assignment_optimizer import optimize_assignments, fit_matrix, task_hours
+from process_registry import get_process_registry
+from benchmarks.bench_ai_pipeline import FakeSupabase, seed_employees, process_roles
+from benchmarks.bench_keyword_matching import TASKS as CUSTOM_TASKS
+
+
+def build_tasks(count, seed=5):
+    """Predefined-process steps (with their role) mixed with custom task texts"""
+    rng = random.Random(seed)
+    steps = [step for template in get_process_registry().templates.values() for step in template.steps]
+    tasks = []
+    for index in range(count):
+        if index % 2 == 0:
+            step = steps[(index // 2) % len(steps)]
+            tasks.append({
+                'id': f"task-{index}",
+                'task_description': f"{step.title}: {step.activities}",
+                'estimated_hours': rng.choice([4, 8, 12, 16]),
+                'strategic_metadata': {'recommended_role': step.responsible}
+            })
+        else:
+            tasks.append({
+                'id': f"task-{index}",
+                'task_description': rng.choice(CUSTOM_TASKS),
+                'estimated_hours': rng.choice([4, 8, 12, 16]),
+                'strategic_metadata': {'required_skills': rng.sample(["logistics", "negotiation", "budgeting"], 1)}
+            })
+    return tasks
+
+
+def per_task_best(tasks, employees):
+    """Each task independently gets its highest-fit employee"""
+    fit = fit_matrix(tasks, employees)
+    best = fit.argmax(axis=1)
+    return {
+        'assignments': [{'task_id': task['id'], 'employee_id': employees[column]['id'],
+                         'fit_score': float(fit[row, column]), 'estimated_hours': task_hours(task)}
+                        for row, (task, column) in enumerate(zip(tasks, best))],
+        'unassigned': []
+    }
+
+
+def summarize(plan, capacity_hours):
+    hours, counts = Counter(), Counter()
+    for assignment in plan['assignments']:
+        hours[assignment['employee_id']] += assignment['estimated_hours']
+        counts[assignment['employee_id']] += 1
+    fits = [assignment['fit_score'] for assignment in plan['assignments']]
+    return {
+        'assigned': len(plan['assignments']),
+        'total_fit': sum(fits),
+        'average_fit': sum(fits) / len(fits) if fits else 0,
+        'employees_used': len(counts),
+        'max_tasks': max(counts.values()) if counts else 0,
+        'max_hours': max(hours.values()) if hours else 0,
+        'over_capacity': sum(1 for value in hours.values() if value > capacity_hours + 1e-9),
+    }
+
+
+def timed(func, repeat):
+    timings, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), max(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=50, help='Tasks in the objective')
+    parser.add_argument('--employees', type=int, default=200, help='Active employees')
+    parser.add_argument('--capacity-hours', type=float, default=40, help='Free hours per employee')
+    parser.add_argument('--max-tasks', type=int, default=3, help='Most tasks per employee')
+    parser.add_argument('--repeat', type=int, default=10, help='Timed repetitions per variant')
+    args = parser.parse_args()
+
+    db = FakeSupabase()
+    employees = seed_employees(db, args.employees, process_roles(get_process_registry().as_legacy_dict()))
+    tasks = build_tasks(args.tasks)
+    rng = random.Random(3)
+    existing_hours = {employee['id']: rng.choice([0, 0, 8, 16, 32]) for employee in employees}
+    print(f"🧮 {len(tasks)} tasks x {len(employees)} employees, {args.capacity_hours:g}h capacity, "
+          f"at most {args.max_tasks} tasks each")
+
+    def hungarian():
+        return optimize_assignments(tasks, employees, existing_hours=existing_hours,
+                                    capacity_hours=args.capacity_hours, max_tasks=args.max_tasks)
+
+    def greedy():
+        solver = assignment_optimizer.linear_sum_assignment
+        assignment_optimizer.linear_sum_assignment = None
+        try:
+            return hungarian()
+        finally:
+            assignment_optimizer.linear_sum_assignment = solver
+
+    variants = [('per-task best match', lambda: per_task_best(tasks, employees)),
+                ('hungarian (capacity slots)', hungarian),
+                ('greedy fallback', greedy)]
+
+    print(f"{'variant':<28}{'median':>10}{'max':>10}{'assigned':>10}{'avg fit':>9}"
+          f"{'employees':>11}{'max tasks':>11}{'max hours':>11}{'over cap':>10}")
+    print("-" * 110)
+    for label, func in variants:
+        median, worst, plan = timed(func, args.repeat)
+        summary = summarize(plan, args.capacity_hours)
+        print(f"{label:<28}{median * 1000:>8.1f}ms{worst * 1000:>8.1f}ms{summary['assigned']:>10}"
+              f"{summary['average_fit']:>9.1f}{summary['employees_used']:>11}{summary['max_tasks']:>11}"
+              f"{summary['max_hours']:>11g}{summary['over_capacity']:>10}")
+        if label != 'per-task best match':
+            for load in plan['employee_load']:
+                assert load['tasks'] <= args.max_tasks, load
+                assert load['planned_hours'] + load['existing_hours'] <= args.capacity_hours + 1e-9, load
+            print(f"{'':<28}scoring {plan['scoring_ms']}ms, solve {plan['solve_ms']}ms, "
+                  f"{plan['iterations']} solve(s), {len(plan['unassigned'])} unassigned")
+    print("-" * 110)
+    print("✅ Optimized plans respect task and hour capacity (existing load counted)")
+
+
+if __name__ == '__main__':
+    main()
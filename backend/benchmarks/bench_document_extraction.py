@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark: JD document text extraction
+
+Compares the old extraction (parse every page, build the string with `+=`,
+truncate at the end) with the budget-aware extraction service, inline and
+through the process pool.
+
+Usage (from the backend directory):
+    python benchmarks/bench_document_extraction.py                  # synthetic corpus
+    python benchmarks/bench_document_extraction.py path/to/pdfs     # your own PDFs
+    python benchmarks/bench_document_extraction.py --pages 400 --docs 8
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PyPDF2
+from document_extraction import DocumentExtractionService, extract_pdf_text
+
+CHAR_BUDGET = 10000
+
+
+def build_synthetic_pdf(pages, lines_per_page=45):
+    """Build a text-only PDF with `pages` pages of job-description-like text"""
+    line = "Coordinate supplier payments, customs clearance and transport logistics for Kenya-Ethiopia orders."
+    objects = []
+
+    font_id = 3
+    page_ids = []
+    next_id = 4
+    page_objects = []
+    for page_number in range(pages):
+        stream_lines = ["BT", "/F1 9 Tf", "40 800 Td", "11 TL"]
+        for line_number in range(lines_per_page):
+            stream_lines.append(f"({page_number + 1}.{line_number + 1} {line}) Tj T*")
+        stream_lines.append("ET")
+        stream = "\n".join(stream_lines).encode('latin-1')
+        content_id, page_id = next_id, next_id + 1
+        next_id += 2
+        page_objects.append((content_id, b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"))
+        page_objects.append((page_id, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode('latin-1')))
+        page_ids.append(page_id)
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects.append((1, b"<< /Type /Catalog /Pages 2 0 R >>"))
+    objects.append((2, f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode('latin-1')))
+    objects.append((font_id, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"))
+    objects.extend(page_objects)
+    objects.sort(key=lambda obj: obj[0])
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id, body in objects:
+        offsets[obj_id] = out.tell()
+        out.write(b"%d 0 obj\n" % obj_id + body + b"\nendobj\n")
+    xref_offset = out.tell()
+    out.write(b"xref\n0 %d\n" % (len(objects) + 1))
+    out.write(b"0000000000 65535 f \n")
+    for obj_id, _ in objects:
+        out.write(b"%010d 00000 n \n" % offsets[obj_id])
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset))
+    return out.getvalue()
+
+
+def legacy_extract_text_from_pdf(pdf_content):
+    """The extraction used before the service: every page, string concatenation"""
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_content))
+    text = ""
+    for page in pdf_reader.pages:
+        text += page.extract_text() + "\n"
+    return text[:CHAR_BUDGET]
+
+
+def load_corpus(args):
+    if args.corpus_dir:
+        corpus = []
+        for name in sorted(os.listdir(args.corpus_dir)):
+            if name.lower().endswith('.pdf'):
+                with open(os.path.join(args.corpus_dir, name), 'rb') as f:
+                    corpus.append((name, f.read()))
+        return corpus
+    return [(f"synthetic-{i + 1}.pdf", build_synthetic_pdf(args.pages)) for i in range(args.docs)]
+
+
+def run(label, extract, corpus, concurrency=1):
+    timings = []
+    total_chars = 0
+
+    def timed(document):
+        start = time.perf_counter()
+        text = extract(document[1])
+        return time.perf_counter() - start, len(text or '')
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for elapsed, chars in pool.map(timed, corpus):
+            timings.append(elapsed)
+            total_chars += chars
+    wall = time.perf_counter() - wall_start
+
+    print(f"{label:<38} wall {wall:7.3f}s   median/doc {statistics.median(timings) * 1000:8.1f}ms   "
+          f"max/doc {max(timings) * 1000:8.1f}ms   chars {total_chars}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('corpus_dir', nargs='?', help='Directory of PDFs (default: synthetic corpus)')
+    parser.add_argument('--pages', type=int, default=200, help='Pages per synthetic PDF')
+    parser.add_argument('--docs', type=int, default=6, help='Number of synthetic PDFs')
+    parser.add_argument('--concurrency', type=int, default=3, help='Concurrent requests (like gunicorn threads)')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args)
+    if not corpus:
+        print("No PDFs found")
+        return
+    total_mb = sum(len(content) for _, content in corpus) / (1024 * 1024)
+    print(f"📚 Corpus: {len(corpus)} PDFs, {total_mb:.1f} MB, budget {CHAR_BUDGET} chars")
+    print("-" * 100)
+
+    service = DocumentExtractionService(max_workers=2, timeout=120)
+    # Warm the pool so process start-up isn't billed to the first document
+    service.extract('pdf', corpus[0][1])
+
+    run("legacy (all pages, +=)", legacy_extract_text_from_pdf, corpus)
+    run("budgeted inline", lambda content: extract_pdf_text(content, CHAR_BUDGET), corpus)
+    run("budgeted process pool", lambda content: service.extract('pdf', content), corpus)
+    print("-" * 100)
+    run(f"legacy x{args.concurrency} threads", legacy_extract_text_from_pdf, corpus, args.concurrency)
+    run(f"budgeted process pool x{args.concurrency} threads",
+        lambda content: service.extract('pdf', content), corpus, args.concurrency)
+
+    service.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Benchmark: employee fit scoring
+
+Compares the original per-employee scorers (lowercase the task and scan the
+hard-coded keyword lists for every employee) with the compiled keyword matcher
+and NumPy feature-matrix scoring, and checks both produce identical scores.
+
+Usage (from the backend directory):
+    python benchmarks/bench_keyword_matching.py
+    python benchmarks/bench_keyword_matching.py --employees 5000 --repeat 20
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import keyword_matcher
+from keyword_matcher import (
+    KeywordMatcher, get_task_text, advanced_fit_scores, department_analysis_scores,
+    ultra_fast_scores, basic_recommendation_score, DEPARTMENT_ALIGNMENT_KEYWORDS,
+    BASIC_DEPARTMENT_KEYWORDS, DEPARTMENT_ANALYSIS_KEYWORDS, TASK_SKILL_KEYWORDS, JD_TASK_KEYWORDS
+)
+
+TASKS = [
+    "Coordinate customs clearance and arrange transport for the shipment from Mombasa to Addis Ababa, "
+    "confirm supplier payment and update inventory records for the Supply Chain Specialist",
+    "Prepare the client agreement and invoice, negotiate payment terms with the customer and "
+    "validate product quality specification before dispatch",
+    "Develop the quarterly budget, process tax documentation and manage bank reconciliation for finance and accounting",
+    "Lead product development testing and design validation with the technical engineering team",
+]
+
+ROLES = [
+    "Supply Chain Specialist", "Sales Manager", "Commercial & Finance Specialist", "Product Development Lead",
+    "Logistics Coordinator", "Accountant", "Customs Clearance Officer", "Quality Assurance Engineer",
+    "Business Development Manager", "Admin Assistant", "Operations Manager", "Warehouse Supervisor",
+]
+DEPARTMENTS = [
+    "SUPPLY CHAIN DEPARTMENT", "SALES DEPARTMENT", "PRODUCT DEVELOPMENT DEPARTMENT",
+    "FINANCE & ADMIN DEPARTMENT", "Operations", "Human Resources",
+]
+SKILLS = [
+    "logistics", "customs", "negotiation", "Excel", "project management", "quality control", "budgeting",
+    "supplier relations", "invoice processing", "technical writing", "data analysis", "sales",
+    "communication", "inventory", "documentation", "product testing", "bank reconciliation",
+]
+JD_SNIPPETS = [
+    "You will manage and coordinate shipments, oversee suppliers and handle customs documentation.",
+    "Lead client negotiations, create proposals and finalize agreements with customers.",
+    "Plan, organize and analyze budgets; implement accounting controls and supervise payments.",
+    "Design, build and develop products; execute testing plans and process validation.",
+]
+
+
+def build_employees(count, seed=7):
+    rng = random.Random(seed)
+    employees = []
+    for index in range(count):
+        employees.append({
+            'id': f"emp-{index}",
+            'name': f"Employee {index}",
+            'role': rng.choice(ROLES + [None]),
+            'department': rng.choice(DEPARTMENTS + [None]),
+            'skills': rng.sample(SKILLS, rng.randint(0, 8)),
+            'experience_years': rng.randint(0, 12),
+        })
+    jd_texts = [rng.choice(JD_SNIPPETS + [None]) for _ in range(count)]
+    return employees, jd_texts
+
+
+# ========== ORIGINAL SCORERS (as they were in task_routes.py) ==========
+
+def legacy_advanced_fit_score(task_description, role, department, skills, experience, jd_text=None):
+    task_lower = task_description.lower()
+    score = 0
+
+    if role:
+        role_lower = role.lower()
+        if role_lower in task_lower:
+            score += 40
+        else:
+            matches = sum(1 for kw in role_lower.split() if len(kw) > 3 and kw in task_lower)
+            score += 30 if matches >= 2 else 20 if matches >= 1 else 10
+
+    if department:
+        dept_lower = department.lower()
+        dept_score = 5
+        for dept, keywords in DEPARTMENT_ALIGNMENT_KEYWORDS.items():
+            if dept in dept_lower:
+                dept_score = min(sum(1 for kw in keywords if kw in task_lower) * 5, 20)
+                break
+        score += dept_score
+
+    if skills and isinstance(skills, list):
+        points = 0
+        for skill in skills[:10]:
+            skill_lower = str(skill).lower()
+            if skill_lower in task_lower:
+                points += 2
+            elif any(task_skill in skill_lower for task_skill in TASK_SKILL_KEYWORDS):
+                points += 1
+        score += min(points * 4, 20)
+
+    if jd_text:
+        jd_lower = jd_text.lower()
+        score += min(sum(1 for kw in JD_TASK_KEYWORDS if kw in task_lower and kw in jd_lower) * 3, 15)
+
+    score += min(experience, 5)
+    return min(score, 100)
+
+
+def legacy_department_analysis(task_description, employee):
+    task_lower = task_description.lower()
+    department = (employee.get('department') or '').upper().strip()
+    if not department:
+        return None
+    dept_score = 0
+    if department in DEPARTMENT_ANALYSIS_KEYWORDS:
+        dept_score = min(sum(1 for kw in DEPARTMENT_ANALYSIS_KEYWORDS[department] if kw in task_lower) * 15, 60)
+    role_score = 0
+    role = employee.get('role') or ''
+    if role:
+        role_score = min(sum(1 for word in role.lower().split() if len(word) > 4 and word in task_lower) * 10, 30)
+    return dept_score + role_score + min(employee.get('experience_years', 0) * 2, 10)
+
+
+def legacy_ultra_fast(task_description, employee):
+    task_lower = task_description.lower()
+    score = 40 if (employee.get('role') or '').lower() in task_lower else 0
+    score += min(sum(1 for skill in employee.get('skills', [])[:3] if skill.lower() in task_lower) * 10, 30)
+    experience = employee.get('experience_years', 0)
+    score += 15 if experience >= 3 else 10 if experience >= 1 else 0
+    return min(score, 100)
+
+
+def legacy_basic(task_description, employee):
+    task_lower = task_description.lower()
+    role = (employee.get('role') or '').lower()
+    department = (employee.get('department') or '').lower()
+    score = 50
+    if role and any(word in task_lower for word in role.split() if len(word) > 3):
+        score += 20
+    for dept, keywords in BASIC_DEPARTMENT_KEYWORDS.items():
+        if dept in department:
+            if any(kw in task_lower for kw in keywords):
+                score += 15
+            break
+    return min(score, 100)
+
+
+# ========== RUNS ==========
+
+def run_legacy(task, employees, jd_texts):
+    advanced = [legacy_advanced_fit_score(task, e.get('role'), e.get('department'), e.get('skills'),
+                                          e.get('experience_years', 0), jd)
+                for e, jd in zip(employees, jd_texts)]
+    department = [legacy_department_analysis(task, e) for e in employees]
+    ultra_fast = [legacy_ultra_fast(task, e) for e in employees]
+    basic = [legacy_basic(task, e) for e in employees]
+    return advanced, department, ultra_fast, basic
+
+
+def run_compiled(task, employees, jd_texts):
+    task_text = get_task_text(task)
+    advanced = advanced_fit_scores(task_text, employees, jd_texts)
+    department_scores, has_department = department_analysis_scores(task_text, employees)
+    ultra_fast = ultra_fast_scores(task_text, employees)
+    basic = [basic_recommendation_score(task_text, e) for e in employees]
+    return advanced, department_scores, has_department, ultra_fast, basic
+
+
+def clear_caches():
+    keyword_matcher.get_task_text.cache_clear()
+    keyword_matcher.get_jd_keywords.cache_clear()
+    keyword_matcher.skill_has_task_skill.cache_clear()
+
+
+def verify(employees, jd_texts):
+    for task in TASKS:
+        advanced, department, ultra_fast, basic = run_legacy(task, employees, jd_texts)
+        c_advanced, c_department, c_has_department, c_ultra_fast, c_basic = run_compiled(task, employees, jd_texts)
+        assert list(c_advanced) == advanced, "advanced fit scores differ"
+        assert [int(s) if ok else None for s, ok in zip(c_department, c_has_department)] == department, \
+            "department analysis scores differ"
+        assert list(c_ultra_fast) == ultra_fast, "ultra-fast scores differ"
+        assert c_basic == basic, "basic recommendation scores differ"
+
+    # The combined pattern must agree with plain `in` checks on arbitrary text
+    matcher = KeywordMatcher(list(TASK_SKILL_KEYWORDS) + JD_TASK_KEYWORDS + ["man", "manager", "ship", "shipment"])
+    rng = random.Random(3)
+    words = list(matcher.keywords) + ["the", "and", "xx", "ing", "ment"]
+    for _ in range(500):
+        text = "".join(rng.choice(words) + rng.choice(["", " "]) for _ in range(rng.randint(0, 12)))
+        assert matcher.find(text) == {kw for kw in matcher.keywords if kw in text}, text
+
+
+def timed(label, func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    print(f"{label:<34} median {statistics.median(timings) * 1000:8.2f}ms   "
+          f"min {min(timings) * 1000:8.2f}ms   max {max(timings) * 1000:8.2f}ms")
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--employees', type=int, default=1000, help='Number of synthetic employees')
+    parser.add_argument('--repeat', type=int, default=10, help='Timed repetitions per variant')
+    args = parser.parse_args()
+
+    employees, jd_texts = build_employees(args.employees)
+    verify(employees, jd_texts)
+    print(f"✅ Compiled scores match the original scorers ({len(TASKS)} tasks x {len(employees)} employees)")
+    print(f"👥 Scoring {len(employees)} employees x {len(TASKS)} tasks, 4 scorers each")
+    print("-" * 90)
+
+    def legacy():
+        for task in TASKS:
+            run_legacy(task, employees, jd_texts)
+
+    def compiled_cold():
+        clear_caches()
+        for task in TASKS:
+            run_compiled(task, employees, jd_texts)
+
+    def compiled_warm():
+        for task in TASKS:
+            run_compiled(task, employees, jd_texts)
+
+    legacy_time = timed("legacy (per-employee `in` scans)", legacy, args.repeat)
+    cold_time = timed("compiled, cold caches", compiled_cold, args.repeat)
+    warm_time = timed("compiled, warm caches", compiled_warm, args.repeat)
+    print("-" * 90)
+    print(f"Speed-up: {legacy_time / cold_time:.1f}x cold, {legacy_time / warm_time:.1f}x warm")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Benchmark: maintained unread counters vs counting notifications per badge refresh
+
+Seeds an in-memory Supabase with employees and notifications, registers
+Python versions of the adjust_notification_unread / reconcile_notification_unread
+database functions, then
+1. applies a stream of random notification writes through the real code
+   paths (create_single_notification and the read / read-all / delete
+   endpoints) and checks that every counter equals a count of the table
+2. times the badge endpoint (GET /api/notifications/count) reading the
+   counter vs counting the unread rows (what it did before, and what it
+   still does without the migration)
+
+Usage (from the backend directory):
+    python benchmarks/bench_notification_counts.py
+    python benchmarks/bench_notification_counts.py --employees 200 --notifications 50000 --writes 500
+"""
+import io
+import os
+import sys
+import time
+import uuid
+import random
+import argparse
+import statistics
+import contextlib
+from collections import Counter
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jwt
+from flask import Flask
+
+import notification_routes
+import notification_counters
+from notification_counters import NotificationCounterStore, NOTIFICATION_COUNTS_TABLE, ALL_EMPLOYEES
+from benchmarks.bench_ai_pipeline import FakeSupabase
+
+SECRET_KEY = 'bench-secret'
+
+
+def adjust_notification_unread(db, params):
+    """Python version of the SQL function in migrations/notification_unread_counts.sql"""
+    rows = {row['employee_id']: row for row in db.tables.setdefault(NOTIFICATION_COUNTS_TABLE, [])}
+    deltas = dict(params['p_deltas'])
+    deltas[ALL_EMPLOYEES] = sum(deltas.values())
+    for employee_id, delta in deltas.items():
+        row = rows.get(employee_id)
+        if row is None:
+            row = {'employee_id': employee_id, 'unread_count': 0}
+            db.tables[NOTIFICATION_COUNTS_TABLE].append(row)
+        row['unread_count'] = max(row['unread_count'] + delta, 0)
+    return None
+
+
+def reconcile_notification_unread(db, params):
+    counts = Counter(str(row['to_employee']) for row in db.tables.get('notifications', []) if not row.get('is_read'))
+    known = {row['employee_id'] for row in db.tables.get(NOTIFICATION_COUNTS_TABLE, [])} - {ALL_EMPLOYEES}
+    rows = [{'employee_id': employee_id, 'unread_count': counts.get(employee_id, 0)}
+            for employee_id in known | set(counts)]
+    rows.append({'employee_id': ALL_EMPLOYEES, 'unread_count': sum(counts.values())})
+    db.tables[NOTIFICATION_COUNTS_TABLE] = rows
+    return sum(counts.values())
+
+
+def seed(db, rng, employees, count):
+    start = datetime.utcnow() - timedelta(days=60)
+    db.tables['notifications'] = [{
+        'id': str(uuid.uuid4()),
+        'to_employee': rng.choice(employees),
+        'channel': 'in_app',
+        'message': f"Seeded notification {index}",
+        'meta': {'type': 'task_updated'},
+        'priority': 'normal',
+        'created_at': (start + timedelta(seconds=index * 30)).isoformat(),
+        'is_read': rng.random() < 0.7
+    } for index in range(count)]
+
+
+def token_for(employee_id):
+    return {'Authorization': f"Bearer {jwt.encode({'role': 'employee', 'employee_id': employee_id}, SECRET_KEY, algorithm='HS256')}"}
+
+
+def apply_write(db, client, rng, employees):
+    """One random notification write through the code path the app uses"""
+    kind = rng.choice(['create', 'create', 'read', 'read', 'read_all', 'delete'])
+    employee_id = rng.choice(employees)
+    own = [row for row in db.tables['notifications'] if row['to_employee'] == employee_id]
+    if kind == 'create' or not own:
+        task = {'task_description': 'Benchmark task'}
+        notification_routes.create_single_notification(
+            db, str(uuid.uuid4()), 'task_updated', 'Task updated', [employee_id], task,
+            'Bench', 'admin', None, None, None)
+        return 'create'
+    headers = token_for(employee_id)
+    if kind == 'read':
+        response = client.put(f"/api/notifications/{rng.choice(own)['id']}/read", headers=headers)
+    elif kind == 'read_all':
+        response = client.put("/api/notifications/read-all", headers=headers)
+    else:
+        response = client.delete(f"/api/notifications/{rng.choice(own)['id']}", headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return kind
+
+
+def timed(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--employees', type=int, default=200, help='Employees receiving notifications')
+    parser.add_argument('--notifications', type=int, default=20000, help='Seeded notifications')
+    parser.add_argument('--writes', type=int, default=300, help='Random notification writes to apply')
+    parser.add_argument('--repeat', type=int, default=50, help='Timed badge requests')
+    args = parser.parse_args()
+
+    rng = random.Random(48)
+    db = FakeSupabase()
+    db.functions['adjust_notification_unread'] = adjust_notification_unread
+    db.functions['reconcile_notification_unread'] = reconcile_notification_unread
+    employees = [str(uuid.UUID(int=(0x48 << 96) + index)) for index in range(args.employees)]
+    seed(db, rng, employees, args.notifications)
+    notification_routes.get_supabase_client = lambda: db
+    notification_counters.get_supabase_client = lambda: db
+
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = SECRET_KEY
+    app.register_blueprint(notification_routes.notification_bp)
+    client = app.test_client()
+
+    store = NotificationCounterStore(cache_seconds=0, reconcile_seconds=10 ** 9)
+    notification_counters._notification_counter_store = store
+    print(f"🔔 {args.employees} employees, {args.notifications} notifications, {args.writes} random writes")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        store.unread_count()  # first read reconciles
+        db.round_trips.clear()
+        kinds = [apply_write(db, client, rng, employees) for _ in range(args.writes)]
+    adjustments = db.round_trips['rpc:adjust_notification_unread']
+    print(f"{'writes':<32}{adjustments / args.writes:>8.2f} counter adjustments per write "
+          f"({', '.join(f'{kind} {kinds.count(kind)}' for kind in sorted(set(kinds)))})")
+
+    expected = Counter(str(row['to_employee']) for row in db.tables['notifications'] if not row.get('is_read'))
+    with contextlib.redirect_stdout(io.StringIO()):
+        mismatched = [employee_id for employee_id in employees
+                      if store.unread_count(employee_id) != expected.get(employee_id, 0)]
+        total = store.unread_count()
+    print(f"{'counters equal to a table count':<32}{len(employees) - len(mismatched):>8}/{len(employees)}"
+          f"  (total {total} vs {sum(expected.values())})")
+    assert not mismatched and total == sum(expected.values()), f"counters drifted for {len(mismatched)} employees"
+
+    employee_id = max(expected, key=expected.get)
+    headers = token_for(employee_id)
+
+    def badge():
+        response = client.get("/api/notifications/count", headers=headers)
+        assert response.get_json()['unread_count'] == expected[employee_id]
+
+    results = []
+    for label, available, cache_seconds in (('badge: count unread rows', False, 0),
+                                            ('badge: counter', True, 0),
+                                            ('badge: counter (cached)', True, 5)):
+        store._available, store.cache_seconds = available, cache_seconds
+        with contextlib.redirect_stdout(io.StringIO()):
+            badge()
+            db.round_trips.clear()
+            elapsed = timed(badge, args.repeat)
+        trips = Counter({table: count / args.repeat for table, count in db.round_trips.items()})
+        results.append((label, elapsed, trips))
+    for label, elapsed, trips in results:
+        detail = ', '.join(f"{table} {count:g}" for table, count in sorted(trips.items())) or 'none'
+        print(f"{label:<32}{elapsed:>8.2f}ms  DB round trips per request: {detail}")
+    print("✅ Maintained unread counters match the notifications table")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Benchmark: delta-sync notification feed vs refetching the newest 200
+
+Seeds an in-memory Supabase with notifications (including rows that share a
+created_at, to exercise the id tie-break), then
+1. pages one employee's whole history with before=<cursor> and checks every
+   notification comes back exactly once, newest first
+2. delivers a burst larger than a page and checks since=<cursor> catches up
+   on all of it without gaps or duplicates (after dropping known ids, as the
+   client does with the re-read overlap window)
+3. inserts a row whose created_at is older than the client's cursor (a
+   late commit) and checks the next since-poll still returns it
+4. simulates steady-state polling (a few new notifications between polls)
+   and compares what the legacy full fetch and the since-cursor fetch
+   (compact projection) transfer per poll
+
+The in-memory store scans every row, so request latency is not measured
+here; against Postgres the cursor queries are index range scans
+(migrations/notifications_feed_keyset.sql).
+
+Usage (from the backend directory):
+    python benchmarks/bench_notification_feed.py
+    python benchmarks/bench_notification_feed.py --notifications 50000 --polls 50
+"""
+import io
+import os
+import sys
+import uuid
+import random
+import argparse
+import statistics
+import contextlib
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+import notification_routes
+import notification_counters
+from notification_counters import NotificationCounterStore
+from benchmarks.bench_ai_pipeline import FakeSupabase
+from benchmarks.bench_notification_counts import (
+    SECRET_KEY, token_for, adjust_notification_unread, reconcile_notification_unread
+)
+
+
+def notification(rng, employee_id, created_at):
+    return {
+        'id': str(uuid.uuid4()),
+        'to_employee': employee_id,
+        'channel': 'in_app',
+        'message': f"Task updated: {rng.randrange(10 ** 6)}",
+        'meta': {
+            'task_id': str(uuid.uuid4()),
+            'task_description': 'Prepare the proforma invoice and confirm payment terms with the customer'[:100],
+            'type': 'task_updated',
+            'added_by': 'Bench User',
+            'user_role': 'admin',
+            'note_preview': None,
+            'specially_attached': True,
+            'attached_to': employee_id,
+            'attached_to_multiple': [str(uuid.uuid4()) for _ in range(rng.randint(0, 6))],
+            'timestamp': created_at,
+            'is_note_notification': False,
+            'is_attachment_notification': False,
+            'is_task_owner_confirmation': False
+        },
+        'priority': 'normal',
+        'created_at': created_at,
+        'is_read': rng.random() < 0.7
+    }
+
+
+def seed(db, rng, employees, count):
+    start = datetime.utcnow() - timedelta(days=30)
+    rows = []
+    for index in range(count):
+        # Every fourth notification shares its timestamp with the previous one
+        created_at = (start + timedelta(seconds=(index - (index % 4 == 3)) * 10)).isoformat()
+        rows.append(notification(rng, rng.choice(employees), created_at))
+    db.tables['notifications'] = rows
+
+
+def fetch(client, headers, **params):
+    response = client.get("/api/notifications", headers=headers, query_string=params)
+    body = response.get_json()
+    assert response.status_code == 200 and body['success'], body
+    return body, len(response.data)
+
+
+def page_history(client, headers, limit):
+    """Every notification of the user via before-cursor paging"""
+    body, _ = fetch(client, headers, limit=limit)
+    seen = list(body['notifications'])
+    while body['has_more']:
+        body, _ = fetch(client, headers, before=body['next_before'], limit=limit)
+        seen.extend(body['notifications'])
+    return seen
+
+
+def polled(func, repeat):
+    """Mean (rows, bytes) per poll"""
+    results = [func() for _ in range(repeat)]
+    return statistics.mean(rows for rows, _ in results), statistics.mean(size for _, size in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--employees', type=int, default=50, help='Employees receiving notifications')
+    parser.add_argument('--notifications', type=int, default=20000, help='Seeded notifications')
+    parser.add_argument('--limit', type=int, default=50, help='Page size')
+    parser.add_argument('--polls', type=int, default=30, help='Steady-state polls to simulate')
+    parser.add_argument('--new-per-poll', type=int, default=2, help='Notifications arriving between polls')
+    args = parser.parse_args()
+
+    rng = random.Random(49)
+    db = FakeSupabase()
+    db.functions['adjust_notification_unread'] = adjust_notification_unread
+    db.functions['reconcile_notification_unread'] = reconcile_notification_unread
+    employees = [str(uuid.UUID(int=(0x49 << 96) + index)) for index in range(args.employees)]
+    seed(db, rng, employees, args.notifications)
+    notification_routes.get_supabase_client = lambda: db
+    notification_counters.get_supabase_client = lambda: db
+    notification_counters._notification_counter_store = NotificationCounterStore(reconcile_seconds=10 ** 9)
+
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = SECRET_KEY
+    app.register_blueprint(notification_routes.notification_bp)
+    client = app.test_client()
+
+    employee_id = employees[0]
+    headers = token_for(employee_id)
+    own = sorted((row for row in db.tables['notifications'] if row['to_employee'] == employee_id),
+                 key=lambda row: (row['created_at'], row['id']), reverse=True)
+    print(f"📬 {args.notifications} notifications, {len(own)} for the polling employee, page size {args.limit}")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        history = page_history(client, headers, args.limit)
+    assert [row['id'] for row in history] == [row['id'] for row in own], "history paging skipped or repeated rows"
+    print(f"{'history via before cursor':<34}{len(history):>6} rows, each exactly once, newest first")
+
+    clock = datetime.utcnow()
+
+    def deliver(count):
+        nonlocal clock
+        for _ in range(count):
+            clock += timedelta(seconds=1)
+            row = notification(rng, employee_id, clock.isoformat())
+            row['is_read'] = False
+            db.tables['notifications'].append(row)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        body, _ = fetch(client, headers, limit=args.limit)
+        cursor = body['next_since']
+        burst = args.limit * 2 + 7
+        deliver(burst)
+        caught_up, seen, body = [], {row['id'] for row in body['notifications']}, {'has_more': True}
+        while body['has_more']:
+            body, _ = fetch(client, headers, since=cursor, limit=args.limit)
+            fresh = [row for row in body['notifications'] if row['id'] not in seen]
+            seen.update(row['id'] for row in fresh)
+            caught_up.extend(fresh)
+            cursor = body['next_since']
+    newest = sorted(db.tables['notifications'], key=lambda row: (row['created_at'], row['id']), reverse=True)
+    expected = [row['id'] for row in newest if row['to_employee'] == employee_id][:burst]
+    assert sorted(row['id'] for row in caught_up) == sorted(expected), "since catch-up missed or repeated rows"
+    print(f"{'burst caught up via since cursor':<34}{len(caught_up):>6} rows in {-(-burst // args.limit)} pages")
+
+    # Committed after the client's last poll, with a created_at from before it
+    late = notification(rng, employee_id, (clock - timedelta(seconds=2)).isoformat())
+    late['is_read'] = False
+    db.tables['notifications'].append(late)
+    with contextlib.redirect_stdout(io.StringIO()):
+        body, _ = fetch(client, headers, since=cursor, limit=args.limit)
+    assert late['id'] in {row['id'] for row in body['notifications']}, "late-committed row was skipped"
+    print(f"{'late commit behind the cursor':<34}{'found':>6} on the next since poll "
+          f"({notification_routes.NOTIFICATION_SINCE_OVERLAP_SECONDS:g}s overlap re-read)")
+
+    state = {'cursor': cursor}
+
+    def legacy_poll():
+        deliver(args.new_per_poll)
+        body, size = fetch(client, headers)
+        return len(body['notifications']), size
+
+    def delta_poll():
+        deliver(args.new_per_poll)
+        body, size = fetch(client, headers, since=state['cursor'], limit=args.limit)
+        state['cursor'] = body['next_since']
+        return len(body['notifications']), size
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        body, legacy_first = fetch(client, headers)
+        legacy_rows = len(body['notifications'])
+        legacy_poll_rows, legacy_bytes = polled(legacy_poll, args.polls)
+        body, compact_first = fetch(client, headers, limit=legacy_rows)
+        state['cursor'] = body['next_since']
+        delta_poll_rows, delta_bytes = polled(delta_poll, args.polls)
+    print(f"{'first load: legacy, full meta':<34}{legacy_first / 1024:>8.1f} KB ({legacy_rows} rows)")
+    print(f"{'first load: compact projection':<34}{compact_first / 1024:>8.1f} KB ({legacy_rows} rows)")
+    print(f"{'poll: legacy newest 200':<34}{legacy_bytes / 1024:>8.1f} KB ({legacy_poll_rows:g} rows)")
+    print(f"{'poll: since cursor':<34}{delta_bytes / 1024:>8.1f} KB ({delta_poll_rows:g} rows, "
+          f"{args.new_per_poll} new per poll)")
+    print("✅ Keyset paging returns every notification exactly once")
+
+
+if __name__ == '__main__':
+    main()
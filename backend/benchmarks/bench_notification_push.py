@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Benchmark: notification push (spool broker + SSE stream) vs badge polling
+
+1. Cross-process delivery: several worker processes subscribe through their
+   own SpoolBroker on a shared spool directory (as gunicorn workers do) while
+   another process publishes events; checks every worker receives every event
+   exactly once and reports the publish-to-delivery latency
+2. End to end: serves the notification routes from a threaded HTTP server,
+   keeps an SSE connection open for one employee (GET /api/notifications/stream)
+   and measures how long after a notification write (insert, mark read) the
+   new unread count reaches the client - compared with the expected delay
+   of polling the count endpoint every --poll-interval seconds
+
+Usage (from the backend directory):
+    python benchmarks/bench_notification_push.py
+    python benchmarks/bench_notification_push.py --workers 5 --events 500 --writes 40
+"""
+import io
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import logging
+import tempfile
+import argparse
+import threading
+import contextlib
+import statistics
+import multiprocessing
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jwt
+import requests
+from flask import Flask
+from werkzeug.serving import make_server
+
+import notification_routes
+import notification_counters
+import notification_events
+from notification_events import SpoolBroker
+from notification_counters import NotificationCounterStore
+from benchmarks.bench_ai_pipeline import FakeSupabase
+from benchmarks.bench_notification_counts import (
+    SECRET_KEY, adjust_notification_unread, reconcile_notification_unread
+)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))]
+
+
+# ========== CROSS-PROCESS DELIVERY ==========
+
+def subscriber_process(spool_dir, poll_seconds, expected, ready, results):
+    broker = SpoolBroker(spool_dir, poll_seconds=poll_seconds)
+    subscription = broker.subscribe(None)
+    time.sleep(poll_seconds * 2)  # let the tailer find the end of the spool
+    ready.set()
+    received, latencies = Counter(), []
+    deadline = time.time() + 30
+    while sum(received.values()) < expected and time.time() < deadline:
+        event = subscription.get(timeout=1)
+        if event:
+            received[event['seq']] += 1
+            latencies.append((time.time() - event['sent_at']) * 1000)
+    results.put((os.getpid(), dict(received), latencies))
+
+
+def cross_process(workers, events, poll_seconds):
+    spool_dir = tempfile.mkdtemp(prefix='bench_notification_spool_')
+    context = multiprocessing.get_context('fork' if hasattr(os, 'fork') else 'spawn')
+    results = context.Queue()
+    readies = [context.Event() for _ in range(workers)]
+    processes = [context.Process(target=subscriber_process, args=(spool_dir, poll_seconds, events, ready, results))
+                 for ready in readies]
+    for process in processes:
+        process.start()
+    for ready in readies:
+        ready.wait(10)
+
+    publisher = SpoolBroker(spool_dir, poll_seconds=poll_seconds)
+    for seq in range(events):
+        publisher.publish({'type': 'notification', 'to_employee': str(uuid.uuid4()), 'seq': seq, 'sent_at': time.time()})
+        time.sleep(0.002)
+
+    collected = [results.get(timeout=60) for _ in processes]
+    for process in processes:
+        process.join(5)
+    exact = all(received == {seq: 1 for seq in range(events)} for _, received, _ in collected)
+    latencies = [latency for _, _, worker_latencies in collected for latency in worker_latencies]
+    return exact, latencies
+
+
+# ========== END TO END ==========
+
+class StreamClient:
+    """Reads `unread` events from the SSE endpoint in a thread"""
+
+    def __init__(self, url, token):
+        self.url, self.token = url, token
+        self.updates = []
+        self.connected = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        with requests.get(self.url, headers={'Authorization': f"Bearer {self.token}"},
+                          stream=True, timeout=(5, 120)) as response:
+            event_type = None
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith('event:'):
+                    event_type = line[6:].strip()
+                elif line.startswith('data:') and event_type == 'unread':
+                    self.updates.append((time.time(), json.loads(line[5:])['unread_count']))
+                    self.connected.set()
+
+    def wait_for(self, count, timeout=10):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            for received_at, unread in list(self.updates):
+                if unread == count:
+                    return received_at
+            time.sleep(0.005)
+        return None
+
+
+def end_to_end(writes, poll_seconds, rng):
+    db = FakeSupabase()
+    db.functions['adjust_notification_unread'] = adjust_notification_unread
+    db.functions['reconcile_notification_unread'] = reconcile_notification_unread
+    notification_routes.get_supabase_client = lambda: db
+    notification_counters.get_supabase_client = lambda: db
+    notification_counters._notification_counter_store = NotificationCounterStore(reconcile_seconds=10 ** 9)
+    notification_events._notification_broker = SpoolBroker(
+        tempfile.mkdtemp(prefix='bench_notification_spool_'), poll_seconds=poll_seconds)
+
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = SECRET_KEY
+    app.register_blueprint(notification_routes.notification_bp)
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    employee_id = str(uuid.uuid4())
+    token = jwt.encode({'role': 'employee', 'employee_id': employee_id}, SECRET_KEY, algorithm='HS256')
+    client = StreamClient(f"{base_url}/api/notifications/stream", token).start()
+    assert client.connected.wait(10), "stream did not connect"
+
+    latencies, unread = [], 0
+    for _ in range(writes):
+        own_unread = [row for row in db.tables.get('notifications', [])
+                      if row['to_employee'] == employee_id and not row['is_read']]
+        written_at = time.time()
+        if own_unread and rng.random() < 0.4:
+            response = requests.put(f"{base_url}/api/notifications/{rng.choice(own_unread)['id']}/read",
+                                    headers={'Authorization': f"Bearer {token}"})
+            assert response.status_code == 200
+            unread -= 1
+        else:
+            notification_routes.create_single_notification(
+                db, str(uuid.uuid4()), 'task_updated', 'Task updated', [employee_id],
+                {'task_description': 'Benchmark task'}, 'Bench', 'admin', None, None, None)
+            unread += 1
+        received_at = client.wait_for(unread)
+        assert received_at is not None, f"unread count {unread} never arrived"
+        latencies.append((received_at - written_at) * 1000)
+        client.updates.clear()
+        time.sleep(0.05)
+    server.shutdown()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4, help='Subscriber processes')
+    parser.add_argument('--events', type=int, default=300, help='Events published across processes')
+    parser.add_argument('--writes', type=int, default=30, help='Notification writes for the end-to-end check')
+    parser.add_argument('--spool-poll', type=float, default=0.05, help='Spool tailer poll interval (seconds)')
+    parser.add_argument('--poll-interval', type=float, default=30, help='Badge polling interval to compare with')
+    args = parser.parse_args()
+
+    print(f"📡 {args.workers} worker processes, {args.events} events, spool polled every {args.spool_poll * 1000:g}ms")
+    exact, latencies = cross_process(args.workers, args.events, args.spool_poll)
+    print(f"{'cross-process delivery':<30}{'exactly once' if exact else 'MISSING/DUPLICATED':>14}  "
+          f"p50 {percentile(latencies, 0.5):.1f}ms  p99 {percentile(latencies, 0.99):.1f}ms")
+    assert exact, "spool broker lost or repeated events"
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        push = end_to_end(args.writes, args.spool_poll, random.Random(50))
+    print(f"{'write -> badge via SSE':<30}{len(push):>8} writes  p50 {percentile(push, 0.5):.1f}ms  "
+          f"p99 {percentile(push, 0.99):.1f}ms  max {max(push):.1f}ms")
+    print(f"{'write -> badge via polling':<30}{'':>8}        avg {args.poll_interval * 500:.0f}ms  "
+          f"max {args.poll_interval * 1000:.0f}ms (every {args.poll_interval:g}s, one request per poll)")
+    print(f"✅ Push delivered every event (median {statistics.median(push):.1f}ms after the write)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Benchmark: recommendation quality and latency on a golden dataset
+
+Runs every recommendation strategy over a fixed set of tasks with known
+correct assignees and reports, per strategy (overall and per task group):
+- precision@1 and precision@k (share of the top k that are expected assignees)
+- recall@k (share of the expected assignees found in the top k)
+- hit rate@k (share of tasks with at least one expected assignee in the top k)
+- latency p50 / p90 / p99 / max per task
+- LLM calls per task
+
+Dataset (benchmarks/fixtures/recommendation_golden.json):
+- synthetic employees, two per process role plus a few distractor roles
+- every step of the three predefined processes (from the process registry);
+  the expected assignees hold the step's responsible role
+- custom tasks, each with the role(s) that should get it
+
+Strategies:
+- role_match          - get_role_based_recommendations_for_predefined_process (predefined tasks only)
+- ultra_fast          - ultra_fast_employee_recommendations
+- department_analysis - department_based_analysis
+- advanced_fit        - employees ranked by calculate_advanced_fit_score
+- rag                 - enhanced_role_based_employee_recommendations (role match, else JD analysis by the LLM)
+- llm_short           - llm_employee_recommendations
+
+LLM strategies run against the fake OpenAI server unless --live is given
+(OPENAI_API_KEY from the environment); the fake server's answers are not
+meaningful, so LLM precision only counts with --live.
+
+--json writes the report; --baseline compares with an earlier report and
+exits with status 1 when a strategy's precision@k drops by more than
+--tolerance (reports written before METRICS_VERSION 2 used a different
+precision@k and are not compared).
+
+Usage (from the backend directory):
+    python benchmarks/bench_recommendation_quality.py
+    python benchmarks/bench_recommendation_quality.py --k 3 --repeat 5 --json quality.json
+    python benchmarks/bench_recommendation_quality.py --skip-llm --baseline quality.json
+"""
+import io
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import contextlib
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from benchmarks.bench_ai_pipeline import FakeSupabase
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'recommendation_golden.json')
+LLM_STRATEGIES = ('rag', 'llm_short')
+# Bump when a metric's definition changes; --baseline only compares reports of the same version
+METRICS_VERSION = 2
+
+
+def load_cases(fixture, registry):
+    """Golden cases: predefined-process steps plus the fixture's custom tasks"""
+    employees = fixture['employees']
+    holders = defaultdict(set)
+    for employee in employees:
+        holders[employee['role'].lower().strip()].add(employee['id'])
+
+    cases = []
+    for template_key, template in registry.templates.items():
+        for step in template.steps:
+            cases.append({
+                'group': template_key,
+                'task': {
+                    'id': f"{template_key}-{step.key}",
+                    'task_description': f"{step.title}: {step.activities}",
+                    'strategic_metadata': {'recommended_role': step.responsible}
+                },
+                'expected': holders[step.responsible.lower().strip()]
+            })
+    for index, custom in enumerate(fixture['custom_tasks']):
+        cases.append({
+            'group': 'custom',
+            'task': {
+                'id': f"custom-{index + 1}",
+                'task_description': custom['task_description'],
+                'strategic_metadata': {'required_skills': custom.get('required_skills', [])}
+            },
+            'expected': set().union(*(holders[role.lower().strip()] for role in custom['expected_roles']))
+        })
+    return cases
+
+
+def build_strategies(task_routes, employees, k):
+    """name -> function(task) returning ranked employee ids, or None when not applicable"""
+    def ids(recommendations):
+        return [rec.get('employee_id') for rec in recommendations or []]
+
+    def role_match(task):
+        role = task['strategic_metadata'].get('recommended_role')
+        if not role:
+            return None
+        return ids(task_routes.get_role_based_recommendations_for_predefined_process(
+            role, employees, task['task_description']))
+
+    def advanced_fit(task):
+        scores = [task_routes.calculate_advanced_fit_score(
+            task['task_description'], employee.get('role', ''), employee.get('department', ''),
+            employee.get('skills', []), employee.get('experience_years', 0), employee.get('google_drive_jd'))
+            for employee in employees]
+        order = sorted(range(len(employees)), key=lambda i: -scores[i])
+        return [employees[i]['id'] for i in order[:k]]
+
+    return {
+        'role_match': role_match,
+        'ultra_fast': lambda task: ids(task_routes.ultra_fast_employee_recommendations(
+            task['task_description'], employees, max_recommendations=k)),
+        'department_analysis': lambda task: ids(task_routes.department_based_analysis(
+            task['task_description'], employees, top_k=k)),
+        'advanced_fit': advanced_fit,
+        'rag': lambda task: ids(task_routes.enhanced_role_based_employee_recommendations(
+            task['task_description'], employees, top_k=k, task=task)),
+        'llm_short': lambda task: ids(task_routes.llm_employee_recommendations(task, employees)),
+    }
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))]
+
+
+def score(results, k):
+    """Quality and latency metrics over (case, ranked ids, latencies, llm calls) results"""
+    if not results:
+        return None
+    precision_1 = precision_k = recall_k = hit_rate_k = 0.0
+    latencies, llm_calls, empty = [], 0, 0
+    for case, ranked, timings, calls in results:
+        top = ranked[:k]
+        precision_1 += 1.0 if ranked[:1] and ranked[0] in case['expected'] else 0.0
+        hits = len(set(top) & case['expected'])
+        precision_k += hits / k
+        recall_k += hits / (len(case['expected']) or 1)
+        hit_rate_k += 1.0 if hits else 0.0
+        empty += not ranked
+        latencies.extend(timings)
+        llm_calls += calls
+    count = len(results)
+    return {
+        'cases': count,
+        'precision_at_1': round(precision_1 / count, 3),
+        f'precision_at_{k}': round(precision_k / count, 3),
+        f'recall_at_{k}': round(recall_k / count, 3),
+        f'hit_rate_at_{k}': round(hit_rate_k / count, 3),
+        'empty_results': empty,
+        'latency_ms_p50': round(percentile(latencies, 0.50), 2),
+        'latency_ms_p90': round(percentile(latencies, 0.90), 2),
+        'latency_ms_p99': round(percentile(latencies, 0.99), 2),
+        'latency_ms_max': round(max(latencies), 2),
+        'llm_calls': llm_calls,
+        'llm_calls_per_task': round(llm_calls / count, 2)
+    }
+
+
+def run_strategy(name, strategy, cases, llm, repeat, verbose):
+    results = []
+    for case in cases:
+        timings, ranked, calls = [], None, 0
+        for _ in range(repeat):
+            before = llm.stats()['calls']
+            redirect = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+            start = time.perf_counter()
+            with redirect:
+                ranked = strategy(case['task'])
+            timings.append((time.perf_counter() - start) * 1000)
+            calls = llm.stats()['calls'] - before
+        if ranked is None:
+            continue
+        results.append((case, ranked, timings, calls))
+    return results
+
+
+def compare(report, baseline_path, k, tolerance):
+    """Regressions of precision@k against an earlier report"""
+    with open(baseline_path, 'r', encoding='utf-8') as handle:
+        baseline = json.load(handle)
+    metric, regressions = f'precision_at_{k}', []
+    if baseline.get('metrics_version') != METRICS_VERSION:
+        print(f"   ⚠️ Baseline uses metrics version {baseline.get('metrics_version', 1)}, not {METRICS_VERSION} - not compared")
+        return regressions
+    for name, current in report['strategies'].items():
+        previous = (baseline.get('strategies') or {}).get(name)
+        if not current or not previous or metric not in previous.get('overall', {}):
+            continue
+        delta = current['overall'][metric] - previous['overall'][metric]
+        print(f"   {name:<22}{metric} {previous['overall'][metric]:.3f} -> {current['overall'][metric]:.3f} "
+              f"({delta:+.3f}), p50 {previous['overall']['latency_ms_p50']} -> {current['overall']['latency_ms_p50']}ms")
+        if delta < -tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--k', type=int, default=3, help='Recommendations considered per task')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per task and strategy')
+    parser.add_argument('--strategy', action='append', help='Only run these strategies (repeatable)')
+    parser.add_argument('--skip-llm', action='store_true', help='Skip the LLM strategies')
+    parser.add_argument('--live', action='store_true', help='Use the real OpenAI API instead of the fake server')
+    parser.add_argument('--latency-ms', type=float, default=50, help='Fake OpenAI time to first byte')
+    parser.add_argument('--fixture', default=FIXTURE, help='Golden dataset JSON')
+    parser.add_argument('--json', help='Write the report to this file')
+    parser.add_argument('--baseline', help='Earlier --json report to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.02, help='Allowed precision@k drop vs the baseline')
+    parser.add_argument('--verbose', action='store_true', help='Show pipeline logs')
+    args = parser.parse_args()
+
+    server = None
+    if not args.live:
+        server = FakeOpenAIServer(latency_ms=args.latency_ms, token_delay_ms=0).start()
+        os.environ['OPENAI_API_KEY'] = 'sk-fake-benchmark-key'
+        os.environ['OPENAI_BASE_URL'] = server.base_url
+    elif not os.getenv('OPENAI_API_KEY'):
+        parser.error('--live needs OPENAI_API_KEY')
+    os.environ['JOB_QUEUE_AUTOSTART'] = 'false'
+    os.environ.setdefault('JOB_STORE', 'memory')
+    with contextlib.redirect_stdout(io.StringIO()):
+        import task_routes
+        import employee_workload
+        from process_registry import get_process_registry
+
+    # No open tasks: workload never changes the ranking here
+    db = FakeSupabase()
+    task_routes.get_supabase_client = lambda: db
+    employee_workload.get_supabase_client = lambda: db
+
+    with open(args.fixture, 'rb') as handle:
+        raw = handle.read()
+    fixture = json.loads(raw)
+    employees = fixture['employees']
+    cases = load_cases(fixture, get_process_registry())
+    strategies = build_strategies(task_routes, employees, args.k)
+    selected = [name for name in strategies
+                if (not args.strategy or name in args.strategy) and not (args.skip_llm and name in LLM_STRATEGIES)]
+
+    groups = sorted({case['group'] for case in cases})
+    group_sizes = ', '.join(f"{group} {sum(case['group'] == group for case in cases)}" for group in groups)
+    print(f"🎯 {len(cases)} golden tasks ({group_sizes}), "
+          f"{len(employees)} employees, k={args.k}, {args.repeat} runs each, LLM: {'live' if args.live else 'fake server'}")
+    print(f"{'strategy':<22}{'cases':>6}{'P@1':>7}{f'P@{args.k}':>7}{f'R@{args.k}':>7}{f'H@{args.k}':>7}"
+          f"{'p50':>10}{'p90':>10}{'p99':>10}{'LLM/task':>10}")
+    print("-" * 96)
+
+    report = {
+        'config': {**{key: value for key, value in vars(args).items() if key not in ('verbose',)},
+                   'llm_backend': 'live' if args.live else 'fake',
+                   'fixture_sha256': hashlib.sha256(raw).hexdigest()[:16],
+                   'cases': len(cases), 'employees': len(employees)},
+        'metrics_version': METRICS_VERSION,
+        'strategies': {}
+    }
+    for name in selected:
+        results = run_strategy(name, strategies[name], cases, task_routes.llm, args.repeat, args.verbose)
+        overall = score(results, args.k)
+        if overall is None:
+            continue
+        by_group = {group: score([result for result in results if result[0]['group'] == group], args.k)
+                    for group in groups}
+        report['strategies'][name] = {
+            'overall': overall,
+            'groups': {group: metrics for group, metrics in by_group.items() if metrics}
+        }
+        print(f"{name:<22}{overall['cases']:>6}{overall['precision_at_1']:>7.2f}"
+              f"{overall[f'precision_at_{args.k}']:>7.2f}{overall[f'recall_at_{args.k}']:>7.2f}"
+              f"{overall[f'hit_rate_at_{args.k}']:>7.2f}"
+              f"{overall['latency_ms_p50']:>8.2f}ms{overall['latency_ms_p90']:>8.2f}ms{overall['latency_ms_p99']:>8.2f}ms"
+              f"{overall['llm_calls_per_task']:>10}")
+        for group, metrics in by_group.items():
+            if metrics:
+                print(f"   {group:<19}{metrics['cases']:>6}{metrics['precision_at_1']:>7.2f}"
+                      f"{metrics[f'precision_at_{args.k}']:>7.2f}{metrics[f'recall_at_{args.k}']:>7.2f}"
+                      f"{metrics[f'hit_rate_at_{args.k}']:>7.2f}"
+                      f"{metrics['latency_ms_p50']:>8.2f}ms")
+    print("-" * 96)
+    if not args.live and any(name in LLM_STRATEGIES for name in selected):
+        print("ℹ️ LLM strategies ran against the fake server: their latency and call counts are real, precision is not")
+
+    if server:
+        server.stop()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+        print(f"📄 Report written to {args.json}")
+
+    if args.baseline:
+        print(f"📊 Compared with {args.baseline}:")
+        regressions = compare(report, args.baseline, args.k, args.tolerance)
+        if regressions:
+            print(f"❌ precision@{args.k} regressed for: {', '.join(regressions)}")
+            sys.exit(1)
+        print("✅ No precision regressions")
+
+
+if __name__ == '__main__':
+    main()
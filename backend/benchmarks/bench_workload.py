@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark: maintained employee workload vs scanning action_plans
+
+Seeds an in-memory Supabase with employees and assigned tasks, then
+1. applies a stream of random task writes (create, reassign, progress,
+   completion) through WorkloadStore.task_changed() and checks that the
+   incrementally maintained rows equal a full reconciliation
+2. times what load-aware ranking needs per recommendation: the workload of
+   every active employee, read from the maintained aggregate vs aggregated
+   from a scan of the open tasks (what ranking would otherwise do)
+
+Usage (from the backend directory):
+    python benchmarks/bench_workload.py
+    python benchmarks/bench_workload.py --employees 200 --tasks 5000 --writes 500
+"""
+import io
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+import contextlib
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import employee_workload
+from employee_workload import WorkloadStore, aggregate, load_penalty, WORKLOAD_TASK_FIELDS
+from process_registry import get_process_registry
+from benchmarks.bench_ai_pipeline import FakeSupabase, seed_employees, process_roles
+
+
+def random_task(rng, employees):
+    assignees = rng.sample(employees, rng.choice([1, 1, 1, 2]))
+    return {
+        'task_description': f"Task {rng.randrange(10 ** 6)}",
+        'assigned_to': assignees[0]['id'],
+        'assigned_to_multiple': [employee['id'] for employee in assignees],
+        'estimated_hours': rng.choice([2, 4, 8, 16]),
+        'completion_percentage': rng.choice([0, 0, 25, 50]),
+        'due_date': (date.today() + timedelta(days=rng.randint(-10, 30))).isoformat(),
+        'status': rng.choice(['not_started', 'in_progress', 'waiting', 'completed'])
+    }
+
+
+def apply_write(db, store, rng, employees):
+    """One random task write, followed by the hook the task routes call"""
+    tasks = db.tables['action_plans']
+    kind = rng.choice(['create', 'reassign', 'progress', 'complete'])
+    if kind == 'create' or not tasks:
+        created = db.table("action_plans").insert(random_task(rng, employees)).execute().data[0]
+        store.task_changed(after=created)
+        return kind
+    before = dict(rng.choice(tasks))
+    if kind == 'reassign':
+        assignee = rng.choice(employees)['id']
+        update = {'assigned_to': assignee, 'assigned_to_multiple': [assignee]}
+    elif kind == 'progress':
+        update = {'completion_percentage': rng.choice([25, 50, 75]), 'status': 'in_progress'}
+    else:
+        update = {'completion_percentage': 100, 'status': 'completed'}
+    after = db.table("action_plans").update(update).eq("id", before['id']).execute().data[0]
+    store.task_changed(before=before, after=after)
+    return kind
+
+
+def scan_workloads(db, employee_ids):
+    """Load-aware ranking without the aggregate: scan the open tasks per request"""
+    tasks = db.table("action_plans").select(WORKLOAD_TASK_FIELDS).neq("status", "completed").execute().data
+    return aggregate(tasks, employee_ids)
+
+
+def timed(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--employees', type=int, default=200, help='Active employees')
+    parser.add_argument('--tasks', type=int, default=5000, help='Tasks in action_plans')
+    parser.add_argument('--writes', type=int, default=300, help='Random task writes to apply')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed repetitions')
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    db = FakeSupabase()
+    employees = seed_employees(db, args.employees, process_roles(get_process_registry().as_legacy_dict()))
+    db.table("action_plans").insert([random_task(rng, employees) for _ in range(args.tasks)]).execute()
+    employee_workload.get_supabase_client = lambda: db
+    employee_ids = [employee['id'] for employee in employees]
+
+    store = WorkloadStore(cache_seconds=3600, reconcile_seconds=10 ** 9)
+    with contextlib.redirect_stdout(io.StringIO()):
+        store.reconcile()
+    print(f"⚖️ {len(employees)} employees, {args.tasks} tasks, {args.writes} random task writes")
+
+    db.round_trips.clear()
+    kinds = [apply_write(db, store, rng, employees) for _ in range(args.writes)]
+    trips = sum(db.round_trips.values())
+    incremental = store.for_employees(employee_ids)
+    expected = scan_workloads(db, employee_ids)
+    mismatched = [employee_id for employee_id in employee_ids
+                  if incremental[employee_id][:4] != expected[employee_id][:4]]
+    print(f"{'incremental writes':<32}{trips / args.writes:>8.1f} DB round trips per write "
+          f"({', '.join(f'{kind} {kinds.count(kind)}' for kind in sorted(set(kinds)))})")
+    print(f"{'rows equal to reconciliation':<32}{len(employee_ids) - len(mismatched):>8}/{len(employee_ids)}")
+    assert not mismatched, f"workload drifted for {len(mismatched)} employees"
+
+    db.round_trips.clear()
+    scan_ms = timed(lambda: scan_workloads(db, employee_ids), args.repeat)
+    scan_trips = sum(db.round_trips.values()) / args.repeat
+    db.round_trips.clear()
+    store_ms = timed(lambda: store.for_employees(employee_ids), args.repeat)
+    store_trips = sum(db.round_trips.values()) / args.repeat
+    print(f"{'load per ranking: scan':<32}{scan_ms:>8.2f}ms {scan_trips:>5.1f} DB round trips")
+    print(f"{'load per ranking: aggregate':<32}{store_ms:>8.2f}ms {store_trips:>5.1f} DB round trips")
+
+    busiest = max(incremental.values(), key=lambda workload: workload.remaining_hours)
+    print(f"{'busiest employee':<32}{busiest.open_tasks} open, {busiest.remaining_hours:g}h remaining, "
+          f"{busiest.overdue_tasks} overdue -> penalty {load_penalty(busiest)}")
+    print("✅ Incremental workload matches a full reconciliation")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Fake OpenAI server
+
+A local stand-in for the OpenAI chat completions API, so the AI pipelines
+can be run and measured without an API key. It speaks enough of the real
+protocol for the `openai` client: POST /v1/chat/completions, plain JSON
+responses with `usage`, and `stream: true` server-sent events.
+
+Responses are picked from the prompt:
+- task generation prompts ("tasks" array) get N templated tasks ("exactly N
+  tasks" when the prompt says so, --custom-tasks otherwise); --invalid-task-rate
+  of them come back without a task_description
+- recommendation prompts ("recommendations") get the first employee ids
+  found in the prompt
+- JD analysis prompts ("fit_score") get a fit score derived from the prompt
+- --canned FILE maps prompt substrings to fixed response texts and wins
+  over the templates
+
+Latency and faults are configurable: --latency-ms before the first byte
+(--model-latency MODEL=MS overrides it per requested model),
+--token-delay-ms between streamed tokens, --failure-rate of requests
+answered with --failure-status (429 carries Retry-After: 0).
+
+Usage (from the backend directory):
+    python benchmarks/fake_openai_server.py --port 8765 --latency-ms 300 --token-delay-ms 5
+    OPENAI_API_KEY=fake OPENAI_BASE_URL=http://127.0.0.1:8765/v1 python run_dev.py
+"""
+import re
+import sys
+import json
+import time
+import uuid
+import random
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+UUID_PATTERN = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}')
+TASK_COUNT_PATTERN = re.compile(r'exactly (\d+) task', re.IGNORECASE)
+ROLES = ["Account Executive", "Product Development Manager", "Supply Chain Specialist",
+         "Commercial and Finance Specialist"]
+
+
+def estimate_tokens(text):
+    return max(1, len(text) // 4)
+
+
+def prompt_seed(prompt):
+    return int(hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:8], 16)
+
+
+def templated_tasks(prompt, count, invalid_rate=0.0):
+    rng = random.Random(prompt_seed(prompt))
+    base = datetime(2025, 11, 1)
+    tasks = []
+    for i in range(count):
+        tasks.append({
+            "task_description": f"Step {i + 1}: {rng.choice(['Coordinate', 'Prepare', 'Review', 'Confirm'])} "
+                                f"{rng.choice(['supplier documents', 'customs clearance', 'client proposal', 'budget plan'])}",
+            "due_date": (base + timedelta(days=i)).strftime('%Y-%m-%d'),
+            "priority": rng.choice(['high', 'medium', 'low']),
+            "estimated_hours": rng.choice([4, 8, 12, 16]),
+            "assigned_role": rng.choice(ROLES),
+            "required_skills": ["Coordination", "Planning"],
+            "success_criteria": "Deliverable accepted",
+            "context": "Generated by the fake OpenAI server"
+        })
+        if rng.random() < invalid_rate:
+            tasks[-1]["task_description"] = ""
+    return tasks
+
+
+class FakeOpenAIServer:
+    """Threaded fake server; usable in-process (start/stop) or from the command line"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency_ms=0, token_delay_ms=0, failure_rate=0.0,
+                 failure_status=429, custom_tasks=6, canned=None, seed=1, invalid_task_rate=0.0,
+                 model_latency_ms=None):
+        self.latency = latency_ms / 1000.0
+        self.model_latency = {model: ms / 1000.0 for model, ms in (model_latency_ms or {}).items()}
+        self.token_delay = token_delay_ms / 1000.0
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.custom_tasks = custom_tasks
+        self.invalid_task_rate = invalid_task_rate
+        self.canned = canned or {}
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.streamed = 0
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset_counters(self):
+        with self.lock:
+            self.calls = self.failures = self.streamed = 0
+
+    # ---------- responses ----------
+
+    def respond(self, messages):
+        prompt = "\n".join(str(message.get('content') or '') for message in messages)
+        for needle, text in self.canned.items():
+            if needle in prompt:
+                return text
+
+        if '"tasks"' in prompt:
+            match = TASK_COUNT_PATTERN.search(prompt)
+            count = int(match.group(1)) if match else self.custom_tasks
+            # Strategic analysis first, like the prompt asks
+            return json.dumps({
+                "strategic_analysis": {"context": "Fake strategic context", "goal_type": "custom"},
+                "tasks": templated_tasks(prompt, count, self.invalid_task_rate)
+            }, indent=2)
+
+        if '"recommendations"' in prompt:
+            ids = list(dict.fromkeys(UUID_PATTERN.findall(prompt)))[:3]
+            return json.dumps({
+                "recommendations": [
+                    {"employee_id": employee_id, "employee_name": f"Employee {i + 1}", "fit_score": 90 - i * 7,
+                     "overall_fit": "good", "key_qualifications": ["Relevant role"], "reason": "Fake match",
+                     "confidence": "medium"}
+                    for i, employee_id in enumerate(ids)
+                ],
+                "analysis_summary": "Fake analysis",
+                "total_employees_considered": len(ids)
+            })
+
+        if '"fit_score"' in prompt:
+            score = 50 + prompt_seed(prompt) % 45
+            return json.dumps({
+                "fit_score": score, "skills_match": score, "role_alignment": score, "jd_relevance": score,
+                "overall_fit": "good" if score >= 70 else "moderate",
+                "key_qualifications": ["Relevant experience"], "reason": "Fake JD analysis", "confidence": "medium"
+            })
+
+        return "{}"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length) or b'{}')
+                if not self.path.rstrip('/').endswith('/chat/completions'):
+                    return self._json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+                with server.lock:
+                    server.calls += 1
+                    fail = server.random.random() < server.failure_rate
+                    if fail:
+                        server.failures += 1
+                model = body.get('model', 'gpt-3.5-turbo')
+                latency = server.model_latency.get(model, server.latency)
+                if latency:
+                    time.sleep(latency)
+                if fail:
+                    headers = {'Retry-After': '0'} if server.failure_status == 429 else {}
+                    return self._json(server.failure_status,
+                                      {"error": {"message": "Injected failure", "type": "fake_error"}}, headers)
+
+                messages = body.get('messages') or []
+                content = server.respond(messages)
+                completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+                if body.get('stream'):
+                    with server.lock:
+                        server.streamed += 1
+                    return self._stream(completion_id, model, content)
+
+                prompt_tokens = sum(estimate_tokens(str(m.get('content') or '')) for m in messages)
+                completion_tokens = estimate_tokens(content)
+                self._json(200, {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                                 "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                              "total_tokens": prompt_tokens + completion_tokens}
+                })
+
+            def _json(self, status, payload, headers=None):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, completion_id, model, content):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+
+                def send(payload):
+                    data = f"data: {payload}\n\n".encode('utf-8')
+                    self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+                    self.wfile.flush()
+
+                def chunk(delta, finish_reason=None):
+                    return json.dumps({
+                        "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                        "model": model,
+                        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+                    })
+
+                send(chunk({"role": "assistant", "content": ""}))
+                # ~4 characters per token
+                for start in range(0, len(content), 4):
+                    if server.token_delay:
+                        time.sleep(server.token_delay)
+                    send(chunk({"content": content[start:start + 4]}))
+                send(chunk({}, "stop"))
+                send("[DONE]")
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def parse_model_latency(values):
+    """['gpt-4o-mini=100', ...] -> {'gpt-4o-mini': 100.0}"""
+    latency = {}
+    for value in values:
+        model, _, ms = value.partition('=')
+        latency[model.strip()] = float(ms)
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0, help='Delay before the first byte of every response')
+    parser.add_argument('--token-delay-ms', type=float, default=0, help='Delay between streamed tokens')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of requests that fail')
+    parser.add_argument('--failure-status', type=int, default=429, help='HTTP status of injected failures')
+    parser.add_argument('--custom-tasks', type=int, default=6, help='Tasks returned for custom task prompts')
+    parser.add_argument('--invalid-task-rate', type=float, default=0.0,
+                        help='Fraction of generated tasks returned without a description')
+    parser.add_argument('--model-latency', action='append', default=[], metavar='MODEL=MS',
+                        help='Latency for one model (repeatable)')
+    parser.add_argument('--canned', help='JSON file mapping prompt substrings to response texts')
+    args = parser.parse_args()
+
+    canned = None
+    if args.canned:
+        with open(args.canned, encoding='utf-8') as handle:
+            canned = json.load(handle)
+
+    server = FakeOpenAIServer(args.host, args.port, args.latency_ms, args.token_delay_ms, args.failure_rate,
+                              args.failure_status, args.custom_tasks, canned,
+                              invalid_task_rate=args.invalid_task_rate,
+                              model_latency_ms=parse_model_latency(args.model_latency))
+    print(f"🤖 Fake OpenAI server on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
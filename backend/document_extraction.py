@@ -0,0 +1,184 @@
+"""
+Document Text Extraction Service
+
+Budget-aware PDF/DOCX text extraction for job description documents.
+
+Parsing is CPU-bound and holds the GIL, so documents are parsed in a small,
+bounded process pool instead of on the request (or background) thread:
+1. Pages/paragraphs are read in order and parsing stops as soon as the
+   character budget is reached - the rest of the document is never touched
+2. Output is collected in a list and joined once
+3. Each document gets a timeout; a document that overruns it is abandoned,
+   the pool's worker processes are killed and a new pool is started, so one
+   pathological file can't pin a worker (documents other workers were still
+   parsing at that moment fail and return None)
+"""
+import io
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import PyPDF2
+import docx
+
+DEFAULT_CHAR_BUDGET = int(os.getenv('JD_TEXT_CHAR_BUDGET', '10000'))
+EXTRACTION_MAX_WORKERS = int(os.getenv('EXTRACTION_MAX_WORKERS', '2'))
+EXTRACTION_TIMEOUT = float(os.getenv('EXTRACTION_TIMEOUT', '20'))
+# Set EXTRACTION_USE_PROCESS_POOL=false to parse inline (e.g. on hosts without multiprocessing)
+EXTRACTION_USE_PROCESS_POOL = os.getenv('EXTRACTION_USE_PROCESS_POOL', 'true').lower() == 'true'
+
+
+# ========== PARSERS (run inside pool workers) ==========
+
+def extract_pdf_text(pdf_content, char_budget=DEFAULT_CHAR_BUDGET):
+    """Extract up to `char_budget` characters from PDF bytes, page by page"""
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_content))
+    parts = []
+    collected = 0
+    for page in pdf_reader.pages:
+        page_text = (page.extract_text() or '') + "\n"
+        parts.append(page_text)
+        collected += len(page_text)
+        if collected >= char_budget:
+            break
+    return "".join(parts)[:char_budget]
+
+
+def extract_docx_text(docx_content, char_budget=DEFAULT_CHAR_BUDGET):
+    """Extract up to `char_budget` characters from DOCX bytes, paragraph by paragraph"""
+    doc = docx.Document(io.BytesIO(docx_content))
+    parts = []
+    collected = 0
+    for paragraph in doc.paragraphs:
+        paragraph_text = paragraph.text + "\n"
+        parts.append(paragraph_text)
+        collected += len(paragraph_text)
+        if collected >= char_budget:
+            break
+    return "".join(parts)[:char_budget]
+
+
+PARSERS = {
+    'pdf': extract_pdf_text,
+    'docx': extract_docx_text,
+}
+
+
+# ========== SERVICE ==========
+
+class DocumentExtractionService:
+    """Runs document parsers in a bounded process pool with per-document timeouts"""
+
+    def __init__(self, max_workers=EXTRACTION_MAX_WORKERS, timeout=EXTRACTION_TIMEOUT,
+                 use_process_pool=EXTRACTION_USE_PROCESS_POOL):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.use_process_pool = use_process_pool
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def extract(self, kind, content, char_budget=DEFAULT_CHAR_BUDGET, timeout=None):
+        """
+        Extract text from document bytes.
+
+        Args:
+            kind: 'pdf' or 'docx'
+            content: Raw document bytes
+            char_budget: Maximum number of characters to return
+            timeout: Seconds to wait for this document (defaults to the service timeout)
+
+        Returns:
+            str or None: Extracted text, None if parsing failed or timed out
+        """
+        parser = PARSERS.get(kind)
+        if not parser:
+            raise ValueError(f"Unsupported document type: {kind}")
+        if not content:
+            return None
+
+        if not self.use_process_pool:
+            return self._extract_inline(kind, parser, content, char_budget)
+
+        timeout = self.timeout if timeout is None else timeout
+        executor = self._get_executor()
+        try:
+            future = executor.submit(parser, content, char_budget)
+        except (BrokenProcessPool, RuntimeError) as e:
+            print(f"⚠️ Extraction pool unavailable ({e}), parsing {kind} inline")
+            self._reset_executor(executor)
+            return self._extract_inline(kind, parser, content, char_budget)
+
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            print(f"❌ {kind.upper()} extraction timed out after {timeout}s")
+            future.cancel()
+            # The worker is still busy with this document - kill it and recycle the pool
+            self._reset_executor(executor, kill=True)
+            return None
+        except BrokenProcessPool as e:
+            print(f"❌ Extraction pool crashed while parsing {kind}: {e}")
+            self._reset_executor(executor)
+            return None
+        except Exception as e:
+            print(f"❌ Error extracting text from {kind.upper()}: {e}")
+            return None
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _extract_inline(self, kind, parser, content, char_budget):
+        try:
+            return parser(content, char_budget)
+        except Exception as e:
+            print(f"❌ Error extracting text from {kind.upper()}: {e}")
+            return None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn: gunicorn workers are threaded by the time we get here, fork is not safe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def _reset_executor(self, executor, kill=False):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        # shutdown() never stops a worker that is mid-parse, so grab the processes first
+        processes = list((getattr(executor, '_processes', None) or {}).values()) if kill else []
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            try:
+                if process.is_alive():
+                    process.kill()
+                    print(f"🛑 Killed stuck extraction worker (pid {process.pid})")
+            except Exception as e:
+                print(f"⚠️ Failed to kill extraction worker: {e}")
+
+
+_extraction_service = None
+_extraction_service_lock = threading.Lock()
+
+
+def get_extraction_service():
+    """Return the process-wide extraction service"""
+    global _extraction_service
+    if _extraction_service is None:
+        with _extraction_service_lock:
+            if _extraction_service is None:
+                _extraction_service = DocumentExtractionService()
+    return _extraction_service
+
+
+def extract_document_text(kind, content, char_budget=DEFAULT_CHAR_BUDGET, timeout=None):
+    """Convenience wrapper around the shared extraction service"""
+    return get_extraction_service().extract(kind, content, char_budget=char_budget, timeout=timeout)
@@ -0,0 +1,196 @@
+"""
+Employee Feature Store
+
+Normalized employee features for the recommendation scorers, built once per
+employee instead of on every recommendation call:
+- role / department keys (lowercased role, uppercased department)
+- lowercased skills for task-text matching and a canonical skill-id set
+  (SKILL_SYNONYMS folds "SCM", "Supply Chain Management", ... into one id)
+- JD availability and a JD keyword vector over JD_TASK_KEYWORDS
+- a role key -> employee ids index
+
+The employee routes update entries as employees are created, edited,
+deactivated or get a new JD link. Rows fetched by other processes are
+checked against the stored `updated_at` and the fields the entry was built
+from, so a stale or partial entry is rebuilt on first use - every lookup is
+O(1) per employee. Rows loaded for scoring must select `updated_at`.
+
+Usage:
+    store = get_employee_feature_store()
+    features = store.features_for(employees)   # aligned with `employees`
+    ids = store.employees_with_role('Account Executive')
+"""
+import re
+import threading
+from collections import namedtuple
+
+from keyword_matcher import jd_keyword_vector
+
+EmployeeFeatures = namedtuple('EmployeeFeatures', [
+    'id', 'role', 'role_lower', 'role_key', 'department', 'department_key',
+    'skills_lower', 'skills_key', 'skill_ids', 'experience',
+    'has_jd', 'jd_text', 'jd_vector', 'updated_at', 'fields'
+])
+
+# Normalized skill spelling -> canonical skill id
+SKILL_SYNONYMS = {
+    'scm': 'supply chain',
+    'supply chain management': 'supply chain',
+    'logistic': 'logistics',
+    'logistics management': 'logistics',
+    'freight': 'logistics',
+    'freight forwarding': 'logistics',
+    'customs clearance': 'customs',
+    'customs brokerage': 'customs',
+    'inventory management': 'inventory',
+    'stock management': 'inventory',
+    'purchasing': 'procurement',
+    'sourcing': 'procurement',
+    'negotiations': 'negotiation',
+    'negotiating': 'negotiation',
+    'crm': 'customer relations',
+    'customer relationship management': 'customer relations',
+    'client relations': 'customer relations',
+    'client relationship management': 'customer relations',
+    'bookkeeping': 'accounting',
+    'taxation': 'tax',
+    'tax accounting': 'tax',
+    'ms excel': 'excel',
+    'microsoft excel': 'excel',
+    'qa': 'quality',
+    'qc': 'quality',
+    'quality assurance': 'quality',
+    'quality control': 'quality',
+    'pm': 'project management',
+    'communications': 'communication',
+    'communication skills': 'communication',
+}
+
+_SKILL_SEPARATORS = re.compile(r'[^a-z0-9+#]+')
+
+
+def canonical_skill(skill):
+    """Canonical id of a skill name ('Supply-Chain Management' -> 'supply chain')"""
+    text = _SKILL_SEPARATORS.sub(' ', str(skill).lower().replace('&', ' and ')).strip()
+    return SKILL_SYNONYMS.get(text, text)
+
+
+def canonical_skills(skills):
+    """Set of canonical skill ids for a list of skill names"""
+    if not skills or not isinstance(skills, list):
+        return frozenset()
+    return frozenset(skill_id for skill_id in (canonical_skill(skill) for skill in skills) if skill_id)
+
+
+def build_features(employee):
+    """Compute the features of one employee row"""
+    role = employee.get('role') or ''
+    department = employee.get('department') or ''
+    skills = employee.get('skills')
+    skills = skills if isinstance(skills, list) else []
+    jd_text = employee.get('google_drive_jd') or ''
+    return EmployeeFeatures(
+        id=employee.get('id'),
+        role=role,
+        role_lower=role.lower(),
+        role_key=role.lower().strip(),
+        department=department,
+        department_key=department.upper().strip(),
+        skills_lower=tuple(str(skill).lower() for skill in skills),
+        skills_key=tuple(str(skill) for skill in skills[:10]),
+        skill_ids=canonical_skills(skills),
+        experience=employee.get('experience_years') or 0,
+        has_jd=bool(employee.get('job_description_url') or jd_text),
+        jd_text=jd_text,
+        jd_vector=jd_keyword_vector(jd_text),
+        updated_at=employee.get('updated_at'),
+        fields=frozenset(employee)
+    )
+
+
+class EmployeeFeatureStore:
+    """Employee id -> EmployeeFeatures, plus a role key -> ids index"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows = {}
+        self._features = {}
+        self._by_role = {}
+        self._counters = {'hits': 0, 'builds': 0}
+
+    def upsert(self, employee):
+        """Add or refresh an employee (merged over the fields already known)"""
+        employee_id = employee.get('id')
+        if employee_id is None:
+            return build_features(employee)
+        with self._lock:
+            row = {**self._rows.get(employee_id, {}), **employee}
+        features = build_features(row)
+        with self._lock:
+            previous = self._features.get(employee_id)
+            if previous is not None:
+                self._unindex(previous)
+            self._rows[employee_id] = row
+            self._features[employee_id] = features
+            self._by_role.setdefault(features.role_key, set()).add(employee_id)
+            self._counters['builds'] += 1
+        return features
+
+    def remove(self, employee_id):
+        """Forget a deleted or deactivated employee"""
+        with self._lock:
+            self._rows.pop(employee_id, None)
+            features = self._features.pop(employee_id, None)
+            if features is not None:
+                self._unindex(features)
+
+    def _unindex(self, features):
+        ids = self._by_role.get(features.role_key)
+        if ids is not None:
+            ids.discard(features.id)
+            if not ids:
+                del self._by_role[features.role_key]
+
+    def get(self, employee):
+        """
+        Features for an employee row.
+
+        Rebuilt if the row is newer, has fields the entry lacks or has no
+        `updated_at` to compare (select it to get cache hits).
+        """
+        with self._lock:
+            features = self._features.get(employee.get('id'))
+            if (features is not None
+                    and employee.get('updated_at') is not None
+                    and employee['updated_at'] == features.updated_at
+                    and features.fields.issuperset(employee)):
+                self._counters['hits'] += 1
+                return features
+        return self.upsert(employee)
+
+    def features_for(self, employees):
+        """Features aligned with a list of employee rows"""
+        return [self.get(employee) for employee in employees]
+
+    def employees_with_role(self, role):
+        """Ids of known employees whose role matches exactly (case-insensitive)"""
+        with self._lock:
+            return frozenset(self._by_role.get((role or '').lower().strip(), ()))
+
+    def stats(self):
+        with self._lock:
+            return {'employees': len(self._features), 'roles': len(self._by_role), **self._counters}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_employee_feature_store():
+    """Return the process-wide employee feature store"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = EmployeeFeatureStore()
+    return _store
@@ -1,8 +1,11 @@
 from flask import Blueprint, request, jsonify, g
 import os
 from datetime import datetime
-from auth import token_required
+from auth import token_required, admin_required
 from notification_routes import create_admin_event_notification
+from jd_document_cache import get_jd_document_cache
+from employee_features import get_employee_feature_store
+from employee_workload import get_workload_store, workload_summary, load_penalty
 import secrets
 import uuid
 
@@ -27,6 +30,17 @@ employee_bp = Blueprint('employees', __name__)
 def generate_temp_password(length: int = 12) -> str:
     return secrets.token_urlsafe(length)[:length]
 
+def refresh_employee_features(employee):
+    """Keep the recommendation feature store in step with an employee write"""
+    try:
+        store = get_employee_feature_store()
+        if employee.get('is_active') is False:
+            store.remove(employee.get('id'))
+        else:
+            store.upsert(employee)
+    except Exception as e:
+        print(f"⚠️ Failed to refresh employee features: {e}")
+
 @employee_bp.route('/api/employees', methods=['GET'])
 @token_required
 def get_employees():
@@ -104,6 +118,7 @@ def create_employee():
         
         if result.data:
             employee = result.data[0]
+            refresh_employee_features(employee)
             
             # Notify admins of the new employee (exclude creator if they have employee_id)
             creator_employee_id = None
@@ -185,6 +200,7 @@ def update_employee(employee_id):
         result = supabase.table("employees").update(update_data).eq("id", employee_id).execute()
         
         if result.data:
+            refresh_employee_features(result.data[0])
             return jsonify({'success': True, 'employee': result.data[0]})
         else:
             return jsonify({'success': False, 'error': 'Employee not found'}), 404
@@ -205,6 +221,7 @@ def delete_employee(employee_id):
         }).eq("id", employee_id).execute()
         
         if result.data:
+            get_employee_feature_store().remove(employee_id)
             return jsonify({'success': True, 'message': 'Employee deactivated successfully'})
         else:
             return jsonify({'success': False, 'error': 'Employee not found'}), 404
@@ -230,6 +247,7 @@ def permanent_delete_employee(employee_id):
         result = supabase.table("employees").delete().eq("id", employee_id).execute()
         
         if result.data:
+            get_employee_feature_store().remove(employee_id)
             print(f"✅ Employee {employee_id} permanently deleted")
             return jsonify({
                 'success': True, 
@@ -498,6 +516,13 @@ def update_employee_jd_link(employee_id):
         result = supabase.table("employees").update(update_data).eq("id", employee_id).execute()
         
         if hasattr(result, 'data') and result.data:
+            refresh_employee_features(result.data[0])
+            
+            # Drop the cached text of the previous JD document
+            previous_jd_link = employee_data.data[0].get('job_description_url')
+            if previous_jd_link and previous_jd_link != jd_link:
+                get_jd_document_cache().invalidate(previous_jd_link)
+            
             return jsonify({
                 'success': True, 
                 'message': 'Job description link updated successfully',
@@ -509,4 +534,54 @@ def update_employee_jd_link(employee_id):
     except Exception as e:
         print(f"❌ Error updating JD link: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
-    
+
+@employee_bp.route('/api/employees/workload', methods=['GET'])
+@token_required
+def get_employees_workload():
+    """Open tasks, remaining hours and overdue tasks per employee (from the maintained aggregate)"""
+    try:
+        store = get_workload_store()
+        employee_ids = [employee_id for employee_id in request.args.get('ids', '').split(',') if employee_id]
+        workloads = store.for_employees(employee_ids) if employee_ids else store.all()
+        return jsonify({
+            'success': True,
+            'workload': [{
+                'employee_id': employee_id,
+                **workload_summary(workload),
+                'load_penalty': load_penalty(workload),
+                'updated_at': workload.updated_at
+            } for employee_id, workload in sorted(workloads.items(), key=lambda item: -item[1].remaining_hours)]
+        })
+    except Exception as e:
+        print(f"❌ Error getting workload: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@employee_bp.route('/api/employees/<employee_id>/workload', methods=['GET'])
+@token_required
+def get_employee_workload(employee_id):
+    """Workload of one employee"""
+    try:
+        workload = get_workload_store().get(employee_id)
+        return jsonify({
+            'success': True,
+            'employee_id': employee_id,
+            **workload_summary(workload),
+            'load_penalty': load_penalty(workload),
+            'open_due_dates': list(workload.due_dates),
+            'updated_at': workload.updated_at
+        })
+    except Exception as e:
+        print(f"❌ Error getting workload for {employee_id}: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@employee_bp.route('/api/employees/workload/reconcile', methods=['POST'])
+@token_required
+@admin_required
+def reconcile_employees_workload():
+    """Rebuild the workload aggregate from action_plans"""
+    try:
+        workloads = get_workload_store().reconcile()
+        return jsonify({'success': True, 'employees': len(workloads), 'stats': get_workload_store().stats()})
+    except Exception as e:
+        print(f"❌ Error reconciling workload: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
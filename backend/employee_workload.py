@@ -0,0 +1,359 @@
+"""
+Employee Workload
+
+Maintained per-employee load aggregate for load-aware recommendations, kept
+in the `employee_workload` table (migrations/employee_workload.sql) so
+ranking never has to scan action_plans:
+- open_tasks       - assigned tasks that are not completed/cancelled
+- remaining_hours  - sum of estimated_hours * (1 - completion_percentage/100)
+- overdue_tasks    - open tasks past their due_date
+
+A task counts for its primary assignee and everyone in
+assigned_to_multiple. Task writes (create, update, progress, applying a
+recommendation) call `task_changed()`, which recomputes just the affected
+employees from their open tasks and upserts their rows - every writer
+rebuilds from the current rows, so concurrent workers cannot drift the
+counters. `reconcile()` rebuilds every row from a full scan; it runs in the
+background every WORKLOAD_RECONCILE_SECONDS and from the admin endpoint.
+
+Overdue is time dependent, so rows also keep the due dates of the open
+tasks and `overdue_tasks` is recounted against today on read.
+
+Usage:
+    store = get_workload_store()
+    store.task_changed(before_row, after_row)
+    loads = store.for_employees([employee['id'] for employee in employees])
+    penalty = load_penalty(loads[employee_id])
+"""
+import os
+import time
+import threading
+from collections import namedtuple
+from datetime import datetime, date
+
+WORKLOAD_TABLE = 'employee_workload'
+WORKLOAD_CACHE_SECONDS = int(os.getenv('WORKLOAD_CACHE_SECONDS', '30'))
+WORKLOAD_RECONCILE_SECONDS = int(os.getenv('WORKLOAD_RECONCILE_SECONDS', str(6 * 3600)))
+# Load scoring: hours that count as a full week and the most fit points load can cost
+WORKLOAD_CAPACITY_HOURS = float(os.getenv('WORKLOAD_CAPACITY_HOURS', '40'))
+WORKLOAD_MAX_PENALTY = float(os.getenv('WORKLOAD_MAX_PENALTY', '15'))
+WORKLOAD_OVERDUE_PENALTY = float(os.getenv('WORKLOAD_OVERDUE_PENALTY', '3'))
+
+CLOSED_STATUSES = ('completed', 'cancelled')
+WORKLOAD_TASK_FIELDS = "id, assigned_to, assigned_to_multiple, estimated_hours, completion_percentage, due_date, status"
+
+EmployeeWorkload = namedtuple('EmployeeWorkload', [
+    'employee_id', 'open_tasks', 'remaining_hours', 'overdue_tasks', 'due_dates', 'updated_at'
+])
+
+
+def get_supabase_client():
+    supabase_url = os.getenv('SUPABASE_URL')
+    supabase_key = os.getenv('SUPABASE_SERVICE_KEY')
+    if not supabase_url or not supabase_key:
+        raise Exception("Supabase credentials not configured")
+    from supabase import create_client
+    return create_client(supabase_url, supabase_key)
+
+
+def is_missing_table(error):
+    """True if a Supabase error says the table does not exist (migration not applied)"""
+    code = getattr(error, 'code', None)
+    message = str(getattr(error, 'message', None) or error)
+    return code in ('42P01', 'PGRST205') or 'does not exist' in message or 'schema cache' in message
+
+
+def empty_workload(employee_id):
+    return EmployeeWorkload(employee_id, 0, 0.0, 0, (), None)
+
+
+def task_assignees(task):
+    """Employee ids a task counts for"""
+    if not task:
+        return set()
+    assignees = set(task.get('assigned_to_multiple') or [])
+    if task.get('assigned_to'):
+        assignees.add(task['assigned_to'])
+    return assignees
+
+
+def is_open(task):
+    return (task.get('status') or 'not_started') not in CLOSED_STATUSES
+
+
+def remaining_hours(task):
+    """Estimated hours not yet covered by the task's completion percentage"""
+    try:
+        hours = float(task.get('estimated_hours') or 0)
+        completion = min(max(float(task.get('completion_percentage') or 0), 0), 100)
+    except (TypeError, ValueError):
+        return 0.0
+    return hours * (1 - completion / 100)
+
+
+def due_day(task):
+    """The task's due date as 'YYYY-MM-DD', or None"""
+    due = task.get('due_date')
+    return str(due)[:10] if due else None
+
+
+def count_overdue(due_dates, today=None):
+    today = (today or date.today()).isoformat()
+    return sum(1 for due in due_dates if due < today)
+
+
+def aggregate(tasks, employee_ids=(), today=None):
+    """
+    Workload per employee from task rows.
+
+    Every id in `employee_ids` gets an entry (zero when they have no open task).
+    """
+    totals = {employee_id: [0, 0.0, []] for employee_id in employee_ids}
+    for task in tasks:
+        if not is_open(task):
+            continue
+        hours, due = remaining_hours(task), due_day(task)
+        for employee_id in task_assignees(task):
+            entry = totals.setdefault(employee_id, [0, 0.0, []])
+            entry[0] += 1
+            entry[1] += hours
+            if due:
+                entry[2].append(due)
+    now = datetime.utcnow().isoformat()
+    return {
+        employee_id: EmployeeWorkload(employee_id, open_tasks, round(hours, 2),
+                                      count_overdue(due_dates, today), tuple(sorted(due_dates)), now)
+        for employee_id, (open_tasks, hours, due_dates) in totals.items()
+    }
+
+
+def load_penalty(workload, capacity_hours=WORKLOAD_CAPACITY_HOURS, max_penalty=WORKLOAD_MAX_PENALTY,
+                 overdue_penalty=WORKLOAD_OVERDUE_PENALTY):
+    """Fit points to subtract for an employee's open work (0 when idle, at most max_penalty)"""
+    if workload is None or not workload.open_tasks:
+        return 0.0
+    penalty = max_penalty * min(workload.remaining_hours / capacity_hours, 1) if capacity_hours > 0 else 0
+    penalty += overdue_penalty * workload.overdue_tasks
+    return round(min(penalty, max_penalty), 1)
+
+
+def workload_summary(workload):
+    """JSON-ready workload of one employee (without the due date list)"""
+    workload = workload or empty_workload(None)
+    return {
+        'open_tasks': workload.open_tasks,
+        'remaining_hours': workload.remaining_hours,
+        'overdue_tasks': workload.overdue_tasks
+    }
+
+
+def _to_row(workload):
+    return {
+        'employee_id': workload.employee_id,
+        'open_tasks': workload.open_tasks,
+        'remaining_hours': workload.remaining_hours,
+        'overdue_tasks': workload.overdue_tasks,
+        'open_due_dates': list(workload.due_dates),
+        'updated_at': workload.updated_at
+    }
+
+
+def _from_row(row, today=None):
+    due_dates = tuple(row.get('open_due_dates') or ())
+    return EmployeeWorkload(
+        row['employee_id'],
+        int(row.get('open_tasks') or 0),
+        float(row.get('remaining_hours') or 0),
+        count_overdue(due_dates, today),
+        due_dates,
+        row.get('updated_at')
+    )
+
+
+class WorkloadStore:
+    """employee_workload rows, cached in memory for WORKLOAD_CACHE_SECONDS"""
+
+    def __init__(self, cache_seconds=WORKLOAD_CACHE_SECONDS, reconcile_seconds=WORKLOAD_RECONCILE_SECONDS):
+        self.cache_seconds = cache_seconds
+        self.reconcile_seconds = reconcile_seconds
+        self._lock = threading.Lock()
+        self._rows = {}
+        self._loaded_at = 0
+        self._reconciled_at = time.time()
+        self._reconciling = False
+        self._table_available = True
+        self._counters = {'refreshes': 0, 'reconciles': 0, 'loads': 0}
+
+    # ---------- writes ----------
+
+    def task_changed(self, before=None, after=None):
+        """Recompute the employees a task counted for before and/or after a write"""
+        employee_ids = task_assignees(before) | task_assignees(after)
+        if employee_ids:
+            self.refresh(employee_ids)
+
+    def refresh(self, employee_ids):
+        """Recompute and store the workload of some employees from their open tasks"""
+        employee_ids = sorted({employee_id for employee_id in employee_ids if employee_id})
+        if not employee_ids:
+            return {}
+        try:
+            supabase = get_supabase_client()
+            ids = ",".join(employee_ids)
+            result = supabase.table("action_plans").select(WORKLOAD_TASK_FIELDS).neq("status", "completed").or_(
+                f"assigned_to.in.({ids}),assigned_to_multiple.ov.{{{ids}}}").execute()
+            workloads = aggregate(result.data or [], employee_ids)
+            # The query matches tasks of any listed employee; keep only the listed ones
+            workloads = {employee_id: workloads[employee_id] for employee_id in employee_ids}
+            self._store(workloads)
+            with self._lock:
+                self._counters['refreshes'] += 1
+            return workloads
+        except Exception as e:
+            print(f"⚠️ Failed to refresh workload for {len(employee_ids)} employee(s): {e}")
+            return {}
+
+    def reconcile(self):
+        """Rebuild every employee's row from a full scan of the open tasks"""
+        try:
+            supabase = get_supabase_client()
+            result = supabase.table("action_plans").select(WORKLOAD_TASK_FIELDS).neq("status", "completed").execute()
+            with self._lock:
+                known = list(self._rows)
+            try:
+                stored = supabase.table(WORKLOAD_TABLE).select("employee_id").execute()
+                known.extend(row['employee_id'] for row in stored.data or [])
+                # The migration may have been applied since the table was found missing
+                with self._lock:
+                    self._table_available = True
+            except Exception as e:
+                print(f"⚠️ Could not list {WORKLOAD_TABLE} rows: {e}")
+                if is_missing_table(e):
+                    with self._lock:
+                        self._table_available = False
+            workloads = aggregate(result.data or [], known)
+            self._store(workloads, replace=True)
+            with self._lock:
+                self._reconciled_at = time.time()
+                self._counters['reconciles'] += 1
+            print(f"⚖️ Workload reconciled: {len(workloads)} employees from {len(result.data or [])} open tasks")
+            return workloads
+        except Exception as e:
+            print(f"❌ Workload reconciliation failed: {e}")
+            return {}
+
+    def _store(self, workloads, replace=False):
+        if not workloads:
+            return
+        with self._lock:
+            if replace:
+                self._rows = dict(workloads)
+            else:
+                self._rows.update(workloads)
+            table_available = self._table_available
+        if not table_available:
+            return
+        try:
+            get_supabase_client().table(WORKLOAD_TABLE).upsert(
+                [_to_row(workload) for workload in workloads.values()], on_conflict="employee_id").execute()
+        except Exception as e:
+            print(f"⚠️ Failed to save {WORKLOAD_TABLE} rows: {e}")
+
+    # ---------- reads ----------
+
+    def for_employees(self, employee_ids):
+        """{employee_id: EmployeeWorkload} for the given employees (zero workload when unknown)"""
+        self._ensure_loaded()
+        today = date.today()
+        with self._lock:
+            rows = {employee_id: self._rows.get(employee_id) for employee_id in employee_ids}
+        return {
+            employee_id: (row._replace(overdue_tasks=count_overdue(row.due_dates, today))
+                          if row else empty_workload(employee_id))
+            for employee_id, row in rows.items()
+        }
+
+    def get(self, employee_id):
+        return self.for_employees([employee_id])[employee_id]
+
+    def all(self):
+        self._ensure_loaded()
+        with self._lock:
+            employee_ids = list(self._rows)
+        return self.for_employees(employee_ids)
+
+    def _ensure_loaded(self):
+        """Reload the table when the cached copy is older than cache_seconds; reconcile when due"""
+        with self._lock:
+            stale = time.time() - self._loaded_at > self.cache_seconds
+            reconcile_due = time.time() - self._reconciled_at > self.reconcile_seconds
+        if stale:
+            self._load()
+        if reconcile_due:
+            self._start_reconcile()
+
+    def _start_reconcile(self):
+        """Run reconcile() in a background thread unless one is already running"""
+        with self._lock:
+            if self._reconciling:
+                return
+            self._reconciling = True
+        threading.Thread(target=self._background_reconcile, name='workload-reconcile', daemon=True).start()
+
+    def _load(self):
+        if not self._table_available:
+            with self._lock:
+                self._loaded_at = time.time()
+            return
+        try:
+            result = get_supabase_client().table(WORKLOAD_TABLE).select("*").execute()
+            today = date.today()
+            rows = {row['employee_id']: _from_row(row, today) for row in result.data or []}
+            with self._lock:
+                self._rows = rows
+                self._loaded_at = time.time()
+                self._counters['loads'] += 1
+        except Exception as e:
+            with self._lock:
+                # Keep the last rows; the load is retried once they are cache_seconds old
+                self._loaded_at = time.time()
+            if not is_missing_table(e):
+                print(f"⚠️ Failed to load {WORKLOAD_TABLE} ({e}), keeping the cached workload")
+                return
+            # No table (migration not applied): keep the aggregate in this process only,
+            # built off the request path
+            print(f"⚠️ {WORKLOAD_TABLE} unavailable ({e}), keeping workload in memory")
+            with self._lock:
+                self._table_available = False
+            self._start_reconcile()
+
+    def _background_reconcile(self):
+        try:
+            self.reconcile()
+        finally:
+            with self._lock:
+                self._reconciling = False
+                self._reconciled_at = time.time()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'employees': len(self._rows),
+                'table_available': self._table_available,
+                'seconds_since_reconcile': round(time.time() - self._reconciled_at),
+                **self._counters
+            }
+
+
+_workload_store = None
+_workload_store_lock = threading.Lock()
+
+
+def get_workload_store():
+    """Return the process-wide workload store"""
+    global _workload_store
+    if _workload_store is None:
+        with _workload_store_lock:
+            if _workload_store is None:
+                _workload_store = WorkloadStore()
+    return _workload_store
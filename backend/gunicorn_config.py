@@ -9,7 +9,12 @@ backlog = 2048
 
 # Worker processes
 workers = multiprocessing.cpu_count() * 2 + 1
-worker_class = 'sync'
+# Threaded workers: an open notification stream (/api/notifications/stream) holds
+# one thread instead of a whole worker process. notification_routes reads the same
+# GUNICORN_THREADS and allows streams on all but NOTIFICATION_STREAM_RESERVED_THREADS
+# (default 4) of them, so normal requests always have threads left
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', '12'))
 worker_connections = 1000
 timeout = 120
 keepalive = 5
@@ -0,0 +1,131 @@
+"""
+Hedged LLM Calls
+
+Bounds the latency of interactive AI requests by an SLO instead of by
+OpenAI. A hedged call starts the LLM path on a worker thread and computes
+the instant deterministic path (keyword matching, template tasks) on the
+request thread:
+1. The LLM answers within the deadline -> its result is returned
+2. The LLM fails within the deadline -> the deterministic result is returned
+3. The deadline passes -> the deterministic result is returned at once and
+   the LLM keeps running; when it succeeds, `on_upgrade(result)` stores it
+   (strategic_metadata / ai_meta) so the client picks up the better answer
+
+While HEDGE_MAX_PENDING LLM calls are already running, new calls skip the
+LLM and return the deterministic result, so a slow OpenAI cannot pile up
+threads.
+
+Usage:
+    result, source = get_hedger().call(
+        lambda: llm_path(...), lambda: fast_path(...),
+        deadline=HEDGE_DEADLINE_SECONDS, on_upgrade=save_upgrade, name='recommendations')
+"""
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+HEDGE_DEADLINE_SECONDS = float(os.getenv('HEDGE_DEADLINE_SECONDS', '3'))
+HEDGE_MAX_WORKERS = int(os.getenv('HEDGE_MAX_WORKERS', '8'))
+HEDGE_MAX_PENDING = int(os.getenv('HEDGE_MAX_PENDING', '32'))
+
+# Where the returned result came from
+SOURCE_LLM = 'llm'
+SOURCE_FALLBACK = 'fallback'
+SOURCE_FALLBACK_PENDING = 'fallback_pending'  # the LLM is still running, its result may arrive as an upgrade
+
+
+class Hedger:
+    """Runs LLM calls against a deadline with a deterministic stand-in"""
+
+    def __init__(self, max_workers=HEDGE_MAX_WORKERS, max_pending=HEDGE_MAX_PENDING):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hedge')
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self.pending = 0
+        self._counters = {'calls': 0, 'llm_in_time': 0, 'fallback_errors': 0, 'fallback_deadline': 0,
+                          'shed': 0, 'upgrades': 0, 'upgrade_failures': 0}
+
+    def call(self, primary, fallback, deadline=HEDGE_DEADLINE_SECONDS, on_upgrade=None, name='llm'):
+        """
+        Return (result, source) within about `deadline` seconds.
+
+        Args:
+            primary: LLM path; raises on failure
+            fallback: Instant deterministic path
+            deadline: Seconds the LLM gets before the fallback is returned
+            on_upgrade: Called with the LLM result if it arrives after the deadline
+            name: Label for logs
+        """
+        started = time.monotonic()
+        self._count('calls')
+        with self._lock:
+            shed = self.pending >= self.max_pending
+            if not shed:
+                self.pending += 1
+        if shed:
+            self._count('shed')
+            print(f"⚠️ Hedge {name}: {self.pending} LLM calls pending, answering with the fallback only")
+            return fallback(), SOURCE_FALLBACK
+
+        future = self.executor.submit(primary)
+        future.add_done_callback(self._finished)
+        fallback_result = fallback()
+
+        try:
+            result = future.result(timeout=max(0.0, deadline - (time.monotonic() - started)))
+            self._count('llm_in_time')
+            return result, SOURCE_LLM
+        except TimeoutError:
+            pass
+        except Exception as e:
+            self._count('fallback_errors')
+            print(f"⚠️ Hedge {name}: LLM failed ({e}), answering with the fallback")
+            return fallback_result, SOURCE_FALLBACK
+
+        self._count('fallback_deadline')
+        print(f"⏱️ Hedge {name}: LLM missed the {deadline:.1f}s deadline, answering with the fallback")
+        if on_upgrade:
+            future.add_done_callback(lambda done: self._upgrade(done, on_upgrade, name))
+        return fallback_result, SOURCE_FALLBACK_PENDING
+
+    def _finished(self, future):
+        with self._lock:
+            self.pending -= 1
+
+    def _upgrade(self, future, on_upgrade, name):
+        try:
+            result = future.result()
+        except Exception as e:
+            self._count('upgrade_failures')
+            print(f"⚠️ Hedge {name}: late LLM call failed, keeping the fallback ({e})")
+            return
+        try:
+            on_upgrade(result)
+            self._count('upgrades')
+            print(f"⬆️ Hedge {name}: fallback upgraded with the LLM result")
+        except Exception as e:
+            self._count('upgrade_failures')
+            print(f"❌ Hedge {name}: failed to store the upgrade: {e}")
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self):
+        with self._lock:
+            return {'pending': self.pending, **self._counters}
+
+
+_hedger = None
+_hedger_lock = threading.Lock()
+
+
+def get_hedger():
+    """Return the process-wide hedger"""
+    global _hedger
+    if _hedger is None:
+        with _hedger_lock:
+            if _hedger is None:
+                _hedger = Hedger()
+    return _hedger
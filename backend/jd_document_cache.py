@@ -0,0 +1,283 @@
+"""
+Job Description Document Cache
+
+Disk cache for the job description documents linked from employee profiles
+(the `job_description_url` column, usually a Google Drive link).
+
+Each entry is keyed by the normalized Google Drive file id and stores the
+extracted text together with the HTTP validators (ETag / Last-Modified) of the
+download it came from. Lookups work like this:
+1. Fresh entry -> extracted text is returned straight from memory/disk
+2. Stale entry -> cached text is returned immediately and a conditional
+   request (If-None-Match / If-Modified-Since) is scheduled in the background
+3. No entry    -> the document is downloaded and parsed once, concurrent
+   callers for the same file wait for that single download
+"""
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, parse_qs
+
+import requests
+
+JD_CACHE_DIR = os.getenv('JD_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'erp_jd_cache'))
+JD_CACHE_FRESH_SECONDS = int(os.getenv('JD_CACHE_FRESH_SECONDS', str(6 * 3600)))
+JD_CACHE_FAILURE_SECONDS = int(os.getenv('JD_CACHE_FAILURE_SECONDS', '600'))
+JD_DOWNLOAD_TIMEOUT = int(os.getenv('JD_DOWNLOAD_TIMEOUT', '30'))
+
+DOWNLOAD_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+
+def normalize_drive_file_id(document_url):
+    """
+    Return the Google Drive file id for a Drive link, or None if it is not one.
+
+    Supports the link formats employees paste into their profile:
+    - https://drive.google.com/file/d/<id>/view?usp=sharing
+    - https://drive.google.com/open?id=<id>
+    - https://drive.google.com/uc?export=download&id=<id>
+    """
+    if not document_url or 'drive.google.com' not in document_url:
+        return None
+
+    document_url = document_url.strip()
+    if '/file/d/' in document_url:
+        file_id = document_url.split('/file/d/')[1].split('/')[0].split('?')[0]
+        return file_id or None
+
+    query = parse_qs(urlparse(document_url).query)
+    if query.get('id'):
+        return query['id'][0].strip() or None
+
+    return None
+
+
+def get_cache_key(document_url):
+    """Cache key for a document URL: the Drive file id, or a hash for other URLs"""
+    file_id = normalize_drive_file_id(document_url)
+    if file_id:
+        return f"gdrive-{file_id}"
+    if document_url and 'drive.google.com' not in document_url:
+        return "url-" + hashlib.sha256(document_url.strip().encode('utf-8')).hexdigest()[:32]
+    return None
+
+
+def get_download_url(document_url):
+    """Convert a Google Drive link to its direct download link"""
+    file_id = normalize_drive_file_id(document_url)
+    if file_id:
+        return f"https://drive.google.com/uc?export=download&id={file_id}"
+    return document_url.strip()
+
+
+class JDDocumentCache:
+    """Content cache for extracted job description text"""
+
+    def __init__(self, cache_dir=JD_CACHE_DIR, fresh_seconds=JD_CACHE_FRESH_SECONDS,
+                 failure_seconds=JD_CACHE_FAILURE_SECONDS, timeout=JD_DOWNLOAD_TIMEOUT,
+                 session=None):
+        self.cache_dir = cache_dir
+        self.fresh_seconds = fresh_seconds
+        self.failure_seconds = failure_seconds
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._refreshing = set()
+        self._refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='jd-cache-refresh')
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # ---------- public API ----------
+
+    def get_text(self, document_url, extractor):
+        """
+        Return extracted text for `document_url`.
+
+        `extractor(response, document_url)` turns a successful download into
+        text; it only runs when the document content actually changed.
+        """
+        key = get_cache_key(document_url)
+        if not key:
+            print(f"❌ Unsupported Google Drive URL format: {document_url}")
+            return None
+
+        entry = self._load_entry(key)
+        if entry and self._is_fresh(entry):
+            return entry.get('text')
+
+        if entry:
+            # Serve the stale copy now and revalidate off the request path
+            self._schedule_refresh(key, document_url, extractor)
+            return entry.get('text')
+
+        with self._get_key_lock(key):
+            # Another thread may have downloaded it while we waited
+            entry = self._load_entry(key)
+            if entry:
+                return entry.get('text')
+            entry = self._fetch(key, document_url, extractor, previous=None)
+            return entry.get('text') if entry else None
+
+    def invalidate(self, document_url):
+        """Drop the cached entry for a document (e.g. after the JD link changes)"""
+        key = get_cache_key(document_url)
+        if not key:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+        try:
+            os.remove(self._entry_path(key))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ Failed to remove JD cache entry {key}: {e}")
+
+    def stats(self):
+        """Cache counters for health/debug endpoints"""
+        with self._lock:
+            return {
+                'entries_in_memory': len(self._entries),
+                'refreshing': len(self._refreshing),
+                'cache_dir': self.cache_dir
+            }
+
+    # ---------- fetching ----------
+
+    def _fetch(self, key, document_url, extractor, previous):
+        """Download (conditionally when `previous` has validators) and store the entry"""
+        headers = dict(DOWNLOAD_HEADERS)
+        if previous:
+            if previous.get('etag'):
+                headers['If-None-Match'] = previous['etag']
+            if previous.get('last_modified'):
+                headers['If-Modified-Since'] = previous['last_modified']
+
+        try:
+            response = self.session.get(get_download_url(document_url), timeout=self.timeout, headers=headers)
+
+            if response.status_code == 304 and previous:
+                entry = dict(previous, fetched_at=time.time())
+                self._store_entry(key, entry)
+                print(f"📄 JD cache revalidated (304): {key}")
+                return entry
+
+            response.raise_for_status()
+            text = extractor(response, document_url)
+            entry = {
+                'key': key,
+                'source_url': document_url,
+                'text': text,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'content_type': response.headers.get('content-type', ''),
+                'fetched_at': time.time(),
+                'failed': text is None
+            }
+            self._store_entry(key, entry)
+            print(f"📄 JD cache stored: {key} ({len(text or '')} chars)")
+            return entry
+
+        except Exception as e:
+            print(f"❌ Error downloading JD document {key}: {e}")
+            if previous:
+                # Keep serving the last good copy, retry after the failure window
+                entry = dict(previous, fetched_at=time.time() - self.fresh_seconds + self.failure_seconds)
+            else:
+                entry = {
+                    'key': key,
+                    'source_url': document_url,
+                    'text': None,
+                    'etag': None,
+                    'last_modified': None,
+                    'content_type': '',
+                    'fetched_at': time.time(),
+                    'failed': True
+                }
+            self._store_entry(key, entry)
+            return entry
+
+    def _schedule_refresh(self, key, document_url, extractor):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                with self._get_key_lock(key):
+                    previous = self._load_entry(key)
+                    if previous and self._is_fresh(previous):
+                        return
+                    self._fetch(key, document_url, extractor, previous=previous)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._refresh_executor.submit(refresh)
+
+    def _is_fresh(self, entry):
+        max_age = self.failure_seconds if entry.get('failed') else self.fresh_seconds
+        return time.time() - entry.get('fetched_at', 0) < max_age
+
+    # ---------- storage ----------
+
+    def _get_key_lock(self, key):
+        with self._lock:
+            if key not in self._key_locks:
+                self._key_locks[key] = threading.Lock()
+            return self._key_locks[key]
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load_entry(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+
+        try:
+            with open(self._entry_path(key), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable JD cache entry {key}: {e}")
+            return None
+
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def _store_entry(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+        try:
+            # Write to a temp file and rename so readers in other workers never see partial JSON
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{key}.", suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._entry_path(key))
+        except Exception as e:
+            print(f"⚠️ Failed to persist JD cache entry {key}: {e}")
+
+
+_jd_document_cache = None
+_jd_document_cache_lock = threading.Lock()
+
+
+def get_jd_document_cache():
+    """Return the process-wide JD document cache"""
+    global _jd_document_cache
+    if _jd_document_cache is None:
+        with _jd_document_cache_lock:
+            if _jd_document_cache is None:
+                _jd_document_cache = JDDocumentCache()
+    return _jd_document_cache
@@ -0,0 +1,463 @@
+"""
+Background Job Queue
+
+Bounded, durable background jobs for long-running AI work (employee
+recommendations, RAG analysis).
+
+Every job is tied to the `ai_meta` record that tracks its progress; the job
+state lives next to the request inputs in `ai_meta.input_json['job']`:
+
+    {
+        "handler": "employee_recommendations",   # registered handler name
+        "payload": {"task_id": "..."},           # ids only, handlers re-fetch data
+        "state": "queued" | "running" | "done" | "failed",
+        "attempts": 1, "max_attempts": 3,
+        "lease_owner": "host:pid:abcd1234",      # worker process running it
+        "lease_expires_at": 1718000000.0,        # renewed by the heartbeat
+        "version": 4                             # compare-and-set counter
+    }
+
+How it works:
+1. `enqueue()` / `submit()` refuse new work with QueueFullError when the
+   local queue is at its depth limit (routes turn that into HTTP 429)
+2. A fixed number of worker threads claim jobs with a conditional update on
+   `version`, so a job only ever runs in one place
+3. A heartbeat renews the lease of running jobs; when a gunicorn worker dies
+   or is recycled its leases expire and any other worker re-claims the job
+4. Failed handlers are retried with backoff up to `max_attempts`; a job that
+   ran out of attempts (including one whose worker died on its last attempt)
+   is marked failed and the handler's `on_failure` callback is told why
+
+`InMemoryJobStore` keeps the same contract without a database (tests, local
+scripts); set JOB_STORE=memory to use it.
+"""
+import os
+import copy
+import time
+import uuid
+import queue
+import socket
+import threading
+from datetime import datetime, timedelta
+
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '3'))
+JOB_MAX_QUEUE_DEPTH = int(os.getenv('JOB_MAX_QUEUE_DEPTH', '20'))
+JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', '90'))
+JOB_HEARTBEAT_SECONDS = int(os.getenv('JOB_HEARTBEAT_SECONDS', '30'))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+JOB_RECOVERY_WINDOW_HOURS = int(os.getenv('JOB_RECOVERY_WINDOW_HOURS', '24'))
+JOB_STORE = os.getenv('JOB_STORE', 'supabase').lower()
+
+ACTIVE_STATES = ('queued', 'running')
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at its depth limit"""
+
+    def __init__(self, depth, retry_after=JOB_HEARTBEAT_SECONDS):
+        super().__init__(f"Job queue is full ({depth} jobs waiting)")
+        self.depth = depth
+        self.retry_after = retry_after
+
+
+def get_supabase_client():
+    supabase_url = os.getenv('SUPABASE_URL')
+    supabase_key = os.getenv('SUPABASE_SERVICE_KEY')
+    if not supabase_url or not supabase_key:
+        raise Exception("Supabase credentials not configured")
+    from supabase import create_client
+    return create_client(supabase_url, supabase_key)
+
+
+def new_job(handler, payload, max_attempts=JOB_MAX_ATTEMPTS):
+    """Initial job state for `input_json['job']`"""
+    return {
+        'handler': handler,
+        'payload': payload or {},
+        'state': 'queued',
+        'attempts': 0,
+        'max_attempts': max_attempts,
+        'lease_owner': None,
+        'lease_expires_at': None,
+        'last_error': None,
+        'enqueued_at': time.time(),
+        'version': 0
+    }
+
+
+# ========== STORES ==========
+
+class InMemoryJobStore:
+    """Job store kept in process memory - same contract as SupabaseJobStore"""
+
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def create(self, job_id, job):
+        with self._lock:
+            self._jobs[str(job_id)] = copy.deepcopy(job)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(str(job_id))
+            return copy.deepcopy(job) if job else None
+
+    def compare_and_set(self, job_id, expected_version, job):
+        """Replace the job if its version is still `expected_version`"""
+        with self._lock:
+            current = self._jobs.get(str(job_id))
+            if not current or current.get('version') != expected_version:
+                return False
+            self._jobs[str(job_id)] = copy.deepcopy(job)
+            return True
+
+    def list_active(self):
+        """(job_id, job) pairs for queued or running jobs"""
+        with self._lock:
+            return [(job_id, copy.deepcopy(job)) for job_id, job in self._jobs.items()
+                    if job.get('state') in ACTIVE_STATES]
+
+
+class SupabaseJobStore:
+    """Job store backed by `ai_meta.input_json['job']`"""
+
+    def __init__(self, client_factory=get_supabase_client, recovery_window_hours=JOB_RECOVERY_WINDOW_HOURS):
+        self.client_factory = client_factory
+        self.recovery_window_hours = recovery_window_hours
+
+    def _input_json(self, supabase, job_id):
+        result = supabase.table("ai_meta").select("input_json").eq("id", job_id).execute()
+        if not result.data:
+            return None
+        return result.data[0].get('input_json') or {}
+
+    def create(self, job_id, job):
+        supabase = self.client_factory()
+        input_json = self._input_json(supabase, job_id)
+        if input_json is None:
+            raise Exception(f"AI meta record {job_id} not found")
+        input_json['job'] = job
+        supabase.table("ai_meta").update({
+            "input_json": input_json,
+            "updated_at": datetime.utcnow().isoformat()
+        }).eq("id", job_id).execute()
+
+    def get(self, job_id):
+        input_json = self._input_json(self.client_factory(), job_id)
+        return (input_json or {}).get('job')
+
+    def compare_and_set(self, job_id, expected_version, job):
+        supabase = self.client_factory()
+        input_json = self._input_json(supabase, job_id)
+        if not input_json or not input_json.get('job'):
+            return False
+        if input_json['job'].get('version') != expected_version:
+            return False
+        input_json['job'] = job
+        # The version filter makes the write conditional: a worker that lost
+        # the race updates zero rows
+        result = supabase.table("ai_meta").update({
+            "input_json": input_json,
+            "updated_at": datetime.utcnow().isoformat()
+        }).eq("id", job_id).eq("input_json->job->>version", str(expected_version)).execute()
+        return bool(result.data)
+
+    def list_active(self):
+        supabase = self.client_factory()
+        since = (datetime.utcnow() - timedelta(hours=self.recovery_window_hours)).isoformat()
+        result = supabase.table("ai_meta").select("id, input_json").in_(
+            "input_json->job->>state", list(ACTIVE_STATES)
+        ).gte("created_at", since).execute()
+        return [(row['id'], row['input_json']['job']) for row in (result.data or [])
+                if (row.get('input_json') or {}).get('job')]
+
+
+# ========== QUEUE ==========
+
+class JobQueue:
+    """Bounded worker pool running durable jobs from a job store"""
+
+    def __init__(self, store, workers=JOB_WORKERS, max_queue_depth=JOB_MAX_QUEUE_DEPTH,
+                 lease_seconds=JOB_LEASE_SECONDS, heartbeat_seconds=JOB_HEARTBEAT_SECONDS,
+                 max_attempts=JOB_MAX_ATTEMPTS):
+        self.store = store
+        self.workers = workers
+        self.max_queue_depth = max_queue_depth
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.max_attempts = max_attempts
+        self.handlers = {}
+        self.failure_callbacks = {}
+        self._queue = None
+        self._queued_ids = set()
+        self._running = {}
+        self._lock = threading.Lock()
+        self._started_pid = None
+        self._stop = threading.Event()
+        self.owner = None
+
+    # ---------- setup ----------
+
+    def register(self, name, handler, on_failure=None):
+        """
+        Register `handler(payload, job_id)` under `name`.
+
+        `on_failure(payload, job_id, error)` runs once when the job is given up
+        on, so the handler can surface the failure on its ai_meta record.
+        """
+        self.handlers[name] = handler
+        if on_failure:
+            self.failure_callbacks[name] = on_failure
+
+    def start(self):
+        """Start workers and the heartbeat (idempotent, restarts after fork)"""
+        with self._lock:
+            if self._started_pid == os.getpid():
+                return
+            self._started_pid = os.getpid()
+            self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+            self._queue = queue.Queue()
+            self._queued_ids = set()
+            self._running = {}
+            self._stop.clear()
+
+        for index in range(self.workers):
+            threading.Thread(target=self._worker_loop, name=f"job-worker-{index}", daemon=True).start()
+        threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True).start()
+        print(f"✅ Job queue started: {self.workers} workers, max depth {self.max_queue_depth}, owner {self.owner}")
+
+    def stop(self):
+        self._stop.set()
+
+    # ---------- submitting ----------
+
+    def depth(self):
+        with self._lock:
+            return len(self._queued_ids)
+
+    def ensure_capacity(self):
+        """Raise QueueFullError if a new job would not be accepted right now"""
+        depth = self.depth()
+        if depth >= self.max_queue_depth:
+            raise QueueFullError(depth, retry_after=self.heartbeat_seconds)
+
+    def new_job(self, handler, payload, max_attempts=None):
+        """
+        Job state to store in `input_json['job']` when the ai_meta record is inserted.
+
+        Use max_attempts=1 for handlers that are not safe to run twice.
+        """
+        if handler not in self.handlers:
+            raise ValueError(f"Unknown job handler: {handler}")
+        return new_job(handler, payload, max_attempts or self.max_attempts)
+
+    def enqueue(self, handler, payload, job_id, max_attempts=None):
+        """
+        Persist a job for `job_id` (an existing ai_meta id) and queue it locally.
+
+        Raises:
+            QueueFullError: the queue is at its depth limit
+        """
+        self.ensure_capacity()
+        job = self.new_job(handler, payload, max_attempts)
+        self.store.create(job_id, job)
+        return self.submit(job_id, job)
+
+    def submit(self, job_id, job):
+        """
+        Queue a job whose state is already persisted (see new_job()).
+
+        Raises:
+            QueueFullError: the queue is at its depth limit, the job is marked failed
+        """
+        self.start()
+        if not self._push(job_id):
+            try:
+                self.store.compare_and_set(job_id, job.get('version', 0), dict(
+                    job, state='failed', last_error='Job queue is full', version=job.get('version', 0) + 1
+                ))
+            except Exception as e:
+                print(f"⚠️ Failed to mark rejected job {job_id}: {e}")
+            raise QueueFullError(self.depth(), retry_after=self.heartbeat_seconds)
+        print(f"📥 Job queued: {job['handler']} ({job_id}), depth {self.depth()}")
+        return job_id
+
+    def recover(self):
+        """Queue jobs that are waiting or whose lease expired (e.g. after a restart)"""
+        try:
+            active = self.store.list_active()
+        except Exception as e:
+            print(f"⚠️ Job recovery skipped: {e}")
+            return 0
+
+        now = time.time()
+        recovered = 0
+        for job_id, job in active:
+            expired = job.get('state') == 'running' and (job.get('lease_expires_at') or 0) < now
+            stalled = job.get('state') == 'queued' and now - (job.get('enqueued_at') or 0) > self.lease_seconds
+            if (expired or stalled) and self._push(job_id):
+                recovered += 1
+        if recovered:
+            print(f"🔄 Recovered {recovered} interrupted job(s)")
+        return recovered
+
+    def stats(self):
+        with self._lock:
+            return {
+                'owner': self.owner,
+                'workers': self.workers,
+                'queued': len(self._queued_ids),
+                'running': len(self._running),
+                'max_queue_depth': self.max_queue_depth
+            }
+
+    def _push(self, job_id, force=False):
+        with self._lock:
+            if self._queue is None or job_id in self._queued_ids or job_id in self._running:
+                return False
+            if not force and len(self._queued_ids) >= self.max_queue_depth:
+                return False
+            self._queued_ids.add(job_id)
+            self._queue.put(job_id)
+            return True
+
+    # ---------- running ----------
+
+    def _claim(self, job_id):
+        """Take the lease on a job; returns the claimed job or None"""
+        job = self.store.get(job_id)
+        if not job or job.get('state') not in ACTIVE_STATES:
+            return None
+        if job.get('state') == 'running' and (job.get('lease_expires_at') or 0) >= time.time():
+            return None  # someone else holds a live lease
+
+        if (job.get('attempts') or 0) >= job.get('max_attempts', self.max_attempts):
+            # Its worker died during the last allowed attempt
+            error = 'Worker stopped during the final attempt'
+            given_up = dict(job, state='failed', last_error=error, lease_owner=None,
+                            lease_expires_at=None, version=job.get('version', 0) + 1)
+            if self.store.compare_and_set(job_id, job.get('version', 0), given_up):
+                print(f"❌ Job {job['handler']} ({job_id}) failed: {error}")
+                self._notify_failure(job_id, job, error)
+            return None
+
+        claimed = dict(job,
+                       state='running',
+                       attempts=(job.get('attempts') or 0) + 1,
+                       lease_owner=self.owner,
+                       lease_expires_at=time.time() + self.lease_seconds,
+                       version=job.get('version', 0) + 1)
+        if not self.store.compare_and_set(job_id, job.get('version', 0), claimed):
+            return None
+        return claimed
+
+    def _finish(self, job_id, job, state, error=None):
+        """Write the final (or retry) state, only if we still own the job"""
+        for _ in range(3):
+            current = self.store.get(job_id)
+            if not current or current.get('lease_owner') != self.owner:
+                return False
+            finished = dict(current, state=state, last_error=error, lease_owner=None,
+                            lease_expires_at=None, version=current.get('version', 0) + 1)
+            if state == 'queued':
+                finished['enqueued_at'] = time.time()
+            if self.store.compare_and_set(job_id, current.get('version', 0), finished):
+                return True
+        return False
+
+    def _worker_loop(self):
+        while not self._stop.is_set():
+            try:
+                job_id = self._queue.get(timeout=1)
+            except queue.Empty:
+                continue
+
+            with self._lock:
+                self._queued_ids.discard(job_id)
+
+            try:
+                job = self._claim(job_id)
+            except Exception as e:
+                print(f"⚠️ Failed to claim job {job_id}: {e}")
+                continue
+            if not job:
+                continue
+
+            with self._lock:
+                self._running[job_id] = job
+            try:
+                self._run(job_id, job)
+            finally:
+                with self._lock:
+                    self._running.pop(job_id, None)
+
+    def _run(self, job_id, job):
+        handler = self.handlers.get(job['handler'])
+        if not handler:
+            print(f"❌ No handler registered for job {job_id}: {job['handler']}")
+            self._finish(job_id, job, 'failed', f"Unknown handler {job['handler']}")
+            return
+
+        print(f"⚙️ Running job {job['handler']} ({job_id}), attempt {job['attempts']}/{job['max_attempts']}")
+        try:
+            handler(job.get('payload') or {}, job_id)
+        except Exception as e:
+            error = str(e)
+            print(f"❌ Job {job['handler']} ({job_id}) failed: {error}")
+            if job['attempts'] < job['max_attempts']:
+                if self._finish(job_id, job, 'queued', error):
+                    delay = min(2 ** job['attempts'], 30)
+                    threading.Timer(delay, self._push, args=(job_id,), kwargs={'force': True}).start()
+            elif self._finish(job_id, job, 'failed', error):
+                self._notify_failure(job_id, job, error)
+            return
+
+        self._finish(job_id, job, 'done')
+
+    def _notify_failure(self, job_id, job, error):
+        callback = self.failure_callbacks.get(job['handler'])
+        if not callback:
+            return
+        try:
+            callback(job.get('payload') or {}, job_id, error)
+        except Exception as e:
+            print(f"⚠️ Failure callback for job {job_id} raised: {e}")
+
+    def _heartbeat_loop(self):
+        last_recovery = 0
+        while not self._stop.wait(0 if not last_recovery else self.heartbeat_seconds):
+            with self._lock:
+                running = list(self._running.items())
+            for job_id, _ in running:
+                try:
+                    self._renew(job_id)
+                except Exception as e:
+                    print(f"⚠️ Failed to renew lease for job {job_id}: {e}")
+
+            if time.time() - last_recovery >= self.lease_seconds:
+                last_recovery = time.time()
+                self.recover()
+
+    def _renew(self, job_id):
+        current = self.store.get(job_id)
+        if not current or current.get('lease_owner') != self.owner:
+            return False
+        renewed = dict(current, lease_expires_at=time.time() + self.lease_seconds,
+                       version=current.get('version', 0) + 1)
+        return self.store.compare_and_set(job_id, current.get('version', 0), renewed)
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Return the process-wide job queue (store picked by JOB_STORE)"""
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                store = InMemoryJobStore() if JOB_STORE == 'memory' else SupabaseJobStore()
+                _job_queue = JobQueue(store)
+    return _job_queue
@@ -0,0 +1,134 @@
+"""
+Incremental JSON Parsing for Streamed Completions
+
+The task generation prompts ask the model for one JSON object such as
+{"strategic_analysis": {...}, "tasks": [{...}, {...}]}. When the completion
+is streamed, StreamingJSONParser is fed the text deltas as they arrive and
+emits events as soon as they are complete:
+- ('item', index, value) for each object in the `array_key` array
+- ('field', key, value) for every other top-level field
+
+Text before the root object (a ```json fence) and after it is ignored. Once
+the stream ends, `text` holds the full response for the usual
+safe_json_parse() fallback.
+
+Usage:
+    parser = StreamingJSONParser('tasks')
+    for delta in deltas:
+        for kind, key, value in parser.feed(delta):
+            ...
+"""
+import json
+
+
+class StreamingJSONParser:
+    """Emits the elements of one array field of a streamed JSON object as they close"""
+
+    def __init__(self, array_key='tasks'):
+        self.array_key = array_key
+        self.text = ''
+        self.items_emitted = 0
+        self.errors = []
+        self._pos = 0
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._done = False
+        self._expect_key = False
+        self._key = None
+        self._value_start = None
+        self._in_array = False
+        self._item_start = None
+
+    @property
+    def done(self):
+        """True once the root object has closed"""
+        return self._done
+
+    def feed(self, chunk):
+        """Consume the next chunk of text and return the events it completed"""
+        events = []
+        if not chunk:
+            return events
+        self.text += chunk
+        text = self.text
+
+        for i in range(self._pos, len(text)):
+            if self._done:
+                break
+            char = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1 and self._expect_key:
+                        self._key = self._decode(text[self._string_start:i + 1])
+                        self._expect_key = False
+                continue
+
+            if not self._stack:
+                # Skip anything (code fences, prose) before the root object
+                if char == '{':
+                    self._stack.append('{')
+                    self._expect_key = True
+                continue
+
+            depth = len(self._stack)
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char in '{[':
+                if depth == 1 and char == '[' and self._key == self.array_key:
+                    self._in_array = True
+                elif depth == 2 and self._in_array and char == '{':
+                    self._item_start = i
+                self._stack.append(char)
+            elif char in '}]':
+                self._stack.pop()
+                if depth == 3 and self._in_array and char == '}' and self._item_start is not None:
+                    self._emit_item(text[self._item_start:i + 1], events)
+                    self._item_start = None
+                elif depth == 2 and self._in_array and char == ']':
+                    self._in_array = False
+                elif depth == 1:
+                    self._end_field(text, i, events)
+                    self._done = True
+            elif depth == 1:
+                if char == ':':
+                    self._value_start = i + 1
+                elif char == ',':
+                    self._end_field(text, i, events)
+                    self._expect_key = True
+
+        self._pos = len(text)
+        return events
+
+    def _end_field(self, text, end, events):
+        if self._value_start is None:
+            return
+        key, raw = self._key, text[self._value_start:end]
+        self._key = None
+        self._value_start = None
+        if key == self.array_key:
+            return
+        value = self._decode(raw)
+        if value is not None:
+            events.append(('field', key, value))
+
+    def _emit_item(self, raw, events):
+        value = self._decode(raw)
+        if value is not None:
+            events.append(('item', self.items_emitted, value))
+            self.items_emitted += 1
+
+    def _decode(self, raw):
+        try:
+            return json.loads(raw)
+        except ValueError as e:
+            self.errors.append(f"{e}: {raw[:80]}")
+            return None
@@ -0,0 +1,461 @@
+"""
+Keyword Matching Engine
+
+Compiled keyword matching for the employee fit scoring functions.
+
+All keyword taxonomies used by the scorers are compiled once, at import, into
+a single regular expression. A task description is analyzed once per request:
+1. It is lowercased and scanned with the combined pattern in one pass, giving
+   the set of taxonomy keywords it contains
+2. Dynamic terms (employee roles, role words, skills) are checked against the
+   task text through a memo, so a role shared by many employees costs one scan
+3. Per-employee features are collected into a NumPy matrix and every score is
+   computed for all employees at once
+
+Matching keeps the semantics of the original `keyword in text` checks: the
+pattern is a lookahead, so overlapping and nested keywords are all found.
+"""
+import re
+from functools import lru_cache
+
+import numpy as np
+
+
+# ========== KEYWORD TAXONOMIES ==========
+
+# calculate_department_alignment_score: department name fragment -> task keywords
+DEPARTMENT_ALIGNMENT_KEYWORDS = {
+    "supply chain": ["logistics", "shipment", "inventory", "customs", "supplier", "stock", "delivery"],
+    "sales": ["client", "deal", "agreement", "invoice", "customer", "sales", "revenue"],
+    "product": ["product", "quality", "specification", "technical", "testing", "validation"],
+    "finance": ["payment", "bank", "tax", "financial", "currency", "accounting", "budget"],
+    "operations": ["coordinate", "arrange", "manage", "dispatch", "clearance", "transport"]
+}
+
+# create_basic_recommendation: department name fragment -> task keywords
+BASIC_DEPARTMENT_KEYWORDS = {
+    'supply chain': ['logistics', 'shipment', 'inventory', 'customs'],
+    'sales': ['client', 'deal', 'agreement', 'invoice'],
+    'product': ['product', 'quality', 'specification'],
+    'finance': ['payment', 'bank', 'tax', 'financial']
+}
+
+# department_based_analysis: exact department name -> task keywords
+DEPARTMENT_ANALYSIS_KEYWORDS = {
+    "SUPPLY CHAIN DEPARTMENT": [
+        "logistics", "shipment", "inventory", "customs", "border", "transport",
+        "supplier", "stock", "delivery", "clearance", "dispatch", "shipping"
+    ],
+    "SALES DEPARTMENT": [
+        "client", "deal", "agreement", "invoice", "customer", "sales",
+        "commercial", "revenue", "proposal", "negotiation"
+    ],
+    "PRODUCT DEVELOPMENT DEPARTMENT": [
+        "product", "quality", "specification", "technical", "testing",
+        "validation", "development", "design", "engineering"
+    ],
+    "FINANCE & ADMIN DEPARTMENT": [
+        "payment", "bank", "tax", "financial", "currency", "accounting",
+        "budget", "compliance", "documentation", "admin", "administrative"
+    ]
+}
+
+# calculate_skills_matching_score: common task-related skills (partial skill matches)
+TASK_SKILL_KEYWORDS = [
+    "management", "coordination", "analysis", "planning", "communication",
+    "negotiation", "documentation", "processing", "validation", "testing",
+    "logistics", "finance", "sales", "product", "quality", "technical"
+]
+
+# calculate_jd_analysis_score: action keywords looked up in both task and JD
+JD_TASK_KEYWORDS = [
+    "manage", "coordinate", "lead", "process", "arrange", "finalize",
+    "handle", "execute", "implement", "oversee", "supervise", "analyze",
+    "develop", "create", "build", "design", "plan", "organize"
+]
+
+
+# ========== MATCHER ==========
+
+class KeywordMatcher:
+    """Multi-keyword substring matcher compiled into one regular expression"""
+
+    def __init__(self, keywords):
+        self.keywords = tuple(dict.fromkeys(kw.lower() for kw in keywords if kw))
+        # Longest alternative first: at each position the regex reports the
+        # longest keyword that starts there, every shorter keyword starting at
+        # the same position is a prefix of it
+        ordered = sorted(self.keywords, key=len, reverse=True)
+        self._pattern = re.compile("(?=(" + "|".join(re.escape(kw) for kw in ordered) + "))")
+        self._prefixes = {
+            kw: frozenset(other for other in self.keywords if kw.startswith(other))
+            for kw in self.keywords
+        }
+
+    def find(self, text_lower):
+        """Return the set of keywords contained in already-lowercased text"""
+        found = set()
+        if not text_lower:
+            return found
+        for match in self._pattern.finditer(text_lower):
+            longest = match.group(1)
+            if longest not in found:
+                found.update(self._prefixes[longest])
+        return found
+
+    def count(self, text_lower, keywords):
+        """Number of `keywords` contained in the text"""
+        found = self.find(text_lower)
+        return sum(1 for kw in keywords if kw in found)
+
+
+def _taxonomy_keywords():
+    keywords = list(TASK_SKILL_KEYWORDS) + list(JD_TASK_KEYWORDS)
+    for taxonomy in (DEPARTMENT_ALIGNMENT_KEYWORDS, BASIC_DEPARTMENT_KEYWORDS, DEPARTMENT_ANALYSIS_KEYWORDS):
+        for group in taxonomy.values():
+            keywords.extend(group)
+    return keywords
+
+
+TAXONOMY_MATCHER = KeywordMatcher(_taxonomy_keywords())
+TASK_SKILL_MATCHER = KeywordMatcher(TASK_SKILL_KEYWORDS)
+
+
+# ========== TASK TEXT ==========
+
+class TaskText:
+    """A task description analyzed once: lowercased text plus matched keywords"""
+
+    __slots__ = ('text', 'lower', 'keywords', '_contains')
+
+    def __init__(self, text):
+        self.text = text or ''
+        self.lower = self.text.lower()
+        self.keywords = TAXONOMY_MATCHER.find(self.lower)
+        self._contains = {}
+
+    def contains(self, term):
+        """Memoized `term in task_lower` for dynamic terms (roles, skills)"""
+        result = self._contains.get(term)
+        if result is None:
+            result = term in self.lower
+            self._contains[term] = result
+        return result
+
+    def count_keywords(self, keywords):
+        """Number of taxonomy `keywords` present in the task"""
+        return sum(1 for kw in keywords if kw in self.keywords)
+
+    def count_words(self, text_lower, min_length):
+        """Number of whitespace-separated words of `text_lower` longer than `min_length` found in the task"""
+        return sum(1 for word in text_lower.split() if len(word) > min_length and self.contains(word))
+
+
+@lru_cache(maxsize=256)
+def get_task_text(task_description):
+    """Return the analyzed TaskText for a task description (cached per text)"""
+    return TaskText(task_description)
+
+
+def as_task_text(task):
+    """Accept either a TaskText or a raw/lowercased task string"""
+    if isinstance(task, TaskText):
+        return task
+    return get_task_text(task or '')
+
+
+@lru_cache(maxsize=512)
+def get_jd_keywords(jd_text):
+    """Taxonomy keywords contained in a JD text (cached per text)"""
+    return TAXONOMY_MATCHER.find((jd_text or '').lower())
+
+
+@lru_cache(maxsize=4096)
+def skill_has_task_skill(skill_lower):
+    """True if a (lowercased) employee skill contains one of the common task skills"""
+    return bool(TASK_SKILL_MATCHER.find(skill_lower))
+
+
+@lru_cache(maxsize=512)
+def jd_keyword_vector(jd_text):
+    """Read-only boolean vector: which JD_TASK_KEYWORDS a JD text contains (cached per text)"""
+    jd_keywords = get_jd_keywords(jd_text or '')
+    vector = np.array([kw in jd_keywords for kw in JD_TASK_KEYWORDS], dtype=bool)
+    vector.setflags(write=False)
+    return vector
+
+
+def task_jd_mask(task):
+    """Boolean vector: which JD_TASK_KEYWORDS the task contains"""
+    task = as_task_text(task)
+    return np.array([kw in task.keywords for kw in JD_TASK_KEYWORDS], dtype=bool)
+
+
+def _department_group(dept_lower, taxonomy):
+    """First taxonomy group whose name is contained in the department (dict order)"""
+    for dept in taxonomy:
+        if dept in dept_lower:
+            return dept
+    return None
+
+
+# ========== SCALAR SCORES ==========
+
+def role_alignment_score(task, employee_role):
+    """Role alignment score (0-40 points)"""
+    if not employee_role:
+        return 0
+    task = as_task_text(task)
+    employee_role_lower = employee_role.lower()
+    if task.contains(employee_role_lower):
+        return 40
+    keyword_matches = task.count_words(employee_role_lower, 3)
+    if keyword_matches >= 2:
+        return 30
+    elif keyword_matches >= 1:
+        return 20
+    return 10
+
+
+def department_alignment_score(task, employee_department):
+    """Department alignment score (0-20 points)"""
+    if not employee_department:
+        return 0
+    task = as_task_text(task)
+    dept = _department_group(employee_department.lower(), DEPARTMENT_ALIGNMENT_KEYWORDS)
+    if dept is None:
+        return 5
+    return min(task.count_keywords(DEPARTMENT_ALIGNMENT_KEYWORDS[dept]) * 5, 20)
+
+
+def _skill_points(task, employee_skills):
+    points = 0
+    for skill in employee_skills[:10]:
+        skill_lower = str(skill).lower()
+        if task.contains(skill_lower):
+            points += 2
+        elif skill_has_task_skill(skill_lower):
+            points += 1
+    return points
+
+
+def skills_matching_score(task, employee_skills):
+    """Skills matching score (0-20 points)"""
+    if not employee_skills or not isinstance(employee_skills, list):
+        return 0
+    return min(_skill_points(as_task_text(task), employee_skills) * 4, 20)
+
+
+def jd_analysis_score(task, jd_text):
+    """JD content analysis score (0-15 points)"""
+    if not jd_text:
+        return 0
+    task = as_task_text(task)
+    jd_keywords = get_jd_keywords(jd_text)
+    matching_keywords = sum(1 for kw in JD_TASK_KEYWORDS if kw in task.keywords and kw in jd_keywords)
+    return min(matching_keywords * 3, 15)
+
+
+# ========== VECTORIZED SCORES ==========
+
+def _experience(employee):
+    return employee.get('experience_years') or 0
+
+
+def to_score(value):
+    """Convert a NumPy score to a JSON-friendly int (or float for fractional experience)"""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def _per_value(task, feature):
+    """
+    Memoize `feature(task, value)` per distinct value.
+
+    Employees share a handful of roles, departments and skill sets, so each
+    distinct value is analyzed once per task instead of once per employee.
+    """
+    cache = {}
+
+    def lookup(value):
+        try:
+            return cache[value]
+        except KeyError:
+            result = cache[value] = feature(task, value)
+            return result
+
+    return lookup
+
+
+def _role_state(task, role):
+    """0 no role, 1 role only, 2/3 one/two+ role words in task, 4 exact role in task"""
+    if not role:
+        return 0
+    role_lower = role.lower()
+    if task.contains(role_lower):
+        return 4
+    return 1 + min(task.count_words(role_lower, 3), 2)
+
+
+def _department_points(task, department):
+    if not department:
+        return 0
+    dept = _department_group(department.lower(), DEPARTMENT_ALIGNMENT_KEYWORDS)
+    if dept is None:
+        return 5
+    return min(task.count_keywords(DEPARTMENT_ALIGNMENT_KEYWORDS[dept]) * 5, 20)
+
+
+def _skills_points(task, skills):
+    return min(_skill_points(task, skills), 5) * 4 if skills else 0
+
+
+def _jd_points(task, jd_text):
+    if not jd_text:
+        return 0
+    jd_keywords = get_jd_keywords(jd_text)
+    return min(sum(1 for kw in JD_TASK_KEYWORDS if kw in task.keywords and kw in jd_keywords) * 3, 15)
+
+
+def _analysis_department_points(task, department):
+    keywords = DEPARTMENT_ANALYSIS_KEYWORDS.get(department)
+    return min(task.count_keywords(keywords) * 15, 60) if keywords else 0
+
+
+def _analysis_role_points(task, role):
+    return min(task.count_words(role.lower(), 4) * 10, 30) if role else 0
+
+
+def _top_skill_hits(task, skills):
+    return sum(1 for skill in skills if task.contains(str(skill).lower()))
+
+
+def _skills_key(skills, limit):
+    if not skills or not isinstance(skills, list):
+        return ()
+    return tuple(str(skill) for skill in skills[:limit])
+
+
+ROLE_STATE_POINTS = np.array([0, 10, 20, 30, 40], dtype=np.float64)
+
+
+def advanced_fit_scores(task, employees, jd_texts=None, features=None):
+    """
+    calculate_advanced_fit_score for every employee at once.
+
+    Args:
+        task: Task description (str) or TaskText
+        employees: List of employee dicts (role, department, skills, experience_years)
+        jd_texts: Optional list of JD texts aligned with `employees`
+        features: Optional EmployeeFeatures aligned with `employees` (employee_features);
+            when given, roles, skills and JD vectors are read from it and `jd_texts` is ignored
+
+    Returns:
+        np.ndarray of scores (0-100), one per employee
+    """
+    task = as_task_text(task)
+    role_state = _per_value(task, _role_state)
+    department_points = _per_value(task, _department_points)
+    skills_points = _per_value(task, _skills_points)
+
+    if features is not None:
+        # role_state, department points, skills points, experience
+        matrix = np.array([
+            (role_state(feature.role), department_points(feature.department),
+             skills_points(feature.skills_key), feature.experience)
+            for feature in features
+        ], dtype=np.float64).reshape(-1, 4)
+        jd_matrix = (np.vstack([feature.jd_vector for feature in features]) if features
+                     else np.zeros((0, len(JD_TASK_KEYWORDS)), dtype=bool))
+        jd_points = np.minimum((jd_matrix & task_jd_mask(task)).sum(axis=1) * 3, 15)
+        role_points = ROLE_STATE_POINTS[matrix[:, 0].astype(np.int64)]
+        exp_points = np.minimum(matrix[:, 3], 5)
+        return np.minimum(role_points + matrix[:, 1] + matrix[:, 2] + jd_points + exp_points, 100)
+
+    jd_points = _per_value(task, _jd_points)
+    jd_texts = jd_texts or [None] * len(employees)
+
+    # Feature matrix, one row per employee:
+    # role_state, department points, skills points, JD points, experience
+    features = np.array([
+        (
+            role_state(employee.get('role') or ''),
+            department_points(employee.get('department') or ''),
+            skills_points(_skills_key(employee.get('skills'), 10)),
+            jd_points(jd_text or ''),
+            _experience(employee)
+        )
+        for employee, jd_text in zip(employees, jd_texts)
+    ], dtype=np.float64).reshape(-1, 5)
+
+    role_points = ROLE_STATE_POINTS[features[:, 0].astype(np.int64)]
+    exp_points = np.minimum(features[:, 4], 5)
+    return np.minimum(role_points + features[:, 1] + features[:, 2] + features[:, 3] + exp_points, 100)
+
+
+def department_analysis_scores(task, employees, features=None):
+    """
+    department_based_analysis scoring for every employee at once.
+
+    Returns:
+        (scores, has_department): np.ndarray of scores and a boolean mask of
+        employees that have a department (the others are not scored)
+    """
+    task = as_task_text(task)
+    department_points = _per_value(task, _analysis_department_points)
+    role_points = _per_value(task, _analysis_role_points)
+
+    if features is not None:
+        rows = [(feature.department_key, feature.role, feature.experience) for feature in features]
+    else:
+        rows = [((employee.get('department') or '').upper().strip(), employee.get('role') or '', _experience(employee))
+                for employee in employees]
+    # department points, role points, experience
+    matrix = np.array([
+        (department_points(department), role_points(role), experience) if department else (0, 0, 0)
+        for department, role, experience in rows
+    ], dtype=np.float64).reshape(-1, 3)
+    has_department = np.array([bool(department) for department, _, _ in rows], dtype=bool)
+
+    scores = matrix[:, 0] + matrix[:, 1] + np.minimum(matrix[:, 2] * 2, 10)
+    return scores, has_department
+
+
+def ultra_fast_scores(task, employees, features=None):
+    """ultra_fast_employee_recommendations scoring for every employee at once"""
+    task = as_task_text(task)
+    role_match = _per_value(task, lambda task, role: task.contains(role))
+
+    if features is not None:
+        skill_hits = _per_value(task, lambda task, skills: sum(1 for skill in skills if task.contains(skill)))
+        rows = [(feature.role_lower, feature.skills_lower[:3], feature.experience) for feature in features]
+    else:
+        skill_hits = _per_value(task, _top_skill_hits)
+        rows = [((employee.get('role') or '').lower(), tuple(employee.get('skills') or [])[:3], _experience(employee))
+                for employee in employees]
+    # role in task, top-3 skills in task, experience
+    matrix = np.array([
+        (role_match(role), skill_hits(skills), experience)
+        for role, skills, experience in rows
+    ], dtype=np.float64).reshape(-1, 3)
+
+    experience = matrix[:, 2]
+    exp_points = np.where(experience >= 3, 15, np.where(experience >= 1, 10, 0))
+    return np.minimum(matrix[:, 0] * 40 + np.minimum(matrix[:, 1] * 10, 30) + exp_points, 100)
+
+
+def basic_recommendation_score(task, employee):
+    """create_basic_recommendation score for one employee"""
+    task = as_task_text(task)
+    employee_role = (employee.get('role') or '').lower()
+    employee_department = (employee.get('department') or '').lower()
+
+    score = 50
+    if employee_role and task.count_words(employee_role, 3):
+        score += 20
+
+    dept = _department_group(employee_department, BASIC_DEPARTMENT_KEYWORDS)
+    if dept is not None and task.count_keywords(BASIC_DEPARTMENT_KEYWORDS[dept]):
+        score += 15
+
+    return min(score, 100)
@@ -0,0 +1,331 @@
+"""
+LLM Gateway
+
+Single entry point for OpenAI chat completions. Every call site goes through
+`get_llm_gateway().create(lane, **completion_kwargs)` instead of calling the
+client directly, so that load is shaped in one place:
+1. Token buckets - requests-per-minute and tokens-per-minute budgets. A call
+   reserves 1 request and its estimated tokens (prompt + max_tokens) before
+   it is sent; the reservation is corrected with the real usage afterwards
+2. Priority lanes - while an interactive call (goal classification) is
+   waiting for budget, batch calls (recommendation jobs) do not take any
+3. Retries - 429, 5xx, timeouts and connection errors are retried with
+   full-jitter exponential backoff (honouring Retry-After); other errors
+   (bad request, auth) are raised at once
+4. Circuit breaker - after LLM_BREAKER_FAILURES consecutive retryable
+   failures calls fail fast with CircuitOpenError for LLM_BREAKER_COOLDOWN_SECONDS,
+   then one probe call is let through. Callers treat it like any other
+   OpenAI error and drop to their deterministic fallbacks
+5. Model routing - calls that pass `site=` instead of `model=` get their
+   model from the model router (model_router.py), chosen again on every
+   retry; each attempt's latency and outcome is fed back to the router
+
+Budgets are per process: with several gunicorn workers, set LLM_RPM_LIMIT /
+LLM_TPM_LIMIT to the account limits divided by the worker count.
+"""
+import os
+import time
+import random
+import threading
+
+from prompt_budget import estimate_tokens
+from model_router import get_model_router
+
+LLM_RPM_LIMIT = int(os.getenv('LLM_RPM_LIMIT', '500'))
+LLM_TPM_LIMIT = int(os.getenv('LLM_TPM_LIMIT', '80000'))
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '3'))
+LLM_RETRY_BASE_SECONDS = float(os.getenv('LLM_RETRY_BASE_SECONDS', '1'))
+LLM_RETRY_MAX_SECONDS = float(os.getenv('LLM_RETRY_MAX_SECONDS', '20'))
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv('LLM_QUEUE_TIMEOUT_SECONDS', '30'))
+LLM_BREAKER_FAILURES = int(os.getenv('LLM_BREAKER_FAILURES', '5'))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv('LLM_BREAKER_COOLDOWN_SECONDS', '30'))
+
+# Priority lanes, highest first
+LANE_INTERACTIVE = 'interactive'
+LANE_BATCH = 'batch'
+LANES = (LANE_INTERACTIVE, LANE_BATCH)
+
+
+class LLMUnavailableError(Exception):
+    """The gateway refused the call without sending it"""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        super().__init__(f"OpenAI circuit open, retry in {retry_after:.0f}s")
+
+
+class CapacityTimeoutError(LLMUnavailableError):
+    def __init__(self, lane, waited):
+        super().__init__(f"No OpenAI rate budget for {lane} call after {waited:.1f}s")
+
+
+def estimate_call_tokens(messages, max_tokens):
+    """Token reservation for a call: estimated prompt tokens plus the completion budget"""
+    return sum(estimate_tokens(str(message.get('content') or '')) + 4 for message in messages or []) + (max_tokens or 0)
+
+
+def is_retryable(error):
+    """429, 5xx, timeouts and dropped connections are worth retrying"""
+    status = getattr(error, 'status_code', None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return type(error).__name__ in ('APITimeoutError', 'APIConnectionError', 'Timeout', 'ConnectionError')
+
+
+def retry_after_seconds(error):
+    response = getattr(error, 'response', None)
+    try:
+        return float(response.headers.get('retry-after'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Refills `capacity` units per minute; the level may go negative when usage is corrected upwards"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount):
+        """Seconds until `amount` can be taken (0 if it can be taken now)"""
+        self._refill()
+        # A single call bigger than the bucket only has to wait for a full bucket
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount):
+        self._refill()
+        self.level -= amount
+
+    def give(self, amount):
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+
+class CircuitBreaker:
+    """closed -> open after N consecutive failures -> half-open probe after the cooldown"""
+
+    def __init__(self, failure_threshold=LLM_BREAKER_FAILURES, cooldown_seconds=LLM_BREAKER_COOLDOWN_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at < self.cooldown_seconds:
+            return 'open'
+        return 'half_open'
+
+    def retry_after(self):
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.cooldown_seconds - (time.monotonic() - self.opened_at))
+
+    def allow(self):
+        """
+        Whether a call may be sent now (in half-open state only one probe at a time).
+
+        Returns 'closed' or 'half_open' (this call holds the probe) when allowed, None otherwise.
+        """
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return state
+            if state == 'half_open' and not self.probing:
+                self.probing = True
+                return state
+            return None
+
+    def release_probe(self):
+        """Give back a half-open probe slot that was never used for a call"""
+        with self._lock:
+            self.probing = False
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                print("✅ OpenAI circuit closed")
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.failure_threshold:
+                if self.opened_at is None or self.probing:
+                    print(f"🔌 OpenAI circuit opened after {self.failures} failures, "
+                          f"failing fast for {self.cooldown_seconds:.0f}s")
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+
+class LLMGateway:
+    """Rate-limited, prioritized, retrying front for `client.chat.completions.create`"""
+
+    def __init__(self, client, rpm=LLM_RPM_LIMIT, tpm=LLM_TPM_LIMIT, max_retries=LLM_MAX_RETRIES,
+                 queue_timeout=LLM_QUEUE_TIMEOUT_SECONDS, breaker=None, router=None):
+        self.client = client
+        self.router = router or get_model_router()
+        self.max_retries = max_retries
+        self.queue_timeout = queue_timeout
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.breaker = breaker or CircuitBreaker()
+        self._cond = threading.Condition()
+        self._waiting = {lane: 0 for lane in LANES}
+        self._counters = {'calls': 0, 'retries': 0, 'failures': 0, 'rejected': 0, 'tokens_used': 0}
+
+    def available(self):
+        """False while the circuit is open - callers can go straight to their fallback"""
+        return self.client is not None and self.breaker.state != 'open'
+
+    def create(self, lane=LANE_INTERACTIVE, site=None, **kwargs):
+        """
+        Send a chat completion (same kwargs as client.chat.completions.create).
+        
+        With `site` (a model_router.ROUTING_POLICIES key) and no `model`, the
+        model is picked by the router. The response's `model` tells which one served it.
+
+        Raises:
+            CircuitOpenError: OpenAI is degraded, use the fallback
+            CapacityTimeoutError: no rate budget within the queue timeout
+            openai errors: non-retryable errors, or retries exhausted
+        """
+        if self.client is None:
+            raise LLMUnavailableError("OpenAI client not configured")
+
+        reserved = estimate_call_tokens(kwargs.get('messages'), kwargs.get('max_tokens'))
+        routed = site is not None and 'model' not in kwargs
+        attempt = 0
+        while True:
+            admitted = self.breaker.allow()
+            if not admitted:
+                self._count('rejected')
+                raise CircuitOpenError(self.breaker.retry_after())
+            probe = admitted == 'half_open'
+            try:
+                self._reserve(lane, reserved)
+                if routed:
+                    kwargs['model'] = self.router.choose(site, reserved - (kwargs.get('max_tokens') or 0),
+                                                         kwargs.get('max_tokens'))
+            except Exception:
+                # Nothing reached OpenAI: let the next call probe instead
+                if probe:
+                    self.breaker.release_probe()
+                raise
+            self._count('calls')
+            started = time.monotonic()
+            try:
+                response = self.client.chat.completions.create(**kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    # Our request was wrong: says nothing about OpenAI's health, so the
+                    # failure count is left alone and only a held probe is handed back
+                    if probe:
+                        self.breaker.release_probe()
+                    raise
+                self.router.observe(kwargs.get('model'), time.monotonic() - started, ok=False)
+                self.breaker.record_failure()
+                self._count('failures')
+                if attempt >= self.max_retries or self.breaker.state == 'open':
+                    raise
+                delay = retry_after_seconds(e) or random.uniform(
+                    0, min(LLM_RETRY_MAX_SECONDS, LLM_RETRY_BASE_SECONDS * 2 ** attempt))
+                attempt += 1
+                self._count('retries')
+                print(f"⚠️ OpenAI {lane} call failed ({e.__class__.__name__}), retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            # Streams are observed at time to first byte
+            self.router.observe(kwargs.get('model'), time.monotonic() - started, ok=True)
+            self.breaker.record_success()
+            self._settle(reserved, response)
+            return response
+
+    def _reserve(self, lane, amount):
+        """Block until the lane may take 1 request and `amount` tokens"""
+        higher_lanes = LANES[:LANES.index(lane)]
+        started = time.monotonic()
+        with self._cond:
+            self._waiting[lane] += 1
+            try:
+                while True:
+                    if any(self._waiting[other] for other in higher_lanes):
+                        wait = 0.1
+                    else:
+                        wait = max(self.requests.wait_time(1), self.tokens.wait_time(amount))
+                        if wait == 0:
+                            self.requests.take(1)
+                            self.tokens.take(amount)
+                            return
+                    waited = time.monotonic() - started
+                    if waited >= self.queue_timeout:
+                        self._count('rejected')
+                        raise CapacityTimeoutError(lane, waited)
+                    self._cond.wait(min(wait, self.queue_timeout - waited))
+            finally:
+                self._waiting[lane] -= 1
+                self._cond.notify_all()
+
+    def _settle(self, reserved, response):
+        """Replace the token reservation with the real usage when the response reports it"""
+        usage = getattr(response, 'usage', None)
+        used = getattr(usage, 'total_tokens', None)
+        if used is None:
+            return
+        self._count('tokens_used', used)
+        with self._cond:
+            if used < reserved:
+                self.tokens.give(reserved - used)
+            else:
+                self.tokens.take(used - reserved)
+            self._cond.notify_all()
+
+    def _count(self, name, amount=1):
+        with self._cond:
+            self._counters[name] += amount
+
+    def stats(self):
+        with self._cond:
+            return {
+                'configured': self.client is not None,
+                'circuit': self.breaker.state,
+                'waiting': dict(self._waiting),
+                'requests_available': round(max(self.requests.level, 0), 1),
+                'tokens_available': round(max(self.tokens.level, 0)),
+                **self._counters,
+                'routing': self.router.stats()
+            }
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway(client=None):
+    """Return the process-wide gateway; the first caller supplies the OpenAI client"""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway(client)
+    return _gateway
@@ -0,0 +1,31 @@
+-- Batch write of action_plans.strategic_metadata used by the recommendation
+-- jobs (merge_strategic_metadata in task_routes.py).
+-- The given keys are merged into the task's current strategic_metadata in the
+-- same statement, so keys written while a job was running (an applied
+-- recommendation, a changed recommended_role) and the other columns
+-- (assignment, status, progress, due dates) are left alone. Without this
+-- function the backend re-reads and updates the tasks one by one.
+
+-- p_rows: [{"id": "<task id>", "strategic_metadata": {...keys to set}}, ...]; returns the number of tasks updated
+create or replace function public.merge_strategic_metadata(p_rows jsonb)
+returns integer
+language sql
+as $$
+    with updated as (
+        update public.action_plans as tasks
+        set strategic_metadata = (
+            case jsonb_typeof(tasks.strategic_metadata)
+                when 'object' then tasks.strategic_metadata
+                -- Older rows hold the metadata as a JSON text string
+                when 'string' then coalesce(nullif(tasks.strategic_metadata #>> '{}', '')::jsonb, '{}'::jsonb)
+                else '{}'::jsonb
+            end
+        ) || rows.strategic_metadata
+        from jsonb_to_recordset(p_rows) as rows(id uuid, strategic_metadata jsonb)
+        where tasks.id = rows.id
+        returning tasks.id
+    )
+    select count(*)::integer from updated;
+$$;
+
+drop function if exists public.set_strategic_metadata(jsonb);
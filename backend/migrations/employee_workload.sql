@@ -0,0 +1,23 @@
+-- Per-employee workload aggregate maintained by employee_workload.py
+-- (open tasks, remaining estimated hours, overdue tasks). Rows are rebuilt by
+-- the backend on every task write that touches the employee and reconciled
+-- periodically from action_plans.
+
+create table if not exists public.employee_workload (
+    employee_id uuid primary key references public.employees(id) on delete cascade,
+    open_tasks integer not null default 0,
+    remaining_hours numeric(10, 2) not null default 0,
+    overdue_tasks integer not null default 0,
+    -- due dates ('YYYY-MM-DD') of the open tasks, so overdue can be recounted on read
+    open_due_dates jsonb not null default '[]'::jsonb,
+    updated_at timestamptz not null default now()
+);
+
+create index if not exists employee_workload_remaining_hours_idx
+    on public.employee_workload (remaining_hours);
+
+-- Open tasks per assignee, used when an employee's row is rebuilt
+create index if not exists action_plans_assigned_to_open_idx
+    on public.action_plans (assigned_to) where status <> 'completed';
+create index if not exists action_plans_assigned_to_multiple_idx
+    on public.action_plans using gin (assigned_to_multiple);
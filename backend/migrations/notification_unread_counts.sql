@@ -0,0 +1,81 @@
+-- Per-employee unread notification counters maintained by notification_counters.py.
+-- The backend adjusts them on every notification insert, read and delete
+-- (adjust_notification_unread) and periodically rebuilds them from the
+-- notifications table (reconcile_notification_unread). The row with
+-- employee_id '*' holds the total over all employees (admin feed badge).
+
+create table if not exists public.notification_unread_counts (
+    employee_id text primary key,
+    unread_count integer not null default 0 check (unread_count >= 0),
+    updated_at timestamptz not null default now()
+);
+
+-- Unread notifications per recipient, used by reconciliation and the count fallback
+create index if not exists notifications_unread_to_employee_idx
+    on public.notifications (to_employee) where is_read = false;
+
+-- Apply {employee_id: delta} in one call; counters never go below zero
+create or replace function public.adjust_notification_unread(p_deltas jsonb)
+returns void
+language plpgsql
+as $$
+declare
+    entry record;
+    total integer := 0;
+begin
+    for entry in select key, value::integer as delta from jsonb_each_text(p_deltas) loop
+        insert into public.notification_unread_counts as counts (employee_id, unread_count, updated_at)
+        values (entry.key, greatest(entry.delta, 0), now())
+        on conflict (employee_id) do update
+            set unread_count = greatest(counts.unread_count + entry.delta, 0),
+                updated_at = now();
+        total := total + entry.delta;
+    end loop;
+
+    insert into public.notification_unread_counts as counts (employee_id, unread_count, updated_at)
+    values ('*', greatest(total, 0), now())
+    on conflict (employee_id) do update
+        set unread_count = greatest(counts.unread_count + total, 0),
+            updated_at = now();
+end;
+$$;
+
+-- Rebuild every counter from the notifications table; returns the total
+create or replace function public.reconcile_notification_unread()
+returns integer
+language plpgsql
+as $$
+declare
+    total integer;
+begin
+    insert into public.notification_unread_counts as counts (employee_id, unread_count, updated_at)
+    select to_employee::text, count(*)::integer, now()
+    from public.notifications
+    where is_read = false and to_employee is not null
+    group by to_employee
+    on conflict (employee_id) do update
+        set unread_count = excluded.unread_count,
+            updated_at = now();
+
+    update public.notification_unread_counts
+    set unread_count = 0, updated_at = now()
+    where employee_id <> '*'
+      and unread_count <> 0
+      and employee_id not in (
+          select to_employee::text from public.notifications
+          where is_read = false and to_employee is not null
+      );
+
+    select coalesce(sum(unread_count), 0)::integer into total
+    from public.notification_unread_counts
+    where employee_id <> '*';
+
+    insert into public.notification_unread_counts as counts (employee_id, unread_count, updated_at)
+    values ('*', total, now())
+    on conflict (employee_id) do update
+        set unread_count = excluded.unread_count,
+            updated_at = now();
+
+    return total;
+end;
+$$;
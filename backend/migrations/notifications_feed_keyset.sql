@@ -0,0 +1,9 @@
+-- Keyset index for the notifications feed (GET /api/notifications with
+-- since/before cursors): newest first per recipient, ties broken by id.
+
+create index if not exists notifications_to_employee_created_at_id_idx
+    on public.notifications (to_employee, created_at desc, id desc);
+
+-- Admin feed without an employee record pages over all notifications
+create index if not exists notifications_created_at_id_idx
+    on public.notifications (created_at desc, id desc);
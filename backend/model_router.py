@@ -0,0 +1,166 @@
+"""
+Model Router
+
+Picks the OpenAI model for each AI call site instead of hard-coding one
+model everywhere. Call sites name themselves (`llm.create(lane, site='jd_scoring', ...)`)
+and the gateway asks the router for a model:
+1. ROUTING_POLICIES lists, per call site, the model tiers in preference
+   order and the latency the site is willing to wait for
+2. Tiers whose context window can't hold the prompt + completion are skipped
+3. Small calls (prompt + completion budget <= MODEL_ROUTER_SMALL_CALL_TOKENS,
+   e.g. one JD scoring prompt) go to the fast tier first
+4. Tiers whose model recently errors or answers slower than the site's
+   latency target (EWMA over observed calls) are skipped; an unhealthy model
+   gets a probe call again after MODEL_ROUTER_RECOVERY_SECONDS
+
+Tier -> model names come from the environment, so routing can be pointed at
+other models (or at the fake OpenAI server) without code changes.
+"""
+import os
+import time
+import threading
+
+MODEL_TIERS = {
+    'fast': os.getenv('MODEL_TIER_FAST', 'gpt-4o-mini'),
+    'standard': os.getenv('MODEL_TIER_STANDARD', 'gpt-3.5-turbo'),
+}
+
+# Prompt + completion tokens each tier's model can take
+MODEL_TIER_CONTEXT = {
+    'fast': int(os.getenv('MODEL_TIER_FAST_CONTEXT', '128000')),
+    'standard': int(os.getenv('MODEL_TIER_STANDARD_CONTEXT', '16000')),
+}
+
+MODEL_ROUTER_SMALL_CALL_TOKENS = int(os.getenv('MODEL_ROUTER_SMALL_CALL_TOKENS', '1500'))
+MODEL_ROUTER_MAX_ERROR_RATE = float(os.getenv('MODEL_ROUTER_MAX_ERROR_RATE', '0.3'))
+MODEL_ROUTER_MIN_SAMPLES = int(os.getenv('MODEL_ROUTER_MIN_SAMPLES', '5'))
+MODEL_ROUTER_RECOVERY_SECONDS = float(os.getenv('MODEL_ROUTER_RECOVERY_SECONDS', '60'))
+MODEL_ROUTER_EWMA_ALPHA = float(os.getenv('MODEL_ROUTER_EWMA_ALPHA', '0.2'))
+
+# Call site -> tiers in preference order and the latency (seconds) the site is willing to wait
+ROUTING_POLICIES = {
+    # One short prompt per employee - always worth the fastest model
+    'jd_scoring': {'tiers': ('fast', 'standard'), 'latency_slo': 5},
+    # Short-prompt recommendations (hedged, interactive)
+    'recommendation_short': {'tiers': ('fast', 'standard'), 'latency_slo': 3},
+    # Budgeted recommendation prompt with employee profiles
+    'employee_recommendations': {'tiers': ('standard', 'fast'), 'latency_slo': 20},
+    # Streamed task generation
+    'custom_tasks': {'tiers': ('standard', 'fast'), 'latency_slo': 30},
+    'delivery_tasks': {'tiers': ('standard', 'fast'), 'latency_slo': 30},
+    # Follow-up prompt for missing or invalid tasks
+    'task_repair': {'tiers': ('fast', 'standard'), 'latency_slo': 10},
+}
+DEFAULT_POLICY = {'tiers': ('standard', 'fast'), 'latency_slo': 30}
+
+
+class ModelStats:
+    """EWMA latency and error rate of one model"""
+
+    def __init__(self):
+        self.samples = 0
+        self.latency = 0.0
+        self.error_rate = 0.0
+        self.last_observed = 0.0
+
+    def observe(self, latency, ok, alpha=MODEL_ROUTER_EWMA_ALPHA):
+        if self.samples == 0:
+            self.latency = latency
+            self.error_rate = 0.0 if ok else 1.0
+        else:
+            # Failed calls say nothing about how fast the model answers
+            if ok:
+                self.latency += alpha * (latency - self.latency)
+            self.error_rate += alpha * ((0.0 if ok else 1.0) - self.error_rate)
+        self.samples += 1
+        self.last_observed = time.monotonic()
+
+    def healthy(self, latency_slo):
+        if self.samples < MODEL_ROUTER_MIN_SAMPLES:
+            return True
+        if time.monotonic() - self.last_observed > MODEL_ROUTER_RECOVERY_SECONDS:
+            # Unhealthy models get no traffic, so let one call through to re-measure
+            return True
+        return self.error_rate <= MODEL_ROUTER_MAX_ERROR_RATE and self.latency <= latency_slo
+
+    def as_dict(self):
+        return {'samples': self.samples, 'latency_ewma': round(self.latency, 3),
+                'error_rate_ewma': round(self.error_rate, 3)}
+
+
+class ModelRouter:
+    """Chooses a model per call site from the policy table and observed model health"""
+
+    def __init__(self, tiers=None, policies=None, tier_context=None):
+        self.tiers = tiers or MODEL_TIERS
+        self.policies = policies or ROUTING_POLICIES
+        self.tier_context = tier_context or MODEL_TIER_CONTEXT
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._choices = {}
+
+    def policy(self, site):
+        return self.policies.get(site, DEFAULT_POLICY)
+
+    def preferred_model(self, site):
+        """Model the site uses while everything is healthy (for records created before the call)"""
+        return self.tiers[self.policy(site)['tiers'][0]]
+
+    def choose(self, site, input_tokens=0, max_tokens=0):
+        """Return the model name for a call from `site` with a prompt of `input_tokens`"""
+        policy = self.policy(site)
+        tiers = list(policy['tiers'])
+        if input_tokens + (max_tokens or 0) <= MODEL_ROUTER_SMALL_CALL_TOKENS and 'fast' in tiers:
+            tiers.remove('fast')
+            tiers.insert(0, 'fast')
+
+        fitting = [tier for tier in tiers
+                   if input_tokens + (max_tokens or 0) <= self.tier_context.get(tier, float('inf'))]
+        # Nothing fits: take the biggest context and let the API decide
+        fitting = fitting or [max(tiers, key=lambda tier: self.tier_context.get(tier, 0))]
+
+        with self._lock:
+            chosen = None
+            for tier in fitting:
+                if self._model_stats(self.tiers[tier]).healthy(policy['latency_slo']):
+                    chosen = tier
+                    break
+            if chosen is None:
+                # All unhealthy - the least bad one
+                chosen = min(fitting, key=lambda tier: (self._model_stats(self.tiers[tier]).error_rate,
+                                                        self._model_stats(self.tiers[tier]).latency))
+            model = self.tiers[chosen]
+            key = (site, model)
+            self._choices[key] = self._choices.get(key, 0) + 1
+        return model
+
+    def observe(self, model, latency, ok):
+        """Record one call outcome (ok=False only for OpenAI-side failures)"""
+        with self._lock:
+            self._model_stats(model).observe(latency, ok)
+
+    def _model_stats(self, model):
+        if model not in self._stats:
+            self._stats[model] = ModelStats()
+        return self._stats[model]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'models': {model: stats.as_dict() for model, stats in self._stats.items()},
+                'choices': {f"{site}:{model}": count for (site, model), count in self._choices.items()}
+            }
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_model_router():
+    """Return the process-wide model router"""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ModelRouter()
+    return _router
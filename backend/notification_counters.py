@@ -0,0 +1,215 @@
+"""
+Notification Unread Counters
+
+Maintained unread-notification count per employee, kept in the
+`notification_unread_counts` table (migrations/notification_unread_counts.sql)
+so the badge never has to count the notifications table:
+- inserting unread notifications increments the recipients' counters
+- marking notifications read or deleting unread ones decrements them
+- the '*' row holds the total over all employees (admin feed)
+
+Counters are changed with the `adjust_notification_unread` database function,
+one atomic call per write, and rebuilt from the notifications table with
+`reconcile_notification_unread` on first use, every
+NOTIFICATION_COUNT_RECONCILE_SECONDS in the background and from the admin
+endpoint - reconciliation repairs any drift from failed adjustments.
+
+Reading a counter is a single primary-key lookup, cached in memory for
+NOTIFICATION_COUNT_CACHE_SECONDS (this process's own writes drop the cached
+value). Without the migration the store falls back to counting unread rows.
+
+Usage:
+    counters = get_notification_counter_store()
+    counters.notifications_inserted(result.data)
+    counters.notifications_read(result.data)
+    unread = counters.unread_count(employee_id)   # None for the admin total
+"""
+import os
+import time
+import threading
+from collections import Counter
+
+NOTIFICATION_COUNTS_TABLE = 'notification_unread_counts'
+NOTIFICATION_COUNT_CACHE_SECONDS = float(os.getenv('NOTIFICATION_COUNT_CACHE_SECONDS', '5'))
+NOTIFICATION_COUNT_RECONCILE_SECONDS = int(os.getenv('NOTIFICATION_COUNT_RECONCILE_SECONDS', '3600'))
+# Counter row holding the total over all employees
+ALL_EMPLOYEES = '*'
+
+
+def get_supabase_client():
+    supabase_url = os.getenv('SUPABASE_URL')
+    supabase_key = os.getenv('SUPABASE_SERVICE_KEY')
+    if not supabase_url or not supabase_key:
+        raise Exception("Supabase credentials not configured")
+    from supabase import create_client
+    return create_client(supabase_url, supabase_key)
+
+
+def unread_by_employee(rows):
+    """{employee_id: number of unread rows} for notification rows"""
+    return Counter(str(row['to_employee']) for row in rows or []
+                   if row.get('to_employee') and not row.get('is_read'))
+
+
+class NotificationCounterStore:
+    """notification_unread_counts rows with a short in-memory read cache"""
+
+    def __init__(self, cache_seconds=NOTIFICATION_COUNT_CACHE_SECONDS,
+                 reconcile_seconds=NOTIFICATION_COUNT_RECONCILE_SECONDS):
+        self.cache_seconds = cache_seconds
+        self.reconcile_seconds = reconcile_seconds
+        self._lock = threading.Lock()
+        self._cached = {}
+        self._reconciled_at = 0
+        self._reconciling = False
+        self._ready = False
+        self._available = True
+        self._counters = {'adjustments': 0, 'reads': 0, 'cache_hits': 0, 'fallback_counts': 0, 'reconciles': 0}
+
+    # ---------- writes ----------
+
+    def notifications_inserted(self, rows):
+        """Count newly inserted notification rows"""
+        self.adjust(unread_by_employee(rows))
+
+    def notifications_read(self, rows):
+        """Rows that were unread and have just been marked read"""
+        self.adjust({employee_id: -count for employee_id, count in unread_by_employee(
+            [{**row, 'is_read': False} for row in rows or []]).items()})
+
+    def notifications_deleted(self, rows):
+        """Deleted notification rows (only unread ones change the counters)"""
+        self.adjust({employee_id: -count for employee_id, count in unread_by_employee(rows).items()})
+
+    def adjust(self, deltas):
+        """Apply {employee_id: delta} to the stored counters"""
+        deltas = {str(employee_id): int(delta) for employee_id, delta in (deltas or {}).items() if delta}
+        if not deltas:
+            return
+        with self._lock:
+            for employee_id in deltas:
+                self._cached.pop(employee_id, None)
+            self._cached.pop(ALL_EMPLOYEES, None)
+            available = self._available
+        if not available:
+            return
+        try:
+            get_supabase_client().rpc('adjust_notification_unread', {'p_deltas': deltas}).execute()
+            with self._lock:
+                self._counters['adjustments'] += 1
+        except Exception as e:
+            # The next reconciliation repairs the counters
+            print(f"⚠️ Failed to adjust unread notification counters {deltas}: {e}")
+
+    def reconcile(self):
+        """Rebuild every counter from the notifications table; returns the total or None"""
+        try:
+            result = get_supabase_client().rpc('reconcile_notification_unread', {}).execute()
+            total = result.data
+            with self._lock:
+                self._available = True
+                self._cached.clear()
+                self._reconciled_at = time.time()
+                self._counters['reconciles'] += 1
+            print(f"🔔 Unread notification counters reconciled: {total} unread")
+            return total
+        except Exception as e:
+            # No table/functions (migration not applied): count unread rows on every read
+            print(f"⚠️ {NOTIFICATION_COUNTS_TABLE} unavailable ({e}), counting unread notifications per request")
+            with self._lock:
+                self._available = False
+                self._cached.clear()
+                self._reconciled_at = time.time()
+            return None
+
+    # ---------- reads ----------
+
+    def unread_count(self, employee_id=None, fresh=False):
+        """
+        Unread notifications of an employee, or of everyone when employee_id is None.
+
+        fresh=True skips the read cache (e.g. after another worker changed the counter).
+        """
+        self._ensure_ready()
+        key = str(employee_id) if employee_id else ALL_EMPLOYEES
+        with self._lock:
+            self._counters['reads'] += 1
+            cached = self._cached.get(key)
+            if cached and not fresh and time.time() - cached[1] <= self.cache_seconds:
+                self._counters['cache_hits'] += 1
+                return cached[0]
+            available = self._available
+
+        count = self._read_counter(key) if available else None
+        if count is None:
+            count = self._count_rows(employee_id)
+        else:
+            with self._lock:
+                self._cached[key] = (count, time.time())
+        return count
+
+    def _read_counter(self, key):
+        try:
+            result = (get_supabase_client().table(NOTIFICATION_COUNTS_TABLE)
+                      .select("unread_count").eq("employee_id", key).limit(1).execute())
+            return int(result.data[0]['unread_count']) if result.data else 0
+        except Exception as e:
+            print(f"⚠️ Failed to read unread notification counter for {key}: {e}")
+            return None
+
+    def _count_rows(self, employee_id):
+        """Exact count from the notifications table (fallback)"""
+        with self._lock:
+            self._counters['fallback_counts'] += 1
+        query = get_supabase_client().table("notifications").select("id", count="exact").eq("is_read", False)
+        if employee_id:
+            query = query.eq("to_employee", str(employee_id))
+        result = query.execute()
+        return result.count if getattr(result, 'count', None) is not None else len(result.data or [])
+
+    def _ensure_ready(self):
+        """Reconcile once before the first read, then in the background when due"""
+        with self._lock:
+            first = not self._ready
+            self._ready = True
+            reconcile_due = (not first and not self._reconciling
+                             and time.time() - self._reconciled_at > self.reconcile_seconds)
+            if reconcile_due:
+                self._reconciling = True
+        if first:
+            self.reconcile()
+        if reconcile_due:
+            threading.Thread(target=self._background_reconcile, name='notification-count-reconcile',
+                             daemon=True).start()
+
+    def _background_reconcile(self):
+        # Also retries the counters after they were found unavailable
+        try:
+            self.reconcile()
+        finally:
+            with self._lock:
+                self._reconciling = False
+                self._reconciled_at = time.time()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'table_available': self._available,
+                'cached_counters': len(self._cached),
+                'seconds_since_reconcile': round(time.time() - self._reconciled_at) if self._reconciled_at else None,
+                **self._counters
+            }
+
+
+_notification_counter_store = None
+_notification_counter_store_lock = threading.Lock()
+
+
+def get_notification_counter_store():
+    """Return the process-wide unread notification counter store"""
+    global _notification_counter_store
+    if _notification_counter_store is None:
+        with _notification_counter_store_lock:
+            if _notification_counter_store is None:
+                _notification_counter_store = NotificationCounterStore()
+    return _notification_counter_store
@@ -0,0 +1,248 @@
+"""
+Notification Events
+
+Publish/subscribe for notification changes, feeding the push stream
+(GET /api/notifications/stream). The notification writers publish an event
+after every insert, read and delete:
+
+    {"type": "notification", "to_employee": "...", "notification": {...compact row}}
+    {"type": "read",         "to_employee": "...", "ids": [...]}
+    {"type": "deleted",      "to_employee": "...", "ids": [...]}
+
+Subscribers receive the events of one employee, or of everyone (employee_id
+None, the admin feed without an employee record).
+
+Brokers:
+- InProcessBroker: delivers within this process only (single worker, tests)
+- SpoolBroker: publishers append events to per-minute JSON-lines segments in
+  NOTIFICATION_EVENT_DIR; every worker with subscribers tails them, so all
+  gunicorn workers on the host share events. Segments older than
+  NOTIFICATION_EVENT_RETENTION_SECONDS are deleted.
+
+NOTIFICATION_BROKER=memory|spool picks the broker (spool by default, since
+gunicorn runs several workers).
+
+Usage:
+    get_notification_broker().publish(event)
+    subscription = get_notification_broker().subscribe(employee_id)
+    event = subscription.get(timeout=15)   # None on timeout
+    subscription.close()
+"""
+import os
+import json
+import time
+import queue
+import tempfile
+import threading
+from collections import defaultdict
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends of one short line are not interleaved in practice
+    fcntl = None
+
+NOTIFICATION_BROKER = os.getenv('NOTIFICATION_BROKER', 'spool').lower()
+NOTIFICATION_EVENT_DIR = os.getenv('NOTIFICATION_EVENT_DIR', os.path.join(tempfile.gettempdir(), 'erp_notification_events'))
+NOTIFICATION_EVENT_RETENTION_SECONDS = int(os.getenv('NOTIFICATION_EVENT_RETENTION_SECONDS', '600'))
+NOTIFICATION_SPOOL_POLL_SECONDS = float(os.getenv('NOTIFICATION_SPOOL_POLL_SECONDS', '0.5'))
+# Events buffered per subscriber; the oldest are dropped for a client that stopped reading
+NOTIFICATION_SUBSCRIBER_BUFFER = int(os.getenv('NOTIFICATION_SUBSCRIBER_BUFFER', '100'))
+SEGMENT_SECONDS = 60
+
+
+class Subscription:
+    """Events for one subscriber"""
+
+    def __init__(self, broker, employee_id):
+        self.broker = broker
+        self.employee_id = employee_id
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=NOTIFICATION_SUBSCRIBER_BUFFER)
+
+    def deliver(self, event):
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """Next event, or None when none arrived within `timeout` seconds"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Delivers events to subscribers in this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+        self._counters = {'published': 0, 'delivered': 0}
+
+    def publish(self, event):
+        with self._lock:
+            self._counters['published'] += 1
+        self.dispatch(event)
+
+    def dispatch(self, event):
+        """Hand an event to the local subscribers of its employee and of everyone"""
+        employee_id = str(event.get('to_employee') or '')
+        with self._lock:
+            targets = list(self._subscribers.get(employee_id, ())) + list(self._subscribers.get(None, ()))
+            self._counters['delivered'] += len(targets)
+        for subscription in targets:
+            subscription.deliver(event)
+
+    def subscribe(self, employee_id=None):
+        subscription = Subscription(self, str(employee_id) if employee_id else None)
+        with self._lock:
+            self._subscribers[subscription.employee_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.employee_id)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.employee_id]
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def stats(self):
+        return {'broker': 'memory', 'subscribers': self.subscriber_count(), **self._counters}
+
+
+class SpoolBroker(InProcessBroker):
+    """Shares events between the processes on a host through spool files"""
+
+    def __init__(self, spool_dir=NOTIFICATION_EVENT_DIR, poll_seconds=NOTIFICATION_SPOOL_POLL_SECONDS,
+                 retention_seconds=NOTIFICATION_EVENT_RETENTION_SECONDS):
+        super().__init__()
+        self.spool_dir = spool_dir
+        self.poll_seconds = poll_seconds
+        self.retention_seconds = retention_seconds
+        self._tailer = None
+        self._pruned_at = 0
+        os.makedirs(self.spool_dir, exist_ok=True)
+
+    def publish(self, event):
+        """Append the event to the current segment; the tailers deliver it (here too)"""
+        line = (json.dumps(event, default=str) + "\n").encode('utf-8')
+        path = self._segment_path(int(time.time() // SEGMENT_SECONDS))
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+            with self._lock:
+                self._counters['published'] += 1
+        except Exception as e:
+            print(f"⚠️ Failed to spool notification event: {e}")
+            # Still reach this worker's own subscribers
+            self.dispatch(event)
+        if time.time() - self._pruned_at > SEGMENT_SECONDS:
+            self._pruned_at = time.time()
+            self.prune()
+
+    def subscribe(self, employee_id=None):
+        subscription = super().subscribe(employee_id)
+        self._ensure_tailer()
+        return subscription
+
+    def prune(self):
+        """Delete segments older than the retention window"""
+        cutoff = int((time.time() - self.retention_seconds) // SEGMENT_SECONDS)
+        for segment in self._segments():
+            if segment < cutoff:
+                try:
+                    os.remove(self._segment_path(segment))
+                except FileNotFoundError:
+                    pass
+
+    def _segment_path(self, segment):
+        return os.path.join(self.spool_dir, f"{segment}.jsonl")
+
+    def _segments(self):
+        segments = []
+        for name in os.listdir(self.spool_dir):
+            stem, extension = os.path.splitext(name)
+            if extension == '.jsonl' and stem.isdigit():
+                segments.append(int(stem))
+        return sorted(segments)
+
+    def _ensure_tailer(self):
+        with self._lock:
+            if self._tailer is None:
+                self._tailer = threading.Thread(target=self._tail, name='notification-spool-tailer', daemon=True)
+                self._tailer.start()
+
+    def _tail(self):
+        """Follow the segments from the current end and dispatch new events"""
+        segment = int(time.time() // SEGMENT_SECONDS)
+        path = self._segment_path(segment)
+        offset = os.path.getsize(path) if os.path.exists(path) else 0
+        while True:
+            try:
+                offset = self._read_new(segment, offset)
+                newer = [candidate for candidate in self._segments() if candidate > segment]
+                if newer:
+                    # Finish the current segment (writers may have just appended) before moving on
+                    self._read_new(segment, offset)
+                    segment, offset = newer[0], 0
+                    continue
+            except Exception as e:
+                print(f"⚠️ Notification spool tailer error: {e}")
+            time.sleep(self.poll_seconds)
+
+    def _read_new(self, segment, offset):
+        """Dispatch complete lines after `offset`; returns the new offset"""
+        try:
+            with open(self._segment_path(segment), 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return offset
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            self.dispatch(event)
+        return offset + end
+
+    def stats(self):
+        return {**super().stats(), 'broker': 'spool', 'spool_dir': self.spool_dir}
+
+
+_notification_broker = None
+_notification_broker_lock = threading.Lock()
+
+
+def get_notification_broker():
+    """Return the process-wide notification broker (picked by NOTIFICATION_BROKER)"""
+    global _notification_broker
+    if _notification_broker is None:
+        with _notification_broker_lock:
+            if _notification_broker is None:
+                _notification_broker = InProcessBroker() if NOTIFICATION_BROKER == 'memory' else SpoolBroker()
+    return _notification_broker
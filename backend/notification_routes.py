@@ -1,10 +1,17 @@
-from flask import Blueprint, request, jsonify, g, current_app
+from flask import Blueprint, request, jsonify, g, current_app, Response
 import os
+import json
+import time
+import base64
+import threading
 from datetime import datetime
+from collections import defaultdict
 from supabase import create_client
 import traceback
 import jwt
 from functools import wraps
+from notification_counters import get_notification_counter_store
+from notification_events import get_notification_broker
 
 # Create the main notifications blueprint
 notification_bp = Blueprint('notifications', __name__)
@@ -501,6 +508,7 @@ def create_single_notification(
             try:
                 result = supabase.table("notifications").insert(notification_data).execute()
                 if result.data:
+                    record_new_notifications(result.data)
                     print(f"✅ Notification created for {recipient}: {final_message}")
                 else:
                     print(f"❌ Failed to create notification for {recipient}")
@@ -562,6 +570,7 @@ def create_admin_event_notification(notification_type, message, meta=None, exclu
             try:
                 result = supabase.table("notifications").insert(notification_data).execute()
                 if result.data:
+                    record_new_notifications(result.data)
                     print(f"✅ Admin event notification created for {recipient}: {message}")
                 else:
                     print(f"❌ Failed to create admin event notification for {recipient}")
@@ -569,20 +578,179 @@ def create_admin_event_notification(notification_type, message, meta=None, exclu
                 print(f"❌ Error creating admin event notification for {recipient}: {e}")
     except Exception as e:
         print(f"❌ create_admin_event_notification ERROR: {e}")
+# ===== FEED PAGING =====
+# Feed pages: newest first, keyset-paged on (created_at, id) within the user's scope
+NOTIFICATION_PAGE_DEFAULT = int(os.getenv('NOTIFICATION_PAGE_DEFAULT', '50'))
+NOTIFICATION_PAGE_MAX = 500
+# created_at is set by the app before the insert commits, so a row can become visible
+# after a client already moved its since-cursor past it. since-polls also re-read this
+# window behind the cursor (up to NOTIFICATION_SINCE_OVERLAP_ROWS rows); clients drop
+# ids they already have.
+NOTIFICATION_SINCE_OVERLAP_SECONDS = float(os.getenv('NOTIFICATION_SINCE_OVERLAP_SECONDS', '10'))
+NOTIFICATION_SINCE_OVERLAP_ROWS = int(os.getenv('NOTIFICATION_SINCE_OVERLAP_ROWS', '50'))
+NOTIFICATION_COLUMNS = "id,to_employee,channel,message,meta,priority,is_read,created_at"
+# Meta keys the list views use; the rest of meta is fetched on demand
+LIST_META_KEYS = ('type', 'task_id', 'task_description', 'assigned_by', 'added_by', 'note_preview', 'file_name')
+COMPACT_COLUMNS = "id,to_employee,message,priority,is_read,created_at," + ",".join(
+    f"meta_{key}:meta->>{key}" for key in LIST_META_KEYS)
+
+
+def encode_cursor(row):
+    """Opaque feed cursor for a notification row"""
+    raw = f"{row['created_at']}|{row['id']}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(created_at, id) from a cursor; raises ValueError when malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        created_at, notification_id = raw.split('|', 1)
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not created_at or not notification_id:
+        raise ValueError('Invalid cursor')
+    return created_at, notification_id
+
+
+def keyset_filter(cursor, newer):
+    """PostgREST `or` filter for rows after (newer=True) or before a cursor position"""
+    created_at, notification_id = decode_cursor(cursor)
+    op = 'gt' if newer else 'lt'
+    return f'created_at.{op}."{created_at}",and(created_at.eq."{created_at}",id.{op}.{notification_id})'
+
+
+def fetch_since_overlap(supabase, target_scope, target_value, since, expand_meta=False):
+    """Rows up to NOTIFICATION_SINCE_OVERLAP_SECONDS older than a since-cursor (late commits), newest first"""
+    if NOTIFICATION_SINCE_OVERLAP_SECONDS <= 0 or NOTIFICATION_SINCE_OVERLAP_ROWS <= 0:
+        return []
+    created_at, _ = decode_cursor(since)
+    try:
+        window_start = datetime.fromisoformat(created_at.replace('Z', '+00:00')) - timedelta(
+            seconds=NOTIFICATION_SINCE_OVERLAP_SECONDS)
+    except ValueError:
+        raise ValueError('Invalid cursor')
+    query = supabase.table("notifications").select(NOTIFICATION_COLUMNS if expand_meta else COMPACT_COLUMNS)
+    if target_scope == "employee":
+        query = query.eq("to_employee", target_value)
+    result = (query.gte("created_at", window_start.isoformat()).or_(keyset_filter(since, newer=False))
+              .order("created_at", desc=True).order("id", desc=True).limit(NOTIFICATION_SINCE_OVERLAP_ROWS).execute())
+    rows = result.data or []
+    return rows if expand_meta else [compact_notification(row) for row in rows]
+
+
+def compact_notification(row):
+    """List-view projection: the list meta keys only"""
+    if 'meta' in row:
+        meta = {key: (row.get('meta') or {}).get(key) for key in LIST_META_KEYS}
+    else:
+        meta = {key: row.get(f"meta_{key}") for key in LIST_META_KEYS}
+    return {
+        'id': row['id'],
+        'to_employee': row.get('to_employee'),
+        'message': row.get('message'),
+        'priority': row.get('priority'),
+        'is_read': row.get('is_read', False),
+        'created_at': row.get('created_at'),
+        'meta': {key: value for key, value in meta.items() if value is not None}
+    }
+
+
+def fetch_notification_page(supabase, target_scope, target_value, since=None, before=None, limit=None, expand_meta=False):
+    """
+    One feed page for a user scope.
+
+    - since:  rows newer than the cursor (oldest first while fetching, so a
+              long gap is caught up page by page without skipping rows)
+    - before: rows older than the cursor (history paging)
+    Returns (rows newest first, has_more)
+    """
+    query = supabase.table("notifications").select(NOTIFICATION_COLUMNS if expand_meta else COMPACT_COLUMNS)
+    if target_scope == "employee":
+        query = query.eq("to_employee", target_value)
+    if since:
+        query = query.or_(keyset_filter(since, newer=True))
+    elif before:
+        query = query.or_(keyset_filter(before, newer=False))
+    ascending = bool(since)
+    result = query.order("created_at", desc=not ascending).order("id", desc=not ascending).limit(limit + 1).execute()
+    rows = result.data or []
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if ascending:
+        rows.reverse()
+    if not expand_meta:
+        rows = [compact_notification(row) for row in rows]
+    return rows, has_more
+
+
+# ===== CHANGE HOOKS =====
+# Every notification write goes through these: unread counters first, then the push event
+NOTIFICATION_EVENT_MAX_IDS = 100
+
+
+def record_new_notifications(rows):
+    """Count and push newly inserted notification rows"""
+    rows = rows or []
+    get_notification_counter_store().notifications_inserted(rows)
+    broker = get_notification_broker()
+    for row in rows:
+        broker.publish({
+            'type': 'notification',
+            'to_employee': row.get('to_employee'),
+            'notification': compact_notification(row)
+        })
+
+
+def record_read_notifications(rows):
+    """Rows that were just marked read"""
+    get_notification_counter_store().notifications_read(rows)
+    publish_notification_changes('read', rows)
+
+
+def record_deleted_notifications(rows):
+    get_notification_counter_store().notifications_deleted(rows)
+    publish_notification_changes('deleted', rows)
+
+
+def publish_notification_changes(event_type, rows):
+    """One event per recipient listing the changed ids (capped; `count` has the total)"""
+    by_employee = defaultdict(list)
+    for row in rows or []:
+        if row.get('to_employee'):
+            by_employee[str(row['to_employee'])].append(row['id'])
+    broker = get_notification_broker()
+    for employee_id, ids in by_employee.items():
+        broker.publish({
+            'type': event_type,
+            'to_employee': employee_id,
+            'ids': ids[:NOTIFICATION_EVENT_MAX_IDS],
+            'count': len(ids)
+        })
+
+
 # ===== MAIN NOTIFICATIONS ENDPOINT - FIXED =====
 @notification_bp.route('/api/notifications', methods=['GET'])
 @notifications_token_required  # ← THIS IS THE KEY FIX
 def get_notifications():
-    """Get notifications for current user - FIXED VERSION"""
+    """
+    Get notifications for current user.
+
+    Without paging parameters returns the newest 200 (admin feed: 500) with
+    full meta, as before. Delta-sync clients pass:
+    - since=<cursor>   notifications newer than the cursor, followed by the ones of the
+                       last NOTIFICATION_SINCE_OVERLAP_SECONDS before it (dedupe by id)
+    - before=<cursor>  older notifications (history paging)
+    - limit=<n>        page size (default NOTIFICATION_PAGE_DEFAULT, max 500)
+    - expand=meta      full meta instead of the compact list projection
+    and keep `next_since` / `next_before` from the response.
+    """
     try:
         print("🚀 MAIN NOTIFICATIONS ENDPOINT CALLED")
         
         supabase = get_supabase_client()
         user_target = get_user_notification_target()
         
-        print(f"🎯 User target: {user_target}")
-        print(f"🔍 g.user: {g.user}")
-        
         if not user_target:
             return jsonify({
                 'success': False, 
@@ -593,41 +761,46 @@ def get_notifications():
         target_value = user_target.get('value')
         user_role = user_target.get('role')
         
-        # Admin sees all notifications only when no employee ID is available
-        base_columns = [
-            "id", "to_employee", "channel", "message",
-            "meta", "priority", "is_read", "created_at"
-        ]
-        select_clause = ",".join(base_columns)
-
         if target_scope == "admin_all":
-            print("👑 Admin (no employee record) - fetching ALL notifications")
-            result = (
-                supabase.table("notifications")
-                .select(select_clause)
-                .order("created_at", desc=True)
-                .limit(500)
-                .execute()
-            )
             feed_scope = 'admin_all'
         elif target_scope == "employee" and target_value:
-            print(f"🎯 Scoped notifications for employee: {target_value}")
-            result = (
-                supabase.table("notifications")
-                .select(select_clause)
-                .eq("to_employee", target_value)
-                .order("created_at", desc=True)
-                .limit(200)
-                .execute()
-            )
             feed_scope = 'admin' if user_role in ['admin', 'superadmin'] else 'employee'
         else:
             return jsonify({'success': False, 'error': 'Invalid notification target'}), 400
         
-        notifications = result.data if result.data else []
-        unread_count = len([n for n in notifications if not n.get('is_read', False)])
+        since = request.args.get('since')
+        before = request.args.get('before')
+        paged = since is not None or before is not None or request.args.get('limit') is not None
+        if since and before:
+            return jsonify({'success': False, 'error': 'Use either since or before, not both'}), 400
+        
+        if paged:
+            try:
+                limit = min(max(int(request.args.get('limit', NOTIFICATION_PAGE_DEFAULT)), 1), NOTIFICATION_PAGE_MAX)
+                expand_meta = request.args.get('expand') == 'meta'
+                notifications, has_more = fetch_notification_page(
+                    supabase, target_scope, target_value, since=since, before=before, limit=limit,
+                    expand_meta=expand_meta)
+                overlap = fetch_since_overlap(supabase, target_scope, target_value, since,
+                                              expand_meta=expand_meta) if since else []
+            except ValueError as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
+        else:
+            # Admin sees all notifications only when no employee ID is available
+            limit = 500 if target_scope == "admin_all" else 200
+            notifications, has_more = fetch_notification_page(
+                supabase, target_scope, target_value, limit=limit, expand_meta=True)
+            overlap = []
         
-        print(f"✅ SUCCESS - {len(notifications)} notifications, {unread_count} unread")
+        unread_count = get_notification_counter_store().unread_count(
+            target_value if target_scope == "employee" else None)
+        
+        print(f"✅ SUCCESS - {len(notifications)} notifications ({feed_scope}), {unread_count} unread")
+        
+        # Cursors come from the page itself, not from the re-read overlap
+        next_since = None if before else (encode_cursor(notifications[0]) if notifications else since)
+        next_before = encode_cursor(notifications[-1]) if notifications else None
+        notifications = notifications + overlap
         
         return jsonify({
             'success': True,
@@ -635,13 +808,166 @@ def get_notifications():
             'unread_count': unread_count,
             'total': len(notifications),
             'user_type': 'admin' if user_role in ['admin', 'superadmin'] else 'employee',
-            'feed_scope': feed_scope
+            'feed_scope': feed_scope,
+            'has_more': has_more,
+            # Poll with since=next_since; page back with before=next_before
+            'next_since': next_since,
+            'next_before': next_before
         })
         
     except Exception as e:
         print(f"❌ get_notifications ERROR: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# ===== PUSH STREAM =====
+NOTIFICATION_STREAM_HEARTBEAT_SECONDS = int(os.getenv('NOTIFICATION_STREAM_HEARTBEAT_SECONDS', '15'))
+# Streams end after this long and the client reconnects, so workers are recycled normally
+NOTIFICATION_STREAM_MAX_SECONDS = int(os.getenv('NOTIFICATION_STREAM_MAX_SECONDS', '300'))
+# Every open stream holds one of the worker's GUNICORN_THREADS (gunicorn_config.py), so streams
+# per process stay below it and NOTIFICATION_STREAM_RESERVED_THREADS are left for normal requests
+GUNICORN_THREADS = int(os.getenv('GUNICORN_THREADS', '12'))
+NOTIFICATION_STREAM_RESERVED_THREADS = int(os.getenv('NOTIFICATION_STREAM_RESERVED_THREADS', '4'))
+STREAM_THREADS_AVAILABLE = max(GUNICORN_THREADS - NOTIFICATION_STREAM_RESERVED_THREADS, 0)
+# NOTIFICATION_STREAM_MAX_CLIENTS can lower the limit, not raise it past the threads
+NOTIFICATION_STREAM_MAX_CLIENTS = min(
+    int(os.getenv('NOTIFICATION_STREAM_MAX_CLIENTS', str(STREAM_THREADS_AVAILABLE))), STREAM_THREADS_AVAILABLE)
+NOTIFICATION_STREAM_RETRY_MS = 3000
+# Browsers' EventSource cannot send headers: they connect with ?ticket=<stream ticket>
+# instead of their login token, so no reusable token ends up in access logs
+NOTIFICATION_STREAM_TICKET_SECONDS = int(os.getenv('NOTIFICATION_STREAM_TICKET_SECONDS', '60'))
+STREAM_TICKET_PURPOSE = 'notification_stream'
+_stream_slots_lock = threading.Lock()
+
+
+def stream_ticket_key():
+    # A key of its own: tickets are rejected everywhere a login token is accepted
+    return f"{current_app.config['SECRET_KEY']}:{STREAM_TICKET_PURPOSE}"
+
+
+def get_stream_user():
+    """Token payload from the Authorization header, or from a ?ticket= stream ticket"""
+    token = request.headers.get('Authorization')
+    if token:
+        if token.startswith('Bearer '):
+            token = token[7:]
+        return jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+    ticket = request.args.get('ticket')
+    if not ticket:
+        return None
+    data = jwt.decode(ticket, stream_ticket_key(), algorithms=['HS256'])
+    if data.get('purpose') != STREAM_TICKET_PURPOSE:
+        raise jwt.InvalidTokenError('Not a stream ticket')
+    return data
+
+
+@notification_bp.route('/api/notifications/stream/ticket', methods=['POST'])
+@notifications_token_required
+def create_stream_ticket():
+    """Short-lived ticket for opening the stream from a browser (EventSource)"""
+    claims = {key: value for key, value in g.user.items() if key not in ('exp', 'iat', 'nbf')}
+    claims.update(purpose=STREAM_TICKET_PURPOSE,
+                  exp=datetime.utcnow() + timedelta(seconds=NOTIFICATION_STREAM_TICKET_SECONDS))
+    return jsonify({
+        'success': True,
+        'ticket': jwt.encode(claims, stream_ticket_key(), algorithm='HS256'),
+        'expires_in': NOTIFICATION_STREAM_TICKET_SECONDS
+    })
+
+
+def sse_message(event_type, data):
+    return f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@notification_bp.route('/api/notifications/stream', methods=['GET'])
+def stream_notifications():
+    """
+    Server-sent events for the current user.
+
+    Sends `unread` ({unread_count}) on connect and after every batch of
+    `notification` / `read` / `deleted` events, plus keepalive comments.
+    Authenticates with the Authorization header, or ?ticket= from
+    POST /api/notifications/stream/ticket (fetch a new one before reconnecting).
+    """
+    try:
+        g.user = get_stream_user()
+    except jwt.ExpiredSignatureError:
+        return jsonify({'error': 'Token has expired'}), 401
+    except jwt.InvalidTokenError:
+        return jsonify({'error': 'Token is invalid'}), 401
+    if not g.user:
+        return jsonify({'error': 'Token is missing'}), 401
+    
+    user_target = get_user_notification_target()
+    if not user_target or (user_target.get('scope') == 'employee' and not user_target.get('value')):
+        return jsonify({'success': False, 'error': 'Could not identify user for notifications'}), 400
+    employee_id = user_target.get('value') if user_target.get('scope') == 'employee' else None
+    
+    broker = get_notification_broker()
+    # Check and subscribe together so simultaneous connects can't overshoot the limit
+    with _stream_slots_lock:
+        if broker.subscriber_count() >= NOTIFICATION_STREAM_MAX_CLIENTS:
+            response = jsonify({'success': False, 'error': 'Too many notification streams, poll instead'})
+            response.headers['Retry-After'] = '30'
+            return response, 503
+        subscription = broker.subscribe(employee_id)
+    counters = get_notification_counter_store()
+    
+    def generate():
+        try:
+            yield f"retry: {NOTIFICATION_STREAM_RETRY_MS}\n\n"
+            yield sse_message('unread', {'unread_count': counters.unread_count(employee_id)})
+            deadline = time.time() + NOTIFICATION_STREAM_MAX_SECONDS
+            while time.time() < deadline:
+                event = subscription.get(timeout=min(NOTIFICATION_STREAM_HEARTBEAT_SECONDS,
+                                                     max(deadline - time.time(), 0.1)))
+                if event is None:
+                    yield ": keepalive\n\n"
+                    continue
+                # Send whatever else is waiting, then one fresh count for the batch
+                while event is not None:
+                    yield sse_message(event['type'], event)
+                    event = subscription.get(timeout=0)
+                yield sse_message('unread', {'unread_count': counters.unread_count(employee_id, fresh=True)})
+        finally:
+            subscription.close()
+    
+    print(f"📡 Notification stream opened ({user_target.get('scope')}: {employee_id or 'all'})")
+    response = Response(generate(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # Also frees the slot when the client is gone before the body was ever started
+    response.call_on_close(subscription.close)
+    return response
+
+@notification_bp.route('/api/notifications/<notification_id>', methods=['GET'])
+@notifications_token_required
+def get_notification(notification_id):
+    """One notification with its full meta (list views load compact rows)"""
+    try:
+        supabase = get_supabase_client()
+        user_target = get_user_notification_target()
+        
+        if not user_target:
+            return jsonify({'success': False, 'error': 'Could not identify user'}), 400
+        
+        target_scope = user_target.get('scope')
+        target_value = user_target.get('value')
+        
+        query = supabase.table("notifications").select(NOTIFICATION_COLUMNS).eq("id", notification_id)
+        if target_scope == "employee" and target_value:
+            query = query.eq("to_employee", target_value)
+        elif target_scope != "admin_all":
+            return jsonify({'success': False, 'error': 'Invalid notification target'}), 400
+        result = query.execute()
+        
+        if not result.data:
+            return jsonify({'success': False, 'error': 'Notification not found or not authorized'}), 404
+        
+        return jsonify({'success': True, 'notification': result.data[0]})
+        
+    except Exception as e:
+        print(f"❌ get_notification ERROR: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 # ===== ALL OTHER ENDPOINTS =====
 @notification_bp.route('/api/notifications/<notification_id>/read', methods=['PUT'])
 @notifications_token_required
@@ -667,21 +993,37 @@ def mark_notification_read(notification_id):
         if not notification_result.data:
             return jsonify({'success': False, 'error': 'Notification not found or not authorized'}), 404
         
+        if notification_result.data[0].get('is_read'):
+            return jsonify({
+                'success': True,
+                'message': 'Notification already read',
+                'notification': notification_result.data[0]
+            })
+        
         update_data = {
             "is_read": True,
             "read_at": datetime.utcnow().isoformat(),
             "updated_at": datetime.utcnow().isoformat()
         }
         
-        result = supabase.table("notifications").update(update_data).eq("id", notification_id).execute()
+        # Only an unread row is updated, so concurrent requests decrement the counter once
+        result = supabase.table("notifications").update(update_data).eq("id", notification_id).eq("is_read", False).execute()
         
         if result.data:
+            record_read_notifications(result.data)
             return jsonify({
                 'success': True,
                 'message': 'Notification marked as read',
                 'notification': result.data[0]
             })
         else:
+            current = supabase.table("notifications").select("*").eq("id", notification_id).execute()
+            if current.data and current.data[0].get('is_read'):
+                return jsonify({
+                    'success': True,
+                    'message': 'Notification already read',
+                    'notification': current.data[0]
+                })
             return jsonify({'success': False, 'error': 'Failed to update notification'}), 500
             
     except Exception as e:
@@ -715,6 +1057,8 @@ def mark_all_notifications_read():
         else:
             return jsonify({'success': False, 'error': 'Invalid notification target'}), 400
         
+        record_read_notifications(result.data)
+        
         return jsonify({
             'success': True,
             'message': f'Marked {len(result.data) if result.data else 0} notifications as read'
@@ -727,9 +1071,8 @@ def mark_all_notifications_read():
 @notification_bp.route('/api/notifications/count', methods=['GET'])
 @notifications_token_required
 def get_notification_count():
-    """Get unread notification count for current user"""
+    """Get unread notification count for current user (maintained counter, no table count)"""
     try:
-        supabase = get_supabase_client()
         user_target = get_user_notification_target()
         
         if not user_target:
@@ -739,14 +1082,12 @@ def get_notification_count():
         target_value = user_target.get('value')
         
         if target_scope == "admin_all":
-            result = supabase.table("notifications").select("id", count="exact").eq("is_read", False).execute()
+            unread_count = get_notification_counter_store().unread_count()
         elif target_scope == "employee" and target_value:
-            result = supabase.table("notifications").select("id", count="exact").eq("to_employee", target_value).eq("is_read", False).execute()
+            unread_count = get_notification_counter_store().unread_count(target_value)
         else:
             return jsonify({'success': False, 'error': 'Invalid notification target'}), 400
         
-        unread_count = result.count if hasattr(result, 'count') else 0
-        
         return jsonify({
             'success': True,
             'unread_count': unread_count
@@ -783,6 +1124,7 @@ def delete_notification(notification_id):
         result = supabase.table("notifications").delete().eq("id", notification_id).execute()
         
         if result.data:
+            record_deleted_notifications(result.data)
             return jsonify({
                 'success': True,
                 'message': 'Notification deleted'
@@ -851,9 +1193,22 @@ def notification_health_check():
     return jsonify({
         'success': True,
         'message': 'Notifications API is working',
+        'unread_counters': get_notification_counter_store().stats(),
+        'push': get_notification_broker().stats(),
         'timestamp': datetime.utcnow().isoformat()
     })
 
+@notification_bp.route('/api/notifications/count/reconcile', methods=['POST'])
+@notifications_token_required
+def reconcile_notification_counts():
+    """Rebuild the unread counters from the notifications table (admin only)"""
+    if g.user.get('role') not in ['admin', 'superadmin']:
+        return jsonify({'success': False, 'error': 'Admin access required'}), 403
+    total = get_notification_counter_store().reconcile()
+    if total is None:
+        return jsonify({'success': False, 'error': 'Unread counters are not available'}), 500
+    return jsonify({'success': True, 'total_unread': total})
+
 @notification_bp.route('/api/notifications/test-data', methods=['GET'])
 def test_notifications_data():
     """Test if notifications table has data"""
@@ -0,0 +1,198 @@
+"""
+Process Template Registry
+
+Predefined process templates (Order-to-Delivery, Stock-to-Delivery,
+Lead-to-Delivery, ...) are data: one JSON file per process in
+`process_templates/` (or PROCESS_TEMPLATES_DIR):
+
+    {
+      "key": "order_to_delivery",
+      "name": "Order-to-Delivery",
+      "version": 1,
+      "steps": [
+        {"number": 1, "title": "FINALIZE DEAL DOCUMENTATION", "duration": "1 day",
+         "responsible": "Account Executive", "activities": "...", "deliverable": "..."}
+      ]
+    }
+
+Files are compiled once into immutable ProcessTemplate / ProcessStep objects
+with the step number, title, duration (text and days), role and deliverable
+already parsed, so callers never re-parse step keys like
+"1. LEAD GENERATION AND CAPTURE (1 days)".
+
+The registry is memoized and versioned: `get_process_registry()` returns the
+current snapshot and checks the directory for added, changed or removed
+files at most every PROCESS_TEMPLATES_CHECK_SECONDS, so templates are
+hot-reloaded without restarting workers. `version` changes whenever the
+compiled content changes; callers that derive data from the templates (the
+role router) rebuild when it does. A template file that fails to load is
+skipped and the previous snapshot stays in use if nothing loads.
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import namedtuple
+
+PROCESS_TEMPLATES_DIR = os.getenv(
+    'PROCESS_TEMPLATES_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'process_templates')
+)
+PROCESS_TEMPLATES_CHECK_SECONDS = float(os.getenv('PROCESS_TEMPLATES_CHECK_SECONDS', '5'))
+
+REQUIRED_STEP_FIELDS = ('number', 'title', 'responsible', 'activities', 'deliverable')
+
+DURATION_PATTERN = re.compile(r'([\d.]+)\s*day')
+
+ProcessStep = namedtuple('ProcessStep', [
+    'number', 'title', 'duration', 'duration_days', 'responsible', 'activities', 'deliverable', 'key'
+])
+ProcessTemplate = namedtuple('ProcessTemplate', ['key', 'name', 'version', 'steps', 'source'])
+
+
+def parse_duration_days(duration):
+    """'0.5 day' -> 0.5, '5 days' -> 5.0, anything else -> None"""
+    match = DURATION_PATTERN.search(duration or '')
+    return float(match.group(1)) if match else None
+
+
+def step_key(number, title, duration):
+    """Legacy step key, e.g. "1. FINALIZE DEAL DOCUMENTATION (1 day)" """
+    return f"{number}. {title} ({duration})" if duration else f"{number}. {title}"
+
+
+def compile_template(data, source=None):
+    """Validate a template document and compile it into a ProcessTemplate"""
+    key = (data.get('key') or '').strip()
+    if not key:
+        raise ValueError("template has no 'key'")
+    raw_steps = data.get('steps') or []
+    if not raw_steps:
+        raise ValueError(f"template '{key}' has no steps")
+
+    steps = []
+    for expected, raw in enumerate(sorted(raw_steps, key=lambda s: s.get('number') or 0), start=1):
+        missing = [field for field in REQUIRED_STEP_FIELDS if not raw.get(field)]
+        if missing:
+            raise ValueError(f"template '{key}' step {raw.get('number')} is missing {', '.join(missing)}")
+        if int(raw['number']) != expected:
+            raise ValueError(f"template '{key}' steps must be numbered 1..n, got {raw['number']} at position {expected}")
+        duration = (raw.get('duration') or '').strip()
+        steps.append(ProcessStep(
+            number=expected,
+            title=raw['title'].strip(),
+            duration=duration,
+            duration_days=parse_duration_days(duration),
+            responsible=raw['responsible'].strip(),
+            activities=raw['activities'],
+            deliverable=raw['deliverable'],
+            key=step_key(expected, raw['title'].strip(), duration)
+        ))
+
+    return ProcessTemplate(key=key, name=data.get('name') or key, version=data.get('version', 1),
+                           steps=tuple(steps), source=source)
+
+
+class ProcessRegistry:
+    """One immutable snapshot of all compiled templates"""
+
+    def __init__(self, templates, version):
+        self.templates = templates
+        self.version = version
+        # {process: {step key: {responsible, activities, deliverable}}}, built once per snapshot
+        self._legacy = {
+            key: {
+                step.key: {
+                    "responsible": step.responsible,
+                    "activities": step.activities,
+                    "deliverable": step.deliverable
+                }
+                for step in template.steps
+            }
+            for key, template in templates.items()
+        }
+
+    def get(self, key):
+        return self.templates.get(key)
+
+    def keys(self):
+        return list(self.templates.keys())
+
+    def as_legacy_dict(self):
+        """Registry in the original predefined_processes shape (shared - treat as read-only)"""
+        return self._legacy
+
+
+def load_templates(directory=PROCESS_TEMPLATES_DIR):
+    """Compile every *.json template in `directory` -> ({key: ProcessTemplate}, content digest)"""
+    templates = {}
+    digest = hashlib.sha1()
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.json'):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            with open(path, encoding='utf-8') as handle:
+                content = handle.read()
+            template = compile_template(json.loads(content), source=path)
+        except Exception as e:
+            print(f"❌ Skipping process template {name}: {e}")
+            continue
+        if template.key in templates:
+            print(f"⚠️ Duplicate process template key '{template.key}' in {name}, keeping {templates[template.key].source}")
+            continue
+        templates[template.key] = template
+        digest.update(name.encode('utf-8'))
+        digest.update(content.encode('utf-8'))
+    return templates, digest.hexdigest()[:12]
+
+
+def _directory_signature(directory):
+    try:
+        return tuple(sorted(
+            (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+            for entry in os.scandir(directory) if entry.name.endswith('.json')
+        ))
+    except OSError:
+        return None
+
+
+_registry = None
+_registry_signature = None
+_registry_checked_at = 0.0
+_registry_lock = threading.Lock()
+
+
+def get_process_registry():
+    """Return the current registry snapshot, reloading it when the template files changed"""
+    global _registry, _registry_signature, _registry_checked_at
+
+    now = time.time()
+    if _registry is not None and now - _registry_checked_at < PROCESS_TEMPLATES_CHECK_SECONDS:
+        return _registry
+
+    with _registry_lock:
+        if _registry is not None and now - _registry_checked_at < PROCESS_TEMPLATES_CHECK_SECONDS:
+            return _registry
+        _registry_checked_at = now
+        signature = _directory_signature(PROCESS_TEMPLATES_DIR)
+        if _registry is not None and signature == _registry_signature:
+            return _registry
+
+        try:
+            templates, version = load_templates(PROCESS_TEMPLATES_DIR)
+        except OSError as e:
+            print(f"❌ Failed to read process templates from {PROCESS_TEMPLATES_DIR}: {e}")
+            templates, version = {}, None
+
+        _registry_signature = signature
+        if not templates and _registry is not None:
+            print("⚠️ No process templates loaded, keeping the previous registry")
+            return _registry
+        if _registry is None or version != _registry.version:
+            if _registry is not None:
+                print(f"🔄 Process templates reloaded: {', '.join(templates)} (version {version})")
+            _registry = ProcessRegistry(templates, version)
+        return _registry
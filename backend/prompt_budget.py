@@ -0,0 +1,143 @@
+"""
+Prompt Budgeting
+
+Keeps LLM prompts inside a token budget instead of growing with headcount:
+- estimate_tokens(): local token estimate (no tokenizer download, no API call)
+- compact_json(): JSON without indentation or spaces after separators
+- compact_record(): per-field truncation (long text cut to a token limit,
+  lists cut to a number of items, empty fields dropped)
+- build_candidate_prompt(): fills a prompt with as many ranked candidates
+  (best first) as fit the budget and reports what it produced
+
+The estimator follows the shape of OpenAI's BPE tokenizers (common words are
+one token, long words several, digits in groups of three, every symbol one)
+and errs on the high side, which is what a budget needs.
+
+Usage:
+    prompt, stats = build_candidate_prompt(
+        lambda candidates_json: f"...EMPLOYEES: {candidates_json}...",
+        ranked_profiles, budget=PROMPT_TOKEN_BUDGET)
+"""
+import os
+import re
+import json
+
+# Token budget for a recommendation prompt (instructions + candidates)
+PROMPT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', '3000'))
+# Never send more candidates than this, whatever the budget
+PROMPT_MAX_CANDIDATES = int(os.getenv('PROMPT_MAX_CANDIDATES', '15'))
+
+# Per-field limits for employee profiles: int = max tokens for text, ('items', n) = max list items
+EMPLOYEE_FIELD_LIMITS = {
+    'google_drive_jd': int(os.getenv('PROMPT_JD_TOKENS', '150')),
+    'title': 20,
+    'role': 20,
+    'department': 15,
+    'skills': ('items', 10),
+    'strengths': ('items', 5),
+}
+
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d{1,3}|\s{2,}|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text):
+    """Approximate GPT token count of `text`"""
+    if not text:
+        return 0
+    if not isinstance(text, str):
+        text = compact_json(text)
+    tokens = 0
+    for piece in _TOKEN_PATTERN.findall(text):
+        if piece[0].isalpha():
+            # Up to ~6 letters is usually a single token
+            tokens += 1 + (len(piece) - 1) // 6
+        else:
+            tokens += 1
+    return tokens
+
+
+def compact_json(value):
+    """Smallest JSON encoding of `value`"""
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def truncate_text(text, max_tokens):
+    """Cut `text` to about `max_tokens` at a word boundary, marking the cut with '…'"""
+    if not text or estimate_tokens(text) <= max_tokens:
+        return text
+    words = text.split()
+    kept, used = [], 0
+    for word in words:
+        cost = estimate_tokens(word)
+        if used + cost > max_tokens:
+            break
+        kept.append(word)
+        used += cost
+    return ' '.join(kept) + '…'
+
+
+def compact_record(record, field_limits=None):
+    """
+    Copy of `record` without empty values and with per-field limits applied.
+
+    Returns:
+        tuple: (compacted record, list of truncated field names)
+    """
+    field_limits = field_limits or {}
+    compacted, truncated = {}, []
+    for key, value in record.items():
+        if value in (None, '', [], {}):
+            continue
+        limit = field_limits.get(key)
+        if isinstance(limit, tuple) and isinstance(value, list):
+            if len(value) > limit[1]:
+                value = value[:limit[1]]
+                truncated.append(key)
+        elif isinstance(limit, int) and isinstance(value, str):
+            shortened = truncate_text(value, limit)
+            if shortened != value:
+                value = shortened
+                truncated.append(key)
+        compacted[key] = value
+    return compacted, truncated
+
+
+def build_candidate_prompt(render, candidates, budget=PROMPT_TOKEN_BUDGET, field_limits=None,
+                           max_candidates=PROMPT_MAX_CANDIDATES, min_candidates=1):
+    """
+    Build a prompt holding as many candidates as fit in `budget` tokens.
+
+    Args:
+        render: Function (candidates JSON string) -> full prompt text
+        candidates: Candidate dicts ranked best first; lower-ranked ones are dropped first
+        budget: Token budget for the whole prompt
+        field_limits: Per-field limits passed to compact_record()
+        max_candidates: Hard cap on included candidates
+        min_candidates: Included even if they exceed the budget
+
+    Returns:
+        tuple: (prompt, stats) - stats has prompt_tokens, budget, candidates_total,
+        candidates_included and fields_truncated, for recording in ai_meta
+    """
+    used = estimate_tokens(render('[]'))
+    included, fields_truncated = [], 0
+    for candidate in candidates[:max_candidates]:
+        compacted, truncated = compact_record(candidate, field_limits)
+        cost = estimate_tokens(compact_json(compacted)) + 1  # + separator
+        if used + cost > budget and len(included) >= min_candidates:
+            break
+        included.append(compacted)
+        fields_truncated += len(truncated)
+        used += cost
+
+    prompt = render(compact_json(included))
+    stats = {
+        'prompt_tokens': estimate_tokens(prompt),
+        'budget': budget,
+        'candidates_total': len(candidates),
+        'candidates_included': len(included),
+        'fields_truncated': fields_truncated
+    }
+    if len(included) < len(candidates):
+        print(f"✂️ Prompt budget: {len(included)}/{len(candidates)} candidates, ~{stats['prompt_tokens']} tokens")
+    return prompt, stats
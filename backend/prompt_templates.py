@@ -0,0 +1,205 @@
+"""
+Prompt Templates
+
+Versioned prompts for the AI call sites, laid out for provider prompt
+caching: OpenAI caches the longest prompt prefix it has seen recently, so
+everything that is the same for every request comes first and per-request
+data (goal title, objective number, employee profile) comes last.
+
+A template renders to chat messages in this order:
+1. system message               - static
+2. instructions                 - static (rules, department structure, JSON schema)
+3. shared context (optional)    - same for many requests (e.g. the process steps)
+4. request data                 - `variables`, formatted with the request values
+
+`id` ("custom_tasks@v2") is recorded on ai_meta so results can be traced to
+the prompt that produced them. Bump `version` whenever the static text
+changes; `prefix_hash()` identifies the cacheable prefix.
+
+Usage:
+    template = get_prompt_template('jd_scoring')
+    messages = template.render(task_title=..., task_description=..., name=..., role=..., ...)
+    prompt = messages[-1]['content']
+"""
+import hashlib
+
+
+class PromptTemplate:
+    """Static instructions first, request data last"""
+
+    def __init__(self, name, version, system, instructions, variables):
+        self.name = name
+        self.version = version
+        self.system = system.strip()
+        self.instructions = instructions.strip()
+        self.variables = variables.strip()
+
+    @property
+    def id(self):
+        return f"{self.name}@v{self.version}"
+
+    def prefix(self, shared=None):
+        """The part of the user message that is identical for every request (with the same shared context)"""
+        parts = [self.instructions]
+        if shared:
+            parts.append(shared.strip())
+        return "\n\n".join(parts) + "\n\n"
+
+    def prefix_hash(self, shared=None):
+        return hashlib.sha1((self.system + "\x00" + self.prefix(shared)).encode('utf-8')).hexdigest()[:12]
+
+    def render(self, shared=None, **values):
+        """Chat messages for one request; only `variables` is formatted with `values`"""
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": self.prefix(shared) + self.variables.format(**values)}
+        ]
+
+
+CUSTOM_TASKS = PromptTemplate(
+    name='custom_tasks',
+    version=2,
+    system="You are a task planning expert. Return ONLY valid JSON in the exact format specified. "
+           "Do not include markdown, code blocks, or any text outside the JSON.",
+    instructions="""
+You are generating tasks for a NON-DELIVERY goal. Create 5-8 appropriate, customized tasks for the goal described at the end.
+
+DEPARTMENT STRUCTURE:
+- SUPPLY CHAIN: Logistics, inventory, customs, transport
+- SALES: Client relationships, deals, partnerships
+- PRODUCT: Quality, specifications, testing
+- FINANCE & ADMIN: Payments, compliance, administration
+
+TASK FOCUS AREAS:
+- Strategic planning and analysis
+- Research and development
+- Partnership building
+- Market analysis
+- Process improvement
+- Training and development
+
+REQUIRED JSON FORMAT (strategic_analysis first, then tasks):
+{
+  "strategic_analysis": {
+    "context": "Overall strategic context",
+    "objective": "<goal title>",
+    "process": "Custom AI Task Generation",
+    "delivery": "<goal deadline>",
+    "reporting_requirements": "Progress updates and completion reports",
+    "goal_type": "custom"
+  },
+  "tasks": [
+    {
+      "task_description": "Clear, specific task description",
+      "priority": "high|medium|low",
+      "estimated_hours": 8,
+      "due_date": "YYYY-MM-DD",
+      "assigned_role": "Account Executive|Product Development Manager|Supply Chain Specialist|Commercial and Finance Specialist",
+      "required_skills": ["Skill 1", "Skill 2"],
+      "success_criteria": "What success looks like",
+      "context": "Task context and background"
+    }
+  ]
+}
+
+Generate 5-8 tasks. Return ONLY valid JSON in the exact format above. Do not include markdown code blocks.
+""",
+    variables="""
+GOAL INFORMATION:
+- Title: {title}
+- Description: {description}
+- Output/Goal: {output}
+- Deadline: {deadline}
+"""
+)
+
+DELIVERY_TASKS = PromptTemplate(
+    name='delivery_tasks',
+    version=2,
+    system="Return ONLY valid JSON. Generate exactly 13 tasks using the 13-step delivery process.",
+    instructions="""
+You are generating tasks for a DELIVERY/PROCUREMENT goal. Use the EXACT 13-step Order-to-Delivery process below.
+
+Generate EXACTLY 13 tasks following this process exactly. For each task:
+1. Use the EXACT process step title as task_description
+2. Include due_date within Q4 2025
+3. Use appropriate priority (high/medium/low)
+4. Set estimated_hours between 4-16 hours
+5. CRITICAL: Use the EXACT assigned_role from the standard process step - DO NOT CHANGE IT
+6. Reference the objective number in strategic_context
+
+IMPORTANT: The assigned_role MUST match exactly the "responsible" field from the corresponding step in the standard process. Do not modify or change the role names.
+
+Return ONLY valid JSON with exactly 13 tasks in this format:
+{
+    "tasks": [
+        {
+            "task_description": "1. FINALIZE DEAL DOCUMENTATION (1 day): Complete agreement, Proforma Invoice (PI), and other commercial terms",
+            "due_date": "2025-11-05",
+            "priority": "high",
+            "estimated_hours": 8,
+            "assigned_role": "Account Executive",
+            "strategic_context": "Executing step 1 for objective <objective number>"
+        },
+        ... // 12 more tasks
+    ]
+}
+""",
+    variables="""
+OBJECTIVE: {objective_number} - {title}
+DESCRIPTION: {description}
+OUTPUT: {output}
+"""
+)
+
+JD_SCORING = PromptTemplate(
+    name='jd_scoring',
+    version=2,
+    system="You are an HR expert. Return ONLY valid JSON. Do not include markdown or code blocks.",
+    instructions="""
+You are an HR expert analyzing employee-task fit using Job Descriptions and role information.
+
+Analyze how well the employee at the end matches the task requirements based on:
+1. **Role alignment** - How well does the employee's role match the task requirements?
+2. **Job Description analysis** - If JD is available, analyze the JD content against task requirements
+3. **Department relevance** - Is the employee's department relevant to the task?
+4. **Skills match** - Do the employee's skills align with task requirements?
+5. **Experience level** - Does the employee have appropriate experience?
+
+**IMPORTANT:** Prioritize role and JD analysis. If JD is available, use it to assess fit. If not, rely on role, department, and skills.
+
+Return ONLY valid JSON in this exact format:
+{
+    "fit_score": 85,
+    "skills_match": 90,
+    "role_alignment": 80,
+    "jd_relevance": 75,
+    "overall_fit": "excellent",
+    "key_qualifications": ["Qualification 1", "Qualification 2", "Qualification 3"],
+    "reason": "Detailed explanation of why this employee is suitable for the task",
+    "confidence": "high"
+}
+
+Fit score should be 0-100 based on overall match.
+""",
+    variables="""
+TASK REQUIREMENTS:
+Title: {task_title}
+Description: {task_description}
+
+EMPLOYEE PROFILE:
+- Name: {name}
+- Role: {role}
+- Title: {title}
+- Department: {department}
+- Skills: {skills}
+- Job Description Available: {jd_available}
+"""
+)
+
+PROMPT_TEMPLATES = {template.name: template for template in (CUSTOM_TASKS, DELIVERY_TASKS, JD_SCORING)}
+
+
+def get_prompt_template(name):
+    """Return the current template for a call site"""
+    return PROMPT_TEMPLATES[name]
@@ -0,0 +1,215 @@
+"""
+Recommendation Result Cache
+
+Memoizes employee recommendations so regenerating them for a task whose
+content did not change returns the previous result instead of rerunning the
+pipeline (and its JD analysis LLM calls).
+
+An entry is keyed by:
+- a hash of the task content (task_description + recommended_role) and the
+  assignment strategy (role matching or full RAG)
+- the employee directory version: a hash of the (id, updated_at) pairs of
+  the active employees, so creating, editing, deactivating or deleting any
+  employee changes the key
+- the scoring algorithm version: RECOMMENDATION_ALGORITHM_VERSION plus the
+  JD scoring prompt template id, bumped whenever scoring changes
+
+Old entries are never invalidated explicitly - their keys simply stop being
+looked up. Entries live in memory (LRU) and on disk, so all workers share
+them; files older than RECOMMENDATION_CACHE_TTL_SECONDS are pruned.
+
+Usage:
+    cache = get_recommendation_cache()
+    key = cache.key_for(task_description, recommended_role, strategy, employees)
+    entry = cache.get(key)
+    if entry is None:
+        ...
+        cache.put(key, recommendations, assignment_strategy=strategy, ai_meta_id=ai_meta_id)
+"""
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+from prompt_templates import get_prompt_template
+
+# Bump when the recommendation scoring changes so cached results are recomputed
+RECOMMENDATION_ALGORITHM_VERSION = os.getenv('RECOMMENDATION_ALGORITHM_VERSION', 'rag-3')
+RECOMMENDATION_CACHE_DIR = os.getenv('RECOMMENDATION_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'erp_recommendation_cache'))
+RECOMMENDATION_CACHE_TTL_SECONDS = int(os.getenv('RECOMMENDATION_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+RECOMMENDATION_CACHE_MEMORY_ENTRIES = int(os.getenv('RECOMMENDATION_CACHE_MEMORY_ENTRIES', '512'))
+RECOMMENDATION_CACHE_PRUNE_EVERY = 100
+
+
+def algorithm_version():
+    """Scoring algorithm version, including the JD scoring prompt in use"""
+    return f"{RECOMMENDATION_ALGORITHM_VERSION}+{get_prompt_template('jd_scoring').id}"
+
+
+def directory_version(employees):
+    """
+    Version of the employee directory a recommendation was computed over.
+
+    Rows without `updated_at` contribute their full content instead.
+    """
+    digest = hashlib.sha256()
+    for employee in sorted(employees, key=lambda row: str(row.get('id'))):
+        if employee.get('updated_at') is not None:
+            digest.update(f"{employee.get('id')}|{employee['updated_at']}\n".encode('utf-8'))
+        else:
+            digest.update(json.dumps(employee, sort_keys=True, default=str).encode('utf-8') + b"\n")
+    return digest.hexdigest()[:16]
+
+
+def task_content_hash(task_description, recommended_role):
+    """Hash of the task content recommendations depend on"""
+    content = f"{(task_description or '').strip()}\x00{(recommended_role or '').strip().lower()}"
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:24]
+
+
+class RecommendationCache:
+    """Recommendation results by (task content, directory version, algorithm version)"""
+
+    def __init__(self, cache_dir=RECOMMENDATION_CACHE_DIR, ttl_seconds=RECOMMENDATION_CACHE_TTL_SECONDS,
+                 memory_entries=RECOMMENDATION_CACHE_MEMORY_ENTRIES):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'stores': 0}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key_for(self, task_description, recommended_role, strategy, employees=None, directory=None):
+        """
+        Cache key for a task's recommendations over `employees` (the active directory).
+
+        Pass `directory` (from directory_version) instead when keying many tasks.
+        """
+        parts = [
+            algorithm_version(),
+            strategy or '',
+            task_content_hash(task_description, recommended_role),
+            directory or directory_version(employees or [])
+        ]
+        return hashlib.sha256("|".join(parts).encode('utf-8')).hexdigest()[:40]
+
+    def get(self, key):
+        """Cached entry for `key`, or None"""
+        entry = self._load_entry(key)
+        with self._lock:
+            if entry is None or time.time() - entry.get('created_at', 0) > self.ttl_seconds:
+                self._counters['misses'] += 1
+                return None
+            self._counters['hits'] += 1
+            return entry
+
+    def put(self, key, recommendations, **details):
+        """Store a completed result; `details` (strategy, ai_meta_id, ...) are kept alongside"""
+        entry = {
+            'key': key,
+            'recommendations': recommendations,
+            'algorithm_version': algorithm_version(),
+            'created_at': time.time(),
+            **details
+        }
+        with self._lock:
+            self._remember(key, entry)
+            self._counters['stores'] += 1
+            prune = self._counters['stores'] % RECOMMENDATION_CACHE_PRUNE_EVERY == 0
+        try:
+            # Write to a temp file and rename so readers in other workers never see partial JSON
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{key}.", suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, default=str)
+            os.replace(tmp_path, self._entry_path(key))
+        except Exception as e:
+            print(f"⚠️ Failed to persist recommendation cache entry {key}: {e}")
+        if prune:
+            self.prune()
+        return entry
+
+    def clear(self):
+        """Drop every entry (memory and disk)"""
+        with self._lock:
+            self._entries.clear()
+        for name in os.listdir(self.cache_dir):
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+
+    def prune(self):
+        """Delete entry files older than the TTL"""
+        removed = 0
+        cutoff = time.time() - self.ttl_seconds
+        try:
+            for name in os.listdir(self.cache_dir):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except FileNotFoundError:
+                    pass
+        except Exception as e:
+            print(f"⚠️ Failed to prune recommendation cache: {e}")
+        return removed
+
+    def stats(self):
+        """Cache counters for health/debug endpoints"""
+        with self._lock:
+            return {
+                'entries_in_memory': len(self._entries),
+                'algorithm_version': algorithm_version(),
+                'cache_dir': self.cache_dir,
+                **self._counters
+            }
+
+    # ---------- storage ----------
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.memory_entries:
+            self._entries.popitem(last=False)
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load_entry(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        try:
+            with open(self._entry_path(key), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable recommendation cache entry {key}: {e}")
+            return None
+
+        with self._lock:
+            self._remember(key, entry)
+        return entry
+
+
+_recommendation_cache = None
+_recommendation_cache_lock = threading.Lock()
+
+
+def get_recommendation_cache():
+    """Return the process-wide recommendation result cache"""
+    global _recommendation_cache
+    if _recommendation_cache is None:
+        with _recommendation_cache_lock:
+            if _recommendation_cache is None:
+                _recommendation_cache = RecommendationCache()
+    return _recommendation_cache
@@ -0,0 +1,245 @@
+"""
+Role Router
+
+Maps a task description to the role responsible for it in the predefined
+processes (Lead-to-Delivery, Order-to-Delivery, Stock-to-Delivery).
+
+The router is compiled from the process registry (process_registry.py):
+every phrase points at a (process, step number) and the role is read from
+that step's `responsible` field, so roles are never duplicated here. Phrases come
+from, in priority order:
+1. EXTRA_ROLE_PHRASES - hand-picked phrases that show up in task descriptions
+2. The step titles of every registered process
+3. Step number references ("step 4", "4.") for the Order-to-Delivery process
+
+All phrases are compiled into one matcher; a lookup is a single pass over the
+task text and returns the matched phrase with the highest priority. Results
+are memoized by task description hash, and the router rebuilds itself when
+the registry version changes (a template file was added, edited or removed).
+"""
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+from process_registry import get_process_registry
+from keyword_matcher import KeywordMatcher
+
+ROLE_ROUTER_CHECK_SECONDS = float(os.getenv('ROLE_ROUTER_CHECK_SECONDS', '5'))
+ROLE_ROUTER_MEMO_SIZE = int(os.getenv('ROLE_ROUTER_MEMO_SIZE', '2048'))
+
+# Process used for bare step number references ("step 4", "4.")
+STEP_NUMBER_PROCESS = 'order_to_delivery'
+
+# Phrase -> (process, step number), highest priority first
+EXTRA_ROLE_PHRASES = [
+    # Lead-to-Delivery Process Steps
+    ("lead generation", 'lead_to_delivery', 1),
+    ("lead capture", 'lead_to_delivery', 1),
+    ("lead qualification", 'lead_to_delivery', 2),
+    ("needs analysis", 'lead_to_delivery', 2),
+    ("proposal offering", 'lead_to_delivery', 3),
+    ("commercial proposal", 'lead_to_delivery', 3),
+    ("negotiation", 'lead_to_delivery', 4),
+    ("closing the deal", 'lead_to_delivery', 5),
+    ("signed agreements", 'lead_to_delivery', 5),
+
+    # Order-to-Delivery Process Steps
+    # Step 1 - Finalize deal documentation
+    ("finalize deal", 'order_to_delivery', 1),
+    ("deal documentation", 'order_to_delivery', 1),
+    ("proforma invoice", 'order_to_delivery', 1),
+    ("commercial agreement", 'order_to_delivery', 1),
+    ("signed pi", 'order_to_delivery', 1),
+    ("commercial terms", 'order_to_delivery', 1),
+
+    # Step 2 - Supplier stock order confirmation
+    ("supplier stock", 'order_to_delivery', 2),
+    ("stock order", 'order_to_delivery', 2),
+    ("kenya suppliers", 'order_to_delivery', 2),
+    ("stock availability", 'order_to_delivery', 2),
+    ("inventory reservation", 'order_to_delivery', 2),
+    ("order confirmation", 'order_to_delivery', 2),
+    ("final pricing", 'order_to_delivery', 2),
+    ("supplier coordination", 'order_to_delivery', 2),
+
+    # Step 3 - Product management approval
+    ("product management", 'order_to_delivery', 3),
+    ("product approval", 'order_to_delivery', 3),
+    ("product validation", 'order_to_delivery', 3),
+    ("quality standards", 'order_to_delivery', 3),
+    ("specification approval", 'order_to_delivery', 3),
+    ("technical assessment", 'order_to_delivery', 3),
+    ("product acceptance", 'order_to_delivery', 3),
+
+    # Step 4 - Foreign currency permit application
+    ("foreign currency", 'order_to_delivery', 4),
+    ("bank permit", 'order_to_delivery', 4),
+    ("currency permit", 'order_to_delivery', 4),
+    ("bank permits", 'order_to_delivery', 4),
+
+    # Step 5 - Supplier payment processing
+    ("supplier payment", 'order_to_delivery', 5),
+    ("payment processing", 'order_to_delivery', 5),
+    ("process payment", 'order_to_delivery', 5),
+    ("export documentation", 'order_to_delivery', 5),
+    ("payment confirmation", 'order_to_delivery', 5),
+
+    # Step 6 - Transportation logistics arrangement
+    ("transportation logistics", 'order_to_delivery', 6),
+    ("transport arrangement", 'order_to_delivery', 6),
+    ("appropriate truck", 'order_to_delivery', 6),
+    ("kenya operation", 'order_to_delivery', 6),
+
+    # Step 7 - Kenya side dispatch & clearance
+    ("kenya side", 'order_to_delivery', 7),
+    ("kenya dispatch", 'order_to_delivery', 7),
+    ("kenya clearance", 'order_to_delivery', 7),
+    ("kenyan customs", 'order_to_delivery', 7),
+    ("kenya border", 'order_to_delivery', 7),
+    ("kenya moyale", 'order_to_delivery', 7),
+
+    # Step 8 - Ethiopian customs clearance
+    ("ethiopian customs", 'order_to_delivery', 8),
+    ("ethiopian clearance", 'order_to_delivery', 8),
+    ("customs clearance", 'order_to_delivery', 8),
+    ("1st payment", 'order_to_delivery', 8),
+    ("permit value", 'order_to_delivery', 8),
+
+    # Step 9 - Tax reassessment & final payment
+    ("tax reassessment", 'order_to_delivery', 9),
+    ("2nd tax", 'order_to_delivery', 9),
+    ("final payment", 'order_to_delivery', 9),
+    ("tax payment", 'order_to_delivery', 9),
+
+    # Step 10 - Product loading & dispatch
+    ("product loading", 'order_to_delivery', 10),
+    ("dispatch coordination", 'order_to_delivery', 10),
+    ("product dispatch", 'order_to_delivery', 10),
+
+    # Step 11 - Transport monitoring
+    ("transport monitoring", 'order_to_delivery', 11),
+    ("truck movement", 'order_to_delivery', 11),
+    ("truck tracking", 'order_to_delivery', 11),
+
+    # Step 12 - Final delivery & warehouse handover
+    ("final delivery", 'order_to_delivery', 12),
+    ("warehouse handover", 'order_to_delivery', 12),
+    ("customer delivery", 'order_to_delivery', 12),
+    ("customer warehouse", 'order_to_delivery', 12),
+
+    # Step 13 - Post-delivery documentation & settlement
+    ("post-delivery", 'order_to_delivery', 13),
+    ("financial settlements", 'order_to_delivery', 13),
+    ("document archiving", 'order_to_delivery', 13),
+    ("lesson learned", 'order_to_delivery', 13),
+    ("closed order", 'order_to_delivery', 13),
+]
+
+class RoleRouter:
+    """Compiled phrase -> responsible role index for one registry snapshot"""
+
+    def __init__(self, registry, extra_phrases=EXTRA_ROLE_PHRASES, memo_size=ROLE_ROUTER_MEMO_SIZE):
+        self.memo_size = memo_size
+        self._memo = OrderedDict()
+        self._memo_lock = threading.Lock()
+
+        self.version = registry.version
+        steps = {}
+        for process_key, template in registry.templates.items():
+            for step in template.steps:
+                steps[(process_key, step.number)] = (step.title, step.responsible)
+
+        # phrase -> (rank, role, source); the first (highest priority) definition wins
+        self.routes = {}
+
+        def add(phrase, role, source):
+            phrase = phrase.lower()
+            if phrase and role and phrase not in self.routes:
+                self.routes[phrase] = (len(self.routes), role, source)
+
+        for phrase, process_key, number in extra_phrases:
+            step = steps.get((process_key, number))
+            if step:
+                add(phrase, step[1], f"{process_key} step {number}")
+            else:
+                print(f"⚠️ Role phrase '{phrase}' points at unknown step {process_key} #{number}")
+
+        for (process_key, number), (title, role) in steps.items():
+            add(title, role, f"{process_key} step {number}")
+
+        for (process_key, number), (_, role) in sorted(steps.items(), key=lambda item: item[0][1]):
+            if process_key != STEP_NUMBER_PROCESS:
+                continue
+            for phrase in (f"step {number}", f"step{number}", f"{number}."):
+                add(phrase, role, f"{process_key} step {number}")
+
+        self._matcher = KeywordMatcher(self.routes.keys()) if self.routes else None
+
+    def route(self, task_description):
+        """
+        Return (role, matched phrase) for a task description, (None, None) if no phrase matches.
+        """
+        if not task_description or not self._matcher:
+            return None, None
+
+        digest = hashlib.sha1(task_description.encode('utf-8')).hexdigest()
+        with self._memo_lock:
+            if digest in self._memo:
+                self._memo.move_to_end(digest)
+                return self._memo[digest]
+
+        found = self._matcher.find(task_description.lower())
+        if found:
+            phrase = min(found, key=lambda p: self.routes[p][0])
+            result = (self.routes[phrase][1], phrase)
+        else:
+            result = (None, None)
+
+        with self._memo_lock:
+            self._memo[digest] = result
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return result
+
+
+_router = None
+_router_checked_at = 0.0
+_router_lock = threading.Lock()
+
+
+def get_role_router():
+    """Return the shared router (None if it could not be built), rebuilding it when the process templates changed"""
+    global _router, _router_checked_at
+
+    now = time.time()
+    if _router is not None and now - _router_checked_at < ROLE_ROUTER_CHECK_SECONDS:
+        return _router
+
+    with _router_lock:
+        if _router is not None and now - _router_checked_at < ROLE_ROUTER_CHECK_SECONDS:
+            return _router
+        _router_checked_at = now
+        try:
+            registry = get_process_registry()
+            if _router is not None and registry.version == _router.version:
+                return _router
+            if _router is not None:
+                print("🔄 Process templates changed, rebuilding role router")
+            _router = RoleRouter(registry)
+        except Exception as e:
+            print(f"❌ Failed to build role router: {e}")
+        return _router
+
+
+def route_task_to_role(task_description):
+    """Return (role, matched phrase) for a task description"""
+    router = get_role_router()
+    if router is None:
+        return None, None
+    return router.route(task_description)
+
+
+# Build at import so the first request doesn't pay for it
+get_role_router()
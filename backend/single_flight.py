@@ -0,0 +1,150 @@
+"""
+Single-Flight Request Coalescing
+
+Stops duplicate AI requests (double-clicked "Recommend Employee", Streamlit
+retry buttons re-POSTing a goal) from each creating an `ai_meta` record and
+running the full LLM pipeline again.
+
+A request is identified by (operation, entity id, hash of its inputs). The
+key is stored in `ai_meta.input_json['single_flight_key']` of the record that
+tracks the work, so:
+1. Within one worker, identical requests are serialized on a per-key lock -
+   the second one waits for the first to create its ai_meta record
+2. Across gunicorn workers, the ai_meta table is checked for a record with
+   the same key that is still starting/processing and recent enough
+3. A match means the caller attaches to that record and returns its
+   `ai_meta_id` instead of starting new work
+
+Usage:
+    flight = get_single_flight().begin('rag_recommendations', task_id, {...})
+    try:
+        if flight.existing:
+            return <response with flight.existing['id']>
+        ... create ai_meta with input_json['single_flight_key'] = flight.key ...
+    finally:
+        flight.release()
+"""
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime, timedelta
+
+SINGLE_FLIGHT_WINDOW_SECONDS = int(os.getenv('SINGLE_FLIGHT_WINDOW_SECONDS', '600'))
+SINGLE_FLIGHT_LOCK_TIMEOUT = float(os.getenv('SINGLE_FLIGHT_LOCK_TIMEOUT', '15'))
+
+# ai_meta output_json statuses that mean the work is still going
+IN_FLIGHT_STATUSES = ('starting', 'processing', 'queued')
+
+
+def get_supabase_client():
+    supabase_url = os.getenv('SUPABASE_URL')
+    supabase_key = os.getenv('SUPABASE_SERVICE_KEY')
+    if not supabase_url or not supabase_key:
+        raise Exception("Supabase credentials not configured")
+    from supabase import create_client
+    return create_client(supabase_url, supabase_key)
+
+
+def make_flight_key(operation, entity_id, inputs=None):
+    """Stable key for (operation, entity, inputs)"""
+    digest = hashlib.sha256(
+        json.dumps(inputs or {}, sort_keys=True, default=str).encode('utf-8')
+    ).hexdigest()[:16]
+    return f"{operation}:{entity_id}:{digest}"
+
+
+class Flight:
+    """One caller's view of a single-flight key"""
+
+    def __init__(self, single_flight, key, lock, existing):
+        self.single_flight = single_flight
+        self.key = key
+        self.existing = existing
+        self._lock = lock
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self.single_flight._release(self.key, self._lock)
+
+
+class SingleFlight:
+    """Coalesces identical in-flight requests onto one ai_meta record"""
+
+    def __init__(self, client_factory=get_supabase_client, window_seconds=SINGLE_FLIGHT_WINDOW_SECONDS,
+                 lock_timeout=SINGLE_FLIGHT_LOCK_TIMEOUT):
+        self.client_factory = client_factory
+        self.window_seconds = window_seconds
+        self.lock_timeout = lock_timeout
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def begin(self, operation, entity_id, inputs=None):
+        """
+        Start (or join) the flight for a request.
+
+        Returns:
+            Flight: `existing` is the in-flight ai_meta row ({id, input_json,
+            output_json}) to attach to, or None if the caller should start the
+            work. Always call `release()` once the ai_meta record is created.
+        """
+        key = make_flight_key(operation, entity_id, inputs)
+        lock = self._acquire(key)
+        existing = self.find_in_flight(key)
+        if existing:
+            print(f"🔁 Coalesced duplicate {operation} request for {entity_id} onto AI meta {existing['id']}")
+        return Flight(self, key, lock, existing)
+
+    def find_in_flight(self, key):
+        """Most recent ai_meta row for `key` that is still in flight, or None"""
+        try:
+            supabase = self.client_factory()
+            since = (datetime.utcnow() - timedelta(seconds=self.window_seconds)).isoformat()
+            result = supabase.table("ai_meta").select("id, input_json, output_json, created_at").eq(
+                "input_json->>single_flight_key", key
+            ).gte("created_at", since).order("created_at", desc=True).limit(1).execute()
+        except Exception as e:
+            print(f"⚠️ Single-flight lookup failed, starting new work: {e}")
+            return None
+
+        for row in result.data or []:
+            status = (row.get('output_json') or {}).get('status')
+            if status in IN_FLIGHT_STATUSES:
+                return row
+        return None
+
+    def _acquire(self, key):
+        with self._lock:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        if entry[0].acquire(timeout=self.lock_timeout):
+            return entry[0]
+        # Holder is stuck - don't block the request, the ai_meta lookup still dedupes
+        print(f"⚠️ Single-flight lock timeout for {key}")
+        return None
+
+    def _release(self, key, lock):
+        if lock is not None:
+            lock.release()
+        with self._lock:
+            entry = self._locks.get(key)
+            if entry:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    del self._locks[key]
+
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight():
+    """Return the process-wide single-flight coordinator"""
+    global _single_flight
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight()
+    return _single_flight
@@ -8,19 +8,37 @@ from openai import OpenAI
 from flask import g
 import time
 import threading
-from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
 from dotenv import load_dotenv
 import re
+import math
 import traceback
 import threading
-import backoff
 import threading
-import io
-import requests
-import PyPDF2
-import docx
-from docx import Document
 from predefined_processes import get_predefined_processes_registry
+from process_registry import get_process_registry
+from prompt_templates import get_prompt_template
+from employee_features import get_employee_feature_store, canonical_skills
+from employee_workload import get_workload_store, load_penalty, workload_summary, task_assignees, remaining_hours
+from assignment_optimizer import (
+    optimize_assignments, ASSIGNMENT_CAPACITY_HOURS, ASSIGNMENT_MAX_TASKS_PER_EMPLOYEE
+)
+from jd_document_cache import get_jd_document_cache
+from recommendation_cache import get_recommendation_cache, directory_version
+from document_extraction import extract_document_text
+from role_router import route_task_to_role
+from job_queue import get_job_queue, QueueFullError
+from single_flight import get_single_flight
+from json_stream import StreamingJSONParser
+from llm_gateway import get_llm_gateway, LANE_INTERACTIVE, LANE_BATCH, LLMUnavailableError
+from model_router import get_model_router
+from hedging import get_hedger, HEDGE_DEADLINE_SECONDS, SOURCE_LLM, SOURCE_FALLBACK_PENDING
+from prompt_budget import build_candidate_prompt, compact_json, estimate_tokens, EMPLOYEE_FIELD_LIMITS
+from keyword_matcher import (
+    get_task_text, to_score, department_analysis_scores, ultra_fast_scores,
+    basic_recommendation_score, role_alignment_score, department_alignment_score,
+    skills_matching_score, jd_analysis_score, advanced_fit_scores
+)
 # Load environment variables
 load_dotenv()
 
@@ -36,20 +54,51 @@ print("=" * 50)
 # Configure OpenAI ChatGPT API with new client
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 if OPENAI_API_KEY:
-    client = OpenAI(api_key=OPENAI_API_KEY)
+    # Retries are done by the LLM gateway, not the client
+    client = OpenAI(api_key=OPENAI_API_KEY, max_retries=0)
     print(f"✅ OpenAI API key configured. Key: {OPENAI_API_KEY[:12]}...")
 else:
     print("❌ ERROR: OPENAI_API_KEY not found")
     client = None
+# Every completion goes through the gateway (rate budgets, priority lanes, retries, circuit breaker)
+llm = get_llm_gateway(client)
+model_router = get_model_router()
 task_bp = Blueprint('tasks', __name__)
 
 # Import the correct notification function from notification_routes
-from notification_routes import create_enhanced_task_notification
+from notification_routes import create_enhanced_task_notification, record_new_notifications
 
-# Add thread pool for async processing
+# Bounded, durable background jobs (replaces ad-hoc daemon threads)
+job_queue = get_job_queue()
+# Coalesces duplicate AI requests (double clicks, retries) onto the in-flight ai_meta record
+single_flight = get_single_flight()
 
-# Add thread pool for async processing
-task_executor = ThreadPoolExecutor(max_workers=3)
+# Default for /goals/classify-only when the request doesn't say (`"async": true` or ?async=true)
+CLASSIFY_ASYNC_DEFAULT = os.getenv('CLASSIFY_ASYNC_DEFAULT', 'false')
+
+# Default for hedged mode (`"hedge": true` or ?hedge=true). Recommendations answer with the
+# deterministic result when the LLM misses HEDGE_DEADLINE_SECONDS and store the LLM result
+# when it arrives; classification answers 202 and delivers the AI tasks on ai_meta
+CLASSIFY_HEDGE_DEFAULT = os.getenv('CLASSIFY_HEDGE_DEFAULT', 'false')
+RECOMMEND_HEDGE_DEFAULT = os.getenv('RECOMMEND_HEDGE_DEFAULT', 'false')
+
+# Custom AI task counts; missing or invalid tasks are re-asked for with a small follow-up prompt
+CUSTOM_TASKS_MIN = 3
+CUSTOM_TASKS_MAX = 8
+TASK_REPAIR_TOKENS_PER_TASK = int(os.getenv('TASK_REPAIR_TOKENS_PER_TASK', '300'))
+
+# Objective templates whose tasks are assigned by their process role instead of RAG
+PREDEFINED_PROCESS_TEMPLATES = ('order_to_delivery', 'order-to-delivery', 'stock_to_delivery', 'stock-to-delivery',
+                                'lead_to_delivery', 'lead-to-delivery')
+
+# Objective-level recommendation jobs: progress writes at most this often, RAG analyses run concurrently
+OBJECTIVE_PROGRESS_INTERVAL_SECONDS = float(os.getenv('OBJECTIVE_PROGRESS_INTERVAL_SECONDS', '1'))
+OBJECTIVE_RAG_CONCURRENCY = int(os.getenv('OBJECTIVE_RAG_CONCURRENCY', '3'))
+
+# Employee columns loaded for each recommendation flavour (routes and job handlers)
+# (updated_at lets the employee feature store spot rows changed since it built their features)
+RECOMMENDATION_EMPLOYEE_FIELDS = "id, name, role, title, skills, experience_years, department, strengths, google_drive_jd, updated_at"
+RAG_RECOMMENDATION_EMPLOYEE_FIELDS = "id, name, role, title, department, job_description_url, updated_at"
 
 def get_supabase_client():
     supabase_url = os.getenv('SUPABASE_URL')
@@ -328,6 +377,31 @@ def analyze_ai_response_errors(response_text, step):
     
     return errors
 
+def find_ai_task_problems(task):
+    """Problems with one AI task as {field: problem}; 'task' or 'task_description' make it unusable"""
+    if not isinstance(task, dict):
+        return {'task': "is not a dictionary"}
+    
+    problems = {}
+    # Required fields
+    if not str(task.get('task_description') or '').strip():
+        problems['task_description'] = "missing 'task_description'"
+    
+    # Validate due dates
+    due_date = task.get('due_date')
+    if due_date:
+        try:
+            datetime.fromisoformat(str(due_date).replace('Z', ''))
+        except ValueError:
+            problems['due_date'] = f"has invalid due_date format: {due_date}"
+    
+    # Validate priority
+    priority = str(task.get('priority') or '').lower()
+    if priority and priority not in ['high', 'medium', 'low']:
+        problems['priority'] = f"has invalid priority: {priority}"
+    
+    return problems
+
 def validate_ai_task_breakdown(tasks_data, goal_data):
     """Validate AI task breakdown output"""
     validation_errors = []
@@ -342,103 +416,155 @@ def validate_ai_task_breakdown(tasks_data, goal_data):
     
     # Check each task
     for i, task in enumerate(tasks_data):
-        if not isinstance(task, dict):
-            validation_errors.append(f"Task {i} is not a dictionary")
-            continue
-        
-        # Required fields
-        if not task.get('task_description'):
-            validation_errors.append(f"Task {i} missing 'task_description'")
-        
-        # Validate due dates
-        due_date = task.get('due_date')
-        if due_date:
-            try:
-                datetime.fromisoformat(due_date.replace('Z', ''))
-            except ValueError:
-                validation_errors.append(f"Task {i} has invalid due_date format: {due_date}")
-        
-        # Validate priority
-        priority = task.get('priority', '').lower()
-        if priority and priority not in ['high', 'medium', 'low']:
-            validation_errors.append(f"Task {i} has invalid priority: {priority}")
+        for problem in find_ai_task_problems(task).values():
+            validation_errors.append(f"Task {i} {problem}")
     
     return validation_errors
 
+def repair_ai_task(task, i):
+    """
+    Usable copy of the i-th AI task, or None if it has to be asked for again.
+    
+    An invalid due_date or priority is dropped so the record defaults apply;
+    only a task without a description is worth another LLM call.
+    """
+    problems = find_ai_task_problems(task)
+    if not problems:
+        return task
+    if 'task' in problems or 'task_description' in problems:
+        print(f"⚠️ Task {i} rejected: {'; '.join(problems.values())}")
+        return None
+    print(f"🔧 Task {i} repaired: {'; '.join(problems.values())}")
+    return {key: value for key, value in task.items() if key not in problems}
+
 
 # ========== EMPLOYEE RECOMMENDATIONS ==========
 
-@backoff.on_exception(backoff.expo, Exception, max_tries=2, max_time=10)
+def llm_employee_recommendations(task, employees, lane=LANE_BATCH):
+    """Short-prompt LLM recommendations for a task; raises on any failure"""
+    prompt = f"""
+        Recommend 2 employees for task:
+        TASK: {task['task_description']}
+        SKILLS: {parse_strategic_metadata(task).get('required_skills', [])}
+        EMPLOYEES: {json.dumps([{'id': emp['id'], 'name': emp['name'], 'role': emp.get('role', ''), 'skills': (emp.get('skills') or [])[:3]} for emp in employees[:5]], indent=2)}
+        Return JSON: {{"recommendations": [{{"employee_id": "uuid", "fit_score": 85, "key_qualifications": [], "reason": ""}}]}}
+        """
+    response = llm.create(
+        lane,
+        site='recommendation_short',
+        messages=[{"role": "system", "content": "Return ONLY valid JSON."}, {"role": "user", "content": prompt}],
+        temperature=0.2,
+        max_tokens=400,
+        timeout=15
+    )
+    response_data = safe_json_parse(response.choices[0].message.content, {})
+    recommendations = response_data.get('recommendations', [])
+    for rec in recommendations:
+        rec['ai_model'] = response.model
+        employee = next((emp for emp in employees if emp['id'] == rec.get('employee_id')), None)
+        if employee:
+            rec['employee_name'] = employee['name']
+            rec['employee_role'] = employee.get('role', '')
+    return recommendations
+
 def recommend_employees_for_task(task, employees, ai_meta_id=None):
     try:
         if not client:
             return ultra_fast_employee_recommendations(task['task_description'], employees)
         
-        prompt = f"""
-        Recommend 2 employees for task:
-        TASK: {task['task_description']}
-        SKILLS: {task.get('strategic_metadata', {}).get('required_skills', [])}
-        EMPLOYEES: {json.dumps([{'id': emp['id'], 'name': emp['name'], 'role': emp.get('role', ''), 'skills': emp.get('skills', [])[:3]} for emp in employees[:5]], indent=2)}
-        Return JSON: {{"recommendations": [{"employee_id": "uuid", "fit_score": 85, "key_qualifications": [], "reason": ""}]}}
-        """
         if ai_meta_id:
             update_ai_progress(ai_meta_id, 70, "Recommending employees", f"Processing task {task['id']}")
         
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "system", "content": "Return ONLY valid JSON."}, {"role": "user", "content": prompt}],
-            temperature=0.2,
-            max_tokens=400,
-            timeout=15
-        )
-        response_data = safe_json_parse(response.choices[0].message.content, {})
-        recommendations = response_data.get('recommendations', [])
-        for rec in recommendations:
-            employee = next((emp for emp in employees if emp['id'] == rec['employee_id']), None)
-            if employee:
-                rec['employee_name'] = employee['name']
-                rec['employee_role'] = employee.get('role', '')
+        recommendations = llm_employee_recommendations(task, employees)
         if ai_meta_id:
             update_ai_progress(ai_meta_id, 90, "Recommendations completed", f"Got {len(recommendations)} recommendations")
         return recommendations
     except Exception as e:
-        log_ai_error("employee_recommendations", str(e), ai_meta_id, task_id=task['id'])
+        log_ai_error("employee_recommendations", str(e), ai_meta_id)
         return ultra_fast_employee_recommendations(task['task_description'], employees)
+
+def save_task_recommendations(task, recommendations, source, ai_meta_id=None, upgrade_pending=False):
+    """Store recommendations on the task's strategic_metadata and its ai_meta record"""
+    supabase = get_supabase_client()
+    # Only the recommendation keys, merged into the current metadata: the LLM upgrade
+    # lands seconds later and must not undo an applied recommendation written meanwhile
+    merge_strategic_metadata([{'id': task['id'], 'strategic_metadata': {
+        'ai_recommendations': recommendations,
+        'employee_recommendations_available': bool(recommendations),
+        'recommendations_generated_at': datetime.utcnow().isoformat(),
+        'recommendations_source': source,
+        'recommendations_upgrade_pending': upgrade_pending
+    }}])
+    
+    if ai_meta_id:
+        model = next((rec['ai_model'] for rec in recommendations if rec.get('ai_model')), None)
+        supabase.table("ai_meta").update({
+            "model": model if source == SOURCE_LLM and model else "keyword-fast-match",
+            "output_json": {
+                "status": "completed",
+                "progress": 100,
+                "task_id": task['id'],
+                "recommendations_generated": len(recommendations),
+                "top_recommendation": recommendations[0] if recommendations else None,
+                "source": source,
+                "upgrade_pending": upgrade_pending
+            },
+            "updated_at": datetime.utcnow().isoformat()
+        }).eq("id", ai_meta_id).execute()
+
+def hedged_employee_recommendations(task, employees, ai_meta_id=None, deadline=HEDGE_DEADLINE_SECONDS):
+    """
+    Recommendations within `deadline` seconds: the LLM result if it is in time,
+    otherwise the keyword fast-match, upgraded in the background when the LLM answers.
+    
+    Returns:
+        tuple: (recommendations, source) - source is one of the hedging SOURCE_* values
+    """
+    fallback_saved = threading.Event()
+    
+    def save_upgrade(late_recommendations):
+        # Never let the fallback write land after the upgrade
+        fallback_saved.wait(30)
+        save_task_recommendations(task, late_recommendations, SOURCE_LLM, ai_meta_id)
+    
+    recommendations, source = get_hedger().call(
+        lambda: llm_employee_recommendations(task, employees, lane=LANE_INTERACTIVE),
+        lambda: ultra_fast_employee_recommendations(task['task_description'], employees),
+        deadline=deadline,
+        on_upgrade=save_upgrade,
+        name=f"recommendations {task['id']}"
+    )
+    try:
+        save_task_recommendations(task, recommendations, source, ai_meta_id,
+                                  upgrade_pending=source == SOURCE_FALLBACK_PENDING)
+    finally:
+        fallback_saved.set()
+    return recommendations, source
     
 
 def ultra_fast_employee_recommendations(task_description, employees, max_recommendations=2):
     try:
-        task_lower = task_description.lower()
+        candidates = employees[:8]
+        scores = ultra_fast_scores(task_description, candidates,
+                                   features=get_employee_feature_store().features_for(candidates))
+        workloads = get_workload_store().for_employees([employee['id'] for employee in candidates])
         recommendations = []
-        for employee in employees[:8]:
-            profile = {
-                'id': employee['id'],
-                'name': employee['name'],
-                'role': employee.get('role', '').lower(),
-                'skills': employee.get('skills', [])[:3],
-                'experience_years': employee.get('experience_years', 0)
-            }
-            score = 0
-            if any(keyword in task_lower for keyword in [profile['role']]):
-                score += 40
-            skills = profile.get('skills', [])
-            skill_matches = sum(1 for skill in skills if skill.lower() in task_lower)
-            score += min(skill_matches * 10, 30)
-            if profile['experience_years'] >= 3:
-                score += 15
-            elif profile['experience_years'] >= 1:
-                score += 10
-            score = min(score, 100)
+        for employee, score in zip(candidates, scores):
+            score = to_score(score)
             if score >= 30:
+                workload = workloads[employee['id']]
                 recommendations.append({
-                    'employee_id': profile['id'],
+                    'employee_id': employee['id'],
                     'employee_name': employee['name'],
                     'employee_role': employee.get('role', ''),
                     'fit_score': score,
-                    'key_qualifications': [f"Role: {employee.get('role', 'N/A')}", f"Experience: {profile['experience_years']} years"],
+                    'load_penalty': load_penalty(workload),
+                    'workload': workload_summary(workload),
+                    'key_qualifications': [f"Role: {employee.get('role', 'N/A')}", f"Experience: {employee.get('experience_years', 0)} years"],
                     'reason': "Fast-match based on role and skills"
                 })
-        return sorted(recommendations, key=lambda x: x['fit_score'], reverse=True)[:max_recommendations]
+        # Ranked by fit less open workload, so an idle close match beats a busy one
+        return sorted(recommendations, key=lambda x: x['fit_score'] - x['load_penalty'], reverse=True)[:max_recommendations]
     except Exception as e:
         print(f"❌ Ultra-fast recommendation error: {e}")
         return []
@@ -471,9 +597,22 @@ def process_employee_recommendations_for_task(task, employees, ai_meta_id):
         task_complexity = strategic_meta.get('complexity', 'medium')
         estimated_hours = task.get('estimated_hours', 8)
         
+        # Rank employees with the keyword scorer less their open workload, so the prompt budget drops
+        # the weakest matches first (ties broken by canonical required-skill overlap, so "SCM" counts
+        # for "Supply Chain Management")
+        ranking_text = f"{task['task_description']} {' '.join(str(skill) for skill in required_skills)}"
+        features = get_employee_feature_store().features_for(employees)
+        fit_scores = advanced_fit_scores(get_task_text(ranking_text), employees, features=features)
+        workloads = get_workload_store().for_employees([emp['id'] for emp in employees])
+        penalties = [load_penalty(workloads[emp['id']]) for emp in employees]
+        required_skill_ids = canonical_skills(required_skills)
+        ranked_employees = [employees[i] for i in sorted(
+            range(len(employees)),
+            key=lambda i: (-(fit_scores[i] - penalties[i]), -len(features[i].skill_ids & required_skill_ids)))]
+        
         # Prepare employee data for AI analysis
         employee_profiles = []
-        for emp in employees:
+        for emp in ranked_employees:
             profile = {
                 'id': emp['id'],
                 'name': emp['name'],
@@ -483,7 +622,8 @@ def process_employee_recommendations_for_task(task, employees, ai_meta_id):
                 'skills': emp.get('skills', []),
                 'experience_years': emp.get('experience_years', 0),
                 'strengths': emp.get('strengths', []),
-                'google_drive_jd': emp.get('google_drive_jd', '')[:1000]  # Limit JD length
+                'workload': workload_summary(workloads[emp['id']]),
+                'google_drive_jd': emp.get('google_drive_jd') or ''  # Truncated by the prompt budget
             }
             employee_profiles.append(profile)
         
@@ -499,8 +639,9 @@ def process_employee_recommendations_for_task(task, employees, ai_meta_id):
         }
         supabase.table("ai_meta").update(update_data).eq("id", ai_meta_id).execute()
         
-        # AI prompt for comprehensive employee recommendations
-        prompt = f"""
+        # AI prompt for comprehensive employee recommendations, filled with as many
+        # ranked profiles as fit the token budget
+        prompt, prompt_stats = build_candidate_prompt(lambda employee_profiles_json: f"""
         As an HR and talent matching expert, analyze this task and recommend the best employees based on their profiles.
 
         TASK ANALYSIS:
@@ -512,7 +653,7 @@ def process_employee_recommendations_for_task(task, employees, ai_meta_id):
         - Goal: {task.get('objectives', {}).get('title', 'Not specified')}
 
         EMPLOYEE PROFILES TO ANALYZE:
-        {json.dumps(employee_profiles, indent=2)}
+        {employee_profiles_json}
 
         ANALYSIS CRITERIA:
         1. Skills Match: How well do the employee's skills match the required skills?
@@ -520,7 +661,7 @@ def process_employee_recommendations_for_task(task, employees, ai_meta_id):
         3. Experience Level: Does the employee have sufficient experience?
         4. Strengths Alignment: Do the employee's strengths align with task requirements?
         5. Department Fit: Is this task relevant to the employee's department?
-        6. Workload Consideration: Consider if the employee might be overloaded
+        6. Workload Consideration: Each profile's workload lists open tasks, remaining estimated hours and overdue tasks - prefer less loaded employees when the fit is similar
 
         Provide TOP 3 recommendations with detailed scoring and reasoning.
 
@@ -546,7 +687,7 @@ def process_employee_recommendations_for_task(task, employees, ai_meta_id):
             "analysis_summary": "Brief summary of the overall matching analysis",
             "total_employees_considered": {len(employees)}
         }}
-        """
+        """, employee_profiles, field_limits=EMPLOYEE_FIELD_LIMITS)
         
         # Update progress
         update_data = {
@@ -561,8 +702,9 @@ def process_employee_recommendations_for_task(task, employees, ai_meta_id):
         supabase.table("ai_meta").update(update_data).eq("id", ai_meta_id).execute()
         
         # Call AI for recommendations
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
+        response = llm.create(
+            LANE_BATCH,
+            site='employee_recommendations',
             messages=[
                 {"role": "system", "content": "You are an HR expert specializing in talent matching and task assignment. Return ONLY valid JSON with employee recommendations and analysis."},
                 {"role": "user", "content": prompt}
@@ -591,6 +733,7 @@ def process_employee_recommendations_for_task(task, employees, ai_meta_id):
         
         # Final update to AI meta
         final_update = {
+            "model": response.model,
             "prompt": prompt,
             "raw_response": response_text,
             "output_json": {
@@ -600,7 +743,8 @@ def process_employee_recommendations_for_task(task, employees, ai_meta_id):
                 "recommendations_generated": len(strategic_meta['ai_recommendations']),
                 "processing_time": processing_time,
                 "analysis_summary": strategic_meta['recommendations_analysis'],
-                "top_recommendation": strategic_meta['ai_recommendations'][0] if strategic_meta['ai_recommendations'] else None
+                "top_recommendation": strategic_meta['ai_recommendations'][0] if strategic_meta['ai_recommendations'] else None,
+                "prompt_budget": prompt_stats
             },
             "confidence": 0.85,
             "updated_at": datetime.utcnow().isoformat()
@@ -611,34 +755,28 @@ def process_employee_recommendations_for_task(task, employees, ai_meta_id):
         print(f"📊 Generated {len(strategic_meta['ai_recommendations'])} recommendations")
         
     except Exception as e:
-        error_msg = f"Error in employee recommendations: {str(e)}"
-        print(f"❌ {error_msg}")
-        
-        # Update AI meta with error
-        try:
-            supabase.table("ai_meta").update({
-                "output_json": {
-                    "status": "error",
-                    "error": error_msg,
-                    "progress": 0
-                },
-                "updated_at": datetime.utcnow().isoformat()
-            }).eq("id", ai_meta_id).execute()
-        except Exception as update_error:
-            print(f"❌ Failed to update AI meta with error: {update_error}")
+        print(f"❌ Error in employee recommendations: {str(e)}")
+        # The job queue retries; employee_recommendations_failed() records the final failure
+        raise
+
+def employee_recommendations_failed(payload, ai_meta_id, error):
+    """on_failure callback for employee_recommendations: mark the AI meta record and the task"""
+    log_ai_error("employee_recommendations", f"Error in employee recommendations: {error}", ai_meta_id)
+    try:
+        supabase = get_supabase_client()
+        task_result = supabase.table("action_plans").select("strategic_metadata").eq("id", payload['task_id']).execute()
+        if not task_result.data:
+            return
+        strategic_meta = parse_strategic_metadata(task_result.data[0])
+        strategic_meta['employee_recommendations_available'] = False
+        strategic_meta['recommendations_failed'] = True
+        strategic_meta['recommendations_error'] = error
         
-        # Mark task as having failed recommendations
-        try:
-            strategic_meta = task.get('strategic_metadata', {})
-            strategic_meta['employee_recommendations_available'] = False
-            strategic_meta['recommendations_failed'] = True
-            strategic_meta['recommendations_error'] = str(e)
-            
-            supabase.table("action_plans").update({
-                "strategic_metadata": strategic_meta
-            }).eq("id", task['id']).execute()
-        except Exception as task_error:
-            print(f"❌ Failed to update task with error status: {task_error}")
+        supabase.table("action_plans").update({
+            "strategic_metadata": strategic_meta
+        }).eq("id", payload['task_id']).execute()
+    except Exception as task_error:
+        print(f"❌ Failed to update task with error status: {task_error}")
 
 # ========== NOTIFICATION FUNCTIONS ==========
 
@@ -729,6 +867,7 @@ def get_available_tasks_for_dependencies(task_id, supabase):
 @admin_required
 def generate_employee_recommendations(task_id):
     """Generate AI employee recommendations for a specific task"""
+    flight = None
     try:
         supabase = get_supabase_client()
         
@@ -739,22 +878,39 @@ def generate_employee_recommendations(task_id):
         
         task = task_result.data[0]
         
+        # Attach to an identical request that is already running
+        flight = single_flight.begin('employee_recommendations', task_id, {'task_description': task['task_description']})
+        if flight.existing:
+            return coalesced_response(flight.existing, task_id=task_id)
+        
         # Get all active employees
-        employees_result = supabase.table("employees").select("id, name, role, title, skills, experience_years, department, strengths, google_drive_jd").eq("is_active", True).execute()
+        employees_result = supabase.table("employees").select(RECOMMENDATION_EMPLOYEE_FIELDS).eq("is_active", True).execute()
         employees = employees_result.data if employees_result.data else []
         
         if not employees:
             return jsonify({'success': False, 'error': 'No active employees found'}), 400
         
+        # Hedged mode answers within the SLO instead of starting a background job
+        body = request.get_json(silent=True) or {}
+        hedge = str(body.get('hedge', request.args.get('hedge', RECOMMEND_HEDGE_DEFAULT))).lower() in ('1', 'true', 'yes')
+        
+        # Refuse early (before creating records) when the job queue is full
+        job = None
+        if not hedge:
+            job_queue.ensure_capacity()
+            job = job_queue.new_job('employee_recommendations', {'task_id': task_id})
+        
         # Create AI meta record for recommendations
         ai_meta_data = {
             "source": "chatgpt-employee-recommendations",
-            "model": "gpt-3.5-turbo",
+            "model": model_router.preferred_model('recommendation_short' if hedge else 'employee_recommendations'),
             "input_json": {
                 "task_id": task_id,
                 "task_description": task['task_description'],
                 "employees_count": len(employees),
-                "status": "starting"
+                "status": "starting",
+                "job": job,
+                "single_flight_key": flight.key
             },
             "output_json": {
                 "status": "processing",
@@ -771,12 +927,21 @@ def generate_employee_recommendations(task_id):
         
         ai_meta_id = ai_meta_result.data[0]['id']
         
-        # Start recommendation process in background
-        threading.Thread(
-            target=process_employee_recommendations_for_task,
-            args=(task, employees, ai_meta_id),
-            daemon=True
-        ).start()
+        if hedge:
+            recommendations, source = hedged_employee_recommendations(task, employees, ai_meta_id)
+            return jsonify({
+                'success': True,
+                'ai_meta_id': ai_meta_id,
+                'task_id': task_id,
+                'recommendations': recommendations,
+                'source': source,
+                'upgrade_pending': source == SOURCE_FALLBACK_PENDING,
+                'status_url': f"/api/ai-meta/{ai_meta_id}",
+                'message': f'{len(recommendations)} employee recommendations ({source})'
+            })
+        
+        # Run recommendation process as a background job
+        job_queue.submit(ai_meta_id, job)
         
         return jsonify({
             'success': True, 
@@ -785,10 +950,15 @@ def generate_employee_recommendations(task_id):
             'task_id': task_id
         })
         
+    except QueueFullError as e:
+        return queue_full_response(e)
     except Exception as e:
         error_msg = f"Error starting employee recommendations: {str(e)}"
         print(f"❌ {error_msg}")
         return jsonify({'success': False, 'error': error_msg}), 500
+    finally:
+        if flight:
+            flight.release()
 
 @task_bp.route('/api/tasks/<task_id>/apply-employee-recommendation', methods=['POST'])
 @token_required
@@ -852,6 +1022,8 @@ def apply_employee_recommendation(task_id):
         result = supabase.table("action_plans").update(update_data).eq("id", task_id).execute()
         
         if result.data:
+            get_workload_store().task_changed(after=result.data[0])
+            
             # Create notification for the assigned employee
             create_enhanced_task_notification(
                 task_id,
@@ -944,12 +1116,43 @@ def get_next_objective_number():
 @task_bp.route('/api/tasks/goals/classify-only', methods=['POST'])
 @token_required
 def create_goal_classify_only():
+    flight = None
     try:
         supabase = get_supabase_client()
         data = request.get_json()
         if not data.get('title'):
             return jsonify({'success': False, 'error': 'Goal title required'}), 400
         
+        # Async mode: create goal + ai_meta, queue the classification and answer 202 right away
+        run_async = str(data.get('async', request.args.get('async', CLASSIFY_ASYNC_DEFAULT))).lower() in ('1', 'true', 'yes')
+        # Hedged mode (sync only): template tasks if the AI misses the deadline, AI tasks delivered later
+        hedge = str(data.get('hedge', request.args.get('hedge', CLASSIFY_HEDGE_DEFAULT))).lower() in ('1', 'true', 'yes')
+        
+        if data.get('auto_classify') and client:
+            # A re-POST of the same goal while it is still classifying attaches to that run
+            requester = safe_get_employee_id() or (getattr(g, 'user', None) or {}).get('email') or 'anonymous'
+            flight = single_flight.begin('goal_classify', requester, {
+                field: data.get(field) for field in
+                ('title', 'description', 'output', 'deadline', 'department', 'priority', 'template')
+            })
+            if flight.existing:
+                existing_goal_id = (flight.existing.get('input_json') or {}).get('goal_id')
+                goal_result = supabase.table("objectives").select("*").eq("id", existing_goal_id).execute()
+                return jsonify({
+                    'success': True,
+                    'goal': goal_result.data[0] if goal_result.data else {'id': existing_goal_id},
+                    'ai_tasks': [],
+                    'ai_breakdown': None,
+                    'ai_processing_time': 0,
+                    'ai_meta_id': flight.existing['id'],
+                    'coalesced': True,
+                    'message': 'This goal is already being classified - attached to the running classification'
+                })
+            
+            if run_async:
+                # Refuse before creating the goal when the job queue is full
+                job_queue.ensure_capacity()
+        
         # 🎯 AUTO-GENERATE OBJECTIVE NUMBER
         next_objective_number = get_next_objective_number()
         
@@ -978,11 +1181,13 @@ def create_goal_classify_only():
         if data.get('auto_classify') and client:
             # Get template from frontend (defaults to 'auto' for AI classification)
             template = data.get('template', 'auto')
+            # Classification inserts tasks, so it is never retried automatically
+            job = job_queue.new_job('goal_classification', {'goal_id': goal['id'], 'template': template}, max_attempts=1) if run_async else None
             
             # Create initial AI meta record according to schema
             initial_ai_meta = {
                 "source": "chatgpt-classify-only",
-                "model": "gpt-3.5-turbo",
+                "model": model_router.preferred_model('custom_tasks'),
                 "input_json": {
                     "goal_id": goal['id'],
                     "goal_title": data['title'],
@@ -991,10 +1196,12 @@ def create_goal_classify_only():
                     "goal_deadline": data.get('deadline'),
                     "objective_number": next_objective_number,
                     "template": template,  # 🎯 ADD TEMPLATE INFO
-                    "status": "starting"
+                    "status": "starting",
+                    "single_flight_key": flight.key if flight else None,
+                    "job": job
                 },
                 "output_json": {
-                    "status": "starting", 
+                    "status": "queued" if job else "starting", 
                     "progress": 0, 
                     "goal_id": goal['id'],
                     "objective_number": next_objective_number,
@@ -1010,7 +1217,84 @@ def create_goal_classify_only():
                 supabase.table("objectives").update({'ai_meta_id': ai_meta_id}).eq('id', goal['id']).execute()
                 goal['ai_meta_id'] = ai_meta_id
             
-            ai_tasks, ai_breakdown, ai_processing_time = classify_goal_to_tasks_only(goal, data, ai_meta_id, template)
+            # Duplicates can find the ai_meta record now, don't hold them for the classification
+            if flight:
+                flight.release()
+            
+            if job and ai_meta_id:
+                try:
+                    job_queue.submit(ai_meta_id, job)
+                except QueueFullError as e:
+                    log_ai_error("goal_classification", str(e), ai_meta_id, goal['id'])
+                    return queue_full_response(e)
+                
+                # Tasks are delivered on the ai_meta record (see deliver_classification_result)
+                return jsonify({
+                    'success': True,
+                    'async': True,
+                    'goal': goal,
+                    'ai_tasks': [],
+                    'ai_breakdown': None,
+                    'ai_processing_time': 0,
+                    'ai_meta_id': ai_meta_id,
+                    'status_url': f"/api/ai-meta/{ai_meta_id}",
+                    'message': f'Goal {next_objective_number} created, task classification queued'
+                }), 202
+            
+            def classify_and_deliver():
+                result = classify_goal_to_tasks_only(goal, data, ai_meta_id, template)
+                if ai_meta_id:
+                    deliver_classification_result(ai_meta_id, goal['id'], *result)
+                return result
+            
+            if hedge and template == 'auto':
+                started = time.time()
+                # No instant stand-in tasks: whatever the client is shown must be what is saved
+                result, source = get_hedger().call(
+                    classify_and_deliver,
+                    lambda: None,
+                    deadline=HEDGE_DEADLINE_SECONDS,
+                    name=f"classification {next_objective_number}"
+                )
+                if source == SOURCE_FALLBACK_PENDING:
+                    # The AI run keeps going and saves its tasks, then delivers them on ai_meta
+                    return jsonify({
+                        'success': True,
+                        'async': True,
+                        'goal': goal,
+                        'ai_tasks': [],
+                        'ai_breakdown': None,
+                        'ai_processing_time': time.time() - started,
+                        'ai_meta_id': ai_meta_id,
+                        'hedged': True,
+                        'source': source,
+                        'upgrade_pending': True,
+                        'status_url': f"/api/ai-meta/{ai_meta_id}" if ai_meta_id else None,
+                        'message': f'Goal {next_objective_number} created, task classification still running'
+                    }), 202
+                if source == SOURCE_LLM:
+                    ai_tasks, ai_breakdown, ai_processing_time = result
+                else:
+                    # The AI failed or was shed: the template tasks become the real result
+                    ai_tasks, ai_breakdown, _ = generate_custom_fallback_tasks(goal, data, ai_meta_id)
+                    ai_processing_time = time.time() - started
+                    if ai_meta_id:
+                        deliver_classification_result(ai_meta_id, goal['id'], ai_tasks, ai_breakdown, ai_processing_time)
+                return jsonify({
+                    'success': True,
+                    'goal': goal,
+                    'ai_tasks': ai_tasks,
+                    'ai_breakdown': ai_breakdown,
+                    'ai_processing_time': ai_processing_time,
+                    'ai_meta_id': ai_meta_id,
+                    'hedged': True,
+                    'source': source,
+                    'upgrade_pending': False,
+                    'status_url': f"/api/ai-meta/{ai_meta_id}" if ai_meta_id else None,
+                    'message': f'Goal {next_objective_number} created with task classification ({source})'
+                })
+            
+            ai_tasks, ai_breakdown, ai_processing_time = classify_and_deliver()
         
         return jsonify({
             'success': True,
@@ -1021,9 +1305,14 @@ def create_goal_classify_only():
             'ai_meta_id': ai_meta_id,
             'message': f'Goal {next_objective_number} created with task classification'  # 🎯 SHOW NUMBER
         })
+    except QueueFullError as e:
+        return queue_full_response(e)
     except Exception as e:
         print(f"❌ Error creating goal: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
+    finally:
+        if flight:
+            flight.release()
     
 def get_updated_standard_process():
     """Return the updated standard process framework - DEPRECATED, use predefined_processes.py instead"""
@@ -1152,9 +1441,194 @@ def get_kickoff_information_requirements():
         ]
     }
 
+# ========== STREAMED TASK GENERATION ==========
+
+class StreamedTaskWriter:
+    """
+    Validates and saves AI tasks as they stream out of the model.
+
+    Each task is inserted as soon as its JSON object closes. While held (the
+    strategic analysis the records embed hasn't arrived yet) tasks are buffered
+    and written with one batch insert on release. Every insert reports the
+    real number of created tasks as ai_meta progress.
+    """
+    
+    def __init__(self, build_record, ai_meta_id, activity, expected_tasks, max_tasks=None, hold=False):
+        self.build_record = build_record  # (task_data, index) -> action_plans record
+        self.ai_meta_id = ai_meta_id
+        self.activity = activity
+        self.expected_tasks = expected_tasks
+        self.max_tasks = max_tasks
+        self.held = hold
+        self.supabase = get_supabase_client()
+        self.started_at = time.time()
+        self.first_task_at = None
+        self.received = 0
+        self.accepted = 0
+        self.accepted_indexes = set()
+        self.rejected = []  # indexes of tasks that have to be asked for again
+        self.buffer = []
+        self.created = []
+    
+    @property
+    def time_to_first_task(self):
+        return round(self.first_task_at - self.started_at, 2) if self.first_task_at else None
+    
+    def add(self, task_data, index):
+        """Take the index-th streamed task"""
+        self.received += 1
+        if self.max_tasks and index >= self.max_tasks:
+            print(f"⚠️ Skipping streamed task {index}: more than {self.max_tasks} tasks")
+            return
+        task_data = repair_ai_task(task_data, index)
+        if task_data is None:
+            self.rejected.append(index)
+            return
+        self.accepted += 1
+        self.accepted_indexes.add(index)
+        self.buffer.append((task_data, index))
+        if not self.held:
+            self.flush()
+    
+    def release(self):
+        """Stop holding tasks back and save the buffered ones"""
+        self.held = False
+        self.flush()
+    
+    def flush(self):
+        if not self.buffer:
+            return
+        batch, self.buffer = self.buffer, []
+        records = [self.build_record(task_data, index) for task_data, index in batch]
+        try:
+            result = self.supabase.table("action_plans").insert(records).execute()
+        except Exception as e:
+            print(f"❌ Error saving {len(records)} streamed task(s): {e}")
+            result = None
+        if not result or not result.data:
+            # Not saved: hand the indexes to the repair step like invalid tasks
+            for _, index in batch:
+                self.accepted_indexes.discard(index)
+                self.rejected.append(index)
+            self.accepted -= len(batch)
+            return
+        if self.first_task_at is None:
+            self.first_task_at = time.time()
+            print(f"⏱️ First task saved after {self.time_to_first_task}s")
+        self.created.extend(result.data)
+        for task in result.data:
+            print(f"✅ Saved streamed task {len(self.created)}: {task.get('task_description', '')[:50]}...")
+        if self.ai_meta_id:
+            progress = min(40 + int(50 * len(self.created) / max(self.expected_tasks, 1)), 90)
+            update_ai_progress(self.ai_meta_id, progress, self.activity,
+                               f"Created {len(self.created)} of ~{self.expected_tasks} tasks")
+    
+    def discard(self):
+        """Delete the tasks saved so far (the stream is being replaced by a fallback)"""
+        self.buffer = []
+        if not self.created:
+            return
+        try:
+            self.supabase.table("action_plans").delete().in_("id", [task['id'] for task in self.created]).execute()
+            print(f"🗑️ Discarded {len(self.created)} streamed task(s)")
+        except Exception as e:
+            print(f"❌ Error discarding streamed tasks: {e}")
+        self.created = []
+
+def stream_task_completion(messages, on_event, temperature, max_tokens, timeout, lane=LANE_INTERACTIVE, site='custom_tasks'):
+    """
+    Stream a chat completion that returns {"tasks": [...], ...}.
+    
+    on_event('item', index, task) runs as soon as each task object closes and
+    on_event('field', key, value) for every other top-level field. Returns
+    (full response text, model that served it).
+    """
+    parser = StreamingJSONParser('tasks')
+    model = None
+    stream = llm.create(
+        lane,
+        site=site,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        timeout=timeout,
+        stream=True
+    )
+    for chunk in stream:
+        model = model or getattr(chunk, 'model', None)
+        if not chunk.choices:
+            continue
+        for kind, key, value in parser.feed(chunk.choices[0].delta.content):
+            on_event(kind, key, value)
+    if parser.errors:
+        print(f"⚠️ {len(parser.errors)} streamed JSON fragment(s) could not be parsed: {parser.errors[0]}")
+    return parser.text.strip(), model
+
+def request_missing_tasks(context, slots, lane=LANE_INTERACTIVE):
+    """
+    Ask the model for just the tasks described in `slots` (one line each, in order).
+    
+    Returns the tasks it sent back - possibly fewer, and not yet validated.
+    """
+    slot_lines = "\n".join(f"{n}. {slot}" for n, slot in enumerate(slots, start=1))
+    prompt = f"""{context}
+
+Return ONLY valid JSON with exactly {len(slots)} task(s), one per line below and in the same order:
+{slot_lines}
+
+{{"tasks": [{{"task_description": "...", "due_date": "YYYY-MM-DD", "priority": "high|medium|low", "estimated_hours": 8, "assigned_role": "...", "required_skills": [], "success_criteria": "...", "context": "..."}}]}}
+"""
+    response = llm.create(
+        lane,
+        site='task_repair',
+        messages=[
+            {"role": "system", "content": "Return ONLY valid JSON."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.2,
+        max_tokens=TASK_REPAIR_TOKENS_PER_TASK * len(slots),
+        timeout=20
+    )
+    tasks = safe_json_parse(response.choices[0].message.content, {}).get('tasks')
+    return tasks if isinstance(tasks, list) else []
+
+def repair_streamed_tasks(writer, context, slots):
+    """
+    Re-ask the model for the tasks a stream is missing and save the valid ones.
+    
+    Args:
+        writer: StreamedTaskWriter that received the stream
+        context: Short description of the goal for the follow-up prompt
+        slots: {task index: one-line description of the task wanted there}
+    
+    Returns:
+        dict: requested / recovered counts and the follow-up prompt size, for ai_meta
+    """
+    indexes = sorted(slots)
+    print(f"🔁 Re-asking for {len(indexes)} missing or invalid task(s) instead of regenerating all")
+    if writer.ai_meta_id:
+        update_ai_progress(writer.ai_meta_id, 90, writer.activity, f"Regenerating {len(indexes)} task(s)")
+    
+    accepted_before = writer.accepted
+    tasks = []
+    try:
+        tasks = request_missing_tasks(context, [slots[index] for index in indexes])
+    except Exception as e:
+        print(f"❌ Task repair request failed: {e}")
+    for index, task_data in zip(indexes, tasks):
+        writer.add(task_data, index)
+    writer.flush()
+    
+    return {
+        "requested": len(indexes),
+        "recovered": writer.accepted - accepted_before,
+        "prompt_tokens": estimate_tokens(context) + sum(estimate_tokens(slots[index]) for index in indexes)
+    }
+
 def generate_13_step_delivery_tasks(goal, goal_data, ai_meta_id):
     """Generate exactly 13 tasks using the predefined delivery process"""
     start_time = time.time()
+    writer = None
     
     try:
         # Get the predefined standard process
@@ -1163,71 +1637,77 @@ def generate_13_step_delivery_tasks(goal, goal_data, ai_meta_id):
         # 🎯 GET OBJECTIVE NUMBER FROM GOAL
         objective_number = goal.get('pre_number', 'N/A')
         
-        # Create prompt specifically for delivery goals - INCLUDING OBJECTIVE NUMBER
-        prompt = f"""
-You are generating tasks for a DELIVERY/PROCUREMENT goal. Use the EXACT 13-step Order-to-Delivery process.
-
-OBJECTIVE: {objective_number} - {goal_data['title']}
-DESCRIPTION: {goal_data.get('description', '')}
-OUTPUT: {goal_data.get('output', '')}
-
-STANDARD 13-STEP PROCESS:
-{json.dumps(standard_process, indent=2)}
-
-Generate EXACTLY 13 tasks following this process exactly. For each task:
-1. Use the EXACT process step title as task_description
-2. Include due_date within Q4 2025
-3. Use appropriate priority (high/medium/low)
-4. Set estimated_hours between 4-16 hours
-5. CRITICAL: Use the EXACT assigned_role from the standard process step - DO NOT CHANGE IT
-6. Reference objective {objective_number} in strategic context
-
-IMPORTANT: The assigned_role MUST match exactly the "responsible" field from the corresponding step in the standard process. Do not modify or change the role names.
-
-Return ONLY valid JSON with exactly 13 tasks in this format:
-{{
-    "tasks": [
-        {{
-            "task_description": "1. FINALIZE DEAL DOCUMENTATION (1 day): Complete agreement, Proforma Invoice (PI), and other commercial terms",
-            "due_date": "2025-11-05",
-            "priority": "high",
-            "estimated_hours": 8,
-            "assigned_role": "Account Executive",
-            "strategic_context": "Executing step 1 for objective {objective_number}"
-        }},
-        ... // 12 more tasks
-    ]
-}}
-"""
+        # Static instructions and the process steps first, the objective last (provider prompt caching)
+        template = get_prompt_template('delivery_tasks')
+        messages = template.render(
+            shared=f"STANDARD 13-STEP PROCESS:\n{compact_json(standard_process)}",
+            objective_number=objective_number,
+            title=goal_data['title'],
+            description=goal_data.get('description', ''),
+            output=goal_data.get('output', '')
+        )
+        prompt = messages[-1]['content']
         
         print(f"🤖 Generating 13-step delivery tasks for {objective_number}: {goal_data['title'][:50]}...")
         
         if ai_meta_id:
             update_ai_progress(ai_meta_id, 40, "13-Step Delivery Process", f"Applying standard delivery framework for {objective_number}")
         
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "Return ONLY valid JSON. Generate exactly 13 tasks using the 13-step delivery process."},
-                {"role": "user", "content": prompt}
-            ],
+        # Tasks are saved while the completion streams in
+        writer = StreamedTaskWriter(
+            lambda task_data, i: build_process_task_record(goal, task_data, i, standard_process, ai_meta_id),
+            ai_meta_id, "13-Step Delivery Process", expected_tasks=13, max_tasks=len(standard_process)
+        )
+        response_text, model = stream_task_completion(
+            messages,
+            lambda kind, key, value: writer.add(value, key) if kind == 'item' else None,
             temperature=0.1,
             max_tokens=3000,
-            timeout=30
+            timeout=30,
+            site='delivery_tasks'
         )
+        record_ai_model(ai_meta_id, model)
         
         task_time = time.time() - start_time
-        response_text = response.choices[0].message.content.strip()
         
         print(f"🤖 AI Response: {response_text[:500]}...")
         
-        # Parse the AI response
+        if writer.received:
+            # Keep the valid steps; ask again only for missing or invalid ones
+            steps = list(standard_process.items())
+            missing = [i for i in range(len(steps)) if i not in writer.accepted_indexes]
+            repair = None
+            if missing:
+                print(f"⚠️ AI returned {writer.accepted} valid of {len(steps)} steps")
+                repair = repair_streamed_tasks(
+                    writer,
+                    f"Tasks for delivery objective {objective_number} - {goal_data['title']}. "
+                    f"Use the step title as task_description and the given assigned_role.",
+                    {i: f"{steps[i][0]} - assigned_role: {steps[i][1]['responsible']}" for i in missing}
+                )
+                # Whatever is still missing comes straight from the process definition
+                for i in range(len(steps)):
+                    if i not in writer.accepted_indexes:
+                        writer.add({"task_description": f"{steps[i][0]}: {steps[i][1]['activities']}"}, i)
+                        repair["from_template"] = repair.get("from_template", 0) + 1
+                writer.flush()
+            task_time = time.time() - start_time
+            
+            complete_13_step_meta(goal, writer.created, task_time, ai_meta_id, progress=100,
+                                  time_to_first_task=writer.time_to_first_task, streamed=True,
+                                  prompt_tokens=estimate_tokens(prompt), repair=repair,
+                                  prompt_template=template.id)
+            return writer.created, f"Created {len(writer.created)} 13-step_delivery tasks for {objective_number}", task_time
+        
+        # Nothing streamed as a tasks array - parse the whole response
         ai_analysis = safe_json_parse(response_text, {})
         if not ai_analysis:
             print("❌ Failed to parse AI response as JSON")
             raise Exception("Invalid JSON response from AI")
         
         ai_tasks_data = ai_analysis.get('tasks', [])
+        for error in validate_ai_task_breakdown(ai_tasks_data, goal_data):
+            print(f"⚠️ {error}")
         
         # CRITICAL: Validate we have exactly 13 tasks
         if len(ai_tasks_data) != 13:
@@ -1239,6 +1719,8 @@ Return ONLY valid JSON with exactly 13 tasks in this format:
         
     except Exception as e:
         print(f"❌ Error in 13-step delivery generation: {e}")
+        if writer:
+            writer.discard()
         # Fallback to predefined 13-step process
         return generate_13_step_fallback_tasks(goal, goal_data, get_updated_standard_process(), ai_meta_id)
     
@@ -1355,6 +1837,15 @@ def update_ai_progress(ai_meta_id, progress, activity, details=""):
     except Exception as e:
         print(f"❌ Error updating AI progress: {e}")
 
+def record_ai_model(ai_meta_id, model):
+    """Store the model that actually served an AI call on its ai_meta record"""
+    if not ai_meta_id or not model:
+        return
+    try:
+        get_supabase_client().table("ai_meta").update({"model": model}).eq("id", ai_meta_id).execute()
+    except Exception as e:
+        print(f"❌ Error recording AI model: {e}")
+
 def log_ai_error(function_name, error_message, ai_meta_id=None, goal_id=None, prompt=None, response=None):
     """Log AI errors with context"""
     print(f"❌ AI Error in {function_name}: {error_message}")
@@ -1547,6 +2038,63 @@ def generate_custom_fallback_tasks(goal, goal_data, ai_meta_id):
         print(f"❌ Error in custom fallback generation: {e}")
         return [], "Failed to generate custom fallback tasks", 0
 
+def build_custom_task_record(goal, task_data, i, strategic_analysis, ai_meta_id):
+    """action_plans record for the i-th custom AI task"""
+    # For custom tasks, we don't have predefined process steps
+    # Use AI-generated data with fallbacks
+    strategic_metadata = {
+        "required_skills": task_data.get('required_skills', ["Strategic planning", "Coordination"]),
+        "success_criteria": task_data.get('success_criteria', 'Task completed successfully'),
+        "complexity": task_data.get('complexity', 'medium'),
+        "strategic_analysis": strategic_analysis,
+        "strategic_phase": task_data.get('strategic_phase', f'Phase {i+1}'),
+        "key_stakeholders": task_data.get('key_stakeholders', []),
+        "potential_bottlenecks": task_data.get('potential_bottlenecks', []),
+        "resource_requirements": task_data.get('resource_requirements', []),
+        "assigned_role": task_data.get('assigned_role', 'Account Executive'),
+        "process_step": f"Custom Step {i+1}",
+        "context": task_data.get('context', ''),
+        "objective": goal['title'],
+        "process": task_data.get('process', task_data['task_description']),
+        "delivery": task_data.get('due_date'),
+        "reporting_requirements": task_data.get('reporting_requirements', 'Completion report'),
+        "goal_type": "custom",
+        "objective_number": goal.get('pre_number', 'N/A')
+    }
+
+    task_record = {
+        "task_description": task_data['task_description'],
+        "objective_id": goal['id'],
+        "due_date": task_data.get('due_date'),
+        "priority": task_data.get('priority', 'medium'),
+        "estimated_hours": task_data.get('estimated_hours', 8),
+        "status": "ai_suggested",
+        "completion_percentage": 0,
+        "ai_meta_id": ai_meta_id,
+        "ai_suggested": True,
+        "strategic_metadata": strategic_metadata
+    }
+    return task_record
+
+def complete_custom_tasks_meta(goal, created_tasks, strategic_analysis, ai_meta_id, **extra):
+    """Record the finished custom task generation on the ai_meta record"""
+    if not ai_meta_id:
+        return
+    get_supabase_client().table("ai_meta").update({
+        "output_json": {
+            "status": "custom_ai_tasks_completed",
+            "tasks_generated": len(created_tasks),
+            "goal_id": goal['id'],
+            "goal_type": "custom",
+            "process_applied": "Custom AI Generation",
+            "framework_version": "custom",
+            "ai_analysis_used": True,
+            "strategic_analysis": strategic_analysis,
+            "rag_recommendations_status": "pending",
+            **extra
+        }
+    }).eq("id", ai_meta_id).execute()
+
 def process_and_save_custom_tasks(goal, ai_tasks_data, ai_analysis, ai_meta_id, task_time):
     """Process and save custom AI-generated tasks to database"""
     try:
@@ -1559,60 +2107,14 @@ def process_and_save_custom_tasks(goal, ai_tasks_data, ai_analysis, ai_meta_id,
             if not task_data.get('task_description'):
                 continue
             
-            # For custom tasks, we don't have predefined process steps
-            # Use AI-generated data with fallbacks
-            strategic_metadata = {
-                "required_skills": task_data.get('required_skills', ["Strategic planning", "Coordination"]),
-                "success_criteria": task_data.get('success_criteria', 'Task completed successfully'),
-                "complexity": task_data.get('complexity', 'medium'),
-                "strategic_analysis": strategic_analysis,
-                "strategic_phase": task_data.get('strategic_phase', f'Phase {i+1}'),
-                "key_stakeholders": task_data.get('key_stakeholders', []),
-                "potential_bottlenecks": task_data.get('potential_bottlenecks', []),
-                "resource_requirements": task_data.get('resource_requirements', []),
-                "assigned_role": task_data.get('assigned_role', 'Account Executive'),
-                "process_step": f"Custom Step {i+1}",
-                "context": task_data.get('context', ''),
-                "objective": goal['title'],
-                "process": task_data.get('process', task_data['task_description']),
-                "delivery": task_data.get('due_date'),
-                "reporting_requirements": task_data.get('reporting_requirements', 'Completion report'),
-                "goal_type": "custom",
-                "objective_number": goal.get('pre_number', 'N/A')
-            }
-            
-            task_record = {
-                "task_description": task_data['task_description'],
-                "objective_id": goal['id'],
-                "due_date": task_data.get('due_date'),
-                "priority": task_data.get('priority', 'medium'),
-                "estimated_hours": task_data.get('estimated_hours', 8),
-                "status": "ai_suggested",
-                "completion_percentage": 0,
-                "ai_meta_id": ai_meta_id,
-                "ai_suggested": True,
-                "strategic_metadata": strategic_metadata
-            }
+            task_record = build_custom_task_record(goal, task_data, i, strategic_analysis, ai_meta_id)
             
             task_result = supabase.table("action_plans").insert(task_record).execute()
             if task_result.data:
                 created_tasks.append(task_result.data[0])
         
         # Update AI meta with custom task info
-        if ai_meta_id:
-            supabase.table("ai_meta").update({
-                "output_json": {
-                    "status": "custom_ai_tasks_completed",
-                    "tasks_generated": len(created_tasks),
-                    "goal_id": goal['id'],
-                    "goal_type": "custom",
-                    "process_applied": "Custom AI Generation",
-                    "framework_version": "custom",
-                    "ai_analysis_used": True,
-                    "strategic_analysis": strategic_analysis,
-                    "rag_recommendations_status": "pending"
-                }
-            }).eq("id", ai_meta_id).execute()
+        complete_custom_tasks_meta(goal, created_tasks, strategic_analysis, ai_meta_id)
         
         # RAG recommendations will be generated only when user clicks "Recommend Employee" button
         return created_tasks, f"Created {len(created_tasks)} custom AI tasks", task_time
@@ -1633,86 +2135,90 @@ def process_and_save_custom_tasks(goal, ai_tasks_data, ai_analysis, ai_meta_id,
 def generate_ai_custom_tasks(goal, goal_data, ai_meta_id):
     """Generate custom AI tasks for non-delivery goals"""
     start_time = time.time()
+    writer = None
     
     try:
         print(f"🤖 Generating custom AI tasks for: {goal_data['title'][:50]}...")
         
+        if not llm.available():
+            # Circuit open: skip straight to the deterministic tasks
+            print("⚠️ OpenAI circuit open, using custom fallback tasks")
+            return generate_custom_fallback_tasks(goal, goal_data, ai_meta_id)
+        
         if ai_meta_id:
             update_ai_progress(ai_meta_id, 20, "Custom AI Task Generation", "Preparing AI classification")
         
-        # Enhanced prompt with explicit JSON format
-        prompt = f"""
-You are generating tasks for a NON-DELIVERY goal. Create 5-8 appropriate, customized tasks.
-
-GOAL INFORMATION:
-- Title: {goal_data['title']}
-- Description: {goal_data.get('description', 'N/A')}
-- Output/Goal: {goal_data.get('output', 'N/A')}
-- Deadline: {goal_data.get('deadline', 'Q4 2025')}
-
-DEPARTMENT STRUCTURE:
-- SUPPLY CHAIN: Logistics, inventory, customs, transport
-- SALES: Client relationships, deals, partnerships  
-- PRODUCT: Quality, specifications, testing
-- FINANCE & ADMIN: Payments, compliance, administration
-
-TASK FOCUS AREAS:
-- Strategic planning and analysis
-- Research and development  
-- Partnership building
-- Market analysis
-- Process improvement
-- Training and development
-
-REQUIRED JSON FORMAT:
-{{
-  "tasks": [
-    {{
-      "task_description": "Clear, specific task description",
-      "priority": "high|medium|low",
-      "estimated_hours": 8,
-      "due_date": "YYYY-MM-DD",
-      "assigned_role": "Account Executive|Product Development Manager|Supply Chain Specialist|Commercial and Finance Specialist",
-      "required_skills": ["Skill 1", "Skill 2"],
-      "success_criteria": "What success looks like",
-      "context": "Task context and background"
-    }}
-  ],
-  "strategic_analysis": {{
-    "context": "Overall strategic context",
-    "objective": "{goal_data['title']}",
-    "process": "Custom AI Task Generation",
-    "delivery": "{goal_data.get('deadline', 'Q4 2025')}",
-    "reporting_requirements": "Progress updates and completion reports",
-    "goal_type": "custom"
-  }}
-}}
-
-Generate 5-8 tasks. Return ONLY valid JSON in the exact format above. Do not include markdown code blocks.
-"""
+        # Static instructions first, the goal last (provider prompt caching)
+        template = get_prompt_template('custom_tasks')
+        messages = template.render(
+            title=goal_data['title'],
+            description=goal_data.get('description', 'N/A'),
+            output=goal_data.get('output', 'N/A'),
+            deadline=goal_data.get('deadline', 'Q4 2025')
+        )
+        prompt = messages[-1]['content']
         
         if ai_meta_id:
             update_ai_progress(ai_meta_id, 40, "Custom AI Task Generation", "Calling OpenAI API")
         
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {
-                    "role": "system", 
-                    "content": "You are a task planning expert. Return ONLY valid JSON in the exact format specified. Do not include markdown, code blocks, or any text outside the JSON."
-                },
-                {"role": "user", "content": prompt}
-            ],
+        # Tasks are saved while the completion streams in; they embed the
+        # strategic analysis, so they are held until that field has arrived
+        strategic = {}
+        writer = StreamedTaskWriter(
+            lambda task_data, i: build_custom_task_record(goal, task_data, i, strategic.get('analysis', {}), ai_meta_id),
+            ai_meta_id, "Custom AI Task Generation", expected_tasks=8, hold=True
+        )
+        
+        def on_event(kind, key, value):
+            if kind == 'item':
+                writer.add(value, key)
+            elif key == 'strategic_analysis' and isinstance(value, dict):
+                strategic['analysis'] = value
+                writer.release()
+        
+        response_text, model = stream_task_completion(
+            messages,
+            on_event,
             temperature=0.3,
             max_tokens=3000,
-            timeout=60
+            timeout=60,
+            site='custom_tasks'
         )
+        record_ai_model(ai_meta_id, model)
         
         task_time = time.time() - start_time
-        response_text = response.choices[0].message.content.strip()
         
         print(f"📥 AI Response received ({len(response_text)} chars): {response_text[:200]}...")
         
+        if writer.received:
+            # Save anything still held back (no strategic analysis in the response)
+            writer.release()
+            
+            # Replace rejected tasks and top up to the minimum, keeping the valid ones
+            wanted = min(max(len(writer.rejected), CUSTOM_TASKS_MIN - writer.accepted), CUSTOM_TASKS_MAX - writer.accepted)
+            repair = None
+            if wanted > 0:
+                existing = "; ".join(task['task_description'][:80] for task in writer.created)
+                repair = repair_streamed_tasks(
+                    writer,
+                    f"Additional tasks for the goal '{goal_data['title']}' ({goal_data.get('output', 'N/A')}, "
+                    f"deadline {goal_data.get('deadline', 'Q4 2025')}). Existing tasks: {existing or 'none'}. "
+                    f"Do not repeat them.",
+                    {writer.received + n: "Another distinct task for this goal" for n in range(wanted)}
+                )
+            
+            if writer.accepted < CUSTOM_TASKS_MIN:
+                print(f"⚠️ AI returned only {writer.accepted} valid tasks (minimum {CUSTOM_TASKS_MIN} required), using fallback")
+                writer.discard()
+                return generate_custom_fallback_tasks(goal, goal_data, ai_meta_id)
+            
+            task_time = time.time() - start_time
+            complete_custom_tasks_meta(goal, writer.created, strategic.get('analysis', {}), ai_meta_id, progress=100,
+                                       time_to_first_task=writer.time_to_first_task, streamed=True,
+                                       prompt_tokens=estimate_tokens(prompt), repair=repair,
+                                       prompt_template=template.id)
+            return writer.created, f"Created {len(writer.created)} custom AI tasks", task_time
+        
         if ai_meta_id:
             update_ai_progress(ai_meta_id, 60, "Custom AI Task Generation", "Parsing AI response")
         
@@ -1730,10 +2236,12 @@ Generate 5-8 tasks. Return ONLY valid JSON in the exact format above. Do not inc
             raise Exception("AI response missing 'tasks' array")
         
         print(f"✅ Parsed {len(ai_tasks_data)} tasks from AI response")
+        for error in validate_ai_task_breakdown(ai_tasks_data, goal_data):
+            print(f"⚠️ {error}")
         
         # Validate we have reasonable number of tasks
-        if len(ai_tasks_data) < 3:
-            print(f"⚠️ AI returned only {len(ai_tasks_data)} tasks (minimum 3 required), using fallback")
+        if len(ai_tasks_data) < CUSTOM_TASKS_MIN:
+            print(f"⚠️ AI returned only {len(ai_tasks_data)} tasks (minimum {CUSTOM_TASKS_MIN} required), using fallback")
             return generate_custom_fallback_tasks(goal, goal_data, ai_meta_id)
         
         if ai_meta_id:
@@ -1753,6 +2261,9 @@ Generate 5-8 tasks. Return ONLY valid JSON in the exact format above. Do not inc
         import traceback
         traceback.print_exc()
         
+        if writer:
+            writer.discard()
+        
         if ai_meta_id:
             log_ai_error("generate_ai_custom_tasks", error_msg, ai_meta_id, goal.get('id'), prompt if 'prompt' in locals() else None, response_text if 'response_text' in locals() else None)
         
@@ -1779,11 +2290,11 @@ def generate_predefined_process_tasks(goal, goal_data, ai_meta_id, process_name)
     
     try:
         # Get the predefined process from registry
-        predefined_processes = get_predefined_processes_registry()
-        if process_name not in predefined_processes:
+        template = get_process_registry().get(process_name)
+        if template is None:
             raise ValueError(f"Unknown predefined process: {process_name}")
         
-        process_steps = predefined_processes[process_name]
+        process_steps = template.steps
         objective_number = goal.get('pre_number', 'N/A')
         goal_title = goal_data.get('title', '')
         
@@ -1806,26 +2317,19 @@ def generate_predefined_process_tasks(goal, goal_data, ai_meta_id, process_name)
                              f"Generating {len(process_steps)} predefined tasks for {objective_number}")
         
         # Generate tasks using EXACT predefined steps
-        for i, (step_key, step_data) in enumerate(process_steps.items()):
-            # Calculate due date based on step timing
-            days_offset = i  # Default: sequential days
-            if '(1 day)' in step_key:
-                days_offset = i
-            elif '(2 days)' in step_key:
-                days_offset = i + 1
-            elif '(5 days)' in step_key:
-                days_offset = i + 4
-            elif '(0.5 day)' in step_key:
-                days_offset = i
+        for i, step in enumerate(process_steps):
+            step_key = step.key
+            # Calculate due date based on step timing: multi-day steps end (days - 1) later
+            days_offset = i + max(math.ceil(step.duration_days or 1) - 1, 0)
             
             due_date = (base_date + timedelta(days=days_offset)).strftime('%Y-%m-%d')
             
             # Customize task description for specific objective
             # Replace generic terms with customization text if needed
-            customized_activities = step_data['activities']
+            customized_activities = step.activities
             if customization_text and customization_text != goal_title:
                 # Add customization context (e.g., "for DGEDA")
-                customized_activities = f"{step_data['activities']} for {customization_text}"
+                customized_activities = f"{step.activities} for {customization_text}"
             
             # Customize step key if needed
             customized_step_key = step_key
@@ -1834,7 +2338,7 @@ def generate_predefined_process_tasks(goal, goal_data, ai_meta_id, process_name)
                 customized_step_key = step_key.replace(":", f" for {customization_text}:")
             
             strategic_metadata = {
-                "required_skills": ["Process execution", "Coordination", step_data['responsible']],
+                "required_skills": ["Process execution", "Coordination", step.responsible],
                 "success_criteria": f"Complete {customized_activities} successfully",
                 "complexity": "medium",
                 "strategic_analysis": {
@@ -1843,26 +2347,26 @@ def generate_predefined_process_tasks(goal, goal_data, ai_meta_id, process_name)
                     "objective": goal_title,
                     "process": customized_activities,
                     "delivery": due_date,
-                    "reporting_requirements": step_data['deliverable'],
+                    "reporting_requirements": step.deliverable,
                     "q4_execution_context": "Q4 2025 execution",
                     "process_applied": f"{process_name.upper().replace('_', '-')} Standard Framework",
                     "goal_type": process_name
                 },
                 "strategic_phase": f"Process Step {i+1}",
-                "key_stakeholders": [step_data['responsible']],
+                "key_stakeholders": [step.responsible],
                 "potential_bottlenecks": ["Timeline constraints", "Coordination requirements"],
                 "resource_requirements": ["Standard process tools"],
-                "assigned_role": step_data['responsible'],  # 🎯 USE RECOMMENDED ROLE
+                "assigned_role": step.responsible,  # 🎯 USE RECOMMENDED ROLE
                 "process_step": customized_step_key,
                 "information_requirements": f"Using {process_name} framework",
                 "context": f"Executing {customized_step_key} for {goal_title}",
                 "objective": goal_title,
                 "process": customized_activities,
                 "delivery": due_date,
-                "reporting_requirements": step_data['deliverable'],
+                "reporting_requirements": step.deliverable,
                 "goal_type": process_name,
                 "predefined_process": True,  # 🎯 FLAG FOR RAG SYSTEM
-                "recommended_role": step_data['responsible']  # 🎯 FOR EMPLOYEE RECOMMENDATIONS
+                "recommended_role": step.responsible  # 🎯 FOR EMPLOYEE RECOMMENDATIONS
             }
             
             task_record = {
@@ -1984,6 +2488,92 @@ def generate_13_step_fallback_tasks(goal, goal_data, standard_process, ai_meta_i
     
     return created_tasks, f"Generated {len(created_tasks)} delivery tasks using 13-step fallback", time.time() - start_time
 
+def build_process_task_record(goal, task_data, i, standard_process, ai_meta_id):
+    """action_plans record for the i-th AI task of the 13-step delivery process"""
+    # 🎯 GET OBJECTIVE NUMBER FROM GOAL
+    objective_number = goal.get('pre_number', 'N/A')
+
+    # Get the corresponding standard process step
+    process_step_key = list(standard_process.keys())[i]
+    process_step_data = standard_process[process_step_key]
+
+    # Use AI data with fallbacks
+    task_description = task_data.get('task_description', f"{process_step_key}: {process_step_data['activities']}")
+    due_date = task_data.get('due_date', (datetime.now() + timedelta(days=i)).strftime('%Y-%m-%d'))
+    priority = task_data.get('priority', 'medium')
+    estimated_hours = task_data.get('estimated_hours', 8)
+    # 🎯 ALWAYS USE THE EXACT ROLE FROM PREDEFINED PROCESS - DO NOT TRUST AI
+    assigned_role = process_step_data['responsible']
+
+    strategic_metadata = {
+        "required_skills": ["Process execution", "Coordination", assigned_role],
+        "success_criteria": f"Complete {process_step_data['activities']} successfully",
+        "complexity": "medium",
+        "strategic_analysis": {
+            "validation_score": "13-step process applied",
+            "context": f"Standard delivery process for {goal['title']}",
+            "objective": f"{objective_number} - {goal['title']}",  # 🎯 INCLUDE OBJECTIVE NUMBER
+            "process": process_step_data['activities'],
+            "delivery": due_date,
+            "reporting_requirements": process_step_data['deliverable'],
+            "q4_execution_context": "Q4 2025 execution",
+            "process_applied": "UPDATED Order-to-Delivery Standard Framework",
+            "goal_type": "delivery",
+            "objective_number": objective_number  # 🎯 ADD THIS
+        },
+        "strategic_phase": f"Process Step {i+1}",
+        "key_stakeholders": [assigned_role],
+        "potential_bottlenecks": ["Timeline constraints", "Coordination requirements"],
+        "resource_requirements": ["Standard process tools"],
+        "assigned_role": assigned_role,
+        "process_step": process_step_key,
+        "information_requirements": "Using standard delivery framework",
+        "context": f"Executing {process_step_key} for objective {objective_number}",  # 🎯 INCLUDE NUMBER
+        "objective": f"{objective_number} - {goal['title']}",  # 🎯 INCLUDE NUMBER
+        "process": process_step_data['activities'],
+        "delivery": due_date,
+        "reporting_requirements": process_step_data['deliverable'],
+        "goal_type": "delivery",
+        "objective_number": objective_number,  # 🎯 INCLUDE NUMBER
+        "predefined_process": True,  # 🎯 FLAG FOR RAG SYSTEM
+        "recommended_role": assigned_role  # 🎯 ALWAYS USE PREDEFINED ROLE
+    }
+
+    task_record = {
+        "task_description": task_description,
+        "objective_id": goal['id'],
+        "due_date": due_date,
+        "priority": priority,
+        "estimated_hours": estimated_hours,
+        "status": "ai_suggested",
+        "completion_percentage": 0,
+        "ai_meta_id": ai_meta_id,
+        "ai_suggested": True,
+        "strategic_metadata": strategic_metadata
+    }
+    return task_record
+
+def complete_13_step_meta(goal, created_tasks, task_time, ai_meta_id, **extra):
+    """Record the finished 13-step delivery generation on the ai_meta record"""
+    if not ai_meta_id:
+        return
+    try:
+        get_supabase_client().table("ai_meta").update({
+            "output_json": {
+                "status": "13_step_delivery_completed",
+                "tasks_generated": len(created_tasks),
+                "goal_id": goal['id'],
+                "goal_type": "delivery",
+                "process_applied": "13-step delivery",
+                "framework_version": "13-step",
+                "processing_time": task_time,
+                "objective_number": goal.get('pre_number', 'N/A'),  # 🎯 INCLUDE NUMBER
+                **extra
+            }
+        }).eq("id", ai_meta_id).execute()
+    except Exception as e:
+        print(f"❌ Error updating AI meta: {e}")
+
 def process_and_save_tasks(goal, ai_tasks_data, standard_process, ai_meta_id, task_time, task_type):
     """Process and save tasks to database"""
     supabase = get_supabase_client()
@@ -1997,65 +2587,9 @@ def process_and_save_tasks(goal, ai_tasks_data, standard_process, ai_meta_id, ta
             print(f"⚠️ Skipping task {i}: No task_description")
             continue
         
-        # Get the corresponding standard process step
-        process_step_key = list(standard_process.keys())[i]
-        process_step_data = standard_process[process_step_key]
-        
-        # Use AI data with fallbacks
-        task_description = task_data.get('task_description', f"{process_step_key}: {process_step_data['activities']}")
-        due_date = task_data.get('due_date', (datetime.now() + timedelta(days=i)).strftime('%Y-%m-%d'))
-        priority = task_data.get('priority', 'medium')
-        estimated_hours = task_data.get('estimated_hours', 8)
-        # 🎯 ALWAYS USE THE EXACT ROLE FROM PREDEFINED PROCESS - DO NOT TRUST AI
-        assigned_role = process_step_data['responsible']
-        
-        strategic_metadata = {
-            "required_skills": ["Process execution", "Coordination", assigned_role],
-            "success_criteria": f"Complete {process_step_data['activities']} successfully",
-            "complexity": "medium",
-            "strategic_analysis": {
-                "validation_score": "13-step process applied",
-                "context": f"Standard delivery process for {goal['title']}",
-                "objective": f"{objective_number} - {goal['title']}",  # 🎯 INCLUDE OBJECTIVE NUMBER
-                "process": process_step_data['activities'],
-                "delivery": due_date,
-                "reporting_requirements": process_step_data['deliverable'],
-                "q4_execution_context": "Q4 2025 execution",
-                "process_applied": "UPDATED Order-to-Delivery Standard Framework",
-                "goal_type": "delivery",
-                "objective_number": objective_number  # 🎯 ADD THIS
-            },
-            "strategic_phase": f"Process Step {i+1}",
-            "key_stakeholders": [assigned_role],
-            "potential_bottlenecks": ["Timeline constraints", "Coordination requirements"],
-            "resource_requirements": ["Standard process tools"],
-            "assigned_role": assigned_role,
-            "process_step": process_step_key,
-            "information_requirements": "Using standard delivery framework",
-            "context": f"Executing {process_step_key} for objective {objective_number}",  # 🎯 INCLUDE NUMBER
-            "objective": f"{objective_number} - {goal['title']}",  # 🎯 INCLUDE NUMBER
-            "process": process_step_data['activities'],
-            "delivery": due_date,
-            "reporting_requirements": process_step_data['deliverable'],
-            "goal_type": "delivery",
-            "objective_number": objective_number,  # 🎯 INCLUDE NUMBER
-            "predefined_process": True,  # 🎯 FLAG FOR RAG SYSTEM
-            "recommended_role": assigned_role  # 🎯 ALWAYS USE PREDEFINED ROLE
-        }
-        
-        task_record = {
-            "task_description": task_description,
-            "objective_id": goal['id'],
-            "due_date": due_date,
-            "priority": priority,
-            "estimated_hours": estimated_hours,
-            "status": "ai_suggested",
-            "completion_percentage": 0,
-            "ai_meta_id": ai_meta_id,
-            "ai_suggested": True,
-            "strategic_metadata": strategic_metadata
-        }
-        
+        task_record = build_process_task_record(goal, task_data, i, standard_process, ai_meta_id)
+        task_description = task_record["task_description"]
+
         try:
             task_result = supabase.table("action_plans").insert(task_record).execute()
             if task_result.data:
@@ -2067,23 +2601,8 @@ def process_and_save_tasks(goal, ai_tasks_data, standard_process, ai_meta_id, ta
             print(f"❌ Error saving task {i+1} for {objective_number}: {e}")
     
     # Update AI meta with results
-    if ai_meta_id:
-        try:
-            supabase.table("ai_meta").update({
-                "output_json": {
-                    "status": "13_step_delivery_completed",
-                    "tasks_generated": len(created_tasks),
-                    "goal_id": goal['id'],
-                    "goal_type": "delivery",
-                    "process_applied": "13-step delivery",
-                    "framework_version": "13-step",
-                    "processing_time": task_time,
-                    "objective_number": objective_number  # 🎯 INCLUDE NUMBER
-                }
-            }).eq("id", ai_meta_id).execute()
-        except Exception as e:
-            print(f"❌ Error updating AI meta: {e}")
-    
+    complete_13_step_meta(goal, created_tasks, task_time, ai_meta_id)
+
     return created_tasks, f"Created {len(created_tasks)} {task_type} tasks for {objective_number}", task_time
 
 @task_bp.route('/api/tasks/debug-routes', methods=['GET'])
@@ -2280,6 +2799,8 @@ def create_task():
         result = supabase.table("action_plans").insert(task_data).execute()
         
         if result.data:
+            get_workload_store().task_changed(after=result.data[0])
+            
             # Create notification if assigned to someone
             if task_data['assigned_to']:
                 notification_message = f"New task assigned: {task_description[:100]}..."
@@ -2396,6 +2917,8 @@ def update_task(task_id):
         result = supabase.table("action_plans").update(update_data).eq("id", task_id).execute()
         
         if result.data:
+            get_workload_store().task_changed(before=current_task, after=result.data[0])
+            
             # If task was completed, check dependent tasks
             if update_data.get('status') == 'completed':
                 # Find all tasks that have this task as a dependency
@@ -2824,6 +3347,7 @@ def add_task_update(task_id):
                     task_update['status'] = 'in_progress'
                 
                 supabase.table("action_plans").update(task_update).eq("id", task_id).execute()
+                get_workload_store().task_changed(before=task)
             
             return jsonify({'success': True, 'update': result.data[0]})
         else:
@@ -2878,7 +3402,8 @@ def create_file_upload_notification(task_id, file_name, uploaded_by_name):
                     "created_at": datetime.utcnow().isoformat(),
                     "is_read": False
                 }
-                supabase.table("notifications").insert(notification_data).execute()
+                result = supabase.table("notifications").insert(notification_data).execute()
+                record_new_notifications(result.data)
                 print(f"📎 File upload notification sent to {recipient}")
                 
     except Exception as e:
@@ -3184,6 +3709,7 @@ def add_task_note(task_id):
                 task_update['status'] = 'in_progress'
             
             supabase.table("action_plans").update(task_update).eq("id", task_id).execute()
+            get_workload_store().task_changed(before=task)
             
             # ========== SEPARATE PROGRESS NOTIFICATION ==========
             create_enhanced_task_notification(
@@ -3419,6 +3945,114 @@ def get_ai_meta_progress(ai_meta_id):
         print(f"❌ Error getting AI meta: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@task_bp.route('/api/objectives/<objective_id>/assignment-plan', methods=['POST'])
+@token_required
+def get_objective_assignment_plan(objective_id):
+    """Assign all open tasks of an objective at once, balancing fit against employee capacity"""
+    try:
+        supabase = get_supabase_client()
+        data = request.get_json(silent=True) or {}
+        include_assigned = bool(data.get('include_assigned', False))
+        capacity_hours = float(data.get('capacity_hours', ASSIGNMENT_CAPACITY_HOURS))
+        max_tasks = int(data.get('max_tasks_per_employee', ASSIGNMENT_MAX_TASKS_PER_EMPLOYEE))
+        
+        tasks_result = supabase.table("action_plans").select(
+            "id, task_description, estimated_hours, completion_percentage, strategic_metadata, assigned_to, assigned_to_multiple, status"
+        ).eq("objective_id", objective_id).execute()
+        tasks = [task for task in (tasks_result.data or [])
+                 if task.get('status') != 'completed' and (include_assigned or not task.get('assigned_to'))]
+        if not tasks:
+            return jsonify({'success': True, 'objective_id': objective_id, 'assignments': [], 'unassigned': [],
+                            'message': 'No open tasks to assign'})
+        
+        employees_result = supabase.table("employees").select(RECOMMENDATION_EMPLOYEE_FIELDS).eq("is_active", True).execute()
+        employees = employees_result.data or []
+        if not employees:
+            return jsonify({'success': False, 'error': 'No active employees found'}), 400
+        
+        # Hours already on each employee (maintained workload), minus the planned tasks they hold
+        workloads = get_workload_store().for_employees([employee['id'] for employee in employees])
+        existing_hours = {employee_id: workload.remaining_hours for employee_id, workload in workloads.items()}
+        for task in tasks:
+            for employee_id in task_assignees(task):
+                if employee_id in existing_hours:
+                    existing_hours[employee_id] = max(existing_hours[employee_id] - remaining_hours(task), 0)
+        
+        plan = optimize_assignments(tasks, employees, existing_hours=existing_hours,
+                                    capacity_hours=capacity_hours, max_tasks=max_tasks)
+        print(f"🧮 Assignment plan for objective {objective_id}: {len(plan['assignments'])}/{len(tasks)} tasks "
+              f"assigned ({plan['solver']}, {plan['solve_ms']}ms solve)")
+        
+        return jsonify({'success': True, 'objective_id': objective_id, **plan})
+        
+    except Exception as e:
+        print(f"❌ Error building assignment plan: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@task_bp.route('/api/objectives/<objective_id>/generate-rag-recommendations', methods=['POST'])
+@token_required
+def generate_objective_rag_recommendations(objective_id):
+    """Recommend employees for all tasks of an objective in one background job"""
+    flight = None
+    try:
+        supabase = get_supabase_client()
+        data = request.get_json(silent=True) or {}
+        only_missing = bool(data.get('only_missing', True))
+        
+        tasks_result = supabase.table("action_plans").select("id").eq("objective_id", objective_id).execute()
+        if not tasks_result.data:
+            return jsonify({'success': False, 'error': 'Objective has no tasks'}), 404
+        
+        # Attach to a batch that is already running for this objective
+        flight = single_flight.begin('objective_recommendations', objective_id, {'only_missing': only_missing})
+        if flight.existing:
+            return coalesced_response(flight.existing, objective_id=objective_id)
+        
+        job_queue.ensure_capacity()
+        job = job_queue.new_job('objective_recommendations', {'objective_id': objective_id, 'only_missing': only_missing})
+        
+        ai_meta_result = supabase.table("ai_meta").insert({
+            "source": "objective-rag-recommendations",
+            "model": "role-first-then-department",
+            "input_json": {
+                "objective_id": objective_id,
+                "tasks_count": len(tasks_result.data),
+                "only_missing": only_missing,
+                "status": "starting",
+                "job": job,
+                "single_flight_key": flight.key
+            },
+            "output_json": {
+                "status": "processing",
+                "progress": 0,
+                "current_activity": "Starting objective recommendations",
+                "objective_id": objective_id
+            },
+            "created_at": datetime.utcnow().isoformat()
+        }).execute()
+        if not ai_meta_result.data:
+            return jsonify({'success': False, 'error': 'Failed to create AI meta record'}), 500
+        
+        ai_meta_id = ai_meta_result.data[0]['id']
+        job_queue.submit(ai_meta_id, job)
+        
+        return jsonify({
+            'success': True,
+            'ai_meta_id': ai_meta_id,
+            'objective_id': objective_id,
+            'tasks_count': len(tasks_result.data),
+            'message': 'Objective recommendations processing started'
+        })
+        
+    except QueueFullError as e:
+        return queue_full_response(e)
+    except Exception as e:
+        print(f"❌ Error starting objective recommendations: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+    finally:
+        if flight:
+            flight.release()
+
 @task_bp.route('/api/objectives/<objective_id>/rag-recommendations-status', methods=['GET'])
 @token_required
 def get_rag_recommendations_status(objective_id):
@@ -3528,227 +4162,64 @@ def get_rag_recommendations_status(objective_id):
 # ========== SIMPLIFIED RAG IMPLEMENTATION ==========
 
 def extract_text_from_google_drive_url(google_drive_url):
-    """Extract text from Google Drive URL - handles job_description_url column"""
+    """Extract text from Google Drive URL - handles job_description_url column (served from the JD document cache)"""
     try:
         if not google_drive_url:
             return None
-            
-        # Convert Google Drive URL to direct download link
-        if 'drive.google.com' in google_drive_url:
-            if '/file/d/' in google_drive_url:
-                file_id = google_drive_url.split('/file/d/')[1].split('/')[0]
-                direct_url = f"https://drive.google.com/uc?export=download&id={file_id}"
-            elif '/open?id=' in google_drive_url:
-                file_id = google_drive_url.split('/open?id=')[1].split('&')[0]
-                direct_url = f"https://drive.google.com/uc?export=download&id={file_id}"
-            else:
-                print(f"❌ Unsupported Google Drive URL format: {google_drive_url}")
-                return None
-        else:
-            direct_url = google_drive_url
-
-        # Download the file with timeout and headers
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        response = requests.get(direct_url, timeout=30, headers=headers)
-        response.raise_for_status()
-        
-        content_type = response.headers.get('content-type', '').lower()
-        
-        # Handle PDF files
-        if 'pdf' in content_type or google_drive_url.lower().endswith('.pdf'):
-            return extract_text_from_pdf(response.content)
-        
-        # Handle DOCX files
-        elif 'word' in content_type or 'docx' in content_type or google_drive_url.lower().endswith('.docx'):
-            return extract_text_from_docx(response.content)
         
-        # Handle text files
-        elif 'text' in content_type or google_drive_url.lower().endswith('.txt'):
-            return response.text[:10000]  # Limit text length
-        
-        else:
-            # Try to detect file type from content
-            if response.content.startswith(b'%PDF'):
-                return extract_text_from_pdf(response.content)
-            elif response.content.startswith(b'PK'):  # DOCX files start with PK
-                return extract_text_from_docx(response.content)
-            else:
-                # Fallback: return as text with length limit
-                return response.text[:5000] if response.text else None
+        # Downloads and parses each document once; repeat lookups hit the cache
+        return get_jd_document_cache().get_text(google_drive_url, extract_text_from_document_response)
                 
     except Exception as e:
         print(f"❌ Error extracting text from Google Drive URL: {e}")
         return None
 
+def extract_text_from_document_response(response, document_url):
+    """Extract text from a downloaded JD document based on its content type"""
+    content_type = response.headers.get('content-type', '').lower()
+    
+    # Handle PDF files
+    if 'pdf' in content_type or document_url.lower().endswith('.pdf'):
+        return extract_text_from_pdf(response.content)
+    
+    # Handle DOCX files
+    elif 'word' in content_type or 'docx' in content_type or document_url.lower().endswith('.docx'):
+        return extract_text_from_docx(response.content)
+    
+    # Handle text files
+    elif 'text' in content_type or document_url.lower().endswith('.txt'):
+        return response.text[:10000]  # Limit text length
+    
+    else:
+        # Try to detect file type from content
+        if response.content.startswith(b'%PDF'):
+            return extract_text_from_pdf(response.content)
+        elif response.content.startswith(b'PK'):  # DOCX files start with PK
+            return extract_text_from_docx(response.content)
+        else:
+            # Fallback: return as text with length limit
+            return response.text[:5000] if response.text else None
+
 def extract_text_from_pdf(pdf_content):
-    """Extract text from PDF content"""
-    try:
-        pdf_file = io.BytesIO(pdf_content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text[:10000]  # Limit text length
-    except Exception as e:
-        print(f"❌ Error extracting text from PDF: {e}")
-        return None
+    """Extract text from PDF content (stops at the character budget, parsed in the extraction pool)"""
+    return extract_document_text('pdf', pdf_content, char_budget=10000)
 
 def extract_text_from_docx(docx_content):
-    """Extract text from DOCX content"""
-    try:
-        docx_file = io.BytesIO(docx_content)
-        doc = docx.Document(docx_file)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text[:10000]  # Limit text length
-    except Exception as e:
-        print(f"❌ Error extracting text from DOCX: {e}")
-        return None
+    """Extract text from DOCX content (stops at the character budget, parsed in the extraction pool)"""
+    return extract_document_text('docx', docx_content, char_budget=10000)
 
 def identify_responsible_role_from_process(task_description):
     """
-    SIMPLE AND DIRECT role identification - strictly follows the 13-step process
+    SIMPLE AND DIRECT role identification - strictly follows the predefined processes.
+    Phrases and roles come from the role router, compiled from the process registry.
     """
     if not task_description:
         return None
-        
-    task_lower = task_description.lower()
     
-    # DIRECT MAPPING - Exact process step to role
-    process_role_mapping = {
-        # Lead-to-Delivery Process Steps
-        "lead generation": "Account Executive",
-        "lead capture": "Account Executive",
-        "lead qualification": "Product Development Manager",
-        "needs analysis": "Product Development Manager",
-        "proposal offering": "Commercial & Finance Specialist (Consolidation and Kenya-Focused)",
-        "commercial proposal": "Commercial & Finance Specialist (Consolidation and Kenya-Focused)",
-        "negotiation": "CEO and Chief Revenue Officer",
-        "closing the deal": "Account Executive",
-        "signed agreements": "Account Executive",
-        
-        # Order-to-Delivery Process Steps
-        # Step 1 - Account Executive
-        "finalize deal": "Account Executive",
-        "deal documentation": "Account Executive", 
-        "proforma invoice": "Account Executive",
-        "commercial agreement": "Account Executive",
-        "signed pi": "Account Executive",
-        "commercial terms": "Account Executive",
-        
-        # Step 2 - Supply Chain Specialist
-        "supplier stock": "Supply Chain Specialist",
-        "stock order": "Supply Chain Specialist",
-        "kenya suppliers": "Supply Chain Specialist",
-        "stock availability": "Supply Chain Specialist",
-        "inventory reservation": "Supply Chain Specialist",
-        "order confirmation": "Supply Chain Specialist",
-        "final pricing": "Supply Chain Specialist",
-        "supplier coordination": "Supply Chain Specialist",
-        
-        # Step 3 - Product Development Manager
-        "product management": "Product Development Manager",
-        "product approval": "Product Development Manager", 
-        "product validation":"Product Development Manager",
-        "quality standards": "Product Development Manager",
-        "specification approval": "Product Development Manager",
-        "technical assessment": "Product Development Manager",
-        "product acceptance": "Product Development Manager",
-        
-        # Step 4 - Tax Accounting and Admin Specialist
-        "foreign currency": "Tax Accounting & Admin Specialist (Ethiopia-Focused)",
-        "bank permit": "Tax Accounting & Admin Specialist (Ethiopia-Focused)",
-        "currency permit": "Tax Accounting & Admin Specialist (Ethiopia-Focused)",
-        "bank permits": "Tax Accounting & Admin Specialist (Ethiopia-Focused)",
-        
-        # Step 5 -  Commercial & Finance Specialist (Consolidation and Kenya-Focused)
-        "supplier payment": " Commercial & Finance Specialist (Consolidation and Kenya-Focused)",
-        "payment processing": " Commercial & Finance Specialist (Consolidation and Kenya-Focused)",
-        "process payment": " Commercial & Finance Specialist (Consolidation and Kenya-Focused)",
-        "export documentation": " Commercial & Finance Specialist (Consolidation and Kenya-Focused)",
-        "payment confirmation": " Commercial & Finance Specialist (Consolidation and Kenya-Focused)",
-        
-        # Step 6 - Kenyan operation specialist
-        "transportation logistics": "Kenyan operation specialist",
-        "transport arrangement": "Kenyan operation specialist",
-        "appropriate truck": "Kenyan operation specialist",
-        "kenya operation": "Kenyan operation specialist",
-        
-        # Step 7 - Kenyan operation specialist
-        "kenya side": "Kenyan operation specialist",
-        "kenya dispatch": "Kenyan operation specialist", 
-        "kenya clearance": "Kenyan operation specialist",
-        "kenyan customs": "Kenyan operation specialist",
-        "kenya border": "Kenyan operation specialist",
-        "kenya moyale": "Kenyan operation specialist",
-        
-        # Step 8 - Ethiopian Operation Specialist
-        "ethiopian customs": "Ethiopia Operation Specialist (Senior)",
-        "ethiopian clearance": "Ethiopia Operation Specialist (Senior)",
-        "customs clearance": "Ethiopia Operation Specialist (Senior)",
-        "1st payment": "Ethiopia Operation Specialist (Senior)",
-        "permit value": "Ethiopia Operation Specialist (Senior)",
-        
-        # Step 9 - Tax Accounting and Admin Specialist
-        "tax reassessment": "Tax Accounting & Admin Specialist (Ethiopia-Focused)",
-        "2nd tax": "Tax Accounting & Admin Specialist (Ethiopia-Focused)",
-        "final payment": "Tax Accounting & Admin Specialist (Ethiopia-Focused)",
-        "tax payment": "Tax Accounting & Admin Specialist (Ethiopia-Focused)",
-        
-        # Step 10 - Ethiopian Operation Specialist
-        "product loading": "Ethiopia Operation Specialist (Senior)",
-        "dispatch coordination": "Ethiopia Operation Specialist (Senior)",
-        "product dispatch": "Ethiopia Operation Specialist (Senior)",
-        
-        # Step 11 - Ethiopian Operation Specialist
-        "transport monitoring": "Ethiopia Operation Specialist (Senior)",
-        "truck movement": "Ethiopia Operation Specialist (Senior)",
-        "truck tracking": "Ethiopia Operation Specialist (Senior)",
-        
-        # Step 12 - Tax Accounting and Admin Specialist
-        "final delivery": "Tax Accounting & Admin Specialist (Ethiopia-Focused)",
-        "warehouse handover": "Tax Accounting & Admin Specialist (Ethiopia-Focused)",
-        "customer delivery": "Tax Accounting & Admin Specialist (Ethiopia-Focused)",
-        "customer warehouse": "Tax Accounting & Admin Specialist (Ethiopia-Focused)",
-        
-        # Step 13 - Commercial and Finance Specialist
-        "post-delivery": " Commercial & Finance Specialist (Consolidation and Kenya-Focused)",
-        "financial settlements": " Commercial & Finance Specialist (Consolidation and Kenya-Focused)",
-        "document archiving": " Commercial & Finance Specialist (Consolidation and Kenya-Focused)",
-        "lesson learned": " Commercial & Finance Specialist (Consolidation and Kenya-Focused)",
-        "closed order": " Commercial & Finance Specialist (Consolidation and Kenya-Focused)"
-    }
-    
-    # DIRECT CHECK - No complex logic, just direct mapping
-    for keyword, role in process_role_mapping.items():
-        if keyword in task_lower:
-            print(f"🎯 DIRECT MATCH: '{keyword}' -> {role}")
-            return role
-    
-    # If no direct match, check for step numbers
-    step_keywords = {
-        "step 1": "Account Executive", "step1": "Account Executive", "1.": "Account Executive",
-        "step 2": "Supply Chain Specialist", "step2": "Supply Chain Specialist", "2.": "Supply Chain Specialist", 
-        "step 3": "Product Development Manager", "step3": "Product Development Manager", "3.": "Product Development Manager",
-        "step 4": "Tax Accounting & Admin Specialist (Ethiopia-Focused)", "step4": "Tax Accounting & Admin Specialist (Ethiopia-Focused)", "4.": "Tax Accounting & Admin Specialist (Ethiopia-Focused)",
-        "step 5": " Commercial & Finance Specialist (Consolidation and Kenya-Focused)", "step5": " Commercial & Finance Specialist (Consolidation and Kenya-Focused)", "5.": " Commercial & Finance Specialist (Consolidation and Kenya-Focused)",
-        "step 6": "Kenyan operation specialist", "step6": "Kenyan operation specialist", "6.": "Kenyan operation specialist",
-        "step 7": "Kenyan operation specialist", "step7": "Kenyan operation specialist", "7.": "Kenyan operation specialist",
-        "step 8": "Ethiopian Operation Specialist", "step8": "Ethiopian Operation Specialist", "8.": "Ethiopian Operation Specialist",
-        "step 9": "Tax Accounting & Admin Specialist (Ethiopia-Focused)", "step9": "Tax Accounting & Admin Specialist (Ethiopia-Focused)", "9.": "Tax Accounting & Admin Specialist (Ethiopia-Focused)",
-        "step 10": "Ethiopian Operation Specialist", "step10": "Ethiopian Operation Specialist", "10.": "Ethiopian Operation Specialist",
-        "step 11": "Ethiopian Operation Specialist", "step11": "Ethiopian Operation Specialist", "11.": "Ethiopian Operation Specialist",
-        "step 12": "Tax Accounting & Admin Specialist (Ethiopia-Focused)", "step12": "Tax Accounting & Admin Specialist (Ethiopia-Focused)", "12.": "Tax Accounting & Admin Specialist (Ethiopia-Focused)",
-        "step 13": " Commercial & Finance Specialist (Consolidation and Kenya-Focused)", "step13": " Commercial & Finance Specialist (Consolidation and Kenya-Focused)", "13.": " Commercial & Finance Specialist (Consolidation and Kenya-Focused)"
-    }
-    
-    for step_keyword, role in step_keywords.items():
-        if step_keyword in task_lower:
-            print(f"🎯 STEP MATCH: '{step_keyword}' -> {role}")
-            return role
+    role, phrase = route_task_to_role(task_description)
+    if role:
+        print(f"🎯 DIRECT MATCH: '{phrase}' -> {role}")
+        return role
     
     print(f"❌ No process role identified for: {task_description}")
     return None
@@ -3759,11 +4230,12 @@ def get_role_based_qualifications(task_description, employee, jd_text=None):
     """
     Extract key qualifications with focus on role and task alignment
     """
-    task_lower = task_description.lower()
+    task_lower = get_task_text(task_description).lower
+    features = get_employee_feature_store().get(employee)
     qualifications = []
     
     # Role-based qualifications (primary)
-    employee_role = employee.get('role') or ''
+    employee_role = features.role
     if employee_role:
         qualifications.append(f"Role: {employee_role}")
     
@@ -3777,12 +4249,12 @@ def get_role_based_qualifications(task_description, employee, jd_text=None):
     
     for role_type, keywords in role_keywords.items():
         if any(keyword in task_lower for keyword in keywords):
-            if role_type in employee_role.lower():
+            if role_type in features.role_lower:
                 qualifications.append(f"Task-Role Alignment: {role_type.title()}")
                 break
     
     # Department-based qualifications
-    department = employee.get('department') or ''
+    department = features.department
     if department:
         qualifications.append(f"Department: {department}")
     
@@ -3947,16 +4419,17 @@ def find_employee_by_exact_role(employees, target_role):
             target_department = dept
             break
     
-    for employee in employees:
-        employee_role = (employee.get('role') or '').lower().strip()
-        employee_department = (employee.get('department') or '').upper().strip()
-        
+    store = get_employee_feature_store()
+    features = store.features_for(employees)
+    role_ids = store.employees_with_role(target_role_lower)
+    
+    for employee, employee_features in zip(employees, features):
         # 1. EXACT ROLE MATCH (Highest priority)
-        if employee_role == target_role_lower:
+        if employee_features.id in role_ids:
             exact_matches.append(employee)
         
         # 2. DEPARTMENT MATCH (Fallback - only if no exact matches)
-        elif target_department and employee_department == target_department:
+        elif target_department and employee_features.department_key == target_department:
             department_matches.append(employee)
     
     print(f"🔍 Role matching for '{target_role}':")
@@ -4056,8 +4529,8 @@ def full_rag_jd_analysis(task_description, employees, top_k=3, ai_meta_id=None,
     FULL RAG Analysis using AI to analyze Job Descriptions and Task requirements
     """
     try:
-        if not client:
-            print("⚠️ OpenAI client not available, using fallback")
+        if not llm.available():
+            print("⚠️ OpenAI not available (no client or circuit open), using fallback")
             return department_based_analysis(task_description, employees, top_k=3)
         
         # Combine task title and description for better context
@@ -4103,10 +4576,16 @@ def full_rag_jd_analysis(task_description, employees, top_k=3, ai_meta_id=None,
                     
                     if jd_analysis and jd_analysis.get('fit_score', 0) >= 60:
                         recommendations.append(jd_analysis)
-                        
+                
+                except LLMUnavailableError as llm_error:
+                    # OpenAI degraded or out of budget - don't wait on it for the remaining employees
+                    print(f"⚠️ {llm_error}, using department-based analysis")
+                    return department_based_analysis(task_description, employees, top_k=top_k)
                 except Exception as emp_error:
                     print(f"⚠️ Error analyzing employee {employee.get('name')}: {emp_error}")
                     continue
+            
+            record_ai_model(ai_meta_id, ", ".join(sorted({rec['ai_model'] for rec in recommendations if rec.get('ai_model')})))
         
         # Process employees without JD using basic analysis
         if employees_without_jd and len(recommendations) < top_k:
@@ -4147,60 +4626,23 @@ def analyze_employee_jd_with_ai(task_description, task_title, employee, ai_meta_
         employee_skills = employee.get('skills', [])
         jd_url = employee.get('job_description_url', '')
         
-        # Build employee profile summary
-        employee_profile = f"""
-Employee Profile:
-- Name: {employee_name}
-- Role: {employee_role}
-- Title: {employee_title}
-- Department: {employee_department}
-- Skills: {', '.join(employee_skills) if isinstance(employee_skills, list) else str(employee_skills)}
-- Job Description Available: {'Yes' if jd_url else 'No'}
-"""
-        
-        prompt = f"""
-You are an HR expert analyzing employee-task fit using Job Descriptions and role information.
-
-TASK REQUIREMENTS:
-Title: {task_title}
-Description: {task_description}
-
-EMPLOYEE PROFILE:
-{employee_profile}
-
-Analyze how well this employee matches the task requirements based on:
-1. **Role alignment** - How well does the employee's role match the task requirements?
-2. **Job Description analysis** - If JD is available, analyze the JD content against task requirements
-3. **Department relevance** - Is the employee's department relevant to the task?
-4. **Skills match** - Do the employee's skills align with task requirements?
-5. **Experience level** - Does the employee have appropriate experience?
-
-**IMPORTANT:** Prioritize role and JD analysis. If JD is available, use it to assess fit. If not, rely on role, department, and skills.
-
-Return ONLY valid JSON in this exact format:
-{{
-    "fit_score": 85,
-    "skills_match": 90,
-    "role_alignment": 80,
-    "jd_relevance": 75,
-    "overall_fit": "excellent",
-    "key_qualifications": ["Qualification 1", "Qualification 2", "Qualification 3"],
-    "reason": "Detailed explanation of why this employee is suitable for the task",
-    "confidence": "high"
-}}
-
-Fit score should be 0-100 based on overall match.
-"""
+        # Static scoring instructions first, the task and employee last (provider prompt caching)
+        template = get_prompt_template('jd_scoring')
+        messages = template.render(
+            task_title=task_title,
+            task_description=task_description,
+            name=employee_name,
+            role=employee_role,
+            title=employee_title,
+            department=employee_department,
+            skills=', '.join(employee_skills) if isinstance(employee_skills, list) else str(employee_skills),
+            jd_available='Yes' if jd_url else 'No'
+        )
         
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an HR expert. Return ONLY valid JSON. Do not include markdown or code blocks."
-                },
-                {"role": "user", "content": prompt}
-            ],
+        response = llm.create(
+            LANE_BATCH,
+            site='jd_scoring',
+            messages=messages,
             temperature=0.2,
             max_tokens=500,
             timeout=20
@@ -4233,47 +4675,30 @@ Fit score should be 0-100 based on overall match.
             'rag_enhanced': True,
             'jd_analyzed': bool(jd_url),
             'assignment_type': 'ai_jd_analysis',
-            'role_based_assignment': False
+            'role_based_assignment': False,
+            'ai_model': response.model,
+            'prompt_template': template.id
         }
         
         return recommendation
         
+    except LLMUnavailableError:
+        raise
     except Exception as e:
         print(f"⚠️ Error in AI JD analysis for {employee.get('name')}: {e}")
         return create_basic_recommendation(employee, task_description)
 
 def create_basic_recommendation(employee, task_description):
     """Create a basic recommendation when AI analysis fails"""
-    task_lower = task_description.lower()
-    employee_role = (employee.get('role') or '').lower()
-    employee_department = (employee.get('department') or '').lower()
-    
-    score = 50  # Base score
-    
-    # Role matching
-    if employee_role and any(word in task_lower for word in employee_role.split() if len(word) > 3):
-        score += 20
-    
-    # Department matching
-    dept_keywords = {
-        'supply chain': ['logistics', 'shipment', 'inventory', 'customs'],
-        'sales': ['client', 'deal', 'agreement', 'invoice'],
-        'product': ['product', 'quality', 'specification'],
-        'finance': ['payment', 'bank', 'tax', 'financial']
-    }
-    
-    for dept, keywords in dept_keywords.items():
-        if dept in employee_department:
-            if any(kw in task_lower for kw in keywords):
-                score += 15
-            break
+    # Base 50, +20 role words in task, +15 department keywords in task
+    score = basic_recommendation_score(task_description, employee)
     
     return {
         'employee_id': employee['id'],
         'employee_name': employee.get('name', 'Unknown'),
         'employee_role': employee.get('role', ''),
         'employee_department': employee.get('department', ''),
-        'fit_score': min(score, 100),
+        'fit_score': score,
         'key_qualifications': [
             f"Role: {employee.get('role', 'N/A')}",
             f"Department: {employee.get('department', 'N/A')}"
@@ -4287,56 +4712,21 @@ def department_based_analysis(task_description, employees, top_k=3):
     Department-based analysis for non-process tasks
     Returns top_k recommendations (default: 3)
     """
-    task_lower = task_description.lower()
     recommendations = []
     
-    # Department to task keyword mapping
-    department_keywords = {
-        "SUPPLY CHAIN DEPARTMENT": [
-            "logistics", "shipment", "inventory", "customs", "border", "transport",
-            "supplier", "stock", "delivery", "clearance", "dispatch", "shipping"
-        ],
-        "SALES DEPARTMENT": [
-            "client", "deal", "agreement", "invoice", "customer", "sales",
-            "commercial", "revenue", "proposal", "negotiation"
-        ],
-        "PRODUCT DEVELOPMENT DEPARTMENT": [
-            "product", "quality", "specification", "technical", "testing",
-            "validation", "development", "design", "engineering"
-        ],
-        "FINANCE & ADMIN DEPARTMENT": [
-            "payment", "bank", "tax", "financial", "currency", "accounting",
-            "budget", "compliance", "documentation", "admin", "administrative"
-        ]
-    }
+    # Department keywords (60 max) + role words (30 max) + experience (10 max)
+    features = get_employee_feature_store().features_for(employees)
+    scores, has_department = department_analysis_scores(task_description, employees, features=features)
     
-    for employee in employees:
+    for employee, employee_features, score, scored in zip(employees, features, scores, has_department):
         try:
-            employee_department = (employee.get('department') or '').upper().strip()
-            employee_role = employee.get('role') or ''
-            
-            if not employee_department:
+            if not scored:
                 continue
                 
-            # Check if employee's department keywords match the task
-            department_score = 0
-            if employee_department in department_keywords:
-                keywords = department_keywords[employee_department]
-                matching_keywords = sum(1 for keyword in keywords if keyword in task_lower)
-                department_score = min(matching_keywords * 15, 60)  # Max 60 points
-            
-            # Role relevance bonus
-            role_score = 0
-            if employee_role:
-                role_words = employee_role.lower().split()
-                role_matches = sum(1 for word in role_words if len(word) > 4 and word in task_lower)
-                role_score = min(role_matches * 10, 30)  # Max 30 points
-            
-            # Experience bonus
+            employee_department = employee_features.department_key
+            employee_role = employee_features.role
             experience = employee.get('experience_years', 0)
-            exp_score = min(experience * 2, 10)  # Max 10 points
-            
-            total_score = department_score + role_score + exp_score
+            total_score = to_score(score)
             
             if total_score >= 40:
                 recommendations.append({
@@ -4364,6 +4754,252 @@ def department_based_analysis(task_description, employees, top_k=3):
     sorted_recommendations = sorted(recommendations, key=lambda x: x['fit_score'], reverse=True)
     return sorted_recommendations[:top_k]
 
+def parse_strategic_metadata(task):
+    """A task's strategic_metadata as a dict (stored as JSON text on older rows)"""
+    strategic_meta_raw = task.get('strategic_metadata')
+    if isinstance(strategic_meta_raw, str):
+        try:
+            return json.loads(strategic_meta_raw)
+        except:
+            return {}
+    elif isinstance(strategic_meta_raw, dict):
+        return strategic_meta_raw
+    return {}
+
+def get_objective_template(objective_id=None, objective=None):
+    """Template the objective's tasks were generated with (from the objective's ai_meta input_json)"""
+    try:
+        supabase = get_supabase_client()
+        if objective is None and objective_id:
+            objective_result = supabase.table("objectives").select("ai_meta_id").eq("id", objective_id).execute()
+            objective = objective_result.data[0] if objective_result.data else None
+        if isinstance(objective, dict) and objective.get('ai_meta_id'):
+            ai_meta_result = supabase.table("ai_meta").select("input_json").eq("id", objective['ai_meta_id']).execute()
+            if ai_meta_result.data and ai_meta_result.data[0].get('input_json'):
+                return ai_meta_result.data[0]['input_json'].get('template')
+    except Exception as e:
+        print(f"⚠️ Error getting objective template: {e}")
+    return None
+
+def build_recommendation_metadata(strategic_meta, recommendations, strategy, is_predefined_process, recommended_role, employees_count):
+    """strategic_metadata with a task's employee recommendations filled in"""
+    strategic_meta = dict(strategic_meta or {})
+    strategic_meta['ai_recommendations'] = recommendations
+    strategic_meta['employee_recommendations_available'] = bool(recommendations)
+    if is_predefined_process:
+        strategic_meta['recommendations_analysis'] = f"Role-based assignment for predefined process - {len(recommendations)} recommendation(s) matching role: {recommended_role}"
+    else:
+        strategic_meta['recommendations_analysis'] = f"Full RAG analysis with JD documents - {len(recommendations)} recommendation(s)"
+    strategic_meta['recommendations_generated_at'] = datetime.utcnow().isoformat()
+    strategic_meta['rag_enhanced'] = True
+    strategic_meta['recommendation_count'] = len(recommendations)
+    strategic_meta['assignment_strategy'] = strategy
+    strategic_meta['total_employees_considered'] = employees_count
+    return strategic_meta
+
+def apply_cached_recommendations(task, strategic_meta, recommended_role, strategy, is_predefined_process, employees):
+    """
+    Reuse a cached recommendation result for the task, if there is one.
+
+    On a hit the recommendations are written to the task's strategic_metadata
+    and the cache entry (recommendations, ai_meta_id of the run that produced
+    them) is returned; None on a miss.
+    """
+    entry = get_recommendation_cache().get(
+        get_recommendation_cache().key_for(task['task_description'], recommended_role, strategy, employees))
+    if not entry:
+        return None
+    get_supabase_client().table("action_plans").update({
+        "strategic_metadata": build_recommendation_metadata(
+            strategic_meta, entry['recommendations'], strategy, is_predefined_process, recommended_role, len(employees))
+    }).eq("id", task['id']).execute()
+    print(f"⚡ Cached recommendations for task {task['id']} ({len(entry['recommendations'])} recommendations)")
+    return entry
+
+def merge_strategic_metadata(rows):
+    """
+    Merge keys into several tasks' strategic_metadata in one round trip.
+    
+    rows: [{'id': ..., 'strategic_metadata': {...keys to set}}]. The keys are merged
+    into the task's current value in the database (merge_strategic_metadata,
+    migrations/action_plans_strategic_metadata.sql), so metadata written while a job
+    was running and the other columns (assignment, status, progress) are kept.
+    """
+    if not rows:
+        return 0
+    supabase = get_supabase_client()
+    rows = [{'id': row['id'], 'strategic_metadata': row['strategic_metadata']} for row in rows]
+    try:
+        result = supabase.rpc('merge_strategic_metadata', {'p_rows': rows}).execute()
+        return int(result.data or 0)
+    except Exception as e:
+        print(f"⚠️ Batch strategic_metadata merge failed ({e}), writing tasks one by one")
+        saved = 0
+        for row in rows:
+            try:
+                current = supabase.table("action_plans").select("strategic_metadata").eq("id", row['id']).execute()
+                if not current.data:
+                    continue
+                strategic_meta = dict(parse_strategic_metadata(current.data[0]), **row['strategic_metadata'])
+                supabase.table("action_plans").update({"strategic_metadata": strategic_meta}).eq("id", row['id']).execute()
+                saved += 1
+            except Exception as row_error:
+                print(f"❌ Failed to save recommendations for task {row['id']}: {row_error}")
+        return saved
+
+def process_objective_recommendations(objective_id, ai_meta_id, only_missing=True):
+    """
+    Recommend employees for every task of an objective in one job.
+    
+    The objective template and employee list are loaded once, tasks with the
+    same role (predefined processes) or the same description (RAG) share one
+    result, distinct RAG analyses run OBJECTIVE_RAG_CONCURRENCY at a time,
+    progress is reported on a single ai_meta record and all strategic_metadata
+    updates are written together at the end.
+    """
+    try:
+        supabase = get_supabase_client()
+        start_time = time.time()
+        
+        objective_result = supabase.table("objectives").select("*").eq("id", objective_id).execute()
+        if not objective_result.data:
+            log_ai_error("objective_recommendations", f"Objective {objective_id} not found", ai_meta_id)
+            return
+        objective_template = get_objective_template(objective=objective_result.data[0])
+        is_predefined_process = objective_template in PREDEFINED_PROCESS_TEMPLATES
+        
+        tasks_result = supabase.table("action_plans").select("*").eq("objective_id", objective_id).execute()
+        tasks = tasks_result.data or []
+        if only_missing:
+            tasks = [task for task in tasks if not parse_strategic_metadata(task).get('ai_recommendations')]
+        
+        employees_result = supabase.table("employees").select(RAG_RECOMMENDATION_EMPLOYEE_FIELDS).eq("is_active", True).execute()
+        employees = employees_result.data or []
+        if not employees:
+            log_ai_error("objective_recommendations", "No active employees found", ai_meta_id)
+            return
+        
+        print(f"👥 Objective recommendations for {objective_id}: {len(tasks)} tasks, {len(employees)} employees (template: {objective_template})")
+        
+        def report(done, activity, details):
+            supabase.table("ai_meta").update({
+                "output_json": {
+                    "status": "processing",
+                    "progress": 5 + int(90 * done / max(len(tasks), 1)),
+                    "current_activity": activity,
+                    "activity_details": details,
+                    "objective_id": objective_id,
+                    "tasks_total": len(tasks),
+                    "tasks_done": done,
+                    "template": objective_template
+                },
+                "updated_at": datetime.utcnow().isoformat()
+            }).eq("id", ai_meta_id).execute()
+        
+        report(0, "Recommending employees", f"{len(tasks)} tasks to process")
+        
+        # One analysis per distinct role (role matching) or description (RAG), shared by the tasks
+        cache, directory = get_recommendation_cache(), directory_version(employees)
+        plan, shared, rag_pending, cached = [], {}, {}, 0
+        for task in tasks:
+            strategic_meta = parse_strategic_metadata(task)
+            recommended_role = strategic_meta.get('recommended_role') or strategic_meta.get('assigned_role')
+            role_based = is_predefined_process and bool(recommended_role)
+            strategy = "role_based_predefined_process" if role_based else "full_rag_ai_classified"
+            key = (strategy, recommended_role if role_based else task['task_description'])
+            plan.append((task, strategic_meta, recommended_role, strategy, key))
+            if key in shared or key in rag_pending:
+                continue
+            if role_based:
+                shared[key] = get_role_based_recommendations_for_predefined_process(
+                    recommended_role=recommended_role, employees=employees, task_description=task['task_description'])
+                continue
+            entry = cache.get(cache.key_for(task['task_description'], recommended_role, strategy, directory=directory))
+            if entry:
+                shared[key] = entry['recommendations']
+                cached += 1
+            else:
+                rag_pending[key] = (task, recommended_role)
+        
+        def rag_for_task(task):
+            task_title = task['task_description'].split(':')[0] if ':' in task['task_description'] else None
+            # No ai_meta_id: per-task progress would overwrite the objective's progress
+            return enhanced_role_based_employee_recommendations(
+                task_description=task['task_description'], employees=employees, top_k=3,
+                task_title=task_title, task=task)
+        
+        if rag_pending:
+            analyses = len(shared) + len(rag_pending)
+            last_report = time.time()
+            with ThreadPoolExecutor(max_workers=OBJECTIVE_RAG_CONCURRENCY, thread_name_prefix='objective-rag') as pool:
+                futures = {pool.submit(rag_for_task, task): key for key, (task, _) in rag_pending.items()}
+                for future in as_completed(futures):
+                    analysis_key = futures[future]
+                    recommendations = shared[analysis_key] = future.result()
+                    task, recommended_role = rag_pending[analysis_key]
+                    if recommendations:
+                        strategy = analysis_key[0]
+                        cache.put(cache.key_for(task['task_description'], recommended_role, strategy, directory=directory),
+                                  recommendations, assignment_strategy=strategy,
+                                  recommended_role=recommended_role, ai_meta_id=ai_meta_id)
+                    if time.time() - last_report >= OBJECTIVE_PROGRESS_INTERVAL_SECONDS:
+                        done = sum(1 for *_, key in plan if key in shared)
+                        report(done, "Analyzing Job Descriptions",
+                               f"{len(shared)}/{analyses} analyses: {analysis_key[1][:60]}")
+                        last_report = time.time()
+        
+        rows, summary = [], []
+        for task, strategic_meta, recommended_role, strategy, key in plan:
+            recommendations = shared[key]
+            # Only the recommendation keys: they are merged into the task's current metadata
+            rows.append({
+                'id': task['id'],
+                'strategic_metadata': build_recommendation_metadata(
+                    None, recommendations, strategy, is_predefined_process, recommended_role, len(employees))
+            })
+            summary.append({
+                'task_id': task['id'],
+                'assignment_strategy': strategy,
+                'recommendation_count': len(recommendations),
+                'top_employee': recommendations[0].get('employee_name') if recommendations else None
+            })
+        
+        report(len(tasks), "Saving recommendations", f"Writing recommendations for {len(rows)} tasks")
+        saved = merge_strategic_metadata(rows)
+        
+        models = sorted({rec['ai_model'] for recs in shared.values() for rec in recs if rec.get('ai_model')})
+        record_ai_model(ai_meta_id, ", ".join(models))
+        
+        processing_time = time.time() - start_time
+        supabase.table("ai_meta").update({
+            "output_json": {
+                "status": "completed",
+                "progress": 100,
+                "current_activity": "Objective recommendations complete",
+                "activity_details": f"Recommendations saved for {saved} of {len(tasks)} tasks",
+                "objective_id": objective_id,
+                "tasks_total": len(tasks),
+                "tasks_done": len(tasks),
+                "tasks_saved": saved,
+                "distinct_analyses": len(shared),
+                "cached_analyses": cached,
+                "template": objective_template,
+                "is_predefined_process": is_predefined_process,
+                "processing_time": processing_time,
+                "tasks": summary
+            },
+            "updated_at": datetime.utcnow().isoformat()
+        }).eq("id", ai_meta_id).execute()
+        
+        print(f"✅ Objective recommendations for {objective_id}: {saved}/{len(tasks)} tasks in {processing_time:.2f}s ({len(shared)} distinct analyses)")
+        
+    except Exception as e:
+        print(f"❌ Error in objective recommendations: {e}")
+        import traceback
+        traceback.print_exc()
+        # Let the job queue retry; job_failed() records the final failure on ai_meta
+        raise
+
 # Update the main function to use the corrected approach
 def corrected_process_employee_recommendations_for_task(task, employees, ai_meta_id):
     """
@@ -4381,34 +5017,14 @@ def corrected_process_employee_recommendations_for_task(task, employees, ai_meta
         # 🎯 SIMPLE RULE: Check template from objective
         # Get objective to check template
         objective_id = task.get('objective_id')
-        objective_template = None
-        if objective_id:
-            try:
-                objective_result = supabase.table("objectives").select("ai_meta_id").eq("id", objective_id).execute()
-                if objective_result.data and objective_result.data[0].get('ai_meta_id'):
-                    ai_meta_id_obj = objective_result.data[0]['ai_meta_id']
-                    ai_meta_result = supabase.table("ai_meta").select("input_json").eq("id", ai_meta_id_obj).execute()
-                    if ai_meta_result.data and ai_meta_result.data[0].get('input_json'):
-                        objective_template = ai_meta_result.data[0]['input_json'].get('template')
-            except Exception as e:
-                print(f"⚠️ Error getting objective template: {e}")
+        objective_template = get_objective_template(objective_id) if objective_id else None
         
         # Get recommended_role from strategic_metadata
-        strategic_meta_raw = task.get('strategic_metadata')
-        if isinstance(strategic_meta_raw, str):
-            try:
-                strategic_meta = json.loads(strategic_meta_raw)
-            except:
-                strategic_meta = {}
-        elif isinstance(strategic_meta_raw, dict):
-            strategic_meta = strategic_meta_raw
-        else:
-            strategic_meta = {}
-        
+        strategic_meta = parse_strategic_metadata(task)
         recommended_role = strategic_meta.get('recommended_role') or strategic_meta.get('assigned_role')
         
         # 🎯 SIMPLE CHECK: predefined processes (order_to_delivery, stock_to_delivery) = role matching, auto = RAG
-        is_predefined_process = objective_template in ('order_to_delivery', 'order-to-delivery', 'stock_to_delivery', 'stock-to-delivery', 'lead_to_delivery', 'lead-to-delivery')
+        is_predefined_process = objective_template in PREDEFINED_PROCESS_TEMPLATES
         
         # Debug logging
         print(f"=" * 80)
@@ -4522,19 +5138,8 @@ def corrected_process_employee_recommendations_for_task(task, employees, ai_meta
         processing_time = time.time() - start_time
         
         # Update task with final recommendations
-        if not strategic_meta:
-            strategic_meta = {}
-        strategic_meta['ai_recommendations'] = rag_recommendations
-        strategic_meta['employee_recommendations_available'] = bool(rag_recommendations)
-        if is_predefined_process:
-            strategic_meta['recommendations_analysis'] = f"Role-based assignment for predefined process - {len(rag_recommendations)} recommendation(s) matching role: {recommended_role}"
-        else:
-            strategic_meta['recommendations_analysis'] = f"Full RAG analysis with JD documents - {len(rag_recommendations)} recommendation(s)"
-        strategic_meta['recommendations_generated_at'] = datetime.utcnow().isoformat()
-        strategic_meta['rag_enhanced'] = True
-        strategic_meta['recommendation_count'] = len(rag_recommendations)
-        strategic_meta['assignment_strategy'] = strategy
-        strategic_meta['total_employees_considered'] = len(employees)
+        strategic_meta = build_recommendation_metadata(strategic_meta, rag_recommendations, strategy,
+                                                       is_predefined_process, recommended_role, len(employees))
         
         update_result = supabase.table("action_plans").update({
             "strategic_metadata": strategic_meta
@@ -4566,12 +5171,19 @@ def corrected_process_employee_recommendations_for_task(task, employees, ai_meta
                 "jd_analyzed_count": jd_analyzed_count,
                 "ai_analyzed_count": ai_analyzed_count,
                 "is_predefined_process": is_predefined_process,
-                "recommended_role": recommended_role if is_predefined_process else None
+                "recommended_role": recommended_role if is_predefined_process else None,
+                "prompt_templates": sorted({r['prompt_template'] for r in rag_recommendations if r.get('prompt_template')})
             },
             "updated_at": datetime.utcnow().isoformat()
         }
         supabase.table("ai_meta").update(final_update).eq("id", ai_meta_id).execute()
         
+        if rag_recommendations:
+            cache = get_recommendation_cache()
+            cache.put(cache.key_for(task['task_description'], recommended_role, strategy, employees), rag_recommendations,
+                      assignment_strategy=strategy, recommended_role=recommended_role,
+                      ai_meta_id=ai_meta_id, processing_time=processing_time)
+        
         print(f"✅ CORRECTED RAG recommendations completed in {processing_time:.2f}s")
         print(f"📊 Final recommendations: {len(rag_recommendations)}")
         print(f"🎯 Role-based assignments: {len([r for r in rag_recommendations if r.get('role_based_assignment')])}")
@@ -4584,7 +5196,8 @@ def corrected_process_employee_recommendations_for_task(task, employees, ai_meta
         import traceback
         traceback.print_exc()
         
-        return False
+        # Let the job queue retry; job_failed() records the final failure on ai_meta
+        raise
 
 
 def calculate_advanced_fit_score(task_description, employee_role, employee_department, 
@@ -4592,25 +5205,25 @@ def calculate_advanced_fit_score(task_description, employee_role, employee_depar
     """
     ADVANCED scoring system analyzing multiple criteria
     """
-    task_lower = task_description.lower()
+    task = get_task_text(task_description)
     score = 0
     
     # 1. ROLE ALIGNMENT (40 points max)
-    role_score = calculate_role_alignment_score(task_lower, employee_role)
+    role_score = calculate_role_alignment_score(task, employee_role)
     score += role_score
     
     # 2. DEPARTMENT ALIGNMENT (20 points max)
-    dept_score = calculate_department_alignment_score(task_lower, employee_department)
+    dept_score = calculate_department_alignment_score(task, employee_department)
     score += dept_score
     
     # 3. SKILLS MATCHING (20 points max)
-    skills_score = calculate_skills_matching_score(task_lower, employee_skills)
+    skills_score = calculate_skills_matching_score(task, employee_skills)
     score += skills_score
     
     # 4. JD CONTENT ANALYSIS (15 points max) - Only if JD available
     jd_score = 0
     if jd_text:
-        jd_score = calculate_jd_analysis_score(task_lower, jd_text)
+        jd_score = calculate_jd_analysis_score(task, jd_text)
     score += jd_score
     
     # 5. EXPERIENCE BONUS (5 points max)
@@ -4621,91 +5234,19 @@ def calculate_advanced_fit_score(task_description, employee_role, employee_depar
 
 def calculate_role_alignment_score(task_lower, employee_role):
     """Calculate role alignment score (0-40 points)"""
-    if not employee_role:
-        return 0
-        
-    employee_role_lower = employee_role.lower()
-    
-    # Exact role match in task description
-    if employee_role_lower in task_lower:
-        return 40
-    
-    # Partial role match
-    role_keywords = employee_role_lower.split()
-    keyword_matches = sum(1 for keyword in role_keywords if len(keyword) > 3 and keyword in task_lower)
-    
-    if keyword_matches >= 2:
-        return 30
-    elif keyword_matches >= 1:
-        return 20
-    
-    return 10  # Base score for having a role
+    return role_alignment_score(task_lower, employee_role)
 
 def calculate_department_alignment_score(task_lower, employee_department):
     """Calculate department alignment score (0-20 points)"""
-    if not employee_department:
-        return 0
-        
-    dept_lower = employee_department.lower()
-    
-    # Department mapping to task keywords
-    department_keywords = {
-        "supply chain": ["logistics", "shipment", "inventory", "customs", "supplier", "stock", "delivery"],
-        "sales": ["client", "deal", "agreement", "invoice", "customer", "sales", "revenue"],
-        "product": ["product", "quality", "specification", "technical", "testing", "validation"],
-        "finance": ["payment", "bank", "tax", "financial", "currency", "accounting", "budget"],
-        "operations": ["coordinate", "arrange", "manage", "dispatch", "clearance", "transport"]
-    }
-    
-    # Check if department matches task keywords
-    for dept, keywords in department_keywords.items():
-        if dept in dept_lower:
-            matching_keywords = sum(1 for keyword in keywords if keyword in task_lower)
-            return min(matching_keywords * 5, 20)  # 5 points per matching keyword, max 20
-    
-    return 5  # Base score for having a department
+    return department_alignment_score(task_lower, employee_department)
 
 def calculate_skills_matching_score(task_lower, employee_skills):
     """Calculate skills matching score (0-20 points)"""
-    if not employee_skills or not isinstance(employee_skills, list):
-        return 0
-    
-    # Common task-related skills
-    task_skills = [
-        "management", "coordination", "analysis", "planning", "communication",
-        "negotiation", "documentation", "processing", "validation", "testing",
-        "logistics", "finance", "sales", "product", "quality", "technical"
-    ]
-    
-    # Check for skill matches
-    skill_matches = 0
-    for skill in employee_skills[:10]:  # Check first 10 skills
-        skill_lower = str(skill).lower()
-        
-        # Direct skill match in task
-        if skill_lower in task_lower:
-            skill_matches += 2
-        # Partial skill match
-        elif any(task_skill in skill_lower for task_skill in task_skills):
-            skill_matches += 1
-    
-    return min(skill_matches * 4, 20)  # 4 points per strong match, 2 points per partial
+    return skills_matching_score(task_lower, employee_skills)
 
 def calculate_jd_analysis_score(task_lower, jd_text):
     """Calculate JD content analysis score (0-15 points)"""
-    jd_lower = jd_text.lower()
-    
-    # Task-specific keywords to look for in JD
-    task_keywords = [
-        "manage", "coordinate", "lead", "process", "arrange", "finalize",
-        "handle", "execute", "implement", "oversee", "supervise", "analyze",
-        "develop", "create", "build", "design", "plan", "organize"
-    ]
-    
-    # Count matching keywords between task and JD
-    matching_keywords = sum(1 for keyword in task_keywords if keyword in task_lower and keyword in jd_lower)
-    
-    return min(matching_keywords * 3, 15)  # 3 points per matching keyword
+    return jd_analysis_score(task_lower, jd_text)
 
 def get_advanced_qualifications(task_description, employee, jd_text=None):
     """Generate advanced qualifications based on multiple criteria"""
@@ -4890,6 +5431,7 @@ def ultra_fast_fallback(task_description, employees):
 @admin_required
 def generate_rag_employee_recommendations(task_id):
     """Generate CORRECTED RAG-enhanced employee recommendations for a specific task"""
+    flight = None
     try:
         supabase = get_supabase_client()
         
@@ -4901,34 +5443,31 @@ def generate_rag_employee_recommendations(task_id):
         task = task_result.data[0]
         objective = task.get('objectives') or {}
         
+        # Attach to an identical request that is already running
+        flight = single_flight.begin('rag_recommendations', task_id, {'task_description': task['task_description']})
+        if flight.existing:
+            existing_input = flight.existing.get('input_json') or {}
+            return coalesced_response(
+                flight.existing,
+                task_id=task_id,
+                corrected_rag=True,
+                assignment_strategy=existing_input.get('assignment_strategy'),
+                is_predefined_process=existing_input.get('is_predefined_process'),
+                recommended_role=existing_input.get('recommended_role'),
+                template=(flight.existing.get('output_json') or {}).get('template')
+            )
+        
         # 🎯 SIMPLE RULE: Check template from objective
         # If template is "order_to_delivery" → use predefined role matching
         # If template is "auto" → use RAG
-        objective_template = None
-        if isinstance(objective, dict):
-            # Check ai_meta for template
-            ai_meta_id_obj = objective.get('ai_meta_id')
-            if ai_meta_id_obj:
-                ai_meta_result = supabase.table("ai_meta").select("input_json").eq("id", ai_meta_id_obj).execute()
-                if ai_meta_result.data and ai_meta_result.data[0].get('input_json'):
-                    objective_template = ai_meta_result.data[0]['input_json'].get('template')
+        objective_template = get_objective_template(objective=objective)
         
         # Also check strategic_metadata for role info
-        strategic_meta_raw = task.get('strategic_metadata')
-        if isinstance(strategic_meta_raw, str):
-            try:
-                strategic_meta = json.loads(strategic_meta_raw)
-            except:
-                strategic_meta = {}
-        elif isinstance(strategic_meta_raw, dict):
-            strategic_meta = strategic_meta_raw
-        else:
-            strategic_meta = {}
-        
+        strategic_meta = parse_strategic_metadata(task)
         recommended_role = strategic_meta.get('recommended_role') or strategic_meta.get('assigned_role')
         
         # 🎯 SIMPLE CHECK: predefined processes (order_to_delivery, stock_to_delivery) = role matching, auto = RAG
-        is_predefined_process = objective_template in ('order_to_delivery', 'order-to-delivery', 'stock_to_delivery', 'stock-to-delivery', 'lead_to_delivery', 'lead-to-delivery')
+        is_predefined_process = objective_template in PREDEFINED_PROCESS_TEMPLATES
         
         print(f"🔍 ENDPOINT DEBUG: Task ID: {task_id}")
         print(f"🔍 ENDPOINT DEBUG: Objective template: {objective_template}")
@@ -4936,9 +5475,7 @@ def generate_rag_employee_recommendations(task_id):
         print(f"🔍 ENDPOINT DEBUG: recommended_role: {recommended_role}")
         
         # Get all active employees with JD links
-        employees_result = supabase.table("employees").select(
-            "id, name, role, title, department, job_description_url"
-        ).eq("is_active", True).execute()
+        employees_result = supabase.table("employees").select(RAG_RECOMMENDATION_EMPLOYEE_FIELDS).eq("is_active", True).execute()
         
         employees = employees_result.data if employees_result.data else []
         
@@ -4957,6 +5494,33 @@ def generate_rag_employee_recommendations(task_id):
             assignment_strategy = "full_rag_ai_classified"
             print(f"ℹ️ ENDPOINT: AI-generated task (template: {objective_template}) - will use full RAG analysis")
         
+        # Same task content, employee directory and algorithm: reuse the earlier result, no job
+        cached = apply_cached_recommendations(task, strategic_meta, recommended_role, assignment_strategy,
+                                              is_predefined_process, employees)
+        if cached:
+            recommendations = cached['recommendations']
+            return jsonify({
+                'success': True,
+                'ai_meta_id': cached.get('ai_meta_id'),
+                'cached': True,
+                'status': 'completed',
+                'message': 'Recommendations unchanged since the last analysis - reused the cached result',
+                'task_id': task_id,
+                'corrected_rag': True,
+                'assignment_strategy': assignment_strategy,
+                'employees_count': len(employees),
+                'is_predefined_process': is_predefined_process,
+                'template': objective_template,
+                'recommended_role': recommended_role,
+                'recommendations': recommendations,
+                'initial_activity': "Recommendations ready",
+                'initial_details': f"Reused {len(recommendations)} cached recommendation(s)"
+            })
+        
+        # Refuse early (before creating records) when the job queue is full
+        job_queue.ensure_capacity()
+        job = job_queue.new_job('rag_recommendations', {'task_id': task_id})
+        
         # Create AI meta record for RAG recommendations
         ai_meta_data = {
             "source": "corrected-rag-recommendations",
@@ -4970,7 +5534,9 @@ def generate_rag_employee_recommendations(task_id):
                 "corrected_rag": True,
                 "assignment_strategy": assignment_strategy,
                 "is_predefined_process": is_predefined_process,
-                "recommended_role": recommended_role
+                "recommended_role": recommended_role,
+                "job": job,
+                "single_flight_key": flight.key
             },
             "output_json": {
                 "status": "processing",
@@ -4993,12 +5559,8 @@ def generate_rag_employee_recommendations(task_id):
         
         ai_meta_id = ai_meta_result.data[0]['id']
         
-        # Start CORRECTED RAG-enhanced recommendation process in background
-        threading.Thread(
-            target=corrected_process_employee_recommendations_for_task,  # CHANGED THIS LINE
-            args=(task, employees, ai_meta_id),
-            daemon=True
-        ).start()
+        # Run CORRECTED RAG-enhanced recommendation process as a background job
+        job_queue.submit(ai_meta_id, job)
         
         return jsonify({
             'success': True, 
@@ -5015,10 +5577,140 @@ def generate_rag_employee_recommendations(task_id):
             'initial_details': initial_details
         })
         
+    except QueueFullError as e:
+        return queue_full_response(e)
     except Exception as e:
         error_msg = f"Error starting CORRECTED RAG employee recommendations: {str(e)}"  # UPDATED ERROR
         print(f"❌ {error_msg}")
         return jsonify({'success': False, 'error': error_msg}), 500
+    finally:
+        if flight:
+            flight.release()
+
+# ========== BACKGROUND JOBS ==========
+
+def queue_full_response(error):
+    """HTTP 429 for a full job queue"""
+    response = jsonify({
+        'success': False,
+        'error': 'Too many AI jobs in progress, please retry shortly',
+        'queue_depth': error.depth,
+        'retry_after': error.retry_after
+    })
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 429
+
+def coalesced_response(ai_meta_row, **extra):
+    """Response for a request attached to an identical in-flight one"""
+    return jsonify({
+        'success': True,
+        'ai_meta_id': ai_meta_row['id'],
+        'coalesced': True,
+        'message': 'An identical request is already in progress - attached to it',
+        'progress': (ai_meta_row.get('output_json') or {}).get('progress', 0),
+        **extra
+    })
+
+def load_task_and_employees(task_id, task_select, employee_fields, ai_meta_id, operation):
+    """Re-fetch a job's task and active employees by id; None if either is missing"""
+    supabase = get_supabase_client()
+    task_result = supabase.table("action_plans").select(task_select).eq("id", task_id).execute()
+    if not task_result.data:
+        log_ai_error(operation, f"Task {task_id} not found", ai_meta_id)
+        return None
+    employees_result = supabase.table("employees").select(employee_fields).eq("is_active", True).execute()
+    employees = employees_result.data or []
+    if not employees:
+        log_ai_error(operation, "No active employees found", ai_meta_id)
+        return None
+    return task_result.data[0], employees
+
+def run_employee_recommendations_job(payload, ai_meta_id):
+    """Job handler for /generate-employee-recommendations"""
+    loaded = load_task_and_employees(payload['task_id'], "*, objectives(title)", RECOMMENDATION_EMPLOYEE_FIELDS,
+                                     ai_meta_id, "employee_recommendations")
+    if loaded:
+        process_employee_recommendations_for_task(loaded[0], loaded[1], ai_meta_id)
+
+def run_rag_recommendations_job(payload, ai_meta_id):
+    """Job handler for /generate-rag-recommendations"""
+    loaded = load_task_and_employees(payload['task_id'], "*, objectives(*)", RAG_RECOMMENDATION_EMPLOYEE_FIELDS,
+                                     ai_meta_id, "rag_recommendations")
+    if loaded:
+        corrected_process_employee_recommendations_for_task(loaded[0], loaded[1], ai_meta_id)
+
+def run_objective_recommendations_job(payload, ai_meta_id):
+    """Job handler for /api/objectives/<id>/generate-rag-recommendations"""
+    process_objective_recommendations(payload['objective_id'], ai_meta_id, payload.get('only_missing', True))
+
+def deliver_classification_result(ai_meta_id, goal_id, ai_tasks, ai_breakdown, ai_processing_time):
+    """
+    Publish classification results on the ai_meta record.
+
+    This is the delivery contract for async classification (and for duplicate
+    requests attached to a running one): clients poll /api/ai-meta/<id> until
+    output_json.completed is true, then read output_json.tasks.
+    """
+    try:
+        supabase = get_supabase_client()
+        current = supabase.table("ai_meta").select("output_json").eq("id", ai_meta_id).execute()
+        output_json = (current.data[0].get('output_json') if current.data else None) or {}
+        if output_json.get('status') in ('queued', 'starting', 'processing', None):
+            output_json['status'] = 'completed'
+        output_json.update({
+            "progress": 100,
+            "completed": True,
+            "goal_id": goal_id,
+            "tasks": ai_tasks or [],
+            "tasks_generated": len(ai_tasks or []),
+            "ai_breakdown": ai_breakdown,
+            "ai_processing_time": ai_processing_time,
+            "completed_at": datetime.utcnow().isoformat()
+        })
+        supabase.table("ai_meta").update({
+            "output_json": output_json,
+            "updated_at": datetime.utcnow().isoformat()
+        }).eq("id", ai_meta_id).execute()
+    except Exception as e:
+        print(f"❌ Failed to deliver classification result for {ai_meta_id}: {e}")
+
+def run_goal_classification_job(payload, ai_meta_id):
+    """Job handler for async /goals/classify-only"""
+    supabase = get_supabase_client()
+    goal_result = supabase.table("objectives").select("*").eq("id", payload['goal_id']).execute()
+    if not goal_result.data:
+        log_ai_error("goal_classification", f"Goal {payload['goal_id']} not found", ai_meta_id, payload['goal_id'])
+        return
+    
+    goal = goal_result.data[0]
+    # Rebuild the request's goal data from the stored objective
+    goal_data = {field: goal.get(field) or '' for field in ('title', 'description', 'output', 'department', 'priority')}
+    goal_data['deadline'] = goal.get('deadline')
+    goal_data['auto_classify'] = True
+    
+    template = payload.get('template', 'auto')
+    ai_tasks, ai_breakdown, ai_processing_time = classify_goal_to_tasks_only(goal, goal_data, ai_meta_id, template)
+    deliver_classification_result(ai_meta_id, goal['id'], ai_tasks, ai_breakdown, ai_processing_time)
+
+def job_failed(operation):
+    """
+    on_failure callback: surface a given-up job on its ai_meta record.
+
+    Job handlers must raise on failure (not just log it) so the queue can
+    retry them and call this once the attempts are used up.
+    """
+    def on_failure(payload, ai_meta_id, error):
+        log_ai_error(operation, f"Background job failed: {error}", ai_meta_id, payload.get('goal_id'))
+    return on_failure
+
+job_queue.register('employee_recommendations', run_employee_recommendations_job, on_failure=employee_recommendations_failed)
+job_queue.register('rag_recommendations', run_rag_recommendations_job, on_failure=job_failed("rag_recommendations"))
+job_queue.register('goal_classification', run_goal_classification_job, on_failure=job_failed("goal_classification"))
+job_queue.register('objective_recommendations', run_objective_recommendations_job, on_failure=job_failed("objective_recommendations"))
+
+# Start workers now so jobs interrupted by a restart are picked up without waiting for a request
+if os.getenv('JOB_QUEUE_AUTOSTART', 'true').lower() == 'true':
+    job_queue.start()
 
 @task_bp.route('/api/health/tasks', methods=['GET'])
 def health_check():
@@ -5027,6 +5719,12 @@ def health_check():
         'success': True,
         'message': 'Tasks API is working',
         'openai_configured': bool(client),
+        'job_queue': job_queue.stats(),
+        'llm_gateway': llm.stats(),
+        'hedging': get_hedger().stats(),
+        'employee_features': get_employee_feature_store().stats(),
+        'recommendation_cache': get_recommendation_cache().stats(),
+        'workload': get_workload_store().stats(),
         'timestamp': datetime.utcnow().isoformat()
     })
 
@@ -0,0 +1,90 @@
+"""assignment_optimizer.solve: capacity, re-solving overloads and the greedy fallback without SciPy"""
+import numpy as np
+import pytest
+
+import assignment_optimizer
+from assignment_optimizer import solve, optimize_assignments
+
+
+@pytest.fixture(params=['hungarian', 'greedy'])
+def solver(request, monkeypatch):
+    if request.param == 'greedy':
+        monkeypatch.setattr(assignment_optimizer, 'linear_sum_assignment', None)
+    return request.param
+
+
+def run(fit, hours, capacity, **kwargs):
+    return solve(np.array(fit, dtype=np.float64), np.array(hours, dtype=np.float64),
+                 np.array(capacity, dtype=np.float64), **kwargs)
+
+
+def test_load_penalty_spreads_work_over_close_matches(solver):
+    solution = run([[90, 85], [90, 85]], [8, 8], [40, 40], load_penalty=10)
+    assert solution.solver == solver
+    assert sorted(solution.employee_for_task.tolist()) == [0, 1]
+
+    # Without the penalty the stronger employee takes both
+    assert run([[90, 85], [90, 85]], [8, 8], [40, 40], load_penalty=0).employee_for_task.tolist() == [0, 0]
+
+
+def test_max_tasks_caps_an_employee(solver):
+    solution = run([[95, 40]] * 3, [1, 1, 1], [40, 40], max_tasks=2, load_penalty=0)
+    assert sorted(solution.employee_for_task.tolist()) == [0, 0, 1]
+
+
+def test_weak_fit_and_oversized_tasks_stay_unassigned(solver):
+    # Task 0 fits nobody well enough, task 1 is larger than anyone's free hours
+    solution = run([[20, 25], [90, 90]], [4, 50], [40, 40], min_fit=30)
+    assert solution.employee_for_task.tolist() == [-1, -1]
+
+
+def test_overloaded_employee_loses_their_weakest_task(solver):
+    # Employee 0 is best for all three, but 3 x 16h exceeds the 40h free
+    solution = run([[95, 60], [90, 60], [85, 60]], [16, 16, 16], [40, 40], load_penalty=0)
+    assert solution.employee_for_task.tolist() == [0, 0, 1]
+    assert solution.iterations == 2
+
+
+def test_planned_hours_never_exceed_capacity(solver):
+    rng = np.random.default_rng(7)
+    fit = rng.uniform(30, 100, size=(12, 4))
+    hours = rng.choice([4, 8, 16, 24], size=12).astype(np.float64)
+    capacity = np.array([40, 24, 16, 0], dtype=np.float64)
+
+    solution = solve(fit, hours, capacity, load_penalty=5)
+    assigned = solution.employee_for_task >= 0
+    load = np.bincount(solution.employee_for_task[assigned], weights=hours[assigned], minlength=4)
+    assert np.all(load <= capacity + 1e-9)
+    assert np.all(np.bincount(solution.employee_for_task[assigned], minlength=4) <= 3)
+    assert not np.any(solution.employee_for_task == 3)
+
+
+def test_empty_inputs():
+    assert run(np.zeros((0, 2)), [], [40, 40]).employee_for_task.tolist() == []
+    assert run(np.zeros((2, 0)), [8, 8], []).employee_for_task.tolist() == [-1, -1]
+
+
+def test_plan_uses_recommended_roles_and_existing_hours(solver):
+    employees = [
+        {'id': 'e1', 'name': 'Asha', 'role': 'Account Executive', 'department': 'FINANCE', 'skills': [],
+         'experience_years': 3, 'updated_at': '2026-01-01'},
+        {'id': 'e2', 'name': 'Ravi', 'role': 'Warehouse Manager', 'department': 'OPERATIONS', 'skills': [],
+         'experience_years': 3, 'updated_at': '2026-01-01'},
+    ]
+    tasks = [
+        {'id': 't1', 'task_description': 'Raise the invoice', 'estimated_hours': 8,
+         'strategic_metadata': {'recommended_role': 'Account Executive'}},
+        {'id': 't2', 'task_description': 'Dispatch the order', 'estimated_hours': 8,
+         'strategic_metadata': '{"recommended_role": "warehouse manager"}'},
+    ]
+
+    plan = optimize_assignments(tasks, employees)
+    assert {(row['task_id'], row['employee_id'], row['fit_score']) for row in plan['assignments']} == {
+        ('t1', 'e1', 100), ('t2', 'e2', 100)}
+    assert plan['solver'] == solver
+
+    # The warehouse manager is already fully booked
+    plan = optimize_assignments(tasks, employees, existing_hours={'e2': 40})
+    assert [row['task_id'] for row in plan['assignments']] == ['t1']
+    assert plan['unassigned'][0]['task_id'] == 't2'
+    assert plan['unassigned'][0]['reason'] == 'no_capacity'
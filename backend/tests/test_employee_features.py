@@ -0,0 +1,101 @@
+"""EmployeeFeatureStore: rebuild rules, role index, skill synonyms and scoring parity"""
+import numpy as np
+import pytest
+
+from employee_features import EmployeeFeatureStore, canonical_skill, canonical_skills
+from keyword_matcher import advanced_fit_scores, department_analysis_scores, ultra_fast_scores
+
+
+def employee(employee_id, role, updated_at='2026-01-01T00:00:00', **fields):
+    return {'id': employee_id, 'name': f"Employee {employee_id}", 'role': role, 'department': 'FINANCE',
+            'skills': ['Excel', 'GST Filing'], 'experience_years': 4, 'updated_at': updated_at, **fields}
+
+
+@pytest.mark.parametrize('skill, skill_id', [
+    ('SCM', 'supply chain'),
+    ('Supply-Chain Management', 'supply chain'),
+    ('  supply chain  management ', 'supply chain'),
+    ('MS Excel', 'excel'),
+    ('Quality Control', 'quality'),
+    ('C#', 'c#'),
+    ('Customer Relationship Management', 'customer relations'),
+    ('Freight Forwarding', 'logistics'),
+])
+def test_skill_synonyms_fold_to_one_id(skill, skill_id):
+    assert canonical_skill(skill) == skill_id
+
+
+def test_canonical_skills_ignores_empty_and_non_lists():
+    assert canonical_skills(['CRM', 'Client Relations', '--']) == frozenset({'customer relations'})
+    assert canonical_skills(None) == frozenset()
+    assert canonical_skills('Excel') == frozenset()
+
+
+def test_same_row_is_a_cache_hit():
+    store = EmployeeFeatureStore()
+    row = employee('e1', 'Account Executive')
+    first = store.get(row)
+    assert store.get(dict(row)) is first
+    assert store.stats()['builds'] == 1 and store.stats()['hits'] == 1
+
+
+def test_newer_or_wider_row_is_rebuilt():
+    store = EmployeeFeatureStore()
+    store.get(employee('e1', 'Account Executive', skills=['Excel']))
+
+    newer = store.get(employee('e1', 'Account Executive', updated_at='2026-02-01T00:00:00', skills=['SCM']))
+    assert newer.skill_ids == frozenset({'supply chain'})
+
+    # A row with a field the entry was not built from
+    wider = store.get(employee('e1', 'Account Executive', updated_at='2026-02-01T00:00:00', skills=['SCM'],
+                               google_drive_jd='Prepares GST returns'))
+    assert wider.has_jd and wider is not newer
+
+    # Without updated_at there is nothing to compare: always rebuilt
+    row = {'id': 'e1', 'role': 'Account Executive'}
+    assert store.get(row) is not store.get(row)
+
+
+def test_partial_upsert_keeps_the_known_fields():
+    store = EmployeeFeatureStore()
+    store.upsert(employee('e1', 'Account Executive'))
+    features = store.upsert({'id': 'e1', 'google_drive_jd': 'Reconciles ledgers'})
+    assert features.role == 'Account Executive'
+    assert features.skills_lower == ('excel', 'gst filing')
+    assert features.has_jd
+
+
+def test_role_index_follows_upserts_and_removals():
+    store = EmployeeFeatureStore()
+    store.upsert(employee('e1', 'Account Executive'))
+    store.upsert(employee('e2', 'account executive '))
+    store.upsert(employee('e3', 'Warehouse Manager'))
+    assert store.employees_with_role('ACCOUNT EXECUTIVE') == {'e1', 'e2'}
+
+    store.upsert({'id': 'e2', 'role': 'Warehouse Manager'})
+    assert store.employees_with_role('Account Executive') == {'e1'}
+    assert store.employees_with_role('Warehouse Manager') == {'e2', 'e3'}
+
+    store.remove('e1')
+    store.remove('unknown')
+    assert store.employees_with_role('Account Executive') == frozenset()
+    assert store.stats() == {'employees': 2, 'roles': 1, 'hits': 0, 'builds': 4}
+
+
+def test_scores_from_features_match_scores_from_rows():
+    employees = [
+        employee('e1', 'Account Executive', skills=['GST Filing', 'Excel', 'Tally'],
+                 google_drive_jd='Prepares GST returns and invoices'),
+        employee('e2', 'Warehouse Manager', department='OPERATIONS', skills=['Inventory Management'],
+                 experience_years=1),
+        employee('e3', '', department='', skills=None, experience_years=None),
+    ]
+    features = EmployeeFeatureStore().features_for(employees)
+    task = "Account Executive: file the monthly GST returns and reconcile invoices in Excel"
+
+    assert np.array_equal(ultra_fast_scores(task, employees, features=features), ultra_fast_scores(task, employees))
+    assert np.array_equal(
+        advanced_fit_scores(task, employees, features=features),
+        advanced_fit_scores(task, employees, jd_texts=[row.get('google_drive_jd') for row in employees]))
+    with_features, with_rows = department_analysis_scores(task, employees, features), department_analysis_scores(task, employees)
+    assert np.array_equal(with_features[0], with_rows[0]) and np.array_equal(with_features[1], with_rows[1])
@@ -0,0 +1,128 @@
+"""WorkloadStore loads: transient errors are retried, a missing table falls back to a background reconcile"""
+import time
+import threading
+
+import pytest
+
+import employee_workload
+from employee_workload import WorkloadStore, is_missing_table
+
+
+class APIError(Exception):
+    """Shaped like postgrest.exceptions.APIError"""
+
+    def __init__(self, code, message):
+        self.code = code
+        self.message = message
+        super().__init__(message)
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.rows = None
+
+    def select(self, fields):
+        return self
+
+    def neq(self, column, value):
+        return self
+
+    def or_(self, condition):
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        self.rows = rows
+        return self
+
+    def execute(self):
+        self.db.calls.append((self.table, 'upsert' if self.rows is not None else 'select'))
+        if self.table == employee_workload.WORKLOAD_TABLE and self.db.workload_error:
+            raise self.db.workload_error
+        if self.table == 'action_plans' and self.db.scan_started is not None:
+            self.db.scan_started.set()
+            self.db.release_scan.wait(5)
+        if self.rows is not None:
+            self.db.workload.update({row['employee_id']: row for row in self.rows})
+            return type('Result', (), {'data': self.rows})()
+        data = list(self.db.workload.values()) if self.table == employee_workload.WORKLOAD_TABLE else self.db.tasks
+        return type('Result', (), {'data': data})()
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.calls = []
+        self.workload = {}
+        self.tasks = []
+        self.workload_error = None
+        self.scan_started = None
+        self.release_scan = threading.Event()
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = FakeSupabase()
+    monkeypatch.setattr(employee_workload, 'get_supabase_client', lambda: fake)
+    return fake
+
+
+def task(task_id, employee_id, hours):
+    return {'id': task_id, 'assigned_to': employee_id, 'assigned_to_multiple': [], 'estimated_hours': hours,
+            'completion_percentage': 0, 'due_date': None, 'status': 'in_progress'}
+
+
+def test_missing_table_is_recognised():
+    assert is_missing_table(APIError('42P01', 'relation "public.employee_workload" does not exist'))
+    assert is_missing_table(APIError('PGRST205', "Could not find the table 'public.employee_workload' in the schema cache"))
+    assert not is_missing_table(APIError('57014', 'canceling statement due to statement timeout'))
+    assert not is_missing_table(ConnectionError('Connection reset by peer'))
+
+
+def test_transient_load_error_keeps_the_table_and_retries(db):
+    store = WorkloadStore(cache_seconds=0)
+    db.workload_error = ConnectionError('Connection reset by peer')
+    assert store.get('e1').open_tasks == 0
+    assert store.stats()['table_available']
+
+    db.workload_error = None
+    db.workload['e1'] = {'employee_id': 'e1', 'open_tasks': 2, 'remaining_hours': 6, 'open_due_dates': [], 'updated_at': None}
+    time.sleep(0.01)
+    assert store.get('e1').open_tasks == 2
+    # No full scan of action_plans on the request path
+    assert ('action_plans', 'select') not in db.calls
+
+
+def test_missing_table_reconciles_in_the_background(db):
+    store = WorkloadStore(cache_seconds=3600)
+    db.workload_error = APIError('42P01', 'relation "public.employee_workload" does not exist')
+    db.tasks = [task('t1', 'e1', 4)]
+    db.scan_started = threading.Event()
+
+    # Returns while the reconcile's scan is still blocked
+    assert store.get('e1').open_tasks == 0
+    assert db.scan_started.wait(5)
+    assert not store.stats()['table_available']
+
+    db.release_scan.set()
+    deadline = time.time() + 5
+    while store.stats()['reconciles'] == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert store.get('e1').open_tasks == 1
+    assert store.get('e1').remaining_hours == 4
+
+
+def test_reconcile_picks_the_table_up_once_it_exists(db):
+    store = WorkloadStore(cache_seconds=3600)
+    db.workload_error = APIError('PGRST205', "Could not find the table 'public.employee_workload' in the schema cache")
+    store._load()
+    assert not store.stats()['table_available']
+
+    db.workload_error = None
+    db.tasks = [task('t1', 'e1', 3)]
+    store.reconcile()
+    assert store.stats()['table_available']
+    assert db.workload['e1']['open_tasks'] == 1
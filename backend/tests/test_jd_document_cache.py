@@ -0,0 +1,118 @@
+"""JDDocumentCache against a local HTTP server standing in for Google Drive"""
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from jd_document_cache import JDDocumentCache, get_cache_key
+
+ETAG = '"jd-v1"'
+DOCUMENT_TEXT = "Senior Accountant: prepares monthly closing and GST filings"
+
+
+class DocumentHandler(BaseHTTPRequestHandler):
+    """/jd.txt serves a document with an ETag, anything else is a 404"""
+
+    requests_seen = []
+
+    def do_GET(self):
+        self.requests_seen.append((self.path, self.headers.get('If-None-Match')))
+        if self.path != '/jd.txt':
+            self.send_response(404)
+            self.end_headers()
+            return
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.send_header('ETag', ETAG)
+            self.end_headers()
+            return
+        body = DOCUMENT_TEXT.encode('utf-8')
+        self.send_response(200)
+        self.send_header('ETag', ETAG)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    DocumentHandler.requests_seen = []
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), DocumentHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return JDDocumentCache(cache_dir=str(tmp_path), fresh_seconds=3600, failure_seconds=600, timeout=5)
+
+
+def extract(response, document_url):
+    return response.text
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_fresh_entry_is_served_without_a_download(server, cache):
+    url = f"{server}/jd.txt"
+
+    assert cache.get_text(url, extract) == DOCUMENT_TEXT
+    assert cache.get_text(url, extract) == DOCUMENT_TEXT
+    assert DocumentHandler.requests_seen == [('/jd.txt', None)]
+
+    # A new cache instance on the same directory reads the entry from disk
+    reloaded = JDDocumentCache(cache_dir=cache.cache_dir, fresh_seconds=3600, timeout=5)
+    assert reloaded.get_text(url, extract) == DOCUMENT_TEXT
+    assert len(DocumentHandler.requests_seen) == 1
+
+
+def test_stale_entry_is_served_while_revalidated_conditionally(server, cache):
+    url = f"{server}/jd.txt"
+    key = get_cache_key(url)
+    cache.get_text(url, extract)
+    stale_at = time.time() - cache.fresh_seconds - 1
+    cache._entries[key]['fetched_at'] = stale_at
+
+    extractor_calls = []
+
+    def counting_extract(response, document_url):
+        extractor_calls.append(document_url)
+        return response.text
+
+    assert cache.get_text(url, counting_extract) == DOCUMENT_TEXT
+    assert wait_for(lambda: cache._load_entry(key)['fetched_at'] > stale_at and not cache.stats()['refreshing'])
+
+    assert DocumentHandler.requests_seen == [('/jd.txt', None), ('/jd.txt', ETAG)]
+    # 304: the stored text was kept and the document was not parsed again
+    assert extractor_calls == []
+    assert cache.get_text(url, counting_extract) == DOCUMENT_TEXT
+    assert len(DocumentHandler.requests_seen) == 2
+
+
+def test_failed_download_is_cached_for_the_failure_window(server, cache):
+    url = f"{server}/missing.pdf"
+
+    assert cache.get_text(url, extract) is None
+    assert cache.get_text(url, extract) is None
+    assert DocumentHandler.requests_seen == [('/missing.pdf', None)]
+
+    # Once the failure window has passed the document is retried
+    key = get_cache_key(url)
+    cache._entries[key]['fetched_at'] = time.time() - cache.failure_seconds - 1
+    cache.get_text(url, extract)
+    assert wait_for(lambda: len(DocumentHandler.requests_seen) == 2)
@@ -0,0 +1,124 @@
+"""JobQueue on InMemoryJobStore: lease compare-and-set, lease recovery and retries"""
+import time
+import threading
+
+import pytest
+
+from job_queue import JobQueue, InMemoryJobStore
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def queues():
+    started = []
+
+    def make(store, **kwargs):
+        job_queue = JobQueue(store, **kwargs)
+        started.append(job_queue)
+        return job_queue
+
+    yield make
+    for job_queue in started:
+        job_queue.stop()
+
+
+def test_only_one_worker_wins_the_lease(queues):
+    store = InMemoryJobStore()
+    first, second = queues(store), queues(store)
+    first.owner, second.owner = 'worker-a', 'worker-b'
+    for job_queue in (first, second):
+        job_queue.register('noop', lambda payload, job_id: None)
+    store.create('job-1', first.new_job('noop', {}))
+
+    claimed = first._claim('job-1')
+    assert claimed['state'] == 'running' and claimed['lease_owner'] == 'worker-a'
+    # The lease is live, so the other worker backs off
+    assert second._claim('job-1') is None
+    # A write based on a stale version is refused
+    assert not store.compare_and_set('job-1', 0, dict(claimed, lease_owner='worker-b'))
+    assert store.get('job-1')['lease_owner'] == 'worker-a'
+    assert store.get('job-1')['attempts'] == 1
+
+
+def test_heartbeat_keeps_the_lease_of_a_long_job(queues):
+    store = InMemoryJobStore()
+    release = threading.Event()
+    running = queues(store, workers=1, lease_seconds=1, heartbeat_seconds=0.2)
+    running.register('slow', lambda payload, job_id: release.wait(10))
+    other = queues(store)
+    other.owner = 'worker-b'
+    other.register('slow', lambda payload, job_id: None)
+
+    store.create('job-1', running.new_job('slow', {}))
+    running.submit('job-1', store.get('job-1'))
+    assert wait_for(lambda: store.get('job-1')['state'] == 'running')
+
+    time.sleep(1.5)  # longer than the lease: only the heartbeat keeps it alive
+    assert store.get('job-1')['lease_expires_at'] > time.time()
+    assert other._claim('job-1') is None
+
+    release.set()
+    assert wait_for(lambda: store.get('job-1')['state'] == 'done')
+
+
+def test_expired_lease_is_recovered_by_another_worker(queues):
+    store = InMemoryJobStore()
+    dead = queues(store, lease_seconds=1)
+    dead.owner = 'worker-that-died'
+    dead.register('work', lambda payload, job_id: None)
+    store.create('job-1', dead.new_job('work', {'task_id': 't1'}))
+    assert dead._claim('job-1')  # claimed, then the process "dies" without finishing
+
+    ran = []
+    live = queues(store, workers=1, lease_seconds=1, heartbeat_seconds=0.2)
+    live.register('work', lambda payload, job_id: ran.append((payload, job_id)))
+    live.start()
+
+    assert wait_for(lambda: store.get('job-1')['state'] == 'done')
+    assert ran == [({'task_id': 't1'}, 'job-1')]
+    assert store.get('job-1')['attempts'] == 2
+    # The old owner can no longer write the job
+    assert not dead._finish('job-1', store.get('job-1'), 'failed', 'late')
+
+
+def test_failed_handler_is_retried(queues):
+    store = InMemoryJobStore()
+    attempts, failures = [], []
+
+    def flaky(payload, job_id):
+        attempts.append(job_id)
+        if len(attempts) == 1:
+            raise RuntimeError("OpenAI timed out")
+
+    job_queue = queues(store, workers=1)
+    job_queue.register('flaky', flaky, on_failure=lambda payload, job_id, error: failures.append(error))
+    job_queue.enqueue('flaky', {}, 'job-1')
+
+    assert wait_for(lambda: store.get('job-1')['state'] == 'done')
+    assert len(attempts) == 2
+    assert store.get('job-1')['attempts'] == 2
+    assert failures == []
+
+
+def test_job_out_of_attempts_fails_and_calls_on_failure(queues):
+    store = InMemoryJobStore()
+    failures = []
+
+    def broken(payload, job_id):
+        raise RuntimeError("bad payload")
+
+    job_queue = queues(store, workers=1)
+    job_queue.register('broken', broken, on_failure=lambda payload, job_id, error: failures.append((job_id, error)))
+    job_queue.enqueue('broken', {}, 'job-1', max_attempts=1)
+
+    assert wait_for(lambda: store.get('job-1')['state'] == 'failed')
+    assert store.get('job-1')['last_error'] == "bad payload"
+    assert wait_for(lambda: failures == [('job-1', "bad payload")])
@@ -0,0 +1,66 @@
+"""LLMGateway circuit breaker: only OpenAI-side failures count towards opening it"""
+import time
+
+import pytest
+
+from llm_gateway import LLMGateway, CircuitBreaker, CircuitOpenError
+
+
+class APIStatusError(Exception):
+    def __init__(self, status_code):
+        self.status_code = status_code
+        super().__init__(f"status {status_code}")
+
+
+class ScriptedClient:
+    """Stands in for the OpenAI client: each call raises or returns the next scripted outcome"""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+        self.chat = self
+        self.completions = self
+
+    def create(self, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def make_gateway(outcomes, failures=3):
+    breaker = CircuitBreaker(failure_threshold=failures, cooldown_seconds=60)
+    return LLMGateway(ScriptedClient(outcomes), max_retries=0, breaker=breaker)
+
+
+def call(gateway):
+    return gateway.create(model='gpt-test', messages=[{'role': 'user', 'content': 'hi'}], max_tokens=10)
+
+
+def test_bad_requests_do_not_reset_the_failure_count():
+    gateway = make_gateway([APIStatusError(503), APIStatusError(400), APIStatusError(503),
+                            APIStatusError(400), APIStatusError(503)])
+    for _ in range(5):
+        with pytest.raises(APIStatusError):
+            call(gateway)
+
+    # Three 503s opened the circuit even though 400s came in between
+    assert gateway.breaker.state == 'open'
+    with pytest.raises(CircuitOpenError):
+        call(gateway)
+    assert gateway.client.calls == 5
+
+
+def test_bad_request_on_the_probe_hands_the_probe_back():
+    gateway = make_gateway([APIStatusError(400), 'ok'], failures=1)
+    gateway.breaker.failures = 1
+    gateway.breaker.opened_at = time.monotonic() - 61
+
+    with pytest.raises(APIStatusError):
+        call(gateway)
+    # Still half-open, and the next call may probe
+    assert gateway.breaker.state == 'half_open' and not gateway.breaker.probing
+    assert call(gateway) == 'ok'
+    assert gateway.breaker.state == 'closed'
+
@@ -0,0 +1,154 @@
+"""NotificationCounterStore: deltas for inserts, reads and deletes, the read cache and the count fallback"""
+import pytest
+
+import notification_counters
+from notification_counters import NotificationCounterStore, unread_by_employee, ALL_EMPLOYEES
+
+
+class Result:
+    def __init__(self, data=None, count=None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.filters = {}
+
+    def select(self, fields, count=None):
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def limit(self, count):
+        return self
+
+    def execute(self):
+        self.db.calls.append(('select', self.table))
+        if self.table == notification_counters.NOTIFICATION_COUNTS_TABLE:
+            if self.db.missing:
+                raise Exception('relation "public.notification_unread_counts" does not exist')
+            key = self.filters['employee_id']
+            return Result([{'unread_count': self.db.counts[key]}] if key in self.db.counts else [])
+        rows = [row for row in self.db.notifications
+                if all(str(row.get(column)) == str(value) for column, value in self.filters.items())]
+        return Result([{'id': row['id']} for row in rows], len(rows))
+
+
+class FakeRpc:
+    def __init__(self, db, name, params):
+        self.db, self.name, self.params = db, name, params
+
+    def execute(self):
+        self.db.calls.append(('rpc', self.name, self.params))
+        if self.db.missing:
+            raise Exception(f"Could not find the function public.{self.name}")
+        return Result(getattr(self.db, self.name)(self.params))
+
+
+class FakeSupabase:
+    """Python versions of the functions in migrations/notification_unread_counts.sql"""
+
+    def __init__(self):
+        self.calls = []
+        self.counts = {}
+        self.notifications = []
+        self.missing = False
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params=None):
+        return FakeRpc(self, name, params)
+
+    def adjust_notification_unread(self, params):
+        for employee_id, delta in params['p_deltas'].items():
+            self.counts[employee_id] = max(self.counts.get(employee_id, 0) + delta, 0)
+        total = sum(params['p_deltas'].values())
+        self.counts[ALL_EMPLOYEES] = max(self.counts.get(ALL_EMPLOYEES, 0) + total, 0)
+
+    def reconcile_notification_unread(self, params):
+        self.counts = {employee_id: 0 for employee_id in self.counts}
+        self.counts.update(unread_by_employee(self.notifications))
+        self.counts[ALL_EMPLOYEES] = sum(count for key, count in self.counts.items() if key != ALL_EMPLOYEES)
+        return self.counts[ALL_EMPLOYEES]
+
+    def adjustments(self):
+        return [call[2]['p_deltas'] for call in self.calls if call[:2] == ('rpc', 'adjust_notification_unread')]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = FakeSupabase()
+    monkeypatch.setattr(notification_counters, 'get_supabase_client', lambda: fake)
+    return fake
+
+
+def notification(notification_id, employee_id, is_read=False):
+    return {'id': notification_id, 'to_employee': employee_id, 'is_read': is_read}
+
+
+def test_unread_by_employee_skips_read_rows_and_missing_recipients():
+    rows = [notification(1, 'e1'), notification(2, 'e1'), notification(3, 'e2', is_read=True),
+            notification(4, None), {'id': 5, 'to_employee': 7}]
+    assert unread_by_employee(rows) == {'e1': 2, '7': 1}
+
+
+def test_writes_send_one_delta_per_employee(db):
+    store = NotificationCounterStore()
+    store.notifications_inserted([notification(1, 'e1'), notification(2, 'e1'), notification(3, 'e2')])
+    # Updated rows come back with is_read already set: they were unread before the update
+    store.notifications_read([notification(1, 'e1', is_read=True)])
+    store.notifications_deleted([notification(2, 'e1'), notification(3, 'e2', is_read=True)])
+    store.adjust({'e1': 0})
+    store.notifications_inserted([notification(4, 'e3', is_read=True)])
+
+    assert db.adjustments() == [{'e1': 2, 'e2': 1}, {'e1': -1}, {'e1': -1}]
+    assert db.counts == {'e1': 0, 'e2': 1, ALL_EMPLOYEES: 1}
+
+
+def test_first_read_reconciles_then_reads_one_row(db):
+    db.notifications = [notification(1, 'e1'), notification(2, 'e1'), notification(3, 'e2', is_read=True)]
+    store = NotificationCounterStore()
+
+    assert store.unread_count('e1') == 2
+    assert store.unread_count() == 2
+    assert ('rpc', 'reconcile_notification_unread', {}) in db.calls
+    assert ('select', 'notifications') not in db.calls
+
+
+def test_cached_count_is_dropped_by_own_writes_and_skipped_when_fresh(db):
+    store = NotificationCounterStore(cache_seconds=60)
+    store.unread_count('e1')
+    reads = len(db.calls)
+    assert store.unread_count('e1') == 0
+    assert len(db.calls) == reads
+    assert store.stats()['cache_hits'] == 1
+
+    store.notifications_inserted([notification(1, 'e1')])
+    assert store.unread_count('e1') == 1
+    assert store.unread_count() == 1
+
+    # Another worker's write is only seen with fresh=True (or after cache_seconds)
+    db.counts['e1'] = 5
+    assert store.unread_count('e1') == 1
+    assert store.unread_count('e1', fresh=True) == 5
+
+
+def test_without_the_migration_unread_rows_are_counted(db):
+    db.missing = True
+    db.notifications = [notification(1, 'e1'), notification(2, 'e2'), notification(3, 'e1', is_read=True)]
+    store = NotificationCounterStore()
+
+    assert store.unread_count('e1') == 1
+    assert store.unread_count() == 2
+    assert not store.stats()['table_available']
+    assert store.stats()['fallback_counts'] == 2
+
+    # No adjust calls while the functions are missing
+    store.notifications_inserted([notification(4, 'e1')])
+    assert db.adjustments() == []
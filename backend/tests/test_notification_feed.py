@@ -0,0 +1,195 @@
+"""Notification feed cursors: encoding, keyset paging, since-polls with the overlap window, invalid cursors"""
+import re
+import base64
+from datetime import datetime, timedelta, timezone
+
+import jwt
+import pytest
+from flask import Flask
+
+import notification_routes
+from notification_routes import encode_cursor, decode_cursor, keyset_filter, fetch_notification_page
+
+SECRET_KEY = 'test-secret'
+START = datetime(2026, 10, 19, 9, 0, tzinfo=timezone.utc)
+KEYSET = re.compile(r'created_at\.(gt|lt)\."(.+?)",and\(created_at\.eq\."(.+?)",id\.(gt|lt)\.(.+)\)$')
+
+
+class Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    """The PostgREST calls the feed makes: eq, gte, the keyset `or`, order and limit"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.filters = []
+        self.orderings = []
+        self.max_rows = None
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: str(row.get(column)) == str(value))
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row[column] >= value)
+        return self
+
+    def or_(self, filters):
+        op, created_at, _, _, notification_id = KEYSET.match(filters).groups()
+        if op == 'gt':
+            self.filters.append(lambda row: (row['created_at'], row['id']) > (created_at, notification_id))
+        else:
+            self.filters.append(lambda row: (row['created_at'], row['id']) < (created_at, notification_id))
+        return self
+
+    def order(self, column, desc=False):
+        self.orderings.append((column, desc))
+        return self
+
+    def limit(self, count):
+        self.max_rows = count
+        return self
+
+    def execute(self):
+        rows = [row for row in self.rows if all(match(row) for match in self.filters)]
+        for column, desc in reversed(self.orderings):
+            rows.sort(key=lambda row: row[column], reverse=desc)
+        return Result([dict(row) for row in rows[:self.max_rows]])
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.notifications = []
+
+    def table(self, name):
+        assert name == 'notifications'
+        return FakeQuery(self.notifications)
+
+    def add(self, seconds, notification_id, to_employee='e1'):
+        row = {'id': notification_id, 'to_employee': to_employee, 'message': f"Notification {notification_id}",
+               'priority': 'normal', 'is_read': False, 'meta': {'type': 'task_assigned'},
+               'created_at': (START + timedelta(seconds=seconds)).isoformat()}
+        self.notifications.append(row)
+        return row
+
+
+class FakeCounters:
+    def unread_count(self, employee_id=None, fresh=False):
+        return 0
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = FakeSupabase()
+    monkeypatch.setattr(notification_routes, 'get_supabase_client', lambda: fake)
+    monkeypatch.setattr(notification_routes, 'get_notification_counter_store', lambda: FakeCounters())
+    return fake
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = SECRET_KEY
+    app.register_blueprint(notification_routes.notification_bp)
+    token = jwt.encode({'role': 'employee', 'employee_id': 'e1'}, SECRET_KEY, algorithm='HS256')
+    test_client = app.test_client()
+
+    def get(**params):
+        response = test_client.get('/api/notifications', query_string=params,
+                                   headers={'Authorization': f'Bearer {token}'})
+        return response.status_code, response.get_json()
+
+    return get
+
+
+def ids(rows):
+    return [row['id'] for row in rows]
+
+
+def test_cursor_round_trip():
+    row = {'created_at': '2026-10-19T09:00:00.123456+00:00', 'id': '5f0c7a9e-93f1-4c1b-9a55-0d8b2e7f4a10'}
+    cursor = encode_cursor(row)
+    assert '=' not in cursor and '+' not in cursor and '/' not in cursor
+    assert decode_cursor(cursor) == (row['created_at'], row['id'])
+    assert keyset_filter(cursor, newer=True) == (
+        'created_at.gt."2026-10-19T09:00:00.123456+00:00",'
+        'and(created_at.eq."2026-10-19T09:00:00.123456+00:00",id.gt.5f0c7a9e-93f1-4c1b-9a55-0d8b2e7f4a10)')
+
+
+@pytest.mark.parametrize('cursor', [
+    'not base64 !!',
+    base64.urlsafe_b64encode(b'no separator').decode('ascii'),
+    base64.urlsafe_b64encode(b'|id-only').decode('ascii'),
+    base64.urlsafe_b64encode(b'2026-10-19T09:00:00|').decode('ascii'),
+    base64.urlsafe_b64encode(b'\xff\xfe|x').decode('ascii'),
+])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor(cursor)
+
+
+def test_history_pages_visit_every_row_once(db):
+    # Several rows share a timestamp: the id breaks the tie
+    for index in range(23):
+        db.add(index // 4, f"n{index:02d}")
+
+    seen, before = [], None
+    while True:
+        rows, has_more = fetch_notification_page(db, 'employee', 'e1', before=before, limit=5)
+        seen.extend(ids(rows))
+        if not has_more:
+            break
+        before = encode_cursor(rows[-1])
+    assert seen == [f"n{index:02d}" for index in reversed(range(23))]
+
+
+def test_since_catches_up_a_long_gap_page_by_page(db):
+    for index in range(12):
+        db.add(index, f"n{index:02d}")
+    since = encode_cursor(db.notifications[1])
+
+    rows, has_more = fetch_notification_page(db, 'employee', 'e1', since=since, limit=4)
+    # The oldest rows after the cursor first, returned newest first
+    assert ids(rows) == ['n05', 'n04', 'n03', 'n02'] and has_more
+    rows, has_more = fetch_notification_page(db, 'employee', 'e1', since=encode_cursor(rows[0]), limit=20)
+    assert ids(rows) == [f"n{index:02d}" for index in reversed(range(6, 12))] and not has_more
+
+
+def test_since_poll_returns_new_rows_and_the_overlap_window(db, client):
+    db.add(0, 'old')
+    db.add(30, 'n1')
+    db.add(31, 'someone-else', to_employee='e2')
+    status, first = client(limit=50)
+    assert status == 200 and ids(first['notifications']) == ['n1', 'old']
+
+    # Committed late: created before the cursor but visible only now
+    db.add(25, 'late')
+    db.add(40, 'n2')
+    status, poll = client(since=first['next_since'])
+    assert status == 200
+    # n2 is new; the window behind the cursor (n1 itself excluded) brings back the late row
+    assert ids(poll['notifications']) == ['n2', 'late']
+    assert poll['next_since'] == encode_cursor(db.notifications[-1])
+
+    # Nothing new: the cursor stays put, only the window is re-read
+    status, idle = client(since=poll['next_since'])
+    assert idle['next_since'] == poll['next_since']
+    assert ids(idle['notifications']) == ['n1']
+
+
+def test_invalid_cursor_is_a_bad_request(db, client):
+    for params in ({'since': 'garbage'}, {'before': 'garbage'},
+                   {'since': base64.urlsafe_b64encode(b'not-a-date|n1').decode('ascii')}):
+        status, body = client(**params)
+        assert status == 400
+        assert body == {'success': False, 'error': 'Invalid cursor'}
+
+    status, body = client(since=encode_cursor({'created_at': START.isoformat(), 'id': 'n1'}),
+                          before=encode_cursor({'created_at': START.isoformat(), 'id': 'n1'}))
+    assert status == 400 and 'either since or before' in body['error']
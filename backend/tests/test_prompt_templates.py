@@ -0,0 +1,31 @@
+"""Prompt templates keep a byte-identical prefix across requests (provider prompt caching)"""
+import string
+
+import pytest
+
+from prompt_templates import PROMPT_TEMPLATES
+
+
+def variable_names(template):
+    return {field for _, field, _, _ in string.Formatter().parse(template.variables) if field}
+
+
+def request_values(template, suffix):
+    return {name: f"{name} value {suffix}" for name in variable_names(template)}
+
+
+@pytest.mark.parametrize('name', sorted(PROMPT_TEMPLATES))
+@pytest.mark.parametrize('shared', [None, "STANDARD PROCESS:\n1. Step one\n2. Step two"])
+def test_static_prefix_is_identical_across_requests(name, shared):
+    template = PROMPT_TEMPLATES[name]
+    first = template.render(shared=shared, **request_values(template, 'one'))
+    second = template.render(shared=shared, **request_values(template, 'two'))
+    prefix = template.prefix(shared).encode('utf-8')
+
+    assert [message['role'] for message in first] == ['system', 'user']
+    assert first[0]['content'].encode('utf-8') == second[0]['content'].encode('utf-8')
+    first_user, second_user = first[-1]['content'].encode('utf-8'), second[-1]['content'].encode('utf-8')
+    assert first_user[:len(prefix)] == second_user[:len(prefix)] == prefix
+    # Only the request data differs, and it all comes after the prefix
+    assert first_user != second_user
+    assert b"value one" not in first_user[:len(prefix)]
@@ -1,8 +1,21 @@
 import streamlit as st
 import requests
+import json
+import time
+import threading
 from datetime import datetime
 from config import config
 
+# Notifications fetched per feed request
+NOTIFICATION_PAGE_SIZE = 50
+# How often the sidebar badge re-renders from the push stream (no backend request)
+BADGE_REFRESH_SECONDS = 2
+# Badge polling interval while the push stream is not connected
+BADGE_POLL_SECONDS = 30
+# A stream listener nobody read from for this long (tab closed, session gone) disconnects;
+# the badge starts a new one if the session comes back
+STREAM_LISTENER_IDLE_SECONDS = 60
+
 class NotificationManager:
     def __init__(self, backend_url: str):
         self.backend_url = backend_url
@@ -44,11 +57,82 @@ class NotificationManager:
         except Exception as e:
             return {'success': False, 'error': str(e)}
 
-    def get_notifications(self):
-        """Get notifications for current user"""
+    def _feed(self):
+        """Notifications already loaded this session (reset when the user changes)"""
+        feed = st.session_state.get('notification_feed')
+        if not feed or feed.get('token') != st.session_state.get('token'):
+            feed = {'token': st.session_state.get('token'), 'items': [], 'next_since': None,
+                    'next_before': None, 'has_more': False, 'loaded': False}
+            st.session_state['notification_feed'] = feed
+        return feed
+
+    def get_notifications(self, refresh=False):
+        """
+        Get notifications for current user.
+
+        The first call loads the newest page; later calls only fetch
+        notifications newer than the ones already loaded (since cursor).
+        """
+        feed = self._feed()
+        if refresh or not feed['loaded'] or not feed['next_since']:
+            result = self._safe_request(
+                requests.get,
+                f"{self.backend_url}/api/notifications",
+                params={'limit': NOTIFICATION_PAGE_SIZE}
+            )
+            if not result.get('success'):
+                return result
+            feed.update(items=result.get('notifications', []), next_since=result.get('next_since'),
+                        next_before=result.get('next_before'), has_more=result.get('has_more', False), loaded=True)
+        else:
+            result = {'has_more': True}
+            # Catch up page by page when many arrived since the last poll
+            while result.get('has_more'):
+                result = self._safe_request(
+                    requests.get,
+                    f"{self.backend_url}/api/notifications",
+                    params={'since': feed['next_since'], 'limit': NOTIFICATION_PAGE_SIZE}
+                )
+                if not result.get('success'):
+                    return result
+                # The response also repeats the last few seconds before the cursor (late commits)
+                known = {item['id'] for item in feed['items']}
+                new_items = [item for item in result.get('notifications', []) if item['id'] not in known]
+                if new_items:
+                    feed['items'] = sorted(new_items + feed['items'],
+                                           key=lambda item: (item.get('created_at') or '', item['id']), reverse=True)
+                feed['next_since'] = result.get('next_since') or feed['next_since']
+                if not feed['next_before']:
+                    feed['next_before'] = result.get('next_before')
+        return {
+            'success': True,
+            'notifications': feed['items'],
+            'unread_count': result.get('unread_count', 0),
+            'has_more': feed['has_more']
+        }
+
+    def load_older_notifications(self):
+        """Append the next page of older notifications to the loaded feed"""
+        feed = self._feed()
+        if not feed['next_before']:
+            return {'success': True, 'notifications': []}
+        result = self._safe_request(
+            requests.get,
+            f"{self.backend_url}/api/notifications",
+            params={'before': feed['next_before'], 'limit': NOTIFICATION_PAGE_SIZE}
+        )
+        if result.get('success'):
+            known = {item['id'] for item in feed['items']}
+            feed['items'] += [item for item in result.get('notifications', []) if item['id'] not in known]
+            feed['next_before'] = result.get('next_before') or feed['next_before']
+            feed['has_more'] = result.get('has_more', False)
+        return result
+
+    def get_notification(self, notification_id: str):
+        """One notification with its full meta (the feed holds the compact list view)"""
         return self._safe_request(
-            requests.get, 
-            f"{self.backend_url}/api/notifications"
+            requests.get,
+            f"{self.backend_url}/api/notifications/{notification_id}"
         )
 
     def get_notification_count(self):
@@ -59,22 +143,38 @@ class NotificationManager:
         )
 
     def mark_notification_read(self, notification_id: str):
-        return self._safe_request(
+        result = self._safe_request(
             requests.put,
             f"{self.backend_url}/api/notifications/{notification_id}/read"
         )
+        if result.get('success'):
+            st.session_state.pop('notification_badge_poll', None)
+            for item in self._feed()['items']:
+                if item['id'] == notification_id:
+                    item['is_read'] = True
+        return result
 
     def mark_all_notifications_read(self):
-        return self._safe_request(
+        result = self._safe_request(
             requests.put,
             f"{self.backend_url}/api/notifications/read-all"
         )
+        if result.get('success'):
+            st.session_state.pop('notification_badge_poll', None)
+            for item in self._feed()['items']:
+                item['is_read'] = True
+        return result
 
     def delete_notification(self, notification_id: str):
-        return self._safe_request(
+        result = self._safe_request(
             requests.delete,
             f"{self.backend_url}/api/notifications/{notification_id}"
         )
+        if result.get('success'):
+            st.session_state.pop('notification_badge_poll', None)
+            feed = self._feed()
+            feed['items'] = [item for item in feed['items'] if item['id'] != notification_id]
+        return result
 
     # IMPROVEMENT: Add method to get task details
     def get_task_details(self, task_id: str):
@@ -84,6 +184,97 @@ class NotificationManager:
             f"{self.backend_url}/api/tasks/{task_id}"
         )
 
+class NotificationStreamListener:
+    """
+    Reads the backend's notification stream (server-sent events) in a
+    background thread and keeps the latest unread count for the badge.
+    Reconnects with backoff; stops when the token is rejected or when the
+    badge has not read it for STREAM_LISTENER_IDLE_SECONDS.
+    """
+
+    def __init__(self, backend_url: str, token: str):
+        self.url = f"{backend_url}/api/notifications/stream"
+        self.token = token
+        self.unread_count = None
+        self.connected = False
+        self.last_event_at = None
+        self.last_used = time.time()
+        self.rejected = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='notification-stream', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def touch(self):
+        """Mark the listener as still wanted by its session"""
+        self.last_used = time.time()
+
+    @property
+    def alive(self):
+        return self._thread.is_alive() and not self._stop.is_set()
+
+    def _idle(self):
+        return time.time() - self.last_used > STREAM_LISTENER_IDLE_SECONDS
+
+    def _run(self):
+        backoff = 1
+        while not self._stop.is_set() and not self._idle():
+            try:
+                with requests.get(self.url, headers={'Authorization': f'Bearer {self.token}'},
+                                  stream=True, timeout=(5, 60)) as response:
+                    if response.status_code == 401:
+                        self.rejected = True
+                        return
+                    if response.status_code != 200:
+                        raise requests.exceptions.RequestException(f"status {response.status_code}")
+                    self.connected = True
+                    backoff = 1
+                    self._read_events(response)
+            except requests.exceptions.RequestException:
+                pass
+            finally:
+                self.connected = False
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, 30)
+
+    def _read_events(self, response):
+        event_type, data = None, []
+        # Keepalives arrive every few seconds, so an idle listener notices soon
+        for line in response.iter_lines(decode_unicode=True):
+            if self._stop.is_set() or self._idle():
+                return
+            if line is None:
+                continue
+            if line == '':
+                if event_type == 'unread' and data:
+                    self.unread_count = json.loads('\n'.join(data)).get('unread_count', 0)
+                    self.last_event_at = time.time()
+                event_type, data = None, []
+            elif line.startswith('event:'):
+                event_type = line[6:].strip()
+            elif line.startswith('data:'):
+                data.append(line[5:].strip())
+
+
+def get_notification_listener():
+    """The session's stream listener, restarted when the user changes or after it went idle"""
+    token = st.session_state.get('token')
+    listener = st.session_state.get('notification_listener')
+    if listener and (listener.token != token or (not listener.alive and not listener.rejected)):
+        listener.stop()
+        listener = None
+    if not listener and token:
+        listener = NotificationStreamListener(config.BACKEND_URL, token).start()
+        st.session_state['notification_listener'] = listener
+    if listener:
+        listener.touch()
+    return listener
+
 @st.cache_data(ttl=300)
 def get_notification_manager():
     return NotificationManager(config.BACKEND_URL)
@@ -174,6 +365,7 @@ def show_notifications_page():
     
     with col3:
         if st.button("🔄 Refresh", use_container_width=True):
+            notification_manager.get_notifications(refresh=True)
             st.rerun()
     
     st.markdown("---")
@@ -185,6 +377,13 @@ def show_notifications_page():
     # Display notifications
     for notification in notifications:
         show_notification_card(notification, notification_manager)
+    
+    if result.get('has_more') and st.button("⬇️ Load older notifications", use_container_width=True):
+        older = notification_manager.load_older_notifications()
+        if older.get('success'):
+            st.rerun()
+        else:
+            st.error(f"❌ Failed to load older notifications: {older.get('error')}")
 
 def show_notification_card(notification, task_manager):
     """Display a single notification card with task navigation and delete button"""
@@ -274,6 +473,10 @@ def show_notification_card(notification, task_manager):
 
 def show_notification_details(notification, notification_manager):
     """Show detailed notification information"""
+    # The feed holds compact rows; load the full meta for the details view
+    full = notification_manager.get_notification(notification['id'])
+    if full.get('success'):
+        notification = full['notification']
     meta = notification.get('meta', {})
     created_at = notification.get('created_at', '')
     
@@ -385,23 +588,51 @@ def get_relative_time(timestamp):
     except:
         return timestamp[:16]
 
+def render_notification_badge(unread_count):
+    if unread_count:
+        st.markdown(
+            f"🔔 **Notifications** • **{unread_count}** unread",
+            help=f"You have {unread_count} unread notifications"
+        )
+    else:
+        st.markdown("🔔 **Notifications**")
+
+def polled_unread_count():
+    """Unread count from the count endpoint, at most every BADGE_POLL_SECONDS"""
+    polled = st.session_state.get('notification_badge_poll')
+    if polled and time.time() - polled[1] < BADGE_POLL_SECONDS:
+        return polled[0]
+    count_data = get_notification_manager().get_notification_count()
+    unread_count = count_data.get('unread_count', 0) if count_data.get('success') else None
+    st.session_state['notification_badge_poll'] = (unread_count, time.time())
+    return unread_count
+
+def live_unread_count():
+    listener = get_notification_listener()
+    if listener and listener.connected and listener.unread_count is not None:
+        return listener.unread_count
+    return polled_unread_count()
+
+if hasattr(st, 'fragment'):
+    @st.fragment(run_every=BADGE_REFRESH_SECONDS)
+    def live_notification_badge():
+        """Re-renders only the badge, from the push stream's latest count"""
+        try:
+            render_notification_badge(live_unread_count())
+        except Exception:
+            render_notification_badge(None)
+else:
+    live_notification_badge = None
+
 def show_notification_badge():
-    """Show notification badge in sidebar"""
+    """Show notification badge in sidebar (kept live by the push stream when supported)"""
     try:
-        notification_manager = get_notification_manager()
-        count_data = notification_manager.get_notification_count()
-        
-        if count_data.get('success'):
-            unread_count = count_data.get('unread_count', 0)
-            if unread_count > 0:
-                st.sidebar.markdown(
-                    f"🔔 **Notifications** • **{unread_count}** unread",
-                    help=f"You have {unread_count} unread notifications"
-                )
+        with st.sidebar:
+            if live_notification_badge and st.session_state.get('token'):
+                live_notification_badge()
             else:
-                st.sidebar.markdown("🔔 **Notifications**")
-        else:
-            st.sidebar.markdown("🔔 **Notifications**")
+                count_data = get_notification_manager().get_notification_count()
+                render_notification_badge(count_data.get('unread_count', 0) if count_data.get('success') else None)
     except Exception as e:
         st.sidebar.markdown("🔔 **Notifications**")
 
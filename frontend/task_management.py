@@ -113,7 +113,8 @@ class TaskManager:
                 timeout=400
             )
             print(f"📥 Response status: {response.status_code}")
-            if response.status_code != 200:
+            # 202 = async mode, tasks are delivered on the ai_meta record
+            if response.status_code not in (200, 202):
                 return {'success': False, 'error': f"Request failed with status {response.status_code}"}
             return response.json()
         except requests.exceptions.Timeout:
@@ -445,6 +446,33 @@ def show_goal_management():
             st.session_state.goal_data = goal_data
             st.rerun()
 
+def wait_for_ai_classification(task_manager, result, progress_bar, status_text, timeout=400, poll_interval=2):
+    """Poll the ai_meta record of an async classification until its tasks are delivered"""
+    ai_meta_id = result.get('ai_meta_id')
+    if not ai_meta_id:
+        return {'success': False, 'error': 'No AI meta id returned for the classification'}
+    
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        progress = task_manager.get_ai_progress(ai_meta_id)
+        ai_meta = (progress.get('ai_meta') or {}) if progress.get('success') else {}
+        output_json = ai_meta.get('output_json') or {}
+        job = (ai_meta.get('input_json') or {}).get('job') or {}
+        
+        if output_json.get('completed'):
+            result['ai_tasks'] = output_json.get('tasks', [])
+            result['ai_breakdown'] = output_json.get('ai_breakdown')
+            result['ai_processing_time'] = output_json.get('ai_processing_time', 0)
+            return result
+        if job.get('state') == 'failed' or output_json.get('status') == 'error':
+            return {'success': False, 'error': output_json.get('error') or job.get('last_error') or 'AI classification failed'}
+        
+        progress_bar.progress(min(max(int(output_json.get('progress', 10)), 10), 99))
+        status_text.info(f"🤖 {output_json.get('current_activity') or 'Waiting for AI classification...'}")
+        time.sleep(poll_interval)
+    
+    return {'success': False, 'error': f"Classification still running after {timeout} seconds"}
+
 def show_ai_classification_progress(goal_data):
     st.info("🚀 AI Classifying Goal...")
     
@@ -488,7 +516,10 @@ def show_ai_classification_progress(goal_data):
         
         # Make the API call with progress updates
         with st.spinner("AI is analyzing your goal and generating tasks. This may take 30-60 seconds..."):
-            result = task_manager.create_goal_classify_only(goal_data)
+            result = task_manager.create_goal_classify_only({**goal_data, 'async': True})
+            # Async (or attached to a running classification): follow progress on the ai_meta record
+            if result and result.get('success') and (result.get('async') or result.get('coalesced')):
+                result = wait_for_ai_classification(task_manager, result, progress_bar, status_text)
         
         if result and result.get('success'):
             progress_bar.progress(100)